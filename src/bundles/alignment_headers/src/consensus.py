@@ -138,8 +138,41 @@ class Consensus(DynamicHeaderSequence):
         else:
             r1, r2 = pos1, (len(self.conserved) if pos2 is None else pos2+1)
             self.conserved[r1:r2] = [False] * (r2-r1)
+        if evaluation_func is None:
+            evaluation_func = self._evaluate_columns
         super().reevaluate(pos1, pos2, evaluation_func=evaluation_func)
 
+    def _evaluate_columns(self, pos1, pos2):
+        # Same as evaluate() for each column, but using the alignment's column count table
+        columns = self.alignment.columns
+        counts = columns.column_counts(pos1, pos2)
+        if self.settings.ignore_gaps:
+            counts = counts * columns.is_alpha
+        num_seqs = len(self.alignment.seqs)
+        best = counts.max(axis=1) if counts.shape[1] > 0 else counts.sum(axis=1)
+        best_code = counts.argmax(axis=1) if counts.shape[1] > 0 else best
+        # evaluate() breaks ties by order of occurrence, so handle those columns individually
+        ties = ((counts == best[:,None]).sum(axis=1) > 1) & (best > 0)
+        alphabet = [chr(c) for c in columns.alphabet]
+        threshold = self.settings.capitalize_threshold
+        hide_low = self.settings.hide_low
+        values = []
+        for i, (num, code, tie) in enumerate(zip(best.tolist(), best_code.tolist(), ties.tolist())):
+            pos = pos1 + i
+            if tie:
+                values.append(self.evaluate(pos))
+            elif num == 0:
+                values.append(' ')
+            elif num / num_seqs >= threshold:
+                values.append(alphabet[code].upper())
+                if num == num_seqs:
+                    self.conserved[pos] = True
+            elif hide_low:
+                values.append(' ')
+            else:
+                values.append(alphabet[code].lower())
+        self[:] = values
+
     def set_state(self, state):
         super().set_state(state['base state'])
         self.settings.capitalize_threshold = state['capitalize_threshold']
@@ -192,7 +192,10 @@ class Conservation(DynamicHeaderSequence):
         else:
             if hasattr(self, 'depiction_val'):
                 delattr(self, 'depiction_val')
-        evaluation_func = self._reeval_al2co if self.style == self.STYLE_AL2CO else evaluation_func
+        if self.style == self.STYLE_AL2CO:
+            evaluation_func = self._reeval_al2co
+        elif evaluation_func is None:
+            evaluation_func = self._evaluate_columns
         return super().reevaluate(pos1, pos2, evaluation_func=evaluation_func)
 
     @property
@@ -271,6 +274,41 @@ class Conservation(DynamicHeaderSequence):
 
         return 0
 
+    def clustal_types(self, pos1=0, pos2=None):
+        """clustal_type() for a range of columns, as a numpy array"""
+        columns = self.alignment.columns
+        present = columns.upper_counts(pos1, pos2) > 0
+        from numpy import zeros, int8, array
+        types = zeros((len(present),), int8)
+        upper_alphabet = columns.upper_alphabet
+        for group_type, groups in [(1, clustal_weak_groups), (2, clustal_strong_groups)]:
+            for group in groups:
+                outside = array([c not in group for c in upper_alphabet], bool)
+                types[~(present & outside).any(axis=1)] = group_type
+        types[present.sum(axis=1) == 1] = 3
+        return types
+
+    def percent_identities(self, pos1=0, pos2=None, for_histogram=False):
+        """percent_identity() for a range of columns, as a numpy array"""
+        columns = self.alignment.columns
+        best = columns.max_counts(pos1, pos2, mask=columns.is_alpha)
+        num_seqs = len(self.alignment.seqs)
+        from numpy import where
+        if for_histogram:
+            return where(best > 0, (best - 1) / max(num_seqs - 1, 1), 0.0)
+        return best / num_seqs
+
+    def _evaluate_columns(self, pos1, pos2):
+        # Same as evaluate() for each column, but using the alignment's column count table
+        if self.style == self.STYLE_PERCENT:
+            if len(self.alignment.seqs) == 1:
+                self[:] = [1.0] * (pos2 - pos1 + 1)
+            else:
+                self[:] = self.percent_identities(pos1, pos2).tolist()
+        else:
+            values = [' ', '.', ':', '*']
+            self[:] = [values[t] for t in self.clustal_types(pos1, pos2).tolist()]
+
     def _hist_percent(self, pos):
         return self.percent_identity(pos, for_histogram=True)
 
@@ -73,6 +73,9 @@ class _AlphaFoldBundle(BundleAPI):
         elif command_name == 'alphafold interfaces':
             from . import interfaces
             interfaces.register_alphafold_interfaces_command(logger)
+        elif command_name == 'alphafold ensemble':
+            from . import ensemble
+            ensemble.register_alphafold_ensemble_command(logger)
 
     @staticmethod
     def run_provider(session, name, mgr):
@@ -151,5 +154,8 @@ class _AlphaFoldBundle(BundleAPI):
         if class_name == 'DatabaseEntryId':
             from .search import DatabaseEntryId
             return DatabaseEntryId
+        elif class_name == 'PredictionEnsemble':
+            from .ensemble import PredictionEnsemble
+            return PredictionEnsemble
 
 bundle_api = _AlphaFoldBundle()
@@ -86,44 +86,44 @@ def alphafold_contacts(session, atoms, to_atoms = None, distance = 3, max_pae =
         g.pseudobonds.delete()
     g.dashes = dashes
 
-    # Replace protein or nucleic atoms with residues
-    res, atoms = _pae_residues_and_atoms(atoms)
-    to_res, to_atoms = _pae_residues_and_atoms(to_atoms)
-    
-    # Get pairs of close residues
-    close_rapairs = (_close_residue_pairs(res, to_res, distance) +
-                     _close_residue_atom_pairs(res, to_atoms, distance) +
-                     _close_atom_residue_pairs(atoms, to_res, distance) +
-                     _close_atom_pairs(atoms, to_atoms, distance))
-    rapairs = [(ra1,ra2) for ra1, ra2 in close_rapairs if ra1 != ra2]
+    # Map atoms to PAE matrix rows, residues with a single PAE value use one row for all atoms.
+    atoms1 = _pae_row_atoms(atoms)
+    atoms2 = _pae_row_atoms(to_atoms)
+    rows1, rows2 = pae.row_indices(atoms1), pae.row_indices(atoms2)
+
+    # Get pairs of rows for close residues or atoms
+    i1, i2 = _close_point_pairs(atoms1.scene_coords, atoms2.scene_coords, distance)
+    r1, r2 = _unique_row_pairs(rows1[i1], rows2[i2], pae.matrix_size)
 
     # Get pae values
-    if flip:
-        pae_values = [pae.value(ra2,ra1) for ra1, ra2 in rapairs]
-    else:
-        pae_values = [pae.value(ra1,ra2) for ra1, ra2 in rapairs]
+    pae_matrix = pae.pae_matrix
+    pae_values = pae_matrix[r2,r1] if flip else pae_matrix[r1,r2]
 
     # Show only contacts below max pae value.
     if max_pae is not None:
-        rapairs = [rapairs[i] for i,pae in enumerate(pae_values) if pae <= max_pae]
-        pae_values = [pae for pae in pae_values if pae <= max_pae]
-        
+        keep = (pae_values <= max_pae)
+        r1, r2, pae_values = r1[keep], r2[keep], pae_values[keep]
+
+    rra = pae.row_residues_or_atoms()
+    rapairs = [(rra[i], rra[j]) for i,j in zip(r1.tolist(), r2.tolist())]
+
     # Create pseudobonds between close residues
-    pblist = []
-    from chimerax.atomic import Residue
-    for ra1, ra2 in rapairs:
+    from chimerax.atomic import Residue, Atoms
+    alist1, alist2, pvalues = [], [], []
+    for (ra1, ra2), pae_value in zip(rapairs, pae_values):
         a1 = ra1.principal_atom if isinstance(ra1, Residue) else ra1
         a2 = ra2.principal_atom if isinstance(ra2, Residue) else ra2
         if a1 is None or a2 is None:
             continue	# TODO: Warn about missing principal atoms
-        b = g.new_pseudobond(a1, a2)
-        b.radius = radius
-        pblist.append(b)
-    from chimerax.atomic import Pseudobonds
-    pbonds = Pseudobonds(pblist)
+        alist1.append(a1)
+        alist2.append(a2)
+        pvalues.append(pae_value)
+    pbonds = g.new_pseudobonds(Atoms(alist1), Atoms(alist2))
+    pbonds.radii = radius
 
     # Color pseudobonds
-    pbonds.colors = palette.interpolated_rgba8(pae_values)
+    if len(pbonds) > 0:
+        pbonds.colors = palette.interpolated_rgba8(pvalues)
 
     if output_file is not None:
         lines = [_residue_pair_line(ra1, ra2, pae_value)
@@ -140,96 +140,85 @@ def alphafold_contacts(session, atoms, to_atoms = None, distance = 3, max_pae =
 
 # -----------------------------------------------------------------------------
 #
-def _pae_residues_and_atoms(atoms):
-    res = set()
-    np_atoms = []
-    from .pae import per_residue_pae
-    for a in atoms:
-        r = a.residue
-        if per_residue_pae(r):
-            res.add(r)
-        else:
-            np_atoms.append(a)
-    from chimerax.atomic import Residues, Atoms
-    return Residues(tuple(res)), Atoms(np_atoms)
-
-# -----------------------------------------------------------------------------
-#
-def _close_residue_pairs(residues1, residues2, distance):
-    '''Find pairs of residues within specified distance of each other.'''
-    rpairs = []
-    atoms2 = residues2.atoms
-    xyz2 = atoms2.scene_coords
-    from chimerax.geometry import find_close_points
-    for r1 in residues1:
-        atoms1 = r1.atoms
-        xyz1 = atoms1.scene_coords
-        i1, i2 = find_close_points(xyz1, xyz2, distance)
-        if len(i2) > 0:
-            rclose = atoms2[i2].unique_residues
-            rpairs.extend([(r1,rc) for rc in rclose if rc is not r1])
-    return rpairs
-
-# -----------------------------------------------------------------------------
-#
-def _close_residue_atom_pairs(residues, atoms, distance):
-    rapairs = []
-    axyz = atoms.scene_coords
-    from chimerax.geometry import find_close_points
-    for r in residues:
-        rxyz = r.atoms.scene_coords
-        i1, i2 = find_close_points(rxyz, axyz, distance)
-        if len(i2) > 0:
-            rapairs.extend([(r,a) for a in atoms[i2]])
-    return rapairs
+def _pae_row_atoms(atoms):
+    '''
+    Include all atoms of residues that have a single PAE value since residue
+    contacts are computed using all residue atoms.
+    '''
+    res, np_atoms = _pae_residues_and_atoms(atoms)
+    return res.atoms | np_atoms
 
 # -----------------------------------------------------------------------------
 #
-def _close_atom_residue_pairs(atoms, residues, distance):
-    return [(a,r) for r,a in _close_residue_atom_pairs(residues, atoms, distance)]
+def _pae_residues_and_atoms(atoms):
+    from .pae import per_residue_pae
+    res = atoms.unique_residues
+    from numpy import array
+    rmask = array([per_residue_pae(r) for r in res], bool)
+    pres = res.filter(rmask)
+    np_atoms = atoms.filter(pres.indices(atoms.residues) < 0)
+    return pres, np_atoms
 
 # -----------------------------------------------------------------------------
 #
-def _close_atom_pairs(atoms1, atoms2, distance):
-    if len(atoms1) == 0 or len(atoms2) == 0:
-        return []
+def _close_point_pairs(xyz1, xyz2, distance):
+    '''
+    Return index arrays i1, i2 for every pair of points xyz1[i1], xyz2[i2]
+    within the specified distance.  Points are binned on a grid with cell size
+    equal to the distance and only points in adjacent cells are compared.
+    '''
+    from numpy import empty, int32, int64, floor, minimum, argsort, searchsorted
+    from numpy import repeat, arange, cumsum, concatenate
+    no_pairs = (empty((0,), int32), empty((0,), int32))
 
-    # First find close atoms to speed up computation
+    # Restrict to points that have some close point to limit the work.
     from chimerax.geometry import find_close_points
-    xyz1, xyz2 = atoms1.scene_coords, atoms2.scene_coords
-    i1, i2 = find_close_points(xyz1, xyz2, distance)
-    if len(i1) == 0 or len(i2) == 0:
-        return []
-
-    # Now find every close pair.
-    apairs = []
-    xyz3 = xyz2[i2]
-    for i in i1:
-        j, i3 = find_close_points(xyz1[i:i+1], xyz3, distance)
-        if len(i3) > 0:
-            a1 = atoms1[i]
-            apairs.extend([(a1, atoms2[i2[k]]) for k in i3])
-        
-    return apairs
+    c1, c2 = find_close_points(xyz1, xyz2, distance)
+    if len(c1) == 0 or len(c2) == 0:
+        return no_pairs
+    p1, p2 = xyz1[c1], xyz2[c2]
+
+    origin = minimum(p1.min(axis = 0), p2.min(axis = 0))
+    g1 = floor((p1 - origin) / distance).astype(int64) + 1
+    g2 = floor((p2 - origin) / distance).astype(int64) + 1
+    size = max(g1.max(), g2.max()) + 2
+    def cell_key(g):
+        return (g[:,0]*size + g[:,1])*size + g[:,2]
+    k2 = cell_key(g2)
+    order = argsort(k2)
+    k2s = k2[order]
+
+    d2 = distance * distance
+    pairs1, pairs2 = [], []
+    offsets = [(i,j,k) for i in (-1,0,1) for j in (-1,0,1) for k in (-1,0,1)]
+    for offset in offsets:
+        k1 = cell_key(g1 + offset)
+        lo = searchsorted(k2s, k1, 'left')
+        counts = searchsorted(k2s, k1, 'right') - lo
+        total = counts.sum()
+        if total == 0:
+            continue
+        i = repeat(arange(len(k1)), counts)
+        j = order[arange(total) + repeat(lo - (cumsum(counts) - counts), counts)]
+        d = p1[i] - p2[j]
+        close = ((d*d).sum(axis = 1) <= d2)
+        pairs1.append(c1[i[close]])
+        pairs2.append(c2[j[close]])
+
+    if len(pairs1) == 0:
+        return no_pairs
+    return concatenate(pairs1), concatenate(pairs2)
 
 # -----------------------------------------------------------------------------
 #
-def _residue_to_atom_pairs(rpairs):
-    rapairs = []
-    for r1,r2 in rpairs:
-        rapairs.extend([(o1,o2)
-                        for o1 in _residue_or_non_polymer_atoms(r1)
-                        for o2 in _residue_or_non_polymer_atoms(r2)])
-    return rapairs
-
-# -----------------------------------------------------------------------------
-#
-def _residue_or_non_polymer_atoms(residue):
-    from .pae import per_residue_pae
-    if per_residue_pae(residue):
-        return [residue]
-    else:
-        return residue.atoms
+def _unique_row_pairs(rows1, rows2, num_rows):
+    '''
+    Remove duplicate row pairs, pairs with the same row, and rows not in the PAE matrix (-1).
+    '''
+    keep = (rows1 != rows2) & (rows1 >= 0) & (rows2 >= 0)
+    from numpy import unique, int64
+    rp = unique(rows1[keep].astype(int64) * num_rows + rows2[keep])
+    return rp // num_rows, rp % num_rows
 
 # -----------------------------------------------------------------------------
 #
@@ -0,0 +1,430 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+
+# === UCSF ChimeraX Copyright ===
+# Copyright 2022 Regents of the University of California. All rights reserved.
+# The ChimeraX application is provided pursuant to the ChimeraX license
+# agreement, which covers academic and commercial uses. For more details, see
+# <https://www.rbvi.ucsf.edu/chimerax/docs/licensing.html>
+#
+# This particular file is part of the ChimeraX library. You can also
+# redistribute and/or modify it under the terms of the GNU Lesser General
+# Public License version 2.1 as published by the Free Software Foundation.
+# For more details, see
+# <https://www.gnu.org/licenses/old-licenses/lgpl-2.1.html>
+#
+# THIS SOFTWARE IS PROVIDED "AS IS" WITHOUT WARRANTY OF ANY KIND, EITHER
+# EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE. ADDITIONAL LIABILITY
+# LIMITATIONS ARE DESCRIBED IN THE GNU LESSER GENERAL PUBLIC LICENSE
+# VERSION 2.1
+#
+# This notice must be embedded in or attached to all copies, including partial
+# copies, of the software or any revisions or derivations thereof.
+# === UCSF ChimeraX Copyright ===
+
+# -----------------------------------------------------------------------------
+# Ensembles of predicted structures with identical sequences, for example
+# the models and seeds of an AlphaFold or ESMFold prediction run.  One
+# structure holds the shared atoms, residues and bonds, the coordinates of
+# each predicted model are a coordinate set, and per-residue confidence
+# (pLDDT) is an array with one row per model.
+#
+def alphafold_ensemble(session, structures = None, directory = None, superpose = True,
+                       min_plddt = 70, color_confidence = True, palette = 'alphafold',
+                       method = 'alphafold', is_prediction = None):
+    '''
+    Combine predicted structures with identical sequences into ensembles.
+    Structures can be open models, which are combined into the first
+    structure of each group with the others closed, or can be read from
+    the .pdb and .cif files in a directory one at a time so only one full
+    structure per sequence is kept in memory.  The coordset command switches
+    between models and the confidence coloring follows the shown model.
+    Per-residue statistics across the ensemble are assigned as residue
+    attributes ensemble_plddt_mean, ensemble_plddt_std and ensemble_rmsf.
+    If no structures or directory are given, the open structures that are
+    predictions by the method, as decided by function is_prediction, are used.
+    '''
+    from chimerax.core.errors import UserError
+    if structures is None and directory is None:
+        if is_prediction is None:
+            from .colorgui import _is_alphafold_model as is_prediction
+        from chimerax.atomic import AtomicStructure
+        structures = [s for s in session.models.list(type = AtomicStructure) if is_prediction(s)]
+        if len(structures) == 0:
+            raise UserError(f'No open {method} predictions, specify the structures to combine')
+
+    groups = []
+    if directory is not None:
+        paths = _structure_files(directory)
+        if len(paths) == 0:
+            raise UserError(f'No .pdb or .cif files found in {directory}')
+        groups.extend(_group_files(session, paths))
+    if structures:
+        groups.extend(_group_structures(structures))
+
+    groups = [g for g in groups if g.num_models > 1 or g.base.id is None]
+    if len(groups) == 0:
+        raise UserError(f'No {method} predictions with the same sequence to combine')
+
+    ensembles = []
+    for g in groups:
+        ens = g.make_ensemble()
+        if superpose and ens.num_models > 1:
+            ens.superpose(min_plddt = min_plddt)
+        ens.set_residue_statistics()
+        if color_confidence:
+            ens.color_confidence(palette)
+        ensembles.append(ens)
+
+    new_structures = [g.base for g in groups if g.base.id is None]
+    if new_structures:
+        session.models.add(new_structures)
+    closed = sum([g.combined for g in groups], [])
+    if closed:
+        session.models.close(closed)
+
+    for ens in ensembles:
+        s = ens.structure
+        msg = (f'{method} ensemble {s.name} #{s.id_string} with {ens.num_models} models,'
+               f' mean pLDDT {"%.3g" % ens.plddt.mean()}')
+        if superpose and ens.num_models > 1:
+            rmsf = _median(ens.residue_statistics()['rmsf'])
+            msg += f', median residue RMSF {"%.2f" % rmsf} A'
+        session.logger.info(msg)
+
+    return ensembles
+
+# -----------------------------------------------------------------------------
+#
+from chimerax.core.state import StateManager
+class PredictionEnsemble(StateManager):
+    '''
+    Predicted models sharing one structure.  Each model is a coordinate set
+    of the structure and the per-residue pLDDT confidence of model i is row i
+    of the plddt array.  The predicted aligned error (PAE) of the first model
+    is kept if it was opened, other models do not have PAE.  The ensemble is
+    saved in sessions so confidence coloring follows the shown model after restore.
+    '''
+    def __init__(self, structure, plddt, model_names, palette = None):
+        self.structure = structure
+        self.plddt = plddt		# float32 array, models by residues
+        self.model_names = list(model_names)
+        self._palette = palette
+        self._destroyed = False
+        self.init_state_manager(structure.session, 'prediction ensemble')
+        s = structure
+        self._coordset_index = {cs_id:i for i, cs_id in enumerate(s.coordset_ids)}
+        atoms = s.atoms
+        self._atom_residue_index = s.residues.indices(atoms.residues)
+
+        # Save confidence arrays in sessions.
+        s.__class__.register_attr(s.session, 'ensemble_plddt', 'AlphaFold')
+        s.__class__.register_attr(s.session, 'ensemble_model_names', 'AlphaFold')
+        s.ensemble_plddt = plddt
+        s.ensemble_model_names = self.model_names
+        s._prediction_ensemble = self
+
+        self._changes_handler = s.triggers.add_handler('changes', self._structure_changed)
+
+    def destroy(self):
+        if self._destroyed:
+            return
+        self._destroyed = True
+        s = self.structure
+        if not s.deleted:
+            s.triggers.remove_handler(self._changes_handler)
+            if getattr(s, '_prediction_ensemble', None) is self:
+                del s._prediction_ensemble
+        StateManager.destroy(self)
+
+    def reset_state(self, session):
+        self.destroy()
+
+    def include_state(self):
+        return not self.structure.deleted
+
+    def take_snapshot(self, session, flags):
+        return {'version': 1, 'structure': self.structure, 'palette': self._palette}
+
+    @classmethod
+    def restore_snapshot(cls, session, data):
+        # Confidence arrays are restored as structure attributes.
+        s = data['structure']
+        names = getattr(s, 'ensemble_model_names', None) or []
+        return cls(s, s.ensemble_plddt, names, palette = data['palette'])
+
+    @property
+    def num_models(self):
+        return len(self.plddt)
+
+    @property
+    def model_index(self):
+        '''Index of the currently shown model.'''
+        return self._coordset_index.get(self.structure.active_coordset_id, 0)
+
+    def show_model(self, index):
+        s = self.structure
+        s.active_coordset_id = s.coordset_ids[index]
+
+    def model_coordinates(self, atoms = None):
+        '''Return array of atom coordinates, models by atoms by 3.'''
+        s = self.structure
+        if atoms is None:
+            atoms = s.atoms
+        ci = atoms.coord_indices
+        from numpy import array
+        return array([s.coordset(cs_id).xyzs[ci] for cs_id in s.coordset_ids])
+
+    def superpose(self, reference = 0, min_plddt = 70):
+        '''
+        Superpose all models on the reference model using CA (or P) atoms
+        with pLDDT at least min_plddt in every model, or all CA atoms
+        if fewer than 3 residues are that confident.
+        '''
+        s = self.structure
+        align_atoms = _residue_atoms(s.residues)
+        ri = s.residues.indices(align_atoms.residues)
+        if min_plddt is not None:
+            confident = (self.plddt[:,ri] >= min_plddt).all(axis = 0)
+            if confident.sum() >= 3:
+                align_atoms = align_atoms.filter(confident)
+        if len(align_atoms) < 3:
+            return
+        xyz = self.model_coordinates(align_atoms)
+        rot, shift = _superposition(xyz, xyz[reference])
+        all_xyz = self.model_coordinates() @ rot
+        all_xyz += shift[:,None,:]
+        cs_id = s.active_coordset_id
+        n = s.coordset_size or s.num_atoms
+        from numpy import zeros, float64
+        cs = zeros((len(all_xyz), n, 3), float64)
+        cs[:, s.atoms.coord_indices] = all_xyz
+        all_xyz = None	# Release memory
+        s.add_coordsets(cs, replace = True)
+        s.active_coordset_id = cs_id
+
+    def residue_statistics(self):
+        '''
+        Return dictionary of per-residue arrays across the ensemble: pLDDT
+        mean, standard deviation, minimum and root mean square fluctuation
+        of CA (or P) atom positions about their mean position.
+        '''
+        p = self.plddt
+        stats = {'plddt_mean': p.mean(axis = 0),
+                 'plddt_std': p.std(axis = 0),
+                 'plddt_min': p.min(axis = 0)}
+        s = self.structure
+        from numpy import zeros, float32, sqrt
+        rmsf = zeros((s.num_residues,), float32)
+        ratoms = _residue_atoms(s.residues)
+        if len(ratoms) > 0:
+            xyz = self.model_coordinates(ratoms)
+            d = xyz - xyz.mean(axis = 0)
+            rmsf[s.residues.indices(ratoms.residues)] = sqrt((d*d).sum(axis = 2).mean(axis = 0))
+        stats['rmsf'] = rmsf
+        return stats
+
+    def set_residue_statistics(self):
+        '''Set residue attributes ensemble_plddt_mean, ensemble_plddt_std and ensemble_rmsf.'''
+        from chimerax.atomic import Residue
+        from numpy import float64
+        session = self.structure.session
+        residues = self.structure.residues
+        stats = self.residue_statistics()
+        for attr_name, key in (('ensemble_plddt_mean', 'plddt_mean'),
+                               ('ensemble_plddt_std', 'plddt_std'),
+                               ('ensemble_rmsf', 'rmsf')):
+            Residue.register_attr(session, attr_name, 'AlphaFold', attr_type = float)
+            residues.set_custom_attr_values(attr_name, stats[key].astype(float64))
+
+    def color_confidence(self, palette = 'alphafold'):
+        '''Color by pLDDT of the shown model and recolor when another model is shown.'''
+        self._palette = palette
+        self._update_confidence()
+
+    def _structure_changed(self, trigger_name, changes):
+        if self.structure.deleted:
+            self.destroy()
+            return 'delete handler'
+        if 'active_coordset changed' in changes[1].structure_reasons():
+            self._update_confidence()
+
+    def _update_confidence(self):
+        s = self.structure
+        s.atoms.bfactors = self.plddt[self.model_index][self._atom_residue_index]
+        if self._palette is not None:
+            from .fetch import _color_by_confidence
+            _color_by_confidence(s, palette_name = self._palette)
+
+# -----------------------------------------------------------------------------
+#
+def prediction_ensemble(structure):
+    '''Return the PredictionEnsemble for a structure, or None if it is not an ensemble.'''
+    ens = getattr(structure, '_prediction_ensemble', None)
+    if ens is None:
+        # Recreate after session restore.
+        plddt = getattr(structure, 'ensemble_plddt', None)
+        if plddt is not None and len(plddt) == structure.num_coordsets:
+            names = getattr(structure, 'ensemble_model_names', None) or []
+            ens = PredictionEnsemble(structure, plddt, names)
+    return ens
+
+# -----------------------------------------------------------------------------
+#
+class _EnsembleGroup:
+    '''Coordinates and confidence of predictions with the same atoms as a base structure.'''
+    def __init__(self, base):
+        self.base = base
+        self.atoms = base.atoms
+        self._residue_index = base.residues.indices(self.atoms.residues)
+        self._num_residues = base.num_residues
+        self.coords = []
+        self.plddt = []
+        self.names = []
+        self.combined = []	# Open structures merged into base.
+        self.add(base)
+
+    @property
+    def num_models(self):
+        return len(self.coords)
+
+    def add(self, s):
+        atoms = s.atoms
+        self.coords.append(atoms.coords)
+        self.plddt.append(_residue_plddt(atoms.bfactors, self._residue_index, self._num_residues))
+        self.names.append(s.name)
+
+    def make_ensemble(self):
+        s = self.base
+        from numpy import array, zeros, float32, float64
+        n = s.coordset_size or s.num_atoms
+        cs = zeros((len(self.coords), n, 3), float64)
+        cs[:, self.atoms.coord_indices] = self.coords
+        self.coords = []
+        s.add_coordsets(cs, replace = True)
+        s.active_coordset_id = s.coordset_ids[0]
+        return PredictionEnsemble(s, array(self.plddt, float32), self.names)
+
+# -----------------------------------------------------------------------------
+#
+def _group_structures(structures):
+    groups = {}
+    for s in structures:
+        if prediction_ensemble(s) is not None:
+            continue
+        key = _topology_key(s)
+        g = groups.get(key)
+        if g is None:
+            groups[key] = _EnsembleGroup(s)
+        else:
+            g.add(s)
+            g.combined.append(s)
+    return list(groups.values())
+
+# -----------------------------------------------------------------------------
+# Open structure files one at a time, keeping only coordinates and confidence
+# of structures with the same atoms as an earlier one.
+#
+def _group_files(session, paths):
+    from chimerax.atomic import AtomicStructure
+    groups = {}
+    for i, path in enumerate(paths):
+        session.logger.status(f'Reading prediction {i+1} of {len(paths)}')
+        models, status = session.open_command.open_data(path, log_errors = False)
+        structures = [m for m in models if isinstance(m, AtomicStructure)]
+        for m in models:
+            if m not in structures[:1]:
+                m.delete()
+        if not structures:
+            continue
+        s = structures[0]
+        key = _topology_key(s)
+        g = groups.get(key)
+        if g is None:
+            s.apply_auto_styling()
+            s._auto_style = False
+            groups[key] = _EnsembleGroup(s)
+        else:
+            g.add(s)
+            s.delete()
+    session.logger.status('')
+    return list(groups.values())
+
+# -----------------------------------------------------------------------------
+#
+def _structure_files(directory):
+    from os import listdir
+    from os.path import join, isfile
+    suffixes = ('.pdb', '.cif')
+    paths = [join(directory, f) for f in sorted(listdir(directory))
+             if f.endswith(suffixes) and isfile(join(directory, f))]
+    return paths
+
+# -----------------------------------------------------------------------------
+#
+def _topology_key(s):
+    atoms = s.atoms
+    r = atoms.residues
+    return (tuple(atoms.names), tuple(r.names), tuple(r.numbers), tuple(r.chain_ids))
+
+# -----------------------------------------------------------------------------
+# AlphaFold and ESMFold put the residue pLDDT in the B-factor of every atom.
+#
+def _residue_plddt(bfactors, residue_index, num_residues):
+    from numpy import bincount, float32
+    total = bincount(residue_index, weights = bfactors, minlength = num_residues)
+    count = bincount(residue_index, minlength = num_residues)
+    count[count == 0] = 1
+    return (total / count).astype(float32)
+
+# -----------------------------------------------------------------------------
+#
+def _residue_atoms(residues):
+    from chimerax.atomic import Atoms
+    atoms = [r.principal_atom for r in residues]
+    return Atoms([a for a in atoms if a is not None])
+
+# -----------------------------------------------------------------------------
+# Least squares superposition of each set of points onto reference points.
+# Returns rotations to right multiply points, and translations to add.
+#
+def _superposition(xyz, ref_xyz):
+    from numpy import einsum, linalg, sign, ones
+    c = xyz.mean(axis = 1)
+    rc = ref_xyz.mean(axis = 0)
+    h = einsum('nmi,mj->nij', xyz - c[:,None,:], ref_xyz - rc)
+    u, sv, vt = linalg.svd(h)
+    d = ones((len(xyz), 3))
+    d[:,2] = sign(linalg.det(u @ vt))
+    rot = (u * d[:,None,:]) @ vt
+    shift = rc - einsum('ni,nij->nj', c, rot)
+    return rot, shift
+
+# -----------------------------------------------------------------------------
+#
+def _median(values):
+    from numpy import median
+    return median(values) if len(values) > 0 else 0
+
+# -----------------------------------------------------------------------------
+#
+def ensemble_command_description():
+    from chimerax.core.commands import CmdDesc, OpenFolderNameArg, BoolArg, FloatArg, StringArg
+    from chimerax.atomic import AtomicStructuresArg
+    desc = CmdDesc(
+        optional = [('structures', AtomicStructuresArg)],
+        keyword = [('directory', OpenFolderNameArg),
+                   ('superpose', BoolArg),
+                   ('min_plddt', FloatArg),
+                   ('color_confidence', BoolArg),
+                   ('palette', StringArg)],
+        synopsis = 'Combine predicted structures with the same sequence into an ensemble'
+    )
+    return desc
+
+# -----------------------------------------------------------------------------
+#
+def register_alphafold_ensemble_command(logger):
+    desc = ensemble_command_description()
+    from chimerax.core.commands import register
+    register('alphafold ensemble', desc, alphafold_ensemble, logger=logger)
@@ -817,6 +817,10 @@ class PAEView(QGraphicsView):
         self._report_residues_and_atoms_callback = report_residues_and_atoms_cb
         self._pixmap_item = None
         self._divider_items = []
+        # Matrices larger than this are shown block averaged to limit image memory.
+        self.max_image_size = 2048
+        self.downsample_method = 'mean'
+        self._reduced_matrix = None	# Cache (pae_matrix, block_size, reduced matrix)
         # Report residues and atoms as mouse hovers over plot.
         self.setMouseTracking(True)
 
@@ -888,12 +892,27 @@ class PAEView(QGraphicsView):
         if pi is not None:
             scene.removeItem(pi)
 
-        rgb = pae_rgb(pae_matrix, colormap)
+        # Scene coordinates remain matrix row indices for large matrices that
+        # are drawn at reduced resolution.
+        n = pae_matrix.shape[0]
+        block_size = max(1, -(-n // self.max_image_size))
+        m = self._block_reduced_matrix(pae_matrix, block_size)
+        rgb = pae_rgb(m, colormap)
         if color_blocks is not None:
-            self._color_blocks(rgb, pae_matrix, color_blocks)
+            self._color_blocks(rgb, m, color_blocks, block_size)
         pixmap = pae_pixmap(rgb)
-        self._pixmap_item = scene.addPixmap(pixmap)
-        scene.setSceneRect(0, 0, pixmap.width(), pixmap.height())
+        self._pixmap_item = pi = scene.addPixmap(pixmap)
+        if block_size > 1:
+            pi.setScale(block_size)
+        scene.setSceneRect(0, 0, n, n)
+
+    def _block_reduced_matrix(self, pae_matrix, block_size):
+        rm = self._reduced_matrix
+        if rm is not None and rm[0] is pae_matrix and rm[1] == block_size:
+            return rm[2]
+        m = pae_block_reduce(pae_matrix, block_size, self.downsample_method)
+        self._reduced_matrix = (pae_matrix, block_size, m)
+        return m
 
     def _show_chain_dividers(self, chain_dividers = [], thickness = 4):
         scene = self.scene()
@@ -917,9 +936,11 @@ class PAEView(QGraphicsView):
         for d in di:
             d.setZValue(1)  # Make sure lines are drawn above pixmap
 
-    def _color_blocks(self, rgb, pae_matrix, color_blocks):
-        from numpy import ix_
+    def _color_blocks(self, rgb, pae_matrix, color_blocks, block_size = 1):
+        from numpy import ix_, unique, array, int32
         for color, indices in color_blocks:
+            if block_size > 1:
+                indices = unique(array(indices, int32) // block_size)
             colormap = self._block_colormap(color)
             subsquare = ix_(indices, indices)
             rgb[subsquare] = pae_rgb(pae_matrix[subsquare], colormap)
@@ -1076,6 +1097,32 @@ class AlphaFoldPAE:
         si = self._residue_or_atom_index(scored_residue_or_atom)
         return self._pae_matrix[ai,si]
 
+    # ---------------------------------------------------------------------------
+    #
+    def row_indices(self, atoms):
+        '''
+        Return an array of PAE matrix row indices for the given atoms.
+        Atoms in residues with a single PAE value map to that residue's row.
+        Atoms not represented in the matrix have row index -1.
+        '''
+        from numpy import array, int32, full
+        rows = full((len(atoms),), -1, int32)
+        if len(atoms) == 0:
+            return rows
+        from chimerax.atomic import Residue, Atom, Residues, Atoms
+        rra = self.row_residues_or_atoms()
+        rrows = [i for i,ra in enumerate(rra) if isinstance(ra, Residue)]
+        arows = [i for i,ra in enumerate(rra) if isinstance(ra, Atom)]
+        if rrows:
+            ri = Residues([rra[i] for i in rrows]).indices(atoms.residues)
+            rmask = (ri >= 0)
+            rows[rmask] = array(rrows, int32)[ri[rmask]]
+        if arows:
+            ai = Atoms([rra[i] for i in arows]).indices(atoms)
+            amask = (ai >= 0)
+            rows[amask] = array(arows, int32)[ai[amask]]
+        return rows
+
     # ---------------------------------------------------------------------------
     #
     def _residue_or_atom_index(self, residue_or_atom):
@@ -1288,6 +1335,32 @@ def pae_rgb(pae_matrix, colormap):
     rgb = rgb_flat.reshape((n,n,3)).copy()
     return rgb
 
+# -----------------------------------------------------------------------------
+#
+def pae_block_reduce(pae_matrix, block_size, method = 'mean'):
+    '''
+    Reduce the size of a PAE matrix by combining square blocks of values
+    using the block maximum or mean.  The last block in each dimension is
+    smaller if the matrix size is not a multiple of the block size.
+    '''
+    if block_size <= 1:
+        return pae_matrix
+    import numpy
+    n0, n1 = pae_matrix.shape
+    starts0, starts1 = numpy.arange(0, n0, block_size), numpy.arange(0, n1, block_size)
+    if method == 'max':
+        m = numpy.maximum.reduceat(pae_matrix, starts0, axis = 0)
+        m = numpy.maximum.reduceat(m, starts1, axis = 1)
+    elif method == 'mean':
+        m = numpy.add.reduceat(pae_matrix, starts0, axis = 0, dtype = numpy.float64)
+        m = numpy.add.reduceat(m, starts1, axis = 1)
+        counts0 = numpy.diff(numpy.append(starts0, n0))
+        counts1 = numpy.diff(numpy.append(starts1, n1))
+        m /= numpy.outer(counts0, counts1)
+    else:
+        raise ValueError(f'Unknown block reduce method "{method}", expected "max" or "mean"')
+    return m.astype(numpy.float32)
+
 # -----------------------------------------------------------------------------
 #
 def _pae_colormap(max = 30, step = 5):
@@ -1332,21 +1405,22 @@ def pae_domains(pae_matrix, pae_power=1, pae_cutoff=5, graph_resolution=0.5,
     # PAE matrix is not strictly symmetric.
     # Prediction for error in residue i when aligned on residue j may be different from 
     # error in j when aligned on i. Take the smallest error estimate for each pair.
+    # Only compute weights for edges to avoid full size temporary matrices.
     import numpy
-    pae_matrix = numpy.minimum(pae_matrix, pae_matrix.T)
-    pae_matrix = numpy.maximum(pae_matrix, 0.2)	# AlphaFold Database version 3 has 0 values.
-    weights = 1/pae_matrix**pae_power if pae_power != 1 else 1/pae_matrix
+    close = (pae_matrix < pae_cutoff)
+    close |= close.T
+    # Limit to bottom triangle of matrix
+    i, j = numpy.nonzero(numpy.triu(close, 1))
+    del close
+    pae_values = numpy.minimum(pae_matrix[i,j], pae_matrix[j,i])
+    pae_values = numpy.maximum(pae_values, 0.2)	# AlphaFold Database version 3 has 0 values.
+    weights = 1/pae_values**pae_power if pae_power != 1 else 1/pae_values
 
     import networkx as nx
     g = nx.Graph()
-    size = weights.shape[0]
+    size = pae_matrix.shape[0]
     g.add_nodes_from(range(size))
-    edges = numpy.argwhere(pae_matrix < pae_cutoff)
-    # Limit to bottom triangle of matrix
-    edges = edges[edges[:,0]<edges[:,1]]
-    sel_weights = weights[edges.T[0], edges.T[1]]
-    wedges = [(i,j,w) for (i,j),w in zip(edges,sel_weights)]
-    g.add_weighted_edges_from(wedges)
+    g.add_weighted_edges_from(zip(i.tolist(), j.tolist(), weights.tolist()))
 
     from networkx.algorithms.community import greedy_modularity_communities
     clusters = greedy_modularity_communities(g, weight='weight', resolution=graph_resolution)
@@ -1361,15 +1435,13 @@ def color_by_pae_domain(residues_or_atoms, clusters, colors = None):
         from chimerax.core.colors import random_colors
         colors = random_colors(len(clusters), seed=0)
 
-    from chimerax.atomic import Residue, Atom
+    from chimerax.atomic import Residue, Atom, Residues, Atoms
     for c, color in zip(clusters, colors):
         cra = [residues_or_atoms[i] for i in c]
-        for ra in cra:
-            if isinstance(ra, Residue):
-                ra.ribbon_color = color
-                ra.atoms.colors = color
-            elif isinstance(ra, Atom):
-                ra.color = color
+        res = Residues([ra for ra in cra if isinstance(ra, Residue)])
+        res.ribbon_colors = color
+        res.atoms.colors = color
+        Atoms([ra for ra in cra if isinstance(ra, Atom)]).colors = color
     
 # -----------------------------------------------------------------------------
 #
@@ -0,0 +1,49 @@
+from numpy import array, float64
+
+# Backbone coordinates of a 6 residue glycine peptide.
+atom_names = ("N", "CA", "C", "O")
+base_coords = array([[(3.3*r + 0.0, 0.5*(r%2), 0.0), (3.3*r + 1.2, 1.2 - 0.5*(r%2), 0.3),
+                      (3.3*r + 2.4, 0.4, -0.2), (3.3*r + 2.6, -0.8, -0.6)]
+                     for r in range(6)], float64)
+
+def _write_prediction(path, coords, plddt):
+    lines = []
+    for r, (rcoords, b) in enumerate(zip(coords, plddt)):
+        for name, (x, y, z) in zip(atom_names, rcoords):
+            lines.append("ATOM  %5d  %-3s GLY A%4d    %8.3f%8.3f%8.3f  1.00%6.2f           %s"
+                         % (len(lines)+1, name, r+1, x, y, z, b, name[0]))
+    lines.append("END")
+    path.write_text("\n".join(lines) + "\n")
+
+def test_ensemble_of_open_predictions(test_production_session, tmp_path):
+    session = test_production_session
+    from chimerax.core.commands import run
+    from chimerax.alphafold.ensemble import alphafold_ensemble
+    plddts = [(90, 80, 95, 85, 40, 30), (92, 82, 91, 88, 35, 20), (88, 84, 93, 86, 45, 25)]
+    for i, plddt in enumerate(plddts):
+        coords = base_coords.copy()
+        coords[4:] += (0, 0.7*i, 0.4*i)	# Low confidence residues move.
+        path = tmp_path / ("alphafold_model_%d.pdb" % i)
+        _write_prediction(path, coords, plddt)
+        run(session, "open %s" % path)
+    other_path = tmp_path / "other.pdb"
+    _write_prediction(other_path, base_coords, plddts[0])
+    other = run(session, "open %s" % other_path)[0]
+
+    ensembles = alphafold_ensemble(session)
+    assert len(ensembles) == 1
+    ens = ensembles[0]
+    s = ens.structure
+    assert ens.num_models == 3 and s.num_coordsets == 3
+    assert not other.deleted
+    assert len(session.models.list(type = type(s))) == 2
+    assert (abs(ens.plddt - array(plddts)) < 1e-3).all()
+    stats = ens.residue_statistics()
+    for r, mean, std, rmsf in zip(s.residues, stats['plddt_mean'], stats['plddt_std'],
+                                  stats['rmsf']):
+        assert abs(r.ensemble_plddt_mean - mean) < 1e-5
+        assert abs(r.ensemble_plddt_std - std) < 1e-5
+        assert abs(r.ensemble_rmsf - rmsf) < 1e-5
+    values, has = s.residues.custom_attr_values('ensemble_rmsf')
+    assert has.all()
+    assert (stats['rmsf'][:4] < 1e-3).all() and (stats['rmsf'][4:] > 0.1).all()
@@ -288,11 +288,19 @@ class _AtomicBundleAPI(BundleAPI):
                     from chimerax.core.commands import plural_of
                     collections = concatenate(collections)
                     plural_attr = plural_of(attr_name)
+                    import numpy
+                    from .custom_attrs import is_column_attr
+                    if is_column_attr(self._class_obj, attr_name):
+                        # read values as arrays from the structures' attribute columns
+                        all_vals, has_vals = collections.custom_attr_values(attr_name)
+                        non_none_vals = all_vals[has_vals]
+                        if non_none_vals.dtype == object:
+                            non_none_vals = non_none_vals[non_none_vals != None]
+                        return non_none_vals, len(non_none_vals) < len(all_vals)
                     try:
                         all_vals = getattr(concatenate(collections), plural_of(attr_name))
                     except AttributeError:
                         all_vals = [getattr(item, attr_name, None) for item in collections]
-                    import numpy
                     if not isinstance(all_vals, numpy.ndarray):
                         all_vals = numpy.array(all_vals)
                     non_none_vals = all_vals[all_vals != None]
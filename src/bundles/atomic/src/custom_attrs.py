@@ -0,0 +1,446 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+
+# === UCSF ChimeraX Copyright ===
+# Copyright 2022 Regents of the University of California. All rights reserved.
+# The ChimeraX application is provided pursuant to the ChimeraX license
+# agreement, which covers academic and commercial uses. For more details, see
+# <https://www.rbvi.ucsf.edu/chimerax/docs/licensing.html>
+#
+# This particular file is part of the ChimeraX library. You can also
+# redistribute and/or modify it under the terms of the GNU Lesser General
+# Public License version 2.1 as published by the Free Software Foundation.
+# For more details, see
+# <https://www.gnu.org/licenses/old-licenses/lgpl-2.1.html>
+#
+# THIS SOFTWARE IS PROVIDED "AS IS" WITHOUT WARRANTY OF ANY KIND, EITHER
+# EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE. ADDITIONAL LIABILITY
+# LIMITATIONS ARE DESCRIBED IN THE GNU LESSER GENERAL PUBLIC LICENSE
+# VERSION 2.1
+#
+# This notice must be embedded in or attached to all copies, including partial
+# copies, of the software or any revisions or derivations thereof.
+# === UCSF ChimeraX Copyright ===
+
+"""
+Column storage of registered custom attributes of atoms and residues.  Each structure keeps one
+numpy array per attribute with a row for each of its atoms (or residues), so that millions of
+values can be assigned and retrieved through Atoms/Residues collections without creating Python
+instances.  Rows are keyed by C++ pointer and rows of deleted objects are dropped automatically.
+
+Values assigned to a single Atom or Residue are kept in its instance dictionary, so loops over
+individual objects run at plain attribute speed.  They are moved into the columns the next time
+the columns are used, for instance by a collection accessor or when saving a session.
+"""
+
+class AttrColumns:
+    """Custom attribute values for the atoms or residues of one structure.
+
+       'all_objects' is a function returning the structure's current collection of objects.
+       Each attribute has a values array and a boolean array indicating which rows have a value.
+    """
+
+    def __init__(self, all_objects):
+        from numpy import empty, uintp
+        self._all_objects = all_objects
+        # Collection that has deleted C++ objects removed automatically, to detect deletions
+        self._objects = None
+        # sorted pointers of the rows; a plain array so it is not changed by deletions
+        self._pointers = empty((0,), uintp)
+        self._columns = {}
+
+    def __len__(self):
+        return len(self._pointers)
+
+    @property
+    def attr_names(self):
+        return list(self._columns.keys())
+
+    def values(self, attr_name, pointers):
+        """Return arrays of the values for the objects with the given C++ pointers and whether
+           each object has a value
+        """
+        from numpy import zeros
+        rows = self._rows(pointers)
+        found = rows >= 0
+        col = self._columns.get(attr_name)
+        if col is None:
+            return _empty_values(len(pointers)), zeros((len(pointers),), bool)
+        vals, has = col
+        values = _empty_column(len(pointers), vals.dtype)
+        values[found] = vals[rows[found]]
+        has_value = zeros((len(pointers),), bool)
+        has_value[found] = has[rows[found]]
+        return values, has_value
+
+    def value(self, attr_name, pointer):
+        """Return the value for one object, raise AttributeError if it has no value"""
+        col = self._columns.get(attr_name)
+        if col is not None:
+            from numpy import array, uintp
+            row = self._rows(array([pointer], uintp))[0]
+            vals, has = col
+            if row >= 0 and has[row]:
+                v = vals[row]
+                return v.item() if hasattr(v, 'item') and vals.dtype != object else v
+        raise AttributeError("No value for custom attribute '%s'" % attr_name)
+
+    def set_values(self, attr_name, pointers, values):
+        """Set values for the objects with the given C++ pointers.  'values' is either a
+           sequence with one value per object or a single value given to all the objects.
+        """
+        if len(pointers) == 0:
+            return
+        rows = self._rows(pointers, add = True)
+        new_vals = _column_array(values, len(pointers))
+        col = self._columns.get(attr_name)
+        from numpy import zeros
+        if col is None:
+            vals = _empty_column(len(self._pointers), new_vals.dtype)
+            has = zeros((len(self._pointers),), bool)
+        else:
+            vals, has = col
+            dtype = _merged_dtype(vals.dtype, new_vals.dtype)
+            if dtype != vals.dtype:
+                vals = _convert_column(vals, dtype)
+        if vals.dtype == object and new_vals.dtype != object:
+            new_vals = _convert_column(new_vals, object)
+        vals[rows] = new_vals
+        has[rows] = True
+        self._columns[attr_name] = (vals, has)
+
+    def delete_values(self, attr_name, pointers):
+        col = self._columns.get(attr_name)
+        if col is None:
+            return
+        rows = self._rows(pointers)
+        rows = rows[rows >= 0]
+        vals, has = col
+        has[rows] = False
+        if vals.dtype == object:
+            vals[rows] = None
+        if not has.any():
+            del self._columns[attr_name]
+
+    def has_any_values(self):
+        self._remove_deleted()
+        return len([has for vals, has in self._columns.values() if has.any()]) > 0
+
+    def state(self, objects):
+        """Return values in the order of the 'objects' collection for saving in sessions
+           or copying to another structure
+        """
+        state = {}
+        for attr_name in self.attr_names:
+            vals, has = self.values(attr_name, objects.pointers)
+            if not has.any():
+                continue
+            # sessions save numeric arrays efficiently; other values as lists
+            state[attr_name] = {
+                'values': vals if vals.dtype != object else list(vals),
+                'has values': has
+            }
+        return state
+
+    def set_state(self, objects, state):
+        for attr_name, data in state.items():
+            has = data['has values']
+            values = _column_array(data['values'], len(has))
+            self.set_values(attr_name, objects.pointers[has], values[has])
+
+    def _rows(self, pointers, add = False):
+        """Row for each pointer, or -1 if an object has no row"""
+        self._remove_deleted()
+        rows = self._find_rows(pointers)
+        if add and (rows < 0).any():
+            self._add_rows()
+            rows = self._find_rows(pointers)
+            if (rows < 0).any():
+                raise ValueError("Objects do not belong to this structure")
+        return rows
+
+    def _find_rows(self, pointers):
+        from numpy import searchsorted, full, intp
+        if len(self._pointers) == 0:
+            return full((len(pointers),), -1, intp)
+        rows = searchsorted(self._pointers, pointers)
+        rows[rows == len(self._pointers)] = 0
+        rows[self._pointers[rows] != pointers] = -1
+        return rows
+
+    def _remove_deleted(self):
+        if self._objects is None or len(self._objects) == len(self._pointers):
+            return
+        from numpy import isin
+        keep = isin(self._pointers, self._objects.pointers, assume_unique = True)
+        self._pointers = self._pointers[keep]
+        self._columns = {attr_name: (vals[keep], has[keep])
+            for attr_name, (vals, has) in self._columns.items()}
+
+    def _add_rows(self):
+        # Make rows for all current objects of the structure at once, so that assigning
+        # values one object at a time does not reallocate the columns for every object.
+        objects = self._all_objects()
+        from numpy import sort, searchsorted, zeros
+        pointers = sort(objects.pointers)
+        old_rows = searchsorted(pointers, self._pointers)
+        columns = {}
+        for attr_name, (vals, has) in self._columns.items():
+            new_vals = _empty_column(len(pointers), vals.dtype)
+            new_vals[old_rows] = vals
+            new_has = zeros((len(pointers),), bool)
+            new_has[old_rows] = has
+            columns[attr_name] = (new_vals, new_has)
+        self._columns = columns
+        self._objects = objects.__class__(pointers.copy())
+        self._pointers = pointers
+
+def _empty_values(n):
+    from numpy import empty
+    return empty((n,), object)
+
+def _empty_column(n, dtype):
+    from numpy import zeros, empty
+    if dtype == object:
+        return empty((n,), object)
+    return zeros((n,), dtype)
+
+def _is_single_value(values):
+    from numpy import ndarray
+    if values is None or isinstance(values, (str, bytes)):
+        return True
+    if isinstance(values, ndarray):
+        return values.ndim == 0
+    return not isinstance(values, (list, tuple))
+
+def _column_array(values, n):
+    """Make a 1-dimensional array of length 'n' from a sequence of values or one value.
+       Values that are not numbers or booleans are kept as Python objects.
+    """
+    from numpy import asarray, empty, ndarray, full
+    if _is_single_value(values):
+        a = asarray(values)
+        if a.dtype.kind in 'biuf':
+            return full((n,), a)
+        vals = empty((n,), object)
+        vals.fill(values)
+        return vals
+    if len(values) != n:
+        raise ValueError("Number of values (%d) does not match number of items (%d)" % (len(values), n))
+    if isinstance(values, ndarray) and values.ndim == 1 and values.dtype.kind in 'biufO':
+        return values
+    try:
+        a = asarray(values)
+    except (ValueError, OverflowError):
+        a = None
+    if a is not None and a.ndim == 1 and a.dtype.kind in 'biuf':
+        return a
+    vals = empty((n,), object)
+    for i, v in enumerate(values):
+        vals[i] = v
+    return vals
+
+def _merged_dtype(dtype1, dtype2):
+    from numpy import result_type, dtype
+    if dtype1 == dtype2:
+        return dtype1
+    numeric = 'iuf'
+    if dtype1.kind in numeric and dtype2.kind in numeric:
+        merged = result_type(dtype1, dtype2)
+        # widen integers or floats, but don't turn integer values into floats
+        if merged.kind != 'f' or (dtype1.kind == 'f' and dtype2.kind == 'f'):
+            return merged
+    # keep booleans, integers mixed with floats and other values their original Python type
+    return dtype(object)
+
+def _convert_column(vals, dtype):
+    if dtype != object:
+        return vals.astype(dtype)
+    from numpy import empty
+    ovals = empty((len(vals),), object)
+    ovals[:] = vals.tolist()
+    return ovals
+
+# -----------------------------------------------------------------------------
+#
+def structure_attr_columns(structure, collection_name, create = True):
+    """Return the AttrColumns for the structure's 'atoms' or 'residues', or None if 'create'
+       is False and no custom attributes have been stored.
+    """
+    _move_instance_values()
+    return _structure_attr_columns(structure, collection_name, create)
+
+def _structure_attr_columns(structure, collection_name, create = True):
+    columns = structure.__dict__.get('_custom_attr_columns')
+    if columns is None:
+        if not create:
+            return None
+        columns = structure._custom_attr_columns = {}
+    ac = columns.get(collection_name)
+    if ac is None and create:
+        ac = columns[collection_name] = AttrColumns(lambda s=structure, name=collection_name:
+            getattr(s, name))
+    return ac
+
+def is_column_attr(class_obj, attr_name):
+    """Whether values of a custom attribute of class 'class_obj' are stored in columns"""
+    for c in class_obj.__mro__:
+        if attr_name in c.__dict__:
+            return isinstance(c.__dict__[attr_name], ColumnAttr)
+    return False
+
+def collection_attr_values(collection, attr_name):
+    """Return a values array and a boolean array indicating which items have values"""
+    from numpy import zeros
+    n = len(collection)
+    parts = []
+    for s, mask in structure_masks(collection):
+        ac = structure_attr_columns(s, _collection_name(collection), create = False)
+        if ac is not None:
+            parts.append((mask, *ac.values(attr_name, collection.pointers[mask])))
+    if len(parts) == 1 and parts[0][0].all():
+        mask, values, has = parts[0]
+        return values, has
+    dtype = None
+    for mask, values, has in parts:
+        if has.any():
+            dtype = values.dtype if dtype is None else _merged_dtype(dtype, values.dtype)
+    all_values = _empty_values(n) if dtype is None else _empty_column(n, dtype)
+    all_has = zeros((n,), bool)
+    for mask, values, has in parts:
+        if dtype is not None and values.dtype != dtype:
+            values = _convert_column(values, dtype)
+        all_values[mask] = values
+        all_has[mask] = has
+    return all_values, all_has
+
+def set_collection_attr_values(collection, attr_name, values):
+    """Set values for all items of a collection.  'values' is one value per item or a single value."""
+    single = _is_single_value(values)
+    if not single:
+        values = _column_array(values, len(collection))
+    for s, mask in structure_masks(collection):
+        ac = structure_attr_columns(s, _collection_name(collection))
+        ac.set_values(attr_name, collection.pointers[mask], values if single else values[mask])
+
+def delete_collection_attr(collection, attr_name):
+    for s, mask in structure_masks(collection):
+        ac = structure_attr_columns(s, _collection_name(collection), create = False)
+        if ac is not None:
+            ac.delete_values(attr_name, collection.pointers[mask])
+
+def _collection_name(collection):
+    return collection.object_class._structure_collection
+
+def structure_masks(collection):
+    """Return a list of (structure, mask) pairs, the mask selecting the items of that structure"""
+    if len(collection) == 0:
+        return []
+    spointers = collection.structures.pointers
+    return [(s, spointers == s._c_pointer.value) for s in collection.unique_structures]
+
+# -----------------------------------------------------------------------------
+# Instances with column attribute values in their instance dictionary, mapping
+# id(instance) to (instance, set of attribute names).
+_instance_values = {}
+
+def _move_instance_values():
+    """Move values assigned to single objects into the structures' columns"""
+    global _instance_values
+    if not _instance_values:
+        return
+    pending, _instance_values = _instance_values, {}
+    from numpy import array, uintp
+    batches = {}
+    for inst, attr_names in pending.values():
+        if inst.deleted:
+            continue
+        d = inst.__dict__
+        key = (inst.structure, inst._structure_collection)
+        for attr_name in attr_names:
+            if attr_name in d:
+                pointers, values = batches.setdefault(key + (attr_name,), ([], []))
+                pointers.append(inst.cpp_pointer)
+                values.append(d.pop(attr_name))
+    for (s, collection_name, attr_name), (pointers, values) in batches.items():
+        _structure_attr_columns(s, collection_name).set_values(attr_name,
+            array(pointers, uintp), _column_array(values, len(values)))
+
+def _note_instance_value(inst, attr_name):
+    p = _instance_values.get(id(inst))
+    if p is None:
+        _instance_values[id(inst)] = (inst, set([attr_name]))
+    else:
+        p[1].add(attr_name)
+
+# -----------------------------------------------------------------------------
+#
+class ColumnAttr:
+    """Data descriptor added to the Atom or Residue class for each registered custom attribute,
+       so that only those attributes are stored in the structure's attribute columns and
+       setting other attributes has no extra overhead
+    """
+
+    def __init__(self, attr_name):
+        self.attr_name = attr_name
+
+    def __get__(self, inst, owner = None):
+        # raise AttributeError for the class too, so hasattr(Atom, name) is False as for
+        # attributes kept in instance dictionaries
+        if inst is not None:
+            try:
+                return inst.__dict__[self.attr_name]
+            except KeyError:
+                pass
+            if not inst.deleted:
+                ac = _structure_attr_columns(inst.structure, inst._structure_collection,
+                    create = False)
+                if ac is not None:
+                    return ac.value(self.attr_name, inst.cpp_pointer)
+        raise AttributeError("'%s' object has no attribute '%s'"
+            % ((owner or type(inst)).__name__, self.attr_name))
+
+    def __set__(self, inst, value):
+        # kept in the instance dictionary until the columns are next used
+        inst.__dict__[self.attr_name] = value
+        _note_instance_value(inst, self.attr_name)
+
+    def __delete__(self, inst):
+        had_value = inst.__dict__.pop(self.attr_name, _no_value) is not _no_value
+        ac = _structure_attr_columns(inst.structure, inst._structure_collection, create = False)
+        if ac is not None and hasattr(inst, self.attr_name):
+            from numpy import array, uintp
+            ac.delete_values(self.attr_name, array([inst.cpp_pointer], uintp))
+        elif not had_value:
+            raise AttributeError(self.attr_name)
+
+_no_value = object()
+
+class ColumnAttrsMixin:
+    """Atom and Residue base class that stores values of registered custom attributes in
+       the structure's attribute columns rather than in the instance dictionary
+    """
+
+    # name of the Structure property giving all instances, e.g. 'atoms'
+    _structure_collection = None
+
+    @classmethod
+    def _custom_attr_registered(cls, attr_name):
+        # builtin attributes (properties) can also be registered, e.g. by defattr
+        if attr_name[0] == '_' or is_column_attr(cls, attr_name) or hasattr(cls, attr_name):
+            return
+        setattr(cls, attr_name, ColumnAttr(attr_name))
+        # values assigned before the attribute was registered move into the columns later
+        from .molobject import python_instances_of_class
+        for inst in python_instances_of_class(cls, open_only = False):
+            if attr_name in inst.__dict__ and not inst.deleted:
+                _note_instance_value(inst, attr_name)
+
+    @classmethod
+    def _has_custom_attr_columns(cls, session):
+        from .structure import Structure
+        for s in session.models.list(type = Structure):
+            ac = structure_attr_columns(s, cls._structure_collection, create = False)
+            if ac is not None and ac.has_any_values():
+                return True
+        return False
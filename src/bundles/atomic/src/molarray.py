@@ -560,6 +560,21 @@ class Atoms(Collection):
         "Return list of 2-tuples of (structure, Atoms for that structure)."
         astruct = self.structures._pointers
         return [(us, self.filter(astruct==us._c_pointer.value)) for us in self.unique_structures]
+    def custom_attr_values(self, attr_name):
+        """Return a numpy array of the values of registered custom attribute 'attr_name' and
+        a boolean array indicating which atoms have a value.  Values are retrieved from the
+        structures' attribute columns without creating Python instances."""
+        from .custom_attrs import collection_attr_values
+        return collection_attr_values(self, attr_name)
+    def set_custom_attr_values(self, attr_name, values):
+        """Set registered custom attribute 'attr_name' for all atoms.  'values' is a sequence
+        with one value per atom or a single value for all of them."""
+        from .custom_attrs import set_collection_attr_values
+        set_collection_attr_values(self, attr_name, values)
+    def delete_custom_attr(self, attr_name):
+        """Remove the values of registered custom attribute 'attr_name' from the atoms."""
+        from .custom_attrs import delete_collection_attr
+        delete_collection_attr(self, attr_name)
     chain_ids = cvec_property('atom_chain_id', string, read_only = True)
     colors = cvec_property('atom_color', uint8, 4,
         doc="Returns a :mod:`numpy` Nx4 array of uint8 RGBA values. Can be set "
@@ -1386,6 +1401,21 @@ class Residues(Collection):
         '''Return list of pairs of structure and Residues for that structure.'''
         rmol = self.structures._pointers
         return [(m, self.filter(rmol==m._c_pointer.value)) for m in self.unique_structures]
+    def custom_attr_values(self, attr_name):
+        """Return a numpy array of the values of registered custom attribute 'attr_name' and
+        a boolean array indicating which residues have a value.  Values are retrieved from the
+        structures' attribute columns without creating Python instances."""
+        from .custom_attrs import collection_attr_values
+        return collection_attr_values(self, attr_name)
+    def set_custom_attr_values(self, attr_name, values):
+        """Set registered custom attribute 'attr_name' for all residues.  'values' is a sequence
+        with one value per residue or a single value for all of them."""
+        from .custom_attrs import set_collection_attr_values
+        set_collection_attr_values(self, attr_name, values)
+    def delete_custom_attr(self, attr_name):
+        """Remove the values of registered custom attribute 'attr_name' from the residues."""
+        from .custom_attrs import delete_collection_attr
+        delete_collection_attr(self, attr_name)
 
     @property
     def unique_ids(self):
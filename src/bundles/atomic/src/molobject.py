@@ -62,9 +62,13 @@ def python_instances_of_class(inst_class, *, open_only=True):
 
 # delay .cymol import until 'CFunctions' call above establishes lib path
 from .cymol import CyAtom
-class Atom(CyAtom, State):
+from .custom_attrs import ColumnAttrsMixin
+class Atom(ColumnAttrsMixin, CyAtom, State):
     '''An atom in a (chemical) structure'''
 
+    # registered custom attribute values are stored in columns of the structure's atoms
+    _structure_collection = 'atoms'
+
     # So that attr-registration API can provide return-type info; provide that data here
     # [because Cython properties use immutable getset_descriptor slots, and the final address of a
     # property isn't obtainable until the end of the class definition, using this inelegant solution]
@@ -610,7 +614,7 @@ class PseudobondManager(StateManager):
 # -----------------------------------------------------------------------------
 #
 from .cymol import CyResidue
-class Residue(CyResidue, State):
+class Residue(ColumnAttrsMixin, CyResidue, State):
     '''
     A group of atoms such as an amino acid or nucleic acid. Every atom in
     an :class:`.AtomicStructure` belongs to a residue, including solvent and ions.
@@ -628,6 +632,9 @@ class Residue(CyResidue, State):
         ('worm_radius', (float,)),
     ]
 
+    # registered custom attribute values are stored in columns of the structure's residues
+    _structure_collection = 'residues'
+
     # possibly long-term hack for interoperation with ctypes;
     # has to be here instead of CyResidue because super().__delattr__ doesn't work there
     def __delattr__(self, name):
@@ -1473,6 +1480,7 @@ class StructureData:
     PBG_HYDROGEN_BONDS = c_function('structure_PBG_HYDROGEN_BONDS', args = (),
         ret = ctypes.c_char_p)().decode('utf-8')
     _ss_suppress_count = 0
+    _coordset_loader = None
 
     # For attribute registration...
     _attr_reg_info = [
@@ -1525,7 +1533,14 @@ class StructureData:
         set to true when temporarily changing the active coordset in a Python script. Boolean''')
     active_coordset = c_property('structure_active_coordset', cptr, astype = convert.coordset,
         read_only = True, doc="Supported API. Currently active :class:`CoordSet`. Read only.")
-    active_coordset_id = c_property('structure_active_coordset_id', int32,
+    _active_coordset_id = c_property('structure_active_coordset_id', int32)
+    def _get_active_coordset_id(self):
+        return self._active_coordset_id
+    def _set_active_coordset_id(self, cs_id):
+        if self._coordset_loader is not None:
+            self.load_coordsets([cs_id])
+        self._active_coordset_id = cs_id
+    active_coordset_id = property(_get_active_coordset_id, _set_active_coordset_id,
         doc = "Supported API. Index of the active coordinate set.")
     alt_loc_change_notify = c_property('structure_alt_loc_change_notify', npy_bool, doc=
         '''Whether notifications are issued when altlocs are changed.  Should only be
@@ -1665,6 +1680,7 @@ class StructureData:
         f(s._c_pointer, self._c_pointer, pos_ptr, chain_id_map)
 
     def _copy(self):
+        self.load_coordsets()
         f = c_function('structure_copy', args = (ctypes.c_void_p,), ret = ctypes.c_void_p)
         p = f(self._c_pointer)
         return p
@@ -1716,6 +1732,8 @@ class StructureData:
         '''Supported API. Add a coordinate set with the given id.'''
         if xyz.dtype != float64:
             raise ValueError('add_coordset(): array must be float64, got %s' % xyz.dtype.name)
+        if self._coordset_loader is not None:
+            self._coordset_loader.unloaded_ids.discard(id)
         f = c_function('structure_add_coordset',
                        args = (ctypes.c_void_p, ctypes.c_int, ctypes.c_void_p, ctypes.c_size_t))
         f(self._c_pointer, id, pointer(xyz), len(xyz))
@@ -1744,17 +1762,50 @@ class StructureData:
                 ' must be 3 (xyz)')
         if xyzs.dtype != float64:
             raise ValueError('add_coordsets(): array must be float64, got %s' % xyzs.dtype.name)
+        if replace:
+            self._coordset_loader = None
         f = c_function('structure_add_coordsets',
                        args = (ctypes.c_void_p, ctypes.c_bool, ctypes.c_void_p, ctypes.c_size_t, ctypes.c_size_t))
         f(self._c_pointer, replace, pointer(xyzs), *xyzs.shape[:2])
 
     def remove_coordsets(self):
         '''Remove all coordinate sets.'''
+        self._coordset_loader = None
         f = c_function('structure_remove_coordsets', args = (ctypes.c_void_p,))
         f(self._c_pointer)
 
+    def set_coordset_loader(self, loader):
+        '''
+        Read the coordinates of coordinate sets on demand.  The loader has an
+        "unloaded_ids" set of the coordinate set ids not yet read and a method
+        coordset_coords(cs_id) returning the coordinates of one of them as an
+        N by 3 float64 array in coordinate index order.  Unread coordinate
+        sets are empty placeholders, filled when made active, returned by
+        coordset(), copied or saved, so unread coordinates are never seen.
+        '''
+        self._coordset_loader = loader
+
+    def load_coordsets(self, cs_ids = None):
+        '''
+        Read coordinate sets that a coordset loader has not yet read,
+        by default all of them.  Does nothing if there is no loader.
+        '''
+        loader = self._coordset_loader
+        if loader is None:
+            return
+        unloaded = loader.unloaded_ids
+        ids = [cs_id for cs_id in (tuple(unloaded) if cs_ids is None else cs_ids)
+               if cs_id in unloaded]
+        for cs_id in ids:
+            # Replaces the empty placeholder coordinate set.
+            self.add_coordset(cs_id, loader.coordset_coords(cs_id))
+        if not unloaded:
+            self._coordset_loader = None
+
     def coordset(self, cs_id):
         '''Supported API. Return the CoordSet for the given coordset ID'''
+        if self._coordset_loader is not None:
+            self.load_coordsets([cs_id])
         f = c_function('structure_py_obj_coordset', args = (ctypes.c_void_p, ctypes.c_int),
             ret = ctypes.py_object)
         return f(self._c_pointer, cs_id)
@@ -731,15 +731,11 @@ def close_surfaces(atoms_or_surfs):
         models = surfs[0].session.models
         models.close(surfs)
 
-def buried_area(a1, a2, probe_radius):
-    from chimerax.surface import spheres_surface_area
+def buried_area(a1, a2, probe_radius, areas1 = None, areas2 = None):
+    from chimerax.surface import buried_sphere_areas
     xyz1, r1 = atom_spheres(a1, probe_radius)
-    a1a = spheres_surface_area(xyz1, r1)
     xyz2, r2 = atom_spheres(a2, probe_radius)
-    a2a = spheres_surface_area(xyz2, r2)
-    from numpy import concatenate
-    xyz12, r12 = concatenate((xyz1,xyz2)), concatenate((r1,r2))
-    a12a = spheres_surface_area(xyz12, r12)
+    a1a, a2a, a12a = buried_sphere_areas(xyz1, r1, xyz2, r2, areas1, areas2)
     ba = 0.5 * (a1a.sum() + a2a.sum() - a12a.sum())
     return ba, a1a, a2a, a12a
 
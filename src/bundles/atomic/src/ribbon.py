@@ -33,7 +33,7 @@ EPSILON = 1e-6
 from .molobject import StructureData
 TETHER_CYLINDER = StructureData.TETHER_CYLINDER
 
-from numpy import array, zeros, ones, empty, float32, float64, uint8
+from numpy import array, zeros, ones, empty, float32, float64, uint8, int32
 from numpy import dot, concatenate, any, linspace, newaxis, inner, cross, mean
 from numpy.linalg import norm
 
@@ -45,6 +45,7 @@ def _make_ribbon_graphics(structure, ribbons_drawing):
     ribbons_drawing.clear()
 
     if structure.ribbon_display_count == 0:
+        ribbons_drawing.segments.clear()
         return
 
     if timing:
@@ -54,24 +55,20 @@ def _make_ribbon_graphics(structure, ribbons_drawing):
 
     if timing:
         poltime = time()-t0
+        t0 = time()
 
-    rangestime = xstime = smootime = tubetime = pathtime = spltime = interptime = geotime = tethertime = 0
     global coeftime, normaltime
     coeftime = normaltime = 0
 
     # Ribbon quality. Number of band per residue.
-    lod = structure._level_of_detail
-    segment_divisions = lod.ribbon_fixed_divisions
-    if segment_divisions is None:
-        nres = structure.num_ribbon_residues
-        segment_divisions = lod.ribbon_divisions(nres)
+    segment_divisions = _ribbon_divisions(structure)
+    ribbons_drawing.divisions = segment_divisions
 
-    # Accumulate ribbon information for all polymer chains.
-    geometry = TriangleAccumulator()
-    polyres = []
-    roffset = 0
-    tethered_atoms = []
-    backbone_atoms = []
+    # Geometry of polymers that have not changed is reused.
+    cache = ribbons_drawing.segments
+    cache.check_parameters(structure, segment_divisions)
+    segments = []
+    computed = 0
 
     for rlist, ptype in polymers:
         # Always call get_polymer_spline to make sure hide bits are
@@ -98,128 +95,43 @@ def _make_ribbon_graphics(structure, ribbons_drawing):
         if displays.sum() == 0:
             continue
 
-        if timing:
-            t0 = time()
-            
-        # Assign a residue class to each residue and compute the
-        # ranges of secondary structures
-        is_helix = residues.is_helix
-        ssids = residues.secondary_structure_ids
-        worm = structure.worm_ribbon
-        arc_helix = (structure.ribbon_mode_helix == structure.RIBBON_MODE_ARC and not worm)
-        res_class, helix_ranges, sheet_ranges, display_ranges = \
-            _ribbon_ranges(is_helix, residues.is_strand, ssids, displays,
-                           residues.polymer_types, arc_helix)
-
-        if timing:
-            rangestime += time()-t0
-            t0 = time()
-
-        # Assign front and back cross sections for each residue.
-        xs_mgr = structure.ribbon_xs_mgr
-        xs_front, xs_back, smooth_twist = \
-            _ribbon_crosssections(res_class, xs_mgr, is_helix, arc_helix, worm)
-
-        if timing:
-            xstime += time()-t0
-            t0 = time()
-            
-        # Perform any smoothing (e.g., strand smoothing
-        # to remove lasagna sheets, pipes and planks
-        # display as cylinders and planes, etc.)
-        _smooth_ribbon(residues, coords, guides, helix_ranges, sheet_ranges,
-                       structure.ribbon_mode_helix, structure.ribbon_mode_strand)
-
-        if timing:
-            smootime += time()-t0
-            t0 = time()
-
-        # Create tube helices.
-        if arc_helix:
-            ribbon_adjusts = residues.ribbon_adjusts
-            for start, end in helix_ranges:
-                if displays[start:end].any():
-                    centers = _arc_helix_geometry(coords, xs_mgr, displays, start, end, geometry)
-                    # Adjust coords so non-tube half of helix ends joins center of cylinder
-                    coords[start:end] = centers
-
-        if timing:
-            tubetime += time()-t0
-            t0 = time()
+        # Copy coordinates and guides since smoothing modifies them.
+        inputs = (coords.copy(), None if guides is None else guides.copy(), displays,
+                  residues.secondary_structure_ids, residues.is_helix, residues.is_strand,
+                  residues.ribbon_adjusts, residues.worm_radii, residues.ribbon_hide_backbones)
+        segment = cache.segment(residues, inputs)
+        if segment is None:
+            segment = _ribbon_segment(structure, residues, coords, guides, displays,
+                                      segment_divisions)
+            cache.add_segment(residues, inputs, segment)
+            computed += 1
+        segments.append(segment)
 
-        # _ss_control_point_display(ribbons_drawing, coords, guides)
-
-        # Create spline path
-        if timing:
-            t1 = time()
-        orients = structure.ribbon_orients(residues)
-        flip_normals = _ribbon_flip_normals(structure, is_helix)
-        ribbon = Ribbon(coords, guides, orients, flip_normals, smooth_twist, segment_divisions,
-                        structure.spline_normals)
-        if timing:
-            spltime += time()-t1
-
-        if timing:
-            t1 = time()
-        path = ribbon.path()
-        # _debug_show_normal_spline(ribbons_drawing, coords, ribbon, num_divisions)
-        if timing:
-            interptime += time()-t1
-
-        if timing:
-            pathtime += time() - t0
-            t0 = time()
-
-        if worm:
-            radial_scale = _worm_radii(residues, segment_divisions)
-            radial_scale /= xs_mgr.scale_coil[0]
-        else:
-            radial_scale = None
-
-        # Compute ribbon triangles
-        _ribbon_geometry(path, display_ranges, len(residues), xs_front, xs_back, geometry,
-                         radial_scale=radial_scale)
-
-        if timing:
-            geotime += time() - t0
-            t0 = time()
-
-        # Get list of tethered atoms and attachment position to ribbon.
-        if structure.ribbon_tether_scale > 0:
-            min_tether_offset = structure.bond_radius
-            t_atoms, b_atoms = _ribbon_tethers(ribbon, residues, min_tether_offset)
-            if t_atoms:
-                tethered_atoms.append(t_atoms)
-            if b_atoms:
-                backbone_atoms.append(b_atoms)
-                
-        if timing:
-            tethertime += time()-t0
-        
-        polyres.append(residues)
-
-        roffset += len(residues)
-        geometry.set_range_offset(roffset)
+    cache.remove_unused()
 
     if timing:
+        segtime = time()-t0
         t0 = time()
-        
+
     # Set ribbon drawing geometry, colors, residue triangle ranges, and tethers
-    if not geometry.empty():
+    # Splice together the geometry of each polymer
+    va, na, ta, tranges = _join_segments(segments)
+    if va is not None:
         # Set drawing geometry
-        va, na, ta = geometry.vertex_normal_triangle_arrays()
         ribbons_drawing.set_geometry(va, na, ta)
         # ribbons_drawing.display_style = rp.Mesh
 
         # Remember triangle ranges for each residue.
         from . import concatenate, Residues
-        residues = concatenate(polyres, Residues)
-        ribbons_drawing.set_triangle_ranges(residues, geometry.triangle_ranges)
+        residues = concatenate([seg.residues for seg in segments], Residues)
+        ribbons_drawing.set_triangle_ranges(residues, tranges)
 
         # Set colors
         ribbons_drawing.update_ribbon_colors()
 
         # Make tethers
+        tethered_atoms = [seg.tethered_atoms for seg in segments if seg.tethered_atoms]
+        backbone_atoms = [seg.backbone_atoms for seg in segments if seg.backbone_atoms]
         ribbons_drawing.set_tethers(tethered_atoms, backbone_atoms,
                                     structure.ribbon_tether_shape,
                                     structure.ribbon_tether_scale,
@@ -227,17 +139,237 @@ def _make_ribbon_graphics(structure, ribbons_drawing):
 
     if timing:
         drtime = time() - t0
-        t0 = time()
-
-    if timing:
         nres = sum(structure.residues.ribbon_displays)
-        print('ribbon times %d polymers, %d residues, polymers %.4g, ranges %.4g, xsect %.4g, smooth %.4g, tube %.4g, path %.4g (spline %.4g (coef %.4g, normals %.4g), interpolate %.4g) , triangles %.4g, makedrawing %.4g, tethers %.4g'
-              % (len(polymers), nres,
-                 poltime, rangestime, xstime, smootime, tubetime,
-                 pathtime, spltime, coeftime, normaltime, interptime,
-                 geotime, drtime, tethertime))
+        print('ribbon times %d polymers (%d recomputed), %d residues, polymers %.4g, segments %.4g (coef %.4g, normals %.4g), makedrawing %.4g'
+              % (len(polymers), computed, nres, poltime, segtime,
+                 coeftime, normaltime, drtime))
+
+class _RibbonSegment:
+    '''Ribbon geometry for one polymer.'''
+    def __init__(self, residues, vertices, normals, triangles, triangle_ranges,
+                 tethered_atoms, backbone_atoms, tether_coefficients):
+        self.residues = residues
+        self.vertices = vertices
+        self.normals = normals
+        self.triangles = triangles
+        self.triangle_ranges = triangle_ranges	# Residue index relative to this polymer
+        self.tethered_atoms = tethered_atoms
+        self.backbone_atoms = backbone_atoms
+        self.tether_coefficients = tether_coefficients	# Spline coefficients for tether positions
+
+def _ribbon_segment(structure, residues, coords, guides, displays, segment_divisions):
+    '''Compute ribbon triangles and tethers for one polymer.'''
+    geometry = TriangleAccumulator()
+
+    # Assign a residue class to each residue and compute the
+    # ranges of secondary structures
+    is_helix = residues.is_helix
+    ssids = residues.secondary_structure_ids
+    worm = structure.worm_ribbon
+    arc_helix = (structure.ribbon_mode_helix == structure.RIBBON_MODE_ARC and not worm)
+    res_class, helix_ranges, sheet_ranges, display_ranges = \
+        _ribbon_ranges(is_helix, residues.is_strand, ssids, displays,
+                       residues.polymer_types, arc_helix)
+
+    # Assign front and back cross sections for each residue.
+    xs_mgr = structure.ribbon_xs_mgr
+    xs_front, xs_back, smooth_twist = \
+        _ribbon_crosssections(res_class, xs_mgr, is_helix, arc_helix, worm)
+
+    # Perform any smoothing (e.g., strand smoothing
+    # to remove lasagna sheets, pipes and planks
+    # display as cylinders and planes, etc.)
+    _smooth_ribbon(residues, coords, guides, helix_ranges, sheet_ranges,
+                   structure.ribbon_mode_helix, structure.ribbon_mode_strand)
+
+    # Create tube helices.
+    if arc_helix:
+        for start, end in helix_ranges:
+            if displays[start:end].any():
+                centers = _arc_helix_geometry(coords, xs_mgr, displays, start, end, geometry)
+                # Adjust coords so non-tube half of helix ends joins center of cylinder
+                coords[start:end] = centers
+
+    # _ss_control_point_display(ribbons_drawing, coords, guides)
+
+    # Create spline path
+    orients = structure.ribbon_orients(residues)
+    flip_normals = _ribbon_flip_normals(structure, is_helix)
+    ribbon = Ribbon(coords, guides, orients, flip_normals, smooth_twist, segment_divisions,
+                    structure.spline_normals)
+    path = ribbon.path()
+    # _debug_show_normal_spline(ribbons_drawing, coords, ribbon, num_divisions)
+
+    if worm:
+        radial_scale = _worm_radii(residues, segment_divisions)
+        radial_scale /= xs_mgr.scale_coil[0]
+    else:
+        radial_scale = None
+
+    # Compute ribbon triangles
+    _ribbon_geometry(path, display_ranges, len(residues), xs_front, xs_back, geometry,
+                     radial_scale=radial_scale)
+
+    # Get list of tethered atoms and attachment position to ribbon.
+    t_atoms = b_atoms = tether_coef = None
+    if structure.ribbon_tether_scale > 0:
+        min_tether_offset = structure.bond_radius
+        t_atoms, b_atoms = _ribbon_tethers(ribbon, residues, min_tether_offset)
+        tether_coef = ribbon.segment_coefficients
+
+    if geometry.empty():
+        va = na = ta = None
+        tranges = zeros((0,5), int32)
+    else:
+        va, na, ta = geometry.vertex_normal_triangle_arrays()
+        tranges = geometry.triangle_ranges
+    return _RibbonSegment(residues, va, na, ta, tranges, t_atoms, b_atoms, tether_coef)
+
+def _join_segments(segments):
+    '''
+    Concatenate polymer ribbon geometry offsetting triangle vertex indices
+    and triangle range residue, triangle and vertex indices.
+    '''
+    geom = [seg for seg in segments if seg.vertices is not None]
+    if len(geom) == 0:
+        return None, None, None, zeros((0,5), int32)
+    va = concatenate([seg.vertices for seg in geom])
+    na = concatenate([seg.normals for seg in geom])
+    ta = concatenate([seg.triangles for seg in geom])
+    tranges = concatenate([seg.triangle_ranges for seg in geom])
+    roffset = voffset = toffset = rs = ts = 0
+    for seg in segments:
+        if seg.vertices is not None:
+            nv, nt, nr = len(seg.vertices), len(seg.triangles), len(seg.triangle_ranges)
+            ta[ts:ts+nt] += voffset
+            r = tranges[rs:rs+nr]
+            r[:,0] += roffset
+            r[:,1:3] += toffset
+            r[:,3:5] += voffset
+            voffset += nv
+            toffset += nt
+            ts += nt
+            rs += nr
+        roffset += len(seg.residues)
+    return va, na, ta, tranges
+
+class RibbonSegmentCache:
+    '''
+    Ribbon geometry for each polymer of a structure so that only polymers
+    whose residues changed are recomputed.  Polymers are recomputed if their
+    spline atom coordinates, ribbon display, secondary structure, ribbon adjust,
+    worm radii or backbone hiding differ from the cached values, or if the
+    structure changes trigger reported a change to their residues that affects
+    ribbons.  Changes to structure-wide ribbon parameters recompute all polymers.
+    '''
+    def __init__(self):
+        self._segments = {}	# Map residue pointers bytes to (inputs, _RibbonSegment)
+        self._used = set()
+        self._parameters = None
+        self._changed_residues = []	# Arrays of residue pointers
+        self._all_changed = False
+
+    def clear(self):
+        self._segments.clear()
+        self._parameters = None
+        self._changed_residues = []
+        self._all_changed = False
+
+    def check_parameters(self, structure, segment_divisions):
+        xs_mgr = structure.ribbon_xs_mgr
+        s = structure
+        params = (segment_divisions, xs_mgr, xs_mgr.change_count, s.worm_ribbon,
+                  s.ribbon_mode_helix, s.ribbon_mode_strand, s.ribbon_orientation,
+                  s.spline_normals, s.ribbon_tether_scale, s.bond_radius)
+        if params != self._parameters or self._all_changed:
+            self.clear()
+            self._parameters = params
+        elif self._changed_residues:
+            changed = concatenate(self._changed_residues)
+            from numpy import isin
+            for key, (inputs, seg) in tuple(self._segments.items()):
+                if isin(seg.residues.pointers, changed).any():
+                    del self._segments[key]
+            self._changed_residues = []
+        self._used.clear()
+
+    def segment(self, residues, inputs):
+        key = residues.pointers.tobytes()
+        iseg = self._segments.get(key)
+        if iseg is None:
+            return None
+        cinputs, seg = iseg
+        from numpy import array_equal
+        for a, ca in zip(inputs, cinputs):
+            if a is None or ca is None:
+                if a is not ca:
+                    return None
+            elif not array_equal(a, ca):
+                return None
+        self._used.add(key)
+        return seg
+
+    def add_segment(self, residues, inputs, segment):
+        key = residues.pointers.tobytes()
+        self._segments[key] = (inputs, segment)
+        self._used.add(key)
+
+    def remove_unused(self):
+        segs = self._segments
+        for key in tuple(segs.keys()):
+            if key not in self._used:
+                del segs[key]
+        self._used.clear()
+
+    # Residue and atom changes that need the ribbon for those residues recomputed.
+    _residue_reasons = set(['ribbon_adjust changed', 'ribbon_display changed',
+                            'ribbon_hide_backbone changed', 'ss_id changed',
+                            'ss_type changed', 'worm_radius changed'])
+    _atom_reasons = set(['coord changed', 'alt_loc changed'])
+
+    def atomic_changes(self, changes):
+        '''
+        Record which residues changed from a structure changes trigger.
+        Returns whether any of the changes affect ribbons.
+        '''
+        all_changed = ('active_coordset changed' in changes.atomic_structure_reasons()
+                       or 'coordset changed' in changes.coordset_reasons()
+                       or changes.num_deleted_atoms() > 0)
+        residues_changed = self._residue_reasons.intersection(changes.residue_reasons())
+        atoms_changed = self._atom_reasons.intersection(changes.atom_reasons())
+        created = changes.created_atoms(include_new_structures = False)
+        if not (all_changed or residues_changed or atoms_changed or len(created) > 0):
+            return False
+        if self._all_changed or not self._segments:
+            return True
+        if all_changed:
+            self._all_changed = True
+            self._changed_residues = []
+            return True
+        cr = self._changed_residues
+        if residues_changed:
+            cr.append(changes.modified_residues().pointers)
+        if atoms_changed:
+            cr.append(changes.modified_atoms().unique_residues.pointers)
+        if len(created) > 0:
+            cr.append(created.unique_residues.pointers)
+        return True
+
+    def set_tether_positions(self):
+        '''Set the ribbon coordinates of tethered atoms for the cached polymers.'''
+        for inputs, seg in self._segments.values():
+            if seg.tether_coefficients is not None:
+                _set_tether_positions(seg.residues, seg.tether_coefficients)
 
 
+def _ribbon_divisions(structure):
+    '''Number of bands per residue for the ribbons of a structure.'''
+    gu = structure._graphics_updater
+    # Use the count of ribbon residues shown in all structures so that
+    # many structures each shown in full detail do not make too many triangles.
+    nres = max(structure.ribbon_display_count, gu.num_ribbon_residues_shown)
+    return gu.level_of_detail.ribbon_divisions(nres)
+
 def _get_polymer_spline(residues):
     '''Return a tuple of spline center and guide coordinates for a
     polymer chain.  Residues in the chain that do not have a center
@@ -616,6 +748,9 @@ class RibbonsDrawing(Drawing):
         self._triangle_ranges_sorted = None	# Sorted ranges for first_intercept() calc
         self._residues = None			# Residues used with _triangle_ranges
         self._residues_count = 0		# For detecting deleted residues
+        self.divisions = None			# Bands per residue of current geometry
+        self.segments = RibbonSegmentCache()	# Geometry for each polymer
+        self._lod_geometry = {}			# Map divisions to saved geometry
         
     def clear(self):
         self.set_geometry(None, None, None)
@@ -623,15 +758,67 @@ class RibbonsDrawing(Drawing):
         self._tethers_drawing = None
         self._triangle_ranges = None
         self._residues = None
-
-    def compute_ribbons(self, structure):
+        self.divisions = None
+
+    def compute_ribbons(self, structure, level_of_detail_only = False):
+        '''
+        If only the level of detail changed, for instance switching to coarse
+        ribbons while the camera moves and back when it stops, geometry computed
+        earlier at the new number of divisions is reused.  Only the geometry of
+        the level being replaced is kept, so zooming does not accumulate levels.
+        '''
         if timing:
             t0 = time()
-        _make_ribbon_graphics(structure, self)
+        if level_of_detail_only:
+            saved = self._lod_geometry.pop(_ribbon_divisions(structure), None)
+            self._clear_lod_geometry()
+            if self.divisions is not None:
+                self._lod_geometry[self.divisions] = self._saved_geometry()
+                self.segments = RibbonSegmentCache()
+        else:
+            self._clear_lod_geometry()
+            saved = None
+        if saved is None:
+            _make_ribbon_graphics(structure, self)
+        else:
+            self._restore_geometry(saved)
         if timing:
             t1 = time()
             print ('compute_ribbons(): %.4g' % (t1-t0))
 
+    def _saved_geometry(self):
+        td = self._tethers_drawing
+        if td is not None:
+            self.remove_drawing(td, delete = False)
+        return (self.divisions, self.vertices, self.normals, self.triangles,
+                self._residues, self._residues_count, self._triangle_ranges,
+                self.segments, self._tethers_drawing)
+
+    def _restore_geometry(self, saved):
+        self.clear()
+        (self.divisions, va, na, ta, residues, residues_count, tranges,
+         self.segments, self._tethers_drawing) = saved
+        self.set_geometry(va, na, ta)
+        if residues is not None:
+            self.set_triangle_ranges(residues, tranges)
+            self._residues_count = residues_count
+            self.update_ribbon_colors()
+        if self._tethers_drawing is not None:
+            self.add_drawing(self._tethers_drawing)
+        # Atom ribbon coordinates were set for the previous level of detail.
+        self.segments.set_tether_positions()
+
+    def delete(self):
+        self._clear_lod_geometry()
+        Drawing.delete(self)
+
+    def _clear_lod_geometry(self):
+        for saved in self._lod_geometry.values():
+            td = saved[-1]
+            if td is not None:
+                td.delete()
+        self._lod_geometry.clear()
+
     def set_triangle_ranges(self, residues, triangle_ranges):
         self._residues = residues
         self._residues_count = len(residues)	# For detecting deleted residues
@@ -1760,6 +1947,7 @@ class XSectionManager(State):
 
     def __init__(self):
         self.structure = None
+        self.change_count = 0
         self.scale_helix = (1.0, 0.2)
         self.scale_helix_arrow = ((2.0, 0.2), (0.2, 0.2))
         self.scale_sheet = (1.0, 0.2)
@@ -2113,6 +2301,7 @@ class XSectionManager(State):
 
     def _set_gc_ribbon(self):
         # Mark ribbon for rebuild
+        self.change_count += 1	# Ribbons drawing checks this to reuse polymer geometry
         s = self.structure()
         if s is not None:
             s._graphics_changed |= s._RIBBON_CHANGE
@@ -2155,6 +2344,7 @@ class XSectionManager(State):
             except KeyError:
                 # Older sessions may not have all the current parameters
                 pass
+        self.change_count += 1
 
 # -----------------------------------------------------------------------------
 #
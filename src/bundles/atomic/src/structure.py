@@ -80,6 +80,7 @@ class Structure(Model, StructureData):
         self._bonds_drawing = None
         self._chain_trace_pbgroup = None
         self._ribbons_drawing = None
+        self._ribbon_lod_change_only = False
         self._ring_drawing = None
 
         self._ses_handlers = []
@@ -91,6 +92,7 @@ class Structure(Model, StructureData):
         from chimerax.core.models import MODEL_POSITION_CHANGED, MODEL_DISPLAY_CHANGED
         self._ses_handlers.append(t.add_handler(MODEL_POSITION_CHANGED, self._update_position))
         self.triggers.add_trigger("changes")
+        self.triggers.add_handler("changes", self._ribbon_atomic_changes)
         _register_hover_trigger(session)
         
         self._make_drawing()
@@ -184,6 +186,16 @@ class Structure(Model, StructureData):
             for py_obj in py_objs:
                 collection[base_index + index_lookup[py_obj]].set_custom_attrs(
                     {'custom attrs': py_obj.custom_attrs})
+        # attribute values stored in columns rather than in Python instances
+        from .custom_attrs import structure_attr_columns
+        for class_attr in ['atoms', 'residues']:
+            source_columns = structure_attr_columns(source, class_attr, create=False)
+            if source_columns is None:
+                continue
+            source_objs = getattr(source, class_attr)
+            base_index = 0 if totals is None else totals[class_attr]
+            objs = getattr(self, class_attr)[base_index:base_index + len(source_objs)]
+            structure_attr_columns(self, class_attr).set_state(objs, source_columns.state(source_objs))
 
     def added_to_session(self, session):
         if not self.scene_position.is_identity():
@@ -215,9 +227,19 @@ class Structure(Model, StructureData):
             lighting(self.session, preset = 'full', **kw)
 
     def take_snapshot(self, session, flags):
+        # Sessions save all coordinate sets, so read any not yet read from a file.
+        self.load_coordsets()
         data = {'model state': Model.take_snapshot(self, session, flags),
                 'structure state': StructureData.save_state(self, session, flags),
                 'custom attrs': self.custom_attrs }
+        from .custom_attrs import structure_attr_columns
+        columns = {}
+        for class_attr in ['atoms', 'residues']:
+            ac = structure_attr_columns(self, class_attr, create=False)
+            if ac is not None:
+                columns[class_attr] = ac.state(getattr(self, class_attr))
+        if columns:
+            data['custom attr columns'] = columns
         for attr_name in self._session_attrs.keys():
             data[attr_name] = getattr(self, attr_name)
         data['version'] = STRUCTURE_STATE_VERSION
@@ -243,8 +265,13 @@ class Structure(Model, StructureData):
         # TODO: For some reason ribbon drawing does not update automatically.
         # TODO: Also marker atoms do not draw without this.
         self._graphics_changed |= (self._SHAPE_CHANGE | self._RIBBON_CHANGE | self._RING_CHANGE)
+        self._ribbon_lod_change_only = False
 
         self.set_custom_attrs(data)
+        if 'custom attr columns' in data:
+            from .custom_attrs import structure_attr_columns
+            for class_attr, state in data['custom attr columns'].items():
+                structure_attr_columns(self, class_attr).set_state(getattr(self, class_attr), state)
 
     def _get_bond_radius(self):
         return self._bond_radius
@@ -326,6 +353,7 @@ class Structure(Model, StructureData):
         if sn != self._use_spline_normals:
             self._use_spline_normals = sn
             self._graphics_changed |= self._RIBBON_CHANGE
+            self._ribbon_lod_change_only = False
     spline_normals = property(_get_spline_normals, _set_spline_normals)
 
     def _make_drawing(self):
@@ -360,7 +388,7 @@ class Structure(Model, StructureData):
             return
 
         if gc & self._RIBBON_CHANGE:
-            self._create_ribbon_graphics()
+            self._create_ribbon_graphics(self._ribbon_lod_change_only)
             # Displaying ribbon can set backbone atom hide bits producing shape change.
             gc |= self._graphics_changed
 
@@ -662,7 +690,8 @@ class Structure(Model, StructureData):
         vertices, normals, triangles = fill_6ring(atoms.coords, offset, anchor)
         return AtomicShapeInfo(vertices, normals, triangles, color, atoms)
 
-    def _create_ribbon_graphics(self):
+    def _create_ribbon_graphics(self, level_of_detail_only = False):
+        self._ribbon_lod_change_only = False
         ribbons_drawing = self._ribbons_drawing
         if ribbons_drawing is None:
             from .ribbon import RibbonsDrawing
@@ -670,10 +699,25 @@ class Structure(Model, StructureData):
             self._ribbons_drawing = rd
             self.add_drawing(rd)
 
-        ribbons_drawing.compute_ribbons(self)
+        ribbons_drawing.compute_ribbons(self, level_of_detail_only)
         
         self._graphics_changed |= self._SHAPE_CHANGE
 
+    def _ribbon_atomic_changes(self, trigger_name, changes):
+        # Record residues changed so only ribbons for polymers with changes are recomputed.
+        rd = self._ribbons_drawing
+        if rd is not None and rd.segments.atomic_changes(changes[1]):
+            # Ribbon must be recomputed, not just switched to another level of detail.
+            self._ribbon_lod_change_only = False
+            self._graphics_changed |= self._RIBBON_CHANGE
+
+    def _ribbon_level_of_detail_changed(self):
+        # Remember if no other ribbon change is pending so the ribbon drawing
+        # can reuse geometry previously computed at the new level of detail.
+        if not (self._graphics_changed & self._RIBBON_CHANGE):
+            self._ribbon_lod_change_only = True
+            self._graphics_changed |= self._RIBBON_CHANGE
+
     def _update_ribbon_graphics(self, changes = StructureData._ALL_CHANGE):
         # Ribbon is recomputed when needed by _create_ribbon_graphics()
         # Only selection and color is updated here.
@@ -1871,7 +1915,9 @@ class StructureGraphicsChangeManager:
         self._structures = set()
         self._structures_array = None		# StructureDatas object
         self.num_atoms_shown = 0
+        self.num_ribbon_residues_shown = 0
         self.level_of_detail = LevelOfDetail()
+        self._ribbon_still_frames = 0		# Frames since camera last moved
         from chimerax.core.models import MODEL_DISPLAY_CHANGED
         self._display_handler = t.add_handler(MODEL_DISPLAY_CHANGED, self._model_display_changed)
         self._model_display_change = False
@@ -1897,10 +1943,19 @@ class StructureGraphicsChangeManager:
         if isinstance(model, Structure) or _has_structure_descendant(model):
             self._model_display_change = True
 
-    def _update_graphics_if_needed(self, *_):
+    def _update_graphics_if_needed(self, trigger_name = None, view = None):
         s = self._array()
         gc = s._graphics_changeds	# Includes pseudobond group changes.
         if self._model_display_change or gc.any():
+            # Update ribbon level of detail if number of ribbon residues shown changed.
+            if self._model_display_change or (gc & (StructureData._SHAPE_CHANGE | StructureData._RIBBON_CHANGE)).any():
+                nr = sum(m.ribbon_display_count * m.num_displayed_positions
+                         for m in s if m.visible)
+                if nr != self.num_ribbon_residues_shown:
+                    self.num_ribbon_residues_shown = nr
+                    self.update_ribbon_level_of_detail(view)
+                    gc = s._graphics_changeds
+
             # Update graphics for each changed structure
             for i in gc.nonzero()[0]:
                 s[i].update_graphics_if_needed()
@@ -1915,6 +1970,9 @@ class StructureGraphicsChangeManager:
 
             self._model_display_change = False
 
+        if view is not None:
+            self._check_for_camera_motion(view)
+
         # set by changes.py when "selected changed" is in the global Atom reasons,
         # which is the easiest way to detect that there was a selection in a
         # deleted structure; also set by non-atomic models
@@ -1929,6 +1987,42 @@ class StructureGraphicsChangeManager:
             if m.display:
                 m._update_level_of_detail(n)
 
+    def update_ribbon_level_of_detail(self, view = None):
+        '''Recompute ribbons whose number of bands per residue changed.'''
+        lod = self.level_of_detail
+        if view is not None and not lod.ribbon_moving and view.window_size[0] > 0:
+            lod.ribbon_pixel_size = view.pixel_size()
+        from .ribbon import _ribbon_divisions
+        for m in self._structures:
+            rd = m._ribbons_drawing
+            if rd is not None and rd.divisions is not None and _ribbon_divisions(m) != rd.divisions:
+                m._ribbon_level_of_detail_changed()
+
+    def _check_for_camera_motion(self, view):
+        # Use coarse ribbons for large structures while the camera is moved with
+        # the mouse or in VR, and refine them to suit the new screen size when
+        # the camera stops.  Motion by commands, as in recorded movies, or by
+        # scroll zooming is not coarsened but the ribbons are refined if the
+        # pixel size changes.
+        lod = self.level_of_detail
+        if self.num_ribbon_residues_shown <= lod._ribbon_residue_count_best:
+            lod.ribbon_moving = False
+            return
+        camera_moved = view.camera.redraw_needed
+        if camera_moved and _interactive_motion(self.session, view):
+            self._ribbon_still_frames = 0
+            if not lod.ribbon_moving:
+                lod.ribbon_moving = True
+                self.update_ribbon_level_of_detail()
+        elif self._ribbon_still_frames < lod.ribbon_refine_frames:
+            self._ribbon_still_frames += 1
+            if self._ribbon_still_frames == lod.ribbon_refine_frames:
+                lod.ribbon_moving = False
+                self.update_ribbon_level_of_detail(view)
+        elif (camera_moved and view.window_size[0] > 0
+              and view.pixel_size() != lod.ribbon_pixel_size):
+            self.update_ribbon_level_of_detail(view)
+
     def set_ribbon_divisions(self, divisions):
         self.level_of_detail.ribbon_fixed_divisions = divisions
         self._update_ribbons()
@@ -1936,6 +2030,7 @@ class StructureGraphicsChangeManager:
     def _update_ribbons(self):
         for m in self._structures:
             m._graphics_changed |= m._RIBBON_CHANGE
+            m._ribbon_lod_change_only = False
 
     def _array(self):
         sa = self._structures_array
@@ -2002,6 +2097,16 @@ class LevelOfDetail(State):
         self._ribbon_max_divisions = 20
         self._ribbon_residue_count_best = 20000	# Use max divisions for fewer residues
         self.ribbon_fixed_divisions = None
+
+        # Ribbons of many residues use fewer divisions when bands would be
+        # only a few pixels wide, and fewer still while the camera moves.
+        self._ribbon_residue_spacing = 3.8	# Angstroms between residues along ribbon
+        self._ribbon_pixels_per_division = 2
+        self._ribbon_moving_residue_count = 50000	# Coarse ribbons during motion above this
+        self._ribbon_moving_factor = 0.25
+        self.ribbon_refine_frames = 10		# Refine ribbons when camera still this many frames
+        self.ribbon_moving = False
+        self.ribbon_pixel_size = None		# Scene units per screen pixel
         
     def take_snapshot(self, session, flags):
         return {'quality': self.quality,
@@ -2113,6 +2218,15 @@ class LevelOfDetail(State):
         f = num_residues / self._ribbon_residue_count_best
         dmin, dmax = self._ribbon_min_divisions, self._ribbon_max_divisions
         div = int(self.quality * (dmax if f <= 1 else dmax / f))
+        if f > 1:
+            ps = self.ribbon_pixel_size
+            if ps:
+                # Use a power of 2 so small zooms do not recompute ribbons.
+                pdiv = self._ribbon_residue_spacing / (ps * self._ribbon_pixels_per_division)
+                from math import log2
+                div = min(div, 2 ** max(0, int(log2(max(pdiv, 1)))))
+            if self.ribbon_moving and num_residues > self._ribbon_moving_residue_count:
+                div = int(div * self._ribbon_moving_factor)
         if div < dmin:
             div = dmin
         elif div > dmax:
@@ -2488,6 +2602,19 @@ def _has_structure_descendant(model):
             return True
     return False
 
+def _interactive_motion(session, view):
+    '''Whether the camera may be moving from mouse drags or VR head motion.'''
+    movie = getattr(session, 'movie', None)
+    if movie is not None and movie.is_recording():
+        return False
+    if view.camera.name == 'vr':
+        return True
+    ui = session.ui
+    if not ui.is_gui:
+        return False
+    from Qt.QtCore import Qt
+    return ui.mouseButtons() != Qt.MouseButton.NoButton
+
 # -----------------------------------------------------------------------------
 #
 def all_atomic_structures(session):
@@ -0,0 +1,89 @@
+import pytest
+
+from numpy import array, float64
+
+atom_coords = [(1.0, 2.0, 3.0), (2.5, 2.0, 3.0), (3.0, 3.2, 3.5), (4.2, 3.0, 3.9)]
+
+def _open_structure(session, tmp_path):
+    names = [(" N  ", "N"), (" CA ", "C"), (" C  ", "C"), (" O  ", "O")]
+    lines = []
+    for i, ((name, element), (x, y, z)) in enumerate(zip(names, atom_coords)):
+        lines.append("ATOM  %5d %s GLY A   1    %8.3f%8.3f%8.3f  1.00  0.00          %2s"
+                     % (i+1, name, x, y, z, element))
+    lines.append("END")
+    path = tmp_path / "gly.pdb"
+    path.write_text("\n".join(lines) + "\n")
+    from chimerax.core.commands import run
+    return run(session, "open %s" % path)[0]
+
+def _register(session, attr_name):
+    from chimerax.atomic import Atom
+    Atom.register_attr(session, attr_name, "test", attr_type = float)
+
+def test_single_atom_get_set(test_production_session, tmp_path):
+    session = test_production_session
+    s = _open_structure(session, tmp_path)
+    _register(session, "test_single")
+    a0, a1 = s.atoms[:2]
+    assert not hasattr(a0, "test_single")
+    a0.test_single = 1.5
+    assert a0.test_single == 1.5
+    assert not hasattr(a1, "test_single")
+    a0.test_single = 2.5
+    assert a0.test_single == 2.5
+    values, has = s.atoms.custom_attr_values("test_single")
+    assert list(has) == [True, False, False, False]
+    assert values[0] == 2.5
+    assert a0.test_single == 2.5
+    del a0.test_single
+    assert not hasattr(a0, "test_single")
+    with pytest.raises(AttributeError):
+        del a0.test_single
+
+def test_collection_round_trip(test_production_session, tmp_path):
+    session = test_production_session
+    s = _open_structure(session, tmp_path)
+    _register(session, "test_collection")
+    atoms = s.atoms
+    atoms.set_custom_attr_values("test_collection", array([1, 2, 3, 4], float64))
+    assert [a.test_collection for a in atoms] == [1, 2, 3, 4]
+    atoms[1].test_collection = 7
+    values, has = atoms.custom_attr_values("test_collection")
+    assert has.all()
+    assert list(values) == [1, 7, 3, 4]
+    atoms[2:].delete_custom_attr("test_collection")
+    values, has = atoms.custom_attr_values("test_collection")
+    assert list(has) == [True, True, False, False]
+    assert not hasattr(atoms[3], "test_collection")
+
+def test_deleted_atoms(test_production_session, tmp_path):
+    session = test_production_session
+    s = _open_structure(session, tmp_path)
+    _register(session, "test_deleted")
+    atoms = s.atoms
+    atoms.set_custom_attr_values("test_deleted", array([1, 2, 3, 4], float64))
+    atoms[3].test_deleted = 8
+    atoms[1].delete()
+    remaining = s.atoms
+    assert len(remaining) == 3
+    values, has = remaining.custom_attr_values("test_deleted")
+    assert has.all()
+    assert list(values) == [1, 3, 8]
+
+def test_session_save_restore(test_production_session, tmp_path):
+    session = test_production_session
+    s = _open_structure(session, tmp_path)
+    _register(session, "test_session")
+    s.atoms[:2].set_custom_attr_values("test_session", array([3, 4], float64))
+    s.atoms[3].test_session = 6
+    from chimerax.core.commands import run
+    session_path = tmp_path / "attrs.cxs"
+    run(session, "save %s" % session_path)
+    run(session, "close")
+    run(session, "open %s" % session_path)
+    from chimerax.atomic import all_atomic_structures
+    s = all_atomic_structures(session)[0]
+    values, has = s.atoms.custom_attr_values("test_session")
+    assert list(has) == [True, True, False, True]
+    assert s.atoms[0].test_session == 3
+    assert s.atoms[3].test_session == 6
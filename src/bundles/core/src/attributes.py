@@ -113,6 +113,11 @@ class AttrRegistration:
         session_attrs = self._session_attrs.setdefault(session, set())
         if attr_name not in session_attrs:
             session_attrs.add(attr_name)
+        # classes that store registered attribute values outside of the instances (e.g. in arrays)
+        # may need to move values that were assigned before registration
+        registered_cb = getattr(self.class_, '_custom_attr_registered', None)
+        if registered_cb:
+            registered_cb(attr_name)
 
     # session functions; called from manager, not directly from session-saving mechanism,
     # so API varies from that for State class
@@ -294,6 +299,12 @@ class RegAttrManager(StateManager):
         for instances in self._python_instances:
             if instances:
                 return True
+        # attribute values may be stored without Python instances, but the registrations
+        # are still needed to restore them
+        for reg_class in self.registered_classes:
+            has_stored = getattr(reg_class, '_has_custom_attr_columns', None)
+            if has_stored and has_stored(self.session):
+                return True
         return False
 
     @property
@@ -111,6 +111,7 @@ class DICOMVolume(Volume):
         from numpy import putmask
 
         putmask(dmatrix, mask, value)
+        subgrid.set_matrix((0, 0, 0), dmatrix)
 
         self.data.values_changed()
 
@@ -43,6 +43,9 @@ class _ESMFoldBundle(BundleAPI):
         if command_name == 'esmfold contacts':
             from . import contacts
             contacts.register_esmfold_contacts_command(logger)
+        elif command_name == 'esmfold ensemble':
+            from . import ensemble
+            ensemble.register_esmfold_ensemble_command(logger)
         elif command_name == 'esmfold fetch':
             from . import fetch
             fetch.register_esmfold_fetch_command(logger)
@@ -0,0 +1,47 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+
+# === UCSF ChimeraX Copyright ===
+# Copyright 2022 Regents of the University of California. All rights reserved.
+# The ChimeraX application is provided pursuant to the ChimeraX license
+# agreement, which covers academic and commercial uses. For more details, see
+# <https://www.rbvi.ucsf.edu/chimerax/docs/licensing.html>
+#
+# This particular file is part of the ChimeraX library. You can also
+# redistribute and/or modify it under the terms of the GNU Lesser General
+# Public License version 2.1 as published by the Free Software Foundation.
+# For more details, see
+# <https://www.gnu.org/licenses/old-licenses/lgpl-2.1.html>
+#
+# THIS SOFTWARE IS PROVIDED "AS IS" WITHOUT WARRANTY OF ANY KIND, EITHER
+# EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE. ADDITIONAL LIABILITY
+# LIMITATIONS ARE DESCRIBED IN THE GNU LESSER GENERAL PUBLIC LICENSE
+# VERSION 2.1
+#
+# This notice must be embedded in or attached to all copies, including partial
+# copies, of the software or any revisions or derivations thereof.
+# === UCSF ChimeraX Copyright ===
+
+# -----------------------------------------------------------------------------
+#
+def esmfold_ensemble(session, structures = None, directory = None, superpose = True,
+                     min_plddt = 0.7, color_confidence = True, palette = 'esmfold'):
+    '''
+    Combine ESMFold predicted structures with identical sequences into ensembles
+    that share one structure, with each prediction a coordinate set.
+    ESMFold pLDDT values range from 0 to 1.
+    '''
+    from chimerax.alphafold.ensemble import alphafold_ensemble
+    from .panel import _is_esmfold_model
+    return alphafold_ensemble(session, structures = structures, directory = directory,
+                              superpose = superpose, min_plddt = min_plddt,
+                              color_confidence = color_confidence, palette = palette,
+                              method = 'esmfold', is_prediction = _is_esmfold_model)
+
+# -----------------------------------------------------------------------------
+#
+def register_esmfold_ensemble_command(logger):
+    from chimerax.alphafold import ensemble
+    desc = ensemble.ensemble_command_description()
+    from chimerax.core.commands import register
+    register('esmfold ensemble', desc, esmfold_ensemble, logger=logger)
@@ -0,0 +1,45 @@
+from numpy import array, float64
+
+# Backbone coordinates of a 6 residue glycine peptide.
+atom_names = ("N", "CA", "C", "O")
+base_coords = array([[(3.3*r + 0.0, 0.5*(r%2), 0.0), (3.3*r + 1.2, 1.2 - 0.5*(r%2), 0.3),
+                      (3.3*r + 2.4, 0.4, -0.2), (3.3*r + 2.6, -0.8, -0.6)]
+                     for r in range(6)], float64)
+
+def _write_prediction(path, coords, plddt):
+    lines = []
+    for r, (rcoords, b) in enumerate(zip(coords, plddt)):
+        for name, (x, y, z) in zip(atom_names, rcoords):
+            lines.append("ATOM  %5d  %-3s GLY A%4d    %8.3f%8.3f%8.3f  1.00%6.2f           %s"
+                         % (len(lines)+1, name, r+1, x, y, z, b, name[0]))
+    lines.append("END")
+    path.write_text("\n".join(lines) + "\n")
+
+def test_esmfold_plddt_scale(test_production_session, tmp_path):
+    session = test_production_session
+    from chimerax.core.commands import run
+    from chimerax.geometry import rotation
+    from chimerax.esmfold.ensemble import esmfold_ensemble
+    # ESMFold pLDDT is 0-1.  Only the first 4 residues are confident and the
+    # others move, so superposing on the confident residues fits them exactly.
+    plddt = (0.9, 0.85, 0.95, 0.8, 0.3, 0.2)
+    for i in range(3):
+        coords = base_coords.copy()
+        coords[4:] += (0.5*i, 0.8*i, -0.6*i)
+        coords = rotation((0, 0, 1), 20*i).transform_points(coords.reshape((-1,3))).reshape(coords.shape)
+        path = tmp_path / ("ESM_prediction_%d.pdb" % i)
+        _write_prediction(path, coords, plddt)
+        run(session, "open %s" % path)
+    other_path = tmp_path / "other.pdb"
+    _write_prediction(other_path, base_coords, plddt)
+    other = run(session, "open %s" % other_path)[0]
+
+    ensembles = esmfold_ensemble(session)
+    assert len(ensembles) == 1
+    ens = ensembles[0]
+    assert ens.num_models == 3
+    assert not other.deleted
+    assert abs(ens.plddt.max() - 0.95) < 1e-3
+    rmsf = ens.residue_statistics()['rmsf']
+    assert (rmsf[:4] < 1e-3).all()
+    assert (rmsf[4:] > 0.1).all()
@@ -69,6 +69,7 @@ class _gltfBundle(BundleAPI):
                         'flat_lighting': BoolArg,
                         'backface_culling': BoolArg,
                         'instancing': BoolArg,
+                        'compact': BoolArg,
                         'size': FloatArg,
                     }
                     
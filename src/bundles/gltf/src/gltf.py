@@ -434,9 +434,15 @@ def write_gltf(session, filename = None, models = None,
                short_vertex_indices = False,
                float_colors = False, preserve_transparency = True,
                texture_colors = False, prune_vertex_colors = True,
-               instancing = False,
+               instancing = False, compact = False,
                metallic_factor = 0, roughness_factor = 1,
                flat_lighting = False, backface_culling = True):
+    '''
+    Write visible models as binary glTF.  If compact is true repeated drawing
+    instances use GPU instancing, vertex positions and normals are stored as
+    16-bit and 8-bit integers and 16-bit vertex indices are used when possible.
+    The file contents are returned as bytes and written to filename if it is given.
+    '''
     if models is None:
         models = session.models.list()
 
@@ -448,7 +454,7 @@ def write_gltf(session, filename = None, models = None,
                           flat_lighting, backface_culling)
     nodes, meshes = nodes_and_meshes(drawings, buffers, materials,
                                      short_vertex_indices, prune_vertex_colors,
-                                     instancing)
+                                     instancing, compact)
 
     if center_each_node:
         center_nodes_and_meshes(nodes, meshes, buffers)
@@ -473,7 +479,13 @@ def write_gltf(session, filename = None, models = None,
                 cs_node = center_and_size(top_nodes(nodes), bounds, center, size)
                 nodes.append(cs_node)
 
-    glb = encode_gltf(nodes, buffers, meshes, materials)
+    extensions = []
+    if compact and quantize_meshes(nodes, meshes, buffers):
+        extensions.append('KHR_mesh_quantization')
+    if add_instancing_buffers(nodes, buffers):
+        extensions.append('EXT_mesh_gpu_instancing')
+
+    glb = encode_gltf(nodes, buffers, meshes, materials, extensions)
 
     if filename is not None:
         file = open(filename, 'wb')
@@ -531,6 +543,11 @@ def center_nodes_and_meshes(nodes, meshes, buffers):
     # Recenter nodes
     for node, (center,nv) in zip(nodes, ncenters):
         if 'mesh' in node:
+            im = node.get('_instance_matrices')
+            if im is not None:
+                # Adjust GPU instance matrices for repositioned mesh and node.
+                mcenter = mcenters[node['mesh']][0]
+                im[:,:,3] += im[:,:,:3] @ mcenter - center
             # Adjust node matrix to compensate for repositioned mesh.
             node['matrix'] = right_shift_matrix(node.get('matrix'), center)
         elif 'children' in node:
@@ -573,6 +590,11 @@ def node_centers(nodes, mesh_centers, node_indices = None, ncenters = None):
         node = nodes[ni]
         if 'mesh' in node:
             ncenters[ni] = mesh_centers[node['mesh']]
+            im = node.get('_instance_matrices')
+            if im is not None:
+                center, nv = ncenters[ni]
+                icenters = im[:,:,:3] @ center + im[:,:,3]
+                ncenters[ni] = (icenters.mean(axis = 0), nv * len(im))
         elif 'children' in node:
             node_centers(nodes, mesh_centers, node['children'], ncenters)
             centers = []
@@ -628,11 +650,20 @@ def make_mesh_leaf_nodes(nodes):
 
 # -----------------------------------------------------------------------------
 #
-def encode_gltf(nodes, buffers, meshes, materials):
+def encode_gltf(nodes, buffers, meshes, materials, extensions = ()):
+    return b''.join(glb_pieces(nodes, buffers, meshes, materials, extensions))
+
+# -----------------------------------------------------------------------------
+# Yield the bytes of a binary glTF file in pieces, the header and JSON followed
+# by each buffer, so buffers need not be copied to a single byte array.
+#
+def glb_pieces(nodes, buffers, meshes, materials, extensions = ()):
     
     # Write 80 character comment.
     from chimerax.core import version
     app_ver  = 'UCSF ChimeraX %s' % version
+
+    buffers.set_buffer_offsets()
     
     h = {
         'asset': {'version': '2.0', 'generator': app_ver},
@@ -643,6 +674,8 @@ def encode_gltf(nodes, buffers, meshes, materials):
         'bufferViews': buffers.buffer_views,
         'buffers':[{'byteLength': buffers.nbytes}],
     }
+    if extensions:
+        h['extensionsUsed'] = h['extensionsRequired'] = list(extensions)
     if len(materials.material_specs) > 0:
         h['materials'] = materials.material_specs
 
@@ -660,20 +693,18 @@ def encode_gltf(nodes, buffers, meshes, materials):
     ctype = b'JSON'
     json_chunk = b''.join((clen, ctype, json_text))
 
-    binc = buffers.chunk_bytes()
-    if len(binc) % 4 != 0:
-        # Chunk length required to be a multiple of 4 bytes.
-        binc += b'\0' * (4-len(binc)%4)
-    blen = to_bytes(len(binc), uint32)
+    # Buffers are padded to multiples of 4 bytes as required for chunk length.
+    nbin = buffers.nbytes
+    blen = to_bytes(nbin, uint32)
     btype = b'BIN\x00'
-    bin_chunk = b''.join((blen, btype, binc))
     
     magic = to_bytes(0x46546c67, uint32)
     version = to_bytes(2, uint32)
-    length = to_bytes(12 + len(json_chunk) + len(bin_chunk), uint32)
+    length = to_bytes(12 + len(json_chunk) + 8 + nbin, uint32)
 
-    glb = b''.join((magic, version, length, json_chunk, bin_chunk))
-    return glb
+    yield b''.join((magic, version, length, json_chunk, blen, btype))
+    for b in buffers.buffer_bytes:
+        yield b
 
 # -----------------------------------------------------------------------------
 #
@@ -729,17 +760,19 @@ def any_triangles_shown(d, drawings, ts):
 #
 def nodes_and_meshes(drawings, buffers, materials,
                      short_vertex_indices = False, prune_vertex_colors = True,
-                     leaf_instancing = False):
+                     leaf_instancing = False, compact = False):
 
     # Create tree of nodes with children and matrices set.
-    nodes, drawing_nodes = node_tree(drawings, leaf_instancing)
+    nodes, drawing_nodes = node_tree(drawings, leaf_instancing, gpu_instancing = compact)
 
     # Create meshes for nodes.
-    meshes = Meshes(buffers, materials, short_vertex_indices, prune_vertex_colors, leaf_instancing)
+    meshes = Meshes(buffers, materials, short_vertex_indices, prune_vertex_colors, leaf_instancing,
+                    compact_indices = compact)
     for drawing, dnodes in drawing_nodes.items():
         if meshes.has_mesh(drawing):
             for node in dnodes:
-                node['mesh'] = meshes.mesh_index(drawing, node['single_color'])
+                combine = '_instance_matrices' not in node
+                node['mesh'] = meshes.mesh_index(drawing, node['single_color'], combine)
 
     for node in nodes:
         del node['single_color']
@@ -750,7 +783,7 @@ def nodes_and_meshes(drawings, buffers, materials,
 # The GLTF 2.0 spec requires that a node cannot be the child of more than one
 # other node.  So the child nodes for drawing instances need to be duplicated.
 #
-def node_tree(drawings, leaf_instancing):
+def node_tree(drawings, leaf_instancing, gpu_instancing = False):
     
     # Find top level drawings.
     child_drawings = []
@@ -764,7 +797,8 @@ def node_tree(drawings, leaf_instancing):
     drawing_nodes = {}	# Maps drawing to list of nodes that are copies of that drawing.
     drawing_set = set(drawings)
     for drawing in top_drawings:
-        create_node(drawing, drawing_set, nodes, drawing_nodes, leaf_instancing)
+        create_node(drawing, drawing_set, nodes, drawing_nodes, leaf_instancing,
+                    gpu_instancing)
 
     return nodes, drawing_nodes
 
@@ -773,7 +807,8 @@ def node_tree(drawings, leaf_instancing):
 # and to the drawing_nodes mapping that records all the node copies for each
 # drawing.
 #
-def create_node(drawing, drawing_set, nodes, drawing_nodes, leaf_instancing):
+def create_node(drawing, drawing_set, nodes, drawing_nodes, leaf_instancing,
+                gpu_instancing = False):
     dn = {'name': drawing.name,
           'single_color': drawing.color}
     dni = len(nodes)
@@ -786,6 +821,9 @@ def create_node(drawing, drawing_set, nodes, drawing_nodes, leaf_instancing):
         inodes = gnodes = [dn]
         if not positions.is_identity():
             dn['matrix'] = gltf_transform(positions[0])
+    elif (gpu_instancing and not children and drawing.texture is None
+          and _trs_decomposition(positions.array()) is not None):
+        gnodes = gpu_instance_nodes(drawing, dn, positions, nodes)
     elif leaf_instancing or children:
         ic = drawing.get_colors(displayed_only = True)
         inodes = [{'name': '%s %d' % (drawing.name, i+1),
@@ -807,11 +845,167 @@ def create_node(drawing, drawing_set, nodes, drawing_nodes, leaf_instancing):
 
     if children:
         for node in inodes:
-            node['children'] = [create_node(c, drawing_set, nodes, drawing_nodes, leaf_instancing)
+            node['children'] = [create_node(c, drawing_set, nodes, drawing_nodes, leaf_instancing,
+                                            gpu_instancing)
                                 for c in children]
 
     return dni
 
+# -----------------------------------------------------------------------------
+# Draw the instances of a leaf drawing with the EXT_mesh_gpu_instancing extension.
+# Instance colors are set by the node material, so a node is made for each color.
+# The instance matrices are saved in the nodes until the instance translation,
+# rotation and scale arrays are added by add_instancing_buffers().
+#
+def gpu_instance_nodes(drawing, dn, positions, nodes):
+    m = positions.array().copy()
+    if drawing.vertex_colors is not None:
+        groups = [((255,255,255,255), m)]
+    else:
+        colors = drawing.get_colors(displayed_only = True)
+        from numpy import unique
+        ucolors, cindex = unique(colors, axis = 0, return_inverse = True)
+        cindex = cindex.ravel()
+        groups = [(tuple(int(x) for x in c), m[cindex == i]) for i,c in enumerate(ucolors)]
+
+    if len(groups) == 1:
+        dn['single_color'], dn['_instance_matrices'] = groups[0]
+        return [dn]
+
+    gnodes = [{'name': '%s %d' % (drawing.name, i+1),
+               'single_color': color,
+               '_instance_matrices': gm}
+              for i, (color, gm) in enumerate(groups)]
+    ni = len(nodes)
+    nodes.extend(gnodes)
+    dn['children'] = list(range(ni, ni+len(gnodes)))
+    return gnodes
+
+# -----------------------------------------------------------------------------
+#
+def add_instancing_buffers(nodes, buffers):
+    '''Replace saved instance matrices with EXT_mesh_gpu_instancing buffers.'''
+    used = False
+    from numpy import float32
+    for node in nodes:
+        im = node.pop('_instance_matrices', None)
+        if im is None:
+            continue
+        t, r, s = _trs_decomposition(im)
+        attr = {'TRANSLATION': buffers.add_array(t.astype(float32)),
+                'ROTATION': buffers.add_array(r.astype(float32)),
+                'SCALE': buffers.add_array(s.astype(float32))}
+        node['extensions'] = {'EXT_mesh_gpu_instancing': {'attributes': attr}}
+        used = True
+    return used
+
+# -----------------------------------------------------------------------------
+# Return translations, quaternion rotations (x,y,z,w) and scale factors for an
+# array of 3 by 4 matrices, or None if some matrix is not a rotation and scaling
+# along the rotated axes.
+#
+def _trs_decomposition(matrices, tolerance = 1e-4):
+    from numpy import sqrt, einsum, identity, abs
+    from numpy.linalg import det
+    lin = matrices[:,:,:3]
+    s = sqrt((lin*lin).sum(axis = 1))	# Column lengths
+    if (s == 0).any():
+        return None
+    r = lin / s[:,None,:]
+    rtr = einsum('nji,njk->nik', r, r)
+    if abs(rtr - identity(3)).max() > tolerance or (det(r) <= 0).any():
+        return None
+    return matrices[:,:,3], _rotation_quaternions(r), s
+
+# -----------------------------------------------------------------------------
+#
+def _rotation_quaternions(r):
+    from numpy import empty, stack, sqrt, argmax
+    q = empty((len(r),4))
+    m00, m11, m22 = r[:,0,0], r[:,1,1], r[:,2,2]
+    d = stack((m00+m11+m22, m00-m11-m22, -m00+m11-m22, -m00-m11+m22), axis = 1)
+    k = argmax(d, axis = 1)
+    f = 0.5*sqrt(1 + d.max(axis = 1))		# Largest quaternion component
+    g = 0.25/f
+    x21, x12, x02, x20, x10, x01 = r[:,2,1], r[:,1,2], r[:,0,2], r[:,2,0], r[:,1,0], r[:,0,1]
+    for c, (w, x, y, z) in enumerate((
+            (f, (x21-x12)*g, (x02-x20)*g, (x10-x01)*g),
+            ((x21-x12)*g, f, (x01+x10)*g, (x02+x20)*g),
+            ((x02-x20)*g, (x01+x10)*g, f, (x12+x21)*g),
+            ((x10-x01)*g, (x02+x20)*g, (x12+x21)*g, f))):
+        mask = (k == c)
+        q[mask] = stack((x, y, z, w), axis = 1)[mask]
+    return q
+
+# -----------------------------------------------------------------------------
+# Store mesh vertex positions as unsigned 16-bit integers and normals as 8-bit
+# integers using the KHR_mesh_quantization extension.  Positions are scaled
+# uniformly, so normals are unchanged, and the node transform or GPU instance
+# matrices undo the scaling.  Position arrays used by one mesh share the same
+# scaling.
+#
+def quantize_meshes(nodes, meshes, buffers):
+    specs = meshes.mesh_specs
+    mesh_ids = set(node['mesh'] for node in nodes if 'mesh' in node)
+    if len(mesh_ids) == 0:
+        return False
+
+    # Meshes must be only on leaf nodes so the dequantization transform does
+    # not also apply to child nodes.
+    make_mesh_leaf_nodes(nodes)
+
+    # Group position arrays used by the same mesh.
+    groups = {}
+    for mi in mesh_ids:
+        pos = set(prim['attributes']['POSITION'] for prim in specs[mi]['primitives'])
+        g = set(pos)
+        for vi in pos:
+            if vi in groups:
+                g |= groups[vi]
+        for vi in g:
+            groups[vi] = g
+
+    # Quantize positions.
+    from numpy import float32, uint16, int8, rint, array
+    accessors = buffers.accessors
+    dequant = {}
+    for vi, g in groups.items():
+        gid = id(g)
+        if gid not in dequant:
+            gmin = array([accessors[i]['min'] for i in g]).min(axis = 0)
+            gmax = array([accessors[i]['max'] for i in g]).max(axis = 0)
+            step = (gmax - gmin).max() / 65535
+            dequant[gid] = (gmin, step if step > 0 else 1.0)
+        offset, step = dequant[gid]
+        va = buffers.array(vi, float32).reshape((accessors[vi]['count'],3))
+        q = rint((va - offset) / step).clip(0, 65535).astype(uint16)
+        buffers.replace_array(vi, q, bounds = True)
+
+    # Quantize normals.
+    normals = set(prim['attributes']['NORMAL'] for mi in mesh_ids
+                  for prim in specs[mi]['primitives'] if 'NORMAL' in prim['attributes'])
+    for ni in normals:
+        na = buffers.array(ni, float32).reshape((accessors[ni]['count'],3))
+        buffers.replace_array(ni, rint(127*na).clip(-127,127).astype(int8), normalized = True)
+
+    # Undo position scaling with node transforms.
+    from chimerax.geometry import Place
+    for node in nodes:
+        if 'mesh' not in node:
+            continue
+        vi = specs[node['mesh']]['primitives'][0]['attributes']['POSITION']
+        offset, step = dequant[id(groups[vi])]
+        im = node.get('_instance_matrices')
+        if im is not None:
+            im[:,:,3] += im[:,:,:3] @ offset
+            im[:,:,:3] *= step
+        else:
+            (ox,oy,oz), s = offset, step
+            dq = Place(matrix = ((s,0,0,ox),(0,s,0,oy),(0,0,s,oz)))
+            node['matrix'] = gltf_transform(gltf_place(node.get('matrix')) * dq)
+
+    return True
+
 # -----------------------------------------------------------------------------
 #
 def gltf_transform(place):
@@ -860,13 +1054,16 @@ def left_shift_matrix(matrix, shift):
 #
 class Meshes:
     def __init__(self, buffers, materials, short_vertex_indices = False,
-                 prune_vertex_colors = True, leaf_instancing = False):
+                 prune_vertex_colors = True, leaf_instancing = False,
+                 compact_indices = False):
         self._buffers = buffers
         self._materials = materials
         self._short_vertex_indices = short_vertex_indices
         self._prune_vertex_colors = prune_vertex_colors
         self._leaf_instancing = leaf_instancing
+        self._compact_indices = compact_indices
         self._meshes = {}	# Map Drawing to Mesh.
+        self._geometry_meshes = {}	# Map geometry hash to Mesh to share identical geometry.
         self._mesh_specs = []	# List of all mesh specifications
 
     def has_mesh(self, drawing):
@@ -874,12 +1071,18 @@ class Meshes:
             return False
         return True
     
-    def mesh_index(self, drawing, instance_color):
+    def mesh_index(self, drawing, instance_color, combine_instances = True):
         mesh = self._meshes.get(drawing)
         if mesh is None:
-            mesh = Mesh(drawing, self._buffers, self._materials,
-                        self._short_vertex_indices, self._prune_vertex_colors,
-                        self._leaf_instancing)
+            leaf_instancing = self._leaf_instancing or not combine_instances
+            gkey = _geometry_key(drawing, leaf_instancing)
+            mesh = self._geometry_meshes.get(gkey) if gkey else None
+            if mesh is None:
+                mesh = Mesh(drawing, self._buffers, self._materials,
+                            self._short_vertex_indices, self._prune_vertex_colors,
+                            leaf_instancing, self._compact_indices)
+                if gkey:
+                    self._geometry_meshes[gkey] = mesh
             self._meshes[drawing] = mesh
         mi = len(self._mesh_specs)
         spec = mesh.specification(instance_color)
@@ -890,18 +1093,48 @@ class Meshes:
     def mesh_specs(self):
         return self._mesh_specs
     
+# -----------------------------------------------------------------------------
+# Hash of the drawing geometry used to write drawings with identical geometry,
+# for example the atoms of different structures, only once.  Textured drawings
+# are not shared.
+#
+def _geometry_key(drawing, leaf_instancing):
+    d = drawing
+    if d.texture is not None or d.multitexture is not None:
+        return None
+    if d.display_style == d.Solid:
+        elements = d.masked_triangles
+    else:
+        elements = d._draw_shape.elements
+    arrays = [d.vertices, d.normals, d.vertex_colors, elements]
+    positions = d.get_positions(displayed_only = True)
+    if not leaf_instancing and len(positions) > 1:
+        arrays.extend([positions.array(), d.get_colors(displayed_only = True)])
+    from hashlib import sha1
+    h = sha1()
+    from numpy import ascontiguousarray
+    for a in arrays:
+        if a is None:
+            h.update(b'None')
+        else:
+            h.update(('%s %s' % (a.dtype.str, a.shape)).encode('utf-8'))
+            h.update(ascontiguousarray(a).data)
+    return (h.digest(), d.display_style, leaf_instancing,
+            d.showing_transparent(include_children = False))
+
 # -----------------------------------------------------------------------------
 #
 class Mesh:
     def __init__(self, drawing, buffers, materials,
                  short_vertex_indices = False, prune_vertex_colors = True,
-                 leaf_instancing = False):
+                 leaf_instancing = False, compact_indices = False):
         self._drawing = drawing
         self._buffers = buffers
         self._materials = materials
         self._short_vertex_indices = short_vertex_indices
         self._prune_vertex_colors = prune_vertex_colors
         self._leaf_instancing = leaf_instancing
+        self._compact_indices = compact_indices	# Use 16-bit indices if possible
         
         self._geom_buffers = None
         self._texture_images = []
@@ -1038,7 +1271,8 @@ class Mesh:
                 ci = b.add_array(lin_vc, normalized = not mat._float_vertex_colors, target=b.GLTF_ARRAY_BUFFER)
         tci = b.add_array(tc) if tc is not None else None
         ne = len(ta)
-        etype = uint16 if self._short_vertex_indices else uint32
+        short = self._short_vertex_indices or (self._compact_indices and len(va) <= 2**16)
+        etype = uint16 if short else uint32
         ea = ta.astype(etype, copy=False).reshape((ta.size,))
         ti = b.add_array(ea, target=b.GLTF_ELEMENT_ARRAY_BUFFER)
         mode = _mesh_style(ta)
@@ -1288,14 +1522,26 @@ class Buffers:
         self.buffer_bytes = []
         self.nbytes = 0
 
-        from numpy import float32, uint32, uint16, int16, uint8, frombuffer
-        self.value_types = {float32:5126, uint32:5125, uint16:5123, int16:5122, uint8:5121}
+        from numpy import float32, uint32, uint16, int16, uint8, int8, frombuffer
+        self.value_types = {float32:5126, uint32:5125, uint16:5123, int16:5122, uint8:5121,
+                            int8:5120}
 
     # -----------------------------------------------------------------------------
     #
     def add_array(self, array, bounds=False, normalized=False, target=None):
 
         a = {}
+        self._set_accessor_type(a, array, bounds, normalized)
+        b, stride = self._array_bytes(array, target)
+        a['bufferView'] = self.add_buffer(b, target=target, byte_stride=stride)
+                
+        self.accessors.append(a)
+
+        return len(self.accessors) - 1
+
+    # -----------------------------------------------------------------------------
+    #
+    def _set_accessor_type(self, a, array, bounds, normalized):
         a['count'] = array.shape[0]
         if len(array.shape) == 1:
             t = 'SCALAR'
@@ -1311,16 +1557,47 @@ class Buffers:
         a['componentType'] = self.value_types[array.dtype.type]
         if normalized:
             a['normalized'] = True	# Required for COLOR_0
+        else:
+            a.pop('normalized', None)
 
         if bounds:
             self.set_accessor_bounds(a, array)
 
-        b = array.tobytes()
-        a['bufferView'] = self.add_buffer(b, target=target)
-                
-        self.accessors.append(a)
+    # -----------------------------------------------------------------------------
+    # Elements of vertex attributes must start on 4-byte boundaries so pad rows
+    # of smaller arrays, such as 16-bit integer positions.
+    #
+    def _array_bytes(self, array, target):
+        if target == self.GLTF_ARRAY_BUFFER and array.ndim == 2:
+            row_bytes = array.shape[1] * array.itemsize
+            if row_bytes % 4 != 0:
+                stride = row_bytes + 4 - row_bytes % 4
+                from numpy import zeros
+                padded = zeros((array.shape[0], stride // array.itemsize), array.dtype)
+                padded[:,:array.shape[1]] = array
+                return padded.tobytes(), stride
+        return array.tobytes(), None
 
-        return len(self.accessors) - 1
+    # -----------------------------------------------------------------------------
+    #
+    def array(self, accessor_index, dtype):
+        '''Return array values for an accessor of tightly packed values.'''
+        a = self.accessors[accessor_index]
+        from numpy import frombuffer
+        return frombuffer(self.buffer_bytes[a['bufferView']], dtype = dtype).copy()
+
+    # -----------------------------------------------------------------------------
+    #
+    def replace_array(self, accessor_index, array, bounds=False, normalized=False):
+        '''Replace accessor values with an array that can differ in value type.'''
+        a = self.accessors[accessor_index]
+        for k in ('min', 'max'):
+            a.pop(k, None)
+        self._set_accessor_type(a, array, bounds, normalized)
+        bvi = a['bufferView']
+        bv = self.buffer_views[bvi]
+        b, stride = self._array_bytes(array, bv.get('target'))
+        self._set_buffer(bvi, b, stride)
 
     # -----------------------------------------------------------------------------
     #
@@ -1336,12 +1613,12 @@ class Buffers:
     #
     def set_accessor_bounds(self, a, array):
         nd = array.ndim
-        # TODO: Handle integer min/max
+        vtype = float if array.dtype.kind == 'f' else int
         if nd == 2:
-            a['min'],a['max'] = (tuple(float(x) for x in array.min(axis=0)),
-                                 tuple(float(x) for x in array.max(axis=0)))
+            a['min'],a['max'] = (tuple(vtype(x) for x in array.min(axis=0)),
+                                 tuple(vtype(x) for x in array.max(axis=0)))
         else:
-            a['min'],a['max'] = float(array.min(axis=0)), float(array.max(axis=0))
+            a['min'],a['max'] = vtype(array.min(axis=0)), vtype(array.max(axis=0))
 
     # -----------------------------------------------------------------------------
     # Possible bufferView targets.
@@ -1353,19 +1630,40 @@ class Buffers:
     
     # -----------------------------------------------------------------------------
     #
-    def add_buffer(self, bytes, target=None):
+    def add_buffer(self, bytes, target=None, byte_stride=None):
         bvi = len(self.buffer_views)
-        nb = len(bytes)
-        if nb % 4 != 0:
-            bytes += b'\0' * (4 - (nb%4))  # byteOffset is required to be multiple of 4
-        self.buffer_bytes.append(bytes)
-        bv = {"byteLength": nb, "byteOffset": self.nbytes, "buffer": 0}
+        bv = {"buffer": 0}
         if target is not None:
             bv["target"] = target
         self.buffer_views.append(bv)
-        self.nbytes += len(bytes)
+        self.buffer_bytes.append(b'')
+        self._set_buffer(bvi, bytes, byte_stride)
         return bvi
 
+    # -----------------------------------------------------------------------------
+    #
+    def _set_buffer(self, bvi, bytes, byte_stride=None):
+        nb = len(bytes)
+        if nb % 4 != 0:
+            bytes += b'\0' * (4 - (nb%4))  # byteOffset is required to be multiple of 4
+        self.nbytes += len(bytes) - len(self.buffer_bytes[bvi])
+        self.buffer_bytes[bvi] = bytes
+        bv = self.buffer_views[bvi]
+        bv["byteLength"] = nb
+        if byte_stride is None:
+            bv.pop("byteStride", None)
+        else:
+            bv["byteStride"] = byte_stride
+
+    # -----------------------------------------------------------------------------
+    # Offsets are set when writing since replaced buffers can change size.
+    #
+    def set_buffer_offsets(self):
+        offset = 0
+        for bv, b in zip(self.buffer_views, self.buffer_bytes):
+            bv["byteOffset"] = offset
+            offset += len(b)
+
     # -----------------------------------------------------------------------------
     #
     def chunk_bytes(self):
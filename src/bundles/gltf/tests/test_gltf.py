@@ -0,0 +1,75 @@
+import json
+from io import BytesIO
+
+from numpy import array, float32, float64, int32, uint16, frombuffer, identity, concatenate, lexsort
+
+def _add_surfaces(session):
+    '''Make a surface model with a child surface so its node has a mesh and children.'''
+    from chimerax.core.models import Surface
+    from chimerax.geometry import translation
+    va = array(((0,0,0), (4,0,0), (0,3,0), (0,0,2)), float32)
+    ta = array(((0,1,2), (0,1,3), (0,2,3), (1,2,3)), int32)
+    parent = Surface('parent', session)
+    parent.set_geometry(va, None, ta)
+    parent.position = translation((1,2,3))
+    child = Surface('child', session)
+    child.set_geometry(2*va + (5,0,0), None, ta)
+    child.position = translation((0,-1,0.5))
+    session.models.add([parent])
+    parent.add([child])
+    return parent
+
+def _world_vertices(glb):
+    '''Return scene coordinates of all mesh vertices in a binary glTF.'''
+    from chimerax.gltf.gltf import check_gltf_header
+    json_text, binc = check_gltf_header(BytesIO(glb))
+    j = json.loads(json_text)
+    dtypes = {5126: float32, 5123: uint16}
+    verts = []
+    def add_node(ni, place):
+        node = j['nodes'][ni]
+        if 'matrix' in node:
+            place = place @ array(node['matrix'], float64).reshape((4,4)).T
+        if 'mesh' in node:
+            for prim in j['meshes'][node['mesh']]['primitives']:
+                a = j['accessors'][prim['attributes']['POSITION']]
+                bv = j['bufferViews'][a['bufferView']]
+                offset = bv.get('byteOffset', 0) + a.get('byteOffset', 0)
+                va = frombuffer(binc, dtypes[a['componentType']], count = 3*a['count'],
+                                offset = offset).reshape((a['count'],3)).astype(float64)
+                verts.append(va @ place[:3,:3].T + place[:3,3])
+        for c in node.get('children', []):
+            add_node(c, place)
+    for ni in j['scenes'][0]['nodes']:
+        add_node(ni, identity(4))
+    v = concatenate(verts)
+    return v[lexsort(v.T[::-1])], j
+
+def test_compact_matches_uncompressed(test_production_session):
+    session = test_production_session
+    parent = _add_surfaces(session)
+    from chimerax.gltf.gltf import write_gltf
+    glb = write_gltf(session, models = [parent], center = False, center_each_node = False)
+    cglb = write_gltf(session, models = [parent], center = False, center_each_node = False,
+                      compact = True)
+    v, j = _world_vertices(glb)
+    cv, cj = _world_vertices(cglb)
+    assert 'KHR_mesh_quantization' in cj['extensionsUsed']
+    # Dequantization transforms must not be applied to child nodes.
+    assert not [node for node in cj['nodes'] if 'mesh' in node and node.get('children')]
+    assert v.shape == cv.shape
+    assert abs(cv - v).max() < 1e-3
+
+def test_save_and_open(test_production_session, tmp_path):
+    session = test_production_session
+    parent = _add_surfaces(session)
+    path = tmp_path / 'surfaces.glb'
+    from chimerax.gltf.gltf import write_gltf
+    glb = write_gltf(session, str(path), models = [parent], center = False,
+                     center_each_node = False)
+    assert path.read_bytes() == glb
+    from chimerax.core.commands import run
+    models = run(session, 'open %s' % path)
+    b, ob = parent.bounds(), models[0].bounds()
+    assert abs(ob.xyz_min - b.xyz_min).max() < 1e-5
+    assert abs(ob.xyz_max - b.xyz_max).max() < 1e-5
@@ -74,13 +74,16 @@ def cmd_hbonds(session, atoms, intra_model=True, inter_model=True, relax=True,
     if not relax:
         dist_slop = angle_slop = 0.0
 
+    if cache_DA is not None:
+        session.logger.warning("The 'cacheDA' option is deprecated and ignored;"
+            " donor/acceptor typing is always cached")
+
     base_kw = {
         'inter_model': inter_model,
         'intra_model': intra_model,
         'donors': donors,
         'acceptors': acceptors,
         'inter_submodel': inter_submodel,
-        'cache_da': cache_DA
     }
 
     doing_coordsets = coordsets and len(structures) == 1 and structures[0].num_coordsets > 1
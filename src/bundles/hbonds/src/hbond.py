@@ -287,10 +287,32 @@ donor_params = [
 ]
 processed_donor_params = {}
 
+# Donor and acceptor typing for each structure, reused until the structure "changes"
+# trigger reports changed atoms, bonds, atom types or names.  Maps structure to
+# (changes trigger handler, typing state, {(kind, dist_slop, angle_slop): _Typing}).
+# The typing state (atom and bond counts, atom types, names and elements) catches
+# changes made since the trigger last fired, e.g. earlier in the same command script.
+from weakref import WeakKeyDictionary
+_typing_cache = WeakKeyDictionary()
+
 def flush_cache():
-    global _d_cache, _a_cache, _prev_limited
-    _prev_limited = _d_cache = _a_cache = None
-flush_cache()
+    for structure, (handler, state, typings) in list(_typing_cache.items()):
+        if not structure.deleted:
+            structure.triggers.remove_handler(handler)
+    _typing_cache.clear()
+
+_typing_atom_reasons = set(["idatm_type changed", "name changed", "element changed"])
+def _topology_changed(trigger_name, changes):
+    structure, changes = changes
+    cached = _typing_cache.get(structure)
+    if cached is None:
+        return
+    if (changes.num_deleted_atoms() > 0 or changes.num_deleted_bonds() > 0
+            or len(changes.created_atoms(include_new_structures=False)) > 0
+            or len(changes.created_bonds(include_new_structures=False)) > 0
+            or _typing_atom_reasons.intersection(changes.atom_reasons())
+            or "name changed" in changes.residue_reasons()):
+        cached[2].clear()
 
 _problem = None
 _ring_funcs = [_ring5_asym_N, _ring6_asym_N, _ring5_O,
@@ -308,15 +330,14 @@ def find_coordset_hbonds(session, structure, **kw):
     try:
         for cs_id in cs_ids:
             structure.active_coordset_id = cs_id
-            kw['cache_da'] = cs_id != cs_ids[-1]
             hbonds.append(find_hbonds(session, [structure], **kw))
     finally:
-        structure.active_coordset_od = cur_cs_id
+        structure.active_coordset_id = cur_cs_id
         structure.active_coordset_change_notify = True
     return hbonds
 
 def find_hbonds(session, structures, *, inter_model=True, intra_model=True, donors=None, acceptors=None,
-        dist_slop=0.0, angle_slop=0.0, inter_submodel=False, cache_da=False, status=True):
+        dist_slop=0.0, angle_slop=0.0, inter_submodel=False, cache_da=None, status=True):
     """Hydrogen bond detection based on criteria in "Three-dimensional
         hydrogen-bond geometry and probability information from a
         crystal survey", J. Computer-Aided Molecular Design, 10 (1996),
@@ -329,8 +350,9 @@ def find_hbonds(session, structures, *, inter_model=True, intra_model=True, dono
         Dist/angle slop are the amount that distances/angles are allowed to exceed
         the values given in the above reference and still be considered hydrogen bonds.
 
-        'cache_da' allows donors/acceptors in molecules to be cached if it is anticipated that
-        the same structures will be examined for H-bonds repeatedly (e.g. a dynamics trajectory).
+        'cache_da' is deprecated and ignored.  Donor/acceptor typing is always cached for each
+        structure and reused until the structure's atoms, bonds, atom types or atom names change,
+        so examining the same structures repeatedly (e.g. a dynamics trajectory) is fast.
 
         If 'per_coordset' is True and 'structures' contains a single structure with multiple coordinate
         sets, then hydrogen bonds will be computed for each coordset.
@@ -341,6 +363,11 @@ def find_hbonds(session, structures, *, inter_model=True, intra_model=True, dono
         satisfied, in which case a list of such lists will be returned, one per coordset.
     """
 
+    if cache_da is not None:
+        import warnings
+        warnings.warn("find_hbonds() 'cache_da' argument is deprecated and ignored;"
+            " donor/acceptor typing is always cached", DeprecationWarning, stacklevel=2)
+
     # hack to speed up coordinate lookup...
     from chimerax.atomic import Atoms, Atom
     if len(structures) == 1 or not inter_model or (
@@ -358,28 +385,7 @@ def find_hbonds(session, structures, *, inter_model=True, intra_model=True, dono
             limited_acceptors = Atoms(acceptors)
         else:
             limited_acceptors = acceptors
-        global _d_cache, _a_cache, _prev_limited
-        if cache_da:
-            if limited_donors:
-                dIDs = [id(d) for d in limited_donors]
-                dIDs.sort()
-            else:
-                dIDs = None
-            if limited_acceptors:
-                aIDs = [id(a) for a in limited_acceptors]
-                aIDs.sort()
-            else:
-                aIDs = None
-            key = (dIDs, aIDs)
-            if _prev_limited and _prev_limited != key:
-                flush_cache()
-            _prev_limited = key
-            from weakref import WeakKeyDictionary
-            if _d_cache is None:
-                _d_cache = WeakKeyDictionary()
-                _a_cache = WeakKeyDictionary()
-        else:
-            flush_cache()
+        scene_coords = (Atom._hb_coord == Atom.scene_coord)
         global donor_params, acceptor_params
         global processed_donor_params, processed_acceptor_params
         global _compute_cache
@@ -478,47 +484,23 @@ def find_hbonds(session, structures, *, inter_model=True, intra_model=True, dono
             'S': gen_don_S_params
         }
 
-        from chimerax.atom_search import AtomSearchTree
         metal_coord = {}
-        acc_trees = {}
+        acceptors = {}
         hbonds = []
         has_sulfur = {}
         for structure in structures:
             if status:
                 session.logger.status("Finding acceptors in model '%s'" % structure.name, blank_after=0)
-            if cache_da and structure in _a_cache and (dist_slop,
-                    angle_slop) in _a_cache[structure]:
-                acc_atoms = []
-                acc_data = []
-                for acc_atom, data in _a_cache[structure][(dist_slop, angle_slop)].items():
-                    if not acc_atom.deleted:
-                        acc_atoms.append(acc_atom)
-                        acc_data.append(data)
-            else:
-                acc_atoms, acc_data = _find_acceptors(structure, a_params,
-                        limited_acceptors, generic_acc_info)
-                if cache_da:
-                    cache = WeakKeyDictionary()
-                    for i in range(len(acc_atoms)):
-                        cache[acc_atoms[i]] = acc_data[i]
-                    if structure not in _a_cache:
-                        _a_cache[structure] = {}
-                    _a_cache[structure][(dist_slop, angle_slop)] = cache
-            #xyz = []
-            has_sulfur[structure] = False
-            for acc_atom in acc_atoms:
-                #c = acc_atom._hb_coord
-                #xyz.append([c[0], c[1], c[2]])
-                if acc_atom.element == Element.get_element('S'):
-                    has_sulfur[structure] = True
-            if status:
-                session.logger.status("Building search tree of acceptor atoms", blank_after=0)
-            acc_tree = acc_trees[structure] = AtomSearchTree(acc_atoms, data=acc_data, sep_val=3.0,
-                scene_coords=(Atom._hb_coord == Atom.scene_coord))
+            acc_atoms, acc_data = _typing(structure, 'acceptors', process_key, limited_acceptors,
+                lambda: _find_acceptors(structure, a_params, None, generic_acc_info))
+            acc_xyz = _atom_coords(acc_atoms, scene_coords)
+            acceptors[structure] = (acc_data, acc_xyz)
+            has_sulfur[structure] = any([a.element.number == 16 for a in acc_atoms])
             metals = structure.atoms.filter(structure.atoms.elements.is_metal)
-            for metal in metals:
-                for acc_atom, geom_func, args in acc_tree.search(metal._hb_coord, 4.0):
-                    metal_coord.setdefault(acc_atom, []).append(metal)
+            if len(metals) > 0 and len(acc_atoms) > 0:
+                mi, ai = _close_pairs(_atom_coords(metals, scene_coords), acc_xyz, 4.0)
+                for i, j in zip(mi, ai):
+                    metal_coord.setdefault(acc_atoms[j], []).append(metals[i])
 
         if process_key not in processed_donor_params:
             # find max donor distances before they get squared..
@@ -555,134 +537,132 @@ def find_hbonds(session, structures, *, inter_model=True, intra_model=True, dono
         generic_theta_tau_params = _process_arg_tuple([2.48, 132], dist_slop, angle_slop)
         generic_upsilon_tau_params = _process_arg_tuple([3.42, 90, -161, 125], dist_slop, angle_slop)
         generic_generic_params = _process_arg_tuple([2.48, 3.42, 130, 90], dist_slop, angle_slop)
-        for dmi in range(len(structures)):
-            structure = structures[dmi]
+        for structure in structures:
             if status:
                 session.logger.status("Finding donors in model '%s'" % structure.name, blank_after=0)
-            if cache_da and structure in _d_cache and (dist_slop, angle_slop) in _d_cache[structure]:
-                don_atoms = []
-                don_data = []
-                for don_atom, data in _d_cache[structure][(dist_slop, angle_slop)].items():
-                    if not don_atom.deleted:
-                        don_atoms.append(don_atom)
-                        don_data.append(data)
-            else:
-                don_atoms, don_data = _find_donors(structure, d_params, limited_donors, generic_don_info)
-                if cache_da:
-                    cache = WeakKeyDictionary()
-                    for i in range(len(don_atoms)):
-                        cache[don_atoms[i]] = don_data[i]
-                    if structure not in _d_cache:
-                        _d_cache[structure] = {}
-                    _d_cache[structure][(dist_slop, angle_slop)] = cache
+            don_atoms, don_data = _typing(structure, 'donors', process_key, limited_donors,
+                lambda: _find_donors(structure, d_params, None, generic_don_info))
+            if not don_atoms:
+                continue
 
             if status:
                 session.logger.status("Matching donors in model '%s' to acceptors" % structure.name,
                     blank_after=0)
-            for i in range(len(don_atoms)):
+            # Find donor/acceptor pairs within the donor test distance for all structures at once.
+            from numpy import array, concatenate, full, lexsort
+            don_xyz = _atom_coords(don_atoms, scene_coords)
+            test_dists = array([data[3] for data in don_data])
+            pairs = []
+            for ai, acc_structure in enumerate(structures):
+                if acc_structure == structure and not intra_model or acc_structure != structure and not inter_model:
+                    continue
+                if not inter_submodel \
+                and acc_structure.id and structure.id \
+                and acc_structure.id[0] == structure.id[0] \
+                and acc_structure.id[:-1] == structure.id[:-1] \
+                and acc_structure.id[1:] != structure.id[1:]:
+                    continue
+                acc_data, acc_xyz = acceptors[acc_structure]
+                if len(acc_data) == 0:
+                    continue
+                if has_sulfur[acc_structure]:
+                    from .common_geom import SULFUR_COMP
+                    td = test_dists + SULFUR_COMP
+                else:
+                    td = test_dists
+                di, aci = _close_pairs(don_xyz, acc_xyz, td)
+                pairs.append((di, full(len(di), ai), aci))
+            if not pairs:
+                continue
+            di, si, aci = [concatenate(p) for p in zip(*pairs)]
+            order = lexsort((aci, si, di))
+            donor_hyds = {}
+            for i, ai, j in zip(di[order], si[order], aci[order]):
                 donor_atom = don_atoms[i]
                 geom_type, tau_sym, arg_list, test_dist = don_data[i]
-                donor_hyds = hyd_positions(donor_atom)
-                coord = donor_atom._hb_coord
-                for acc_structure in structures:
-                    if acc_structure == structure and not intra_model or acc_structure != structure and not inter_model:
-                        continue
-                    if not inter_submodel \
-                    and acc_structure.id and structure.id \
-                    and acc_structure.id[0] == structure.id[0] \
-                    and acc_structure.id[:-1] == structure.id[:-1] \
-                    and acc_structure.id[1:] != structure.id[1:]:
+                if i not in donor_hyds:
+                    donor_hyds[i] = hyd_positions(donor_atom)
+                acc_atom, geom_func, args = acceptors[structures[ai]][0][j]
+                if verbose:
+                    session.logger.info("Donor %s possible acceptor %s" % (donor_atom, acc_atom))
+                if acc_atom == donor_atom:
+                    # e.g. hydroxyl
+                    if verbose:
+                        print("skipping: donor == acceptor")
+                    continue
+                try:
+                    if not geom_func(donor_atom, donor_hyds[i], *args):
                         continue
-                    if has_sulfur[acc_structure]:
-                        from .common_geom import SULFUR_COMP
-                        td = test_dist + SULFUR_COMP
+                except ConnectivityError as e:
+                    session.logger.info("Skipping possible acceptor with bad geometry: %s\n%s\n"
+                        % (acc_atom, e))
+                    bad_connectivities += 1
+                    continue
+                except Exception:
+                    print("donor:", donor_atom, " acceptor:", acc_atom)
+                    raise
+                if verbose:
+                    session.logger.info("\t%s satisfies acceptor criteria" % acc_atom)
+                if geom_type == upsilon_tau:
+                    donor_func = don_upsilon_tau
+                    add_args = generic_upsilon_tau_params + [tau_sym]
+                elif geom_type == theta_tau:
+                    donor_func = don_theta_tau
+                    add_args = generic_theta_tau_params
+                elif geom_type == water:
+                    donor_func = don_water
+                    add_args = generic_water_params
+                else:
+                    if donor_atom.idatm_type in ["Npl", "N2+"]:
+                        heavys = 0
+                        for bonded in donor_atom.neighbors:
+                            if bonded.element.number > 1:
+                                heavys += 1
+                        if heavys > 1:
+                            info = gen_don_Npl_1h_params
+                        else:
+                            info = gen_don_Npl_2h_params
                     else:
-                        td = test_dist
-                    accs = acc_trees[acc_structure].search(coord, td)
-                    if verbose:
-                        session.logger.info("Found %d possible acceptors for donor %s:"
-                            % (len(accs), donor_atom))
-                        for acc_data in accs:
-                            session.logger.info("\t%s\n" % acc_data[0])
-                    for acc_atom, geom_func, args in accs:
-                        if acc_atom == donor_atom:
-                            # e.g. hydroxyl
+                        info = generic_don_info[donor_atom.element.name]
+                    donor_func, arg_list = info
+                    add_args = generic_generic_params
+                    if donor_func == don_upsilon_tau:
+                        # tack on generic
+                        # tau symmetry
+                        add_args = generic_upsilon_tau_params + [4]
+                    elif donor_func == don_theta_tau:
+                        add_args = generic_theta_tau_params
+                try:
+                    if not donor_func(donor_atom, donor_hyds[i], acc_atom,
+                            *tuple(arg_list + add_args)):
+                        continue
+                except ConnectivityError as e:
+                    session.logger.info("Skipping possible donor with bad geometry: %s\n%s\n"
+                        % (donor_atom, e))
+                    bad_connectivities += 1
+                    continue
+                except AtomTypeError as e:
+                    session.logger.warning(str(e))
+                    #_problem = ("atom type", donor_atom, str(e), None)
+                    continue
+                if verbose:
+                    session.logger.info("\t%s satisfies donor criteria" % donor_atom)
+                # ensure hbond isn't precluded by metal-coordination...
+                if acc_atom in metal_coord:
+                    from chimerax.geometry import angle
+                    conflict = False
+                    for metal in metal_coord[acc_atom]:
+                        if angle(donor_atom._hb_coord, acc_atom._hb_coord, metal._hb_coord) < 45.0:
                             if verbose:
-                                print("skipping: donor == acceptor")
-                            continue
-                        try:
-                            if not geom_func(donor_atom, donor_hyds, *args):
-                                continue
-                        except ConnectivityError as e:
-                            session.logger.info("Skipping possible acceptor with bad geometry: %s\n%s\n"
-                                % (acc_atom, e))
-                            bad_connectivities += 1
-                            continue
-                        except Exception:
-                            print("donor:", donor_atom, " acceptor:", acc_atom)
-                            raise
-                        if verbose:
-                            session.logger.info("\t%s satisfies acceptor criteria" % acc_atom)
-                        if geom_type == upsilon_tau:
-                            donor_func = don_upsilon_tau
-                            add_args = generic_upsilon_tau_params + [tau_sym]
-                        elif geom_type == theta_tau:
-                            donor_func = don_theta_tau
-                            add_args = generic_theta_tau_params
-                        elif geom_type == water:
-                            donor_func = don_water
-                            add_args = generic_water_params
-                        else:
-                            if donor_atom.idatm_type in ["Npl", "N2+"]:
-                                heavys = 0
-                                for bonded in donor_atom.neighbors:
-                                    if bonded.element.number > 1:
-                                        heavys += 1
-                                if heavys > 1:
-                                    info = gen_don_Npl_1h_params
-                                else:
-                                    info = gen_don_Npl_2h_params
-                            else:
-                                info = generic_don_info[donor_atom.element.name]
-                            donor_func, arg_list = info
-                            add_args = generic_generic_params
-                            if donor_func == don_upsilon_tau:
-                                # tack on generic
-                                # tau symmetry
-                                add_args = generic_upsilon_tau_params + [4]
-                            elif donor_func == don_theta_tau:
-                                add_args = generic_theta_tau_params
-                        try:
-                            if not donor_func(donor_atom, donor_hyds, acc_atom,
-                                    *tuple(arg_list + add_args)):
-                                continue
-                        except ConnectivityError as e:
-                            session.logger.info("Skipping possible donor with bad geometry: %s\n%s\n"
-                                % (donor_atom, e))
-                            bad_connectivities += 1
-                            continue
-                        except AtomTypeError as e:
-                            session.logger.warning(str(e))
-                            #_problem = ("atom type", donor_atom, str(e), None)
-                            continue
-                        if verbose:
-                            session.logger.info("\t%s satisfies donor criteria" % donor_atom)
-                        # ensure hbond isn't precluded by metal-coordination...
-                        if acc_atom in metal_coord:
-                            from chimerax.geometry import angle
-                            conflict = False
-                            for metal in metal_coord[acc_atom]:
-                                if angle(donor_atom._hb_coord, acc_atom._hb_coord, metal._hb_coord) < 45.0:
-                                    if verbose:
-                                        session.logger.info("\tH-bond between %s and %s conflicts with"
-                                            " metal coordination to %s" % (donor_atom, acc_atom, metal))
-                                    conflict = True
-                                    break
-                            if conflict:
-                                continue
-                        hbonds.append((donor_atom, acc_atom))
-            if status:
-                session.logger.status("")
+                                session.logger.info("\tH-bond between %s and %s conflicts with"
+                                    " metal coordination to %s" % (donor_atom, acc_atom, metal))
+                            conflict = True
+                            break
+                    if conflict:
+                        continue
+                hbonds.append((donor_atom, acc_atom))
+        if status:
+            session.logger.status("")
         if bad_connectivities:
             session.logger.warning("Skipped %d atom(s) with bad connectivities; see log for details"
                 % bad_connectivities);
@@ -734,6 +714,113 @@ def find_hbonds(session, structures, *, inter_model=True, intra_model=True, dono
         delattr(Atom, "_hb_coord")
     return hbonds
 
+def _typing(structure, kind, process_key, limited, compute):
+    """Return donor or acceptor atoms and their data for a structure, restricted to the
+       'limited' atoms if given.  The typing is computed by calling 'compute' for all atoms
+       of the structure and is cached until the structure topology changes.
+    """
+    global _problem, _truncated
+    state = _typing_state(structure)
+    cached = _typing_cache.get(structure)
+    if cached is None:
+        handler = structure.triggers.add_handler("changes", _topology_changed)
+        cached = _typing_cache[structure] = (handler, state, {})
+    elif not _same_typing_state(cached[1], state):
+        cached = _typing_cache[structure] = (cached[0], state, {})
+    typings = cached[2]
+    key = (kind,) + tuple(process_key)
+    from chimerax.atomic import Atoms
+    if key in typings:
+        atoms, data, truncated, problem, atom_collection = typings[key]
+    else:
+        prev_truncated, prev_problem = _truncated, _problem
+        _truncated, _problem = set(), None
+        try:
+            atoms, data = compute()
+            truncated, problem = list(_truncated), _problem
+        finally:
+            _truncated, _problem = prev_truncated, prev_problem
+        atom_collection = Atoms(atoms)
+        typings[key] = (atoms, data, truncated, problem, atom_collection)
+
+    if limited:
+        if atoms:
+            indices = atom_collection.mask(limited).nonzero()[0]
+            atoms = [atoms[i] for i in indices]
+            data = [data[i] for i in indices]
+        if truncated:
+            truncated = [a for a, m in zip(truncated, Atoms(truncated).mask(limited)) if m]
+        if problem and problem[1] not in limited:
+            problem = None
+    _truncated.update(truncated)
+    if problem:
+        _problem = problem
+    return atoms, data
+
+def _typing_state(structure):
+    atoms = structure.atoms
+    return ((structure.num_atoms, structure.num_bonds),
+        atoms.idatm_types, atoms.names, atoms.element_numbers)
+
+def _same_typing_state(state1, state2):
+    from numpy import array_equal
+    counts1, *arrays1 = state1
+    counts2, *arrays2 = state2
+    return counts1 == counts2 and all(array_equal(a1, a2) for a1, a2 in zip(arrays1, arrays2))
+
+def _atom_coords(atoms, scene_coords):
+    from chimerax.atomic import Atoms
+    if not isinstance(atoms, Atoms):
+        atoms = Atoms(atoms)
+    return atoms.scene_coords if scene_coords else atoms.coords
+
+def _close_pairs(xyz1, xyz2, max_dist):
+    """Return index arrays (i1, i2) of all pairs of points from xyz1 and xyz2 that are
+       within 'max_dist' of each other, sorted by i1 then i2.  'max_dist' may be a single
+       value or an array giving a distance for each point of xyz1.  Points are binned
+       into a grid of cubes the size of the largest distance so only points in
+       neighboring cubes are compared.
+    """
+    from numpy import asarray, float64, int64, empty, full, floor, minimum, maximum, \
+        argsort, searchsorted, repeat, arange, cumsum, concatenate, lexsort
+    n1, n2 = len(xyz1), len(xyz2)
+    d = asarray(max_dist, float64)
+    if d.ndim == 0:
+        d = full((n1,), float(d))
+    if n1 == 0 or n2 == 0 or d.max() <= 0:
+        return empty((0,), int64), empty((0,), int64)
+    size = d.max()
+    origin = minimum(xyz1.min(axis=0), xyz2.min(axis=0))
+    # Offset cube indices by 1 so neighbor cubes of edge points have non-negative indices.
+    c1 = floor((xyz1 - origin) / size).astype(int64) + 1
+    c2 = floor((xyz2 - origin) / size).astype(int64) + 1
+    dims = maximum(c1.max(axis=0), c2.max(axis=0)) + 2
+    def cube_keys(c):
+        return (c[:,0]*dims[1] + c[:,1])*dims[2] + c[:,2]
+    k2 = cube_keys(c2)
+    order = argsort(k2, kind='stable')
+    sorted_k2 = k2[order]
+    i1s, i2s = [], []
+    for offset in [(i,j,k) for i in (-1,0,1) for j in (-1,0,1) for k in (-1,0,1)]:
+        k1 = cube_keys(c1 + offset)
+        start = searchsorted(sorted_k2, k1, 'left')
+        count = searchsorted(sorted_k2, k1, 'right') - start
+        total = count.sum()
+        if total == 0:
+            continue
+        i1s.append(repeat(arange(n1), count))
+        # Index into sorted points for each pair, start of run plus position within run.
+        run_start = repeat(start - (cumsum(count) - count), count)
+        i2s.append(order[arange(total) + run_start])
+    if not i1s:
+        return empty((0,), int64), empty((0,), int64)
+    i1, i2 = concatenate(i1s), concatenate(i2s)
+    delta = xyz1[i1] - xyz2[i2]
+    close = (delta*delta).sum(axis=1) <= d[i1]*d[i1]
+    i1, i2 = i1[close], i2[close]
+    o = lexsort((i2, i1))
+    return i1[o], i2[o]
+
 def _process_arg_tuple(arg_tuple, dist_slop, angle_slop):
     new_args = []
     for arg in arg_tuple:
@@ -5,3 +5,46 @@ def test_hbonds(test_production_session):
     run(session, "open 2gbp")
     hbonds = find_hbonds(session, session.models[:1], dist_slop=rec_dist_slop, angle_slop=rec_angle_slop)
     assert(len(hbonds) == 793), "Expected to find 793 hbonds in 2gbp; actually found %d" % len(hbonds)
+
+def test_hbonds_cached_typing(test_production_session):
+    from chimerax.core.commands import run
+    from chimerax.atomic import check_for_changes
+    from chimerax.hbonds import find_hbonds, flush_cache
+    from chimerax.hbonds.hbond import _typing_cache
+    session = test_production_session
+    s = run(session, "open 2gbp")[0]
+    hbonds = find_hbonds(session, [s])
+    assert s in _typing_cache
+    assert len(find_hbonds(session, [s])) == len(hbonds), "Cached typing found different hbonds"
+    # deleting atoms discards the cached donor and acceptor typing
+    run(session, "delete :1-20")
+    check_for_changes(session)
+    hbonds2 = find_hbonds(session, [s])
+    assert len(hbonds2) < len(hbonds)
+    assert not [(d, a) for d, a in hbonds2 if d.deleted or a.deleted]
+    flush_cache()
+    assert len(find_hbonds(session, [s])) == len(hbonds2)
+
+def test_hbonds_typing_changed_without_trigger(test_production_session):
+    from chimerax.core.commands import run
+    from chimerax.hbonds import find_hbonds, flush_cache
+    session = test_production_session
+    s = run(session, "open 2gbp")[0]
+    hbonds = find_hbonds(session, [s])
+    # atom types changed in the same command sequence, before the changes trigger fires
+    oxygens = s.atoms.filter(s.atoms.element_names == "O")
+    oxygens[:len(oxygens)//2].idatm_types = "C3"
+    hbonds2 = find_hbonds(session, [s])
+    assert len(hbonds2) < len(hbonds)
+    flush_cache()
+    assert len(find_hbonds(session, [s])) == len(hbonds2)
+
+def test_hbonds_cache_da_deprecated(test_production_session):
+    import pytest
+    from chimerax.core.commands import run
+    from chimerax.hbonds import find_hbonds
+    session = test_production_session
+    s = run(session, "open 2gbp")[0]
+    with pytest.warns(DeprecationWarning):
+        hbonds = find_hbonds(session, [s], cache_da=True)
+    assert len(hbonds) == len(find_hbonds(session, [s]))
@@ -310,16 +310,11 @@ def optimized_buried_area(xyz1, r1, b1, xyz2, r2, b2, axes, probe_radius):
         return None
 
     # Compute areas for spheres near contact interface.
+    # Exposed areas for combined spheres are only recomputed near the interface.
     xyz1, r1 = xyz1[i1], r1[i1]
-    from chimerax.surface import spheres_surface_area
-    a1 = spheres_surface_area(xyz1, r1)
     xyz2, r2 = xyz2[i2], r2[i2]
-    a2 = spheres_surface_area(xyz2, r2)
-
-    # Compute exposed areas for combined spheres.
-    from numpy import concatenate
-    xyz12, r12 = concatenate((xyz1,xyz2)), concatenate((r1,r2))
-    a12 = spheres_surface_area(xyz12, r12)
+    from chimerax.surface import buried_sphere_areas
+    a1, a2, a12 = buried_sphere_areas(xyz1, r1, xyz2, r2)
 
     ba = 0.5 * (a1.sum() + a2.sum() - a12.sum())
     c = Contact(ba, a1, a2, a12, i1, i2)
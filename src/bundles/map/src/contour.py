@@ -0,0 +1,467 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+
+# === UCSF ChimeraX Copyright ===
+# Copyright 2022 Regents of the University of California. All rights reserved.
+# The ChimeraX application is provided pursuant to the ChimeraX license
+# agreement, which covers academic and commercial uses. For more details, see
+# <https://www.rbvi.ucsf.edu/chimerax/docs/licensing.html>
+#
+# This particular file is part of the ChimeraX library. You can also
+# redistribute and/or modify it under the terms of the GNU Lesser General
+# Public License version 2.1 as published by the Free Software Foundation.
+# For more details, see
+# <https://www.gnu.org/licenses/old-licenses/lgpl-2.1.html>
+#
+# THIS SOFTWARE IS PROVIDED "AS IS" WITHOUT WARRANTY OF ANY KIND, EITHER
+# EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE. ADDITIONAL LIABILITY
+# LIMITATIONS ARE DESCRIBED IN THE GNU LESSER GENERAL PUBLIC LICENSE
+# VERSION 2.1
+#
+# This notice must be embedded in or attached to all copies, including partial
+# copies, of the software or any revisions or derivations thereof.
+# === UCSF ChimeraX Copyright ===
+
+# -----------------------------------------------------------------------------
+# Compute contour surfaces of large maps by splitting the map into slabs
+# along the z axis, contouring the slabs in parallel threads, and welding
+# the slab surfaces into one triangle mesh.  Also cache surfaces so that
+# only changed slabs or new threshold levels need to be contoured.
+#
+
+# Maps with fewer grid points are contoured in one piece.
+min_parallel_contour_voxels = 2**24
+
+# Maps with fewer grid points are recontoured entirely after values change.
+min_incremental_contour_voxels = 2**22
+
+# Maps with fewer grid points do not contour nearby levels in advance.
+min_speculative_contour_voxels = 2**20
+
+# Spacing of levels contoured in advance as a fraction of the map value range.
+speculative_contour_level_steps = 100
+
+# Bytes of vertex, triangle and normal arrays cached for all maps of a session.
+contour_cache_bytes = 2**28
+
+# -----------------------------------------------------------------------------
+#
+def contour_surface(matrix, level, cap_faces = True, calculate_normals = True,
+                    nthread = None, min_slab_planes = 16):
+  '''
+  Compute a contour surface like _map.contour_surface() returning vertices,
+  triangles and normals.  Large matrices are split into slabs of z planes
+  which are contoured in separate threads.  Vertices on slab boundaries are
+  merged and their normals averaged so the result is a single connected mesh.
+  '''
+  from ._map import contour_surface as map_contour_surface
+  slabs = _slab_ranges(matrix.shape[0], matrix.size, nthread, min_slab_planes)
+  if len(slabs) <= 1:
+    return map_contour_surface(matrix, level, cap_faces = cap_faces,
+                               calculate_normals = calculate_normals)
+
+  def contour_slab(i, z0, z1):
+    va, ta, na = map_contour_surface(matrix[z0:z1+1], level, cap_faces = cap_faces,
+                                     calculate_normals = True)
+    va[:,2] += z0
+    return i, va, ta, na
+
+  from chimerax.core.threadq import apply_to_list
+  results = apply_to_list(contour_slab, [(i,z0,z1) for i,(z0,z1) in enumerate(slabs)],
+                          nthread = len(slabs))
+  results.sort(key = lambda r: r[0])
+  interior_planes = [z1 for z0,z1 in slabs[:-1]]
+  va, ta, na = _weld_slab_surfaces([r[1:] for r in results], interior_planes, cap_faces)
+  return (va, ta, na) if calculate_normals else (va, ta)
+
+# -----------------------------------------------------------------------------
+# Remember the contour surface of each z slab of a map so that after map
+# values are changed in a few planes, for instance by the map eraser or
+# segmentation painting, only the slabs containing the changed planes are
+# recontoured.  Slab surfaces count against a ContourCacheBudget shared with
+# the cached surfaces of other levels and maps, and the least recently used
+# are discarded to stay within it.
+#
+class SlabContourCache:
+
+  def __init__(self, slab_planes = 32, budget = None):
+    self.slab_planes = slab_planes
+    self._budget = ContourCacheBudget() if budget is None else budget
+    self._key = None		# Volume matrix id the slab surfaces were computed for.
+    self._params = None		# Matrix shape, level and cap_faces of slab surfaces.
+    self._slabs = []		# Inclusive z plane ranges.
+    self._surfaces = []		# Vertices, triangles, normals for each slab.
+    self._changed_zrange = None	# Matrix planes changed since slabs were contoured.
+
+  # ---------------------------------------------------------------------------
+  #
+  def clear(self):
+    with self._budget.lock:
+      self._release_surfaces()
+      self._key = self._params = self._changed_zrange = None
+      self._slabs = []
+      self._surfaces = []
+
+  # ---------------------------------------------------------------------------
+  # Caller holds the budget lock.
+  #
+  def _release_surfaces(self):
+    for i, s in enumerate(self._surfaces):
+      if s is not None:
+        self._budget._remove(self, i)
+
+  # ---------------------------------------------------------------------------
+  # Called by the budget with its lock held.
+  #
+  def _discard(self, i):
+    if i < len(self._surfaces):
+      self._surfaces[i] = None
+
+  # ---------------------------------------------------------------------------
+  # Matrix values for key old_key changed only in planes zrange = (z0,z1)
+  # giving matrix key new_key.  If zrange is None all planes may have changed.
+  #
+  def values_changed(self, zrange, old_key, new_key):
+    if zrange is None or self._key is None or self._key != old_key:
+      self.clear()
+      return
+    self._key = new_key
+    cz = self._changed_zrange
+    self._changed_zrange = zrange if cz is None else (min(cz[0], zrange[0]), max(cz[1], zrange[1]))
+
+  # ---------------------------------------------------------------------------
+  #
+  def contour(self, matrix, level, cap_faces = True, key = None, nthread = None):
+    '''
+    Return contour surface vertices, triangles and normals like
+    contour_surface() reusing slab surfaces from the previous call
+    with the same key where the matrix values have not changed.
+    '''
+    if key is None or matrix.size < min_incremental_contour_voxels:
+      self.clear()
+      return contour_surface(matrix, level, cap_faces = cap_faces, nthread = nthread)
+
+    params = (matrix.shape, level, cap_faces)
+    budget = self._budget
+    with budget.lock:
+      if key != self._key or params != self._params:
+        self._release_surfaces()
+        self._slabs = _fixed_slab_ranges(matrix.shape[0], self.slab_planes)
+        self._surfaces = [None] * len(self._slabs)
+      elif self._changed_zrange is not None:
+        # Changing values alters triangles in adjacent cells and normals
+        # (by gradient) one plane further.
+        z0, z1 = self._changed_zrange
+        z0, z1 = z0 - 2, z1 + 2
+        for i, (s0, s1) in enumerate(self._slabs):
+          if s0 <= z1 and s1 >= z0 and self._surfaces[i] is not None:
+            budget._remove(self, i)
+            self._surfaces[i] = None
+      self._key, self._params, self._changed_zrange = key, params, None
+      # Slabs may be discarded by the budget while others are computed.
+      surfaces = list(self._surfaces)
+      for i, surf in enumerate(surfaces):
+        if surf is not None:
+          budget._used(self, i)
+
+    from ._map import contour_surface as map_contour_surface
+    def contour_slab(i, z0, z1):
+      va, ta, na = map_contour_surface(matrix[z0:z1+1], level, cap_faces = cap_faces,
+                                       calculate_normals = True)
+      va[:,2] += z0
+      return i, va, ta, na
+
+    slabs = self._slabs
+    recompute = [(i,z0,z1) for i,(z0,z1) in enumerate(slabs) if surfaces[i] is None]
+    if len(recompute) == 1:
+      results = [contour_slab(*recompute[0])]
+    elif recompute:
+      if nthread is None:
+        from os import cpu_count
+        nthread = cpu_count() or 1
+      from chimerax.core.threadq import apply_to_list
+      results = apply_to_list(contour_slab, recompute, nthread = min(nthread, len(recompute)))
+    else:
+      results = []
+    with budget.lock:
+      for i, va, ta, na in results:
+        surfaces[i] = self._surfaces[i] = (va, ta, na)
+        budget._add(self, i, va.nbytes + ta.nbytes + na.nbytes)
+
+    interior_planes = [z1 for z0,z1 in slabs[:-1]]
+    return _weld_slab_surfaces(surfaces, interior_planes, cap_faces)
+
+# -----------------------------------------------------------------------------
+# Least recently used order and total size of cached contour surfaces, so
+# that the surface caches of all the maps of a session share one memory limit.  When adding a surface exceeds max_bytes
+# the least recently used surfaces of any cache are discarded.  The caches
+# use the budget lock so surfaces can be added from multiple threads.
+#
+class ContourCacheBudget:
+
+  def __init__(self, max_bytes = None):
+    self.max_bytes = contour_cache_bytes if max_bytes is None else max_bytes
+    from collections import OrderedDict
+    self._entries = OrderedDict()	# (cache, key) -> bytes, least recently used first.
+    self._bytes = 0
+    from threading import RLock
+    self.lock = RLock()
+
+  # ---------------------------------------------------------------------------
+  #
+  @property
+  def nbytes(self):
+    return self._bytes
+
+  # ---------------------------------------------------------------------------
+  # The following methods are called with the lock held.
+  #
+  def _add(self, cache, key, nbytes):
+    self._remove(cache, key)
+    self._entries[(cache, key)] = nbytes
+    self._bytes += nbytes
+    while self._bytes > self.max_bytes and len(self._entries) > 1:
+      (c, k), size = self._entries.popitem(last = False)
+      self._bytes -= size
+      c._discard(k)
+
+  def _used(self, cache, key):
+    if (cache, key) in self._entries:
+      self._entries.move_to_end((cache, key))
+
+  def _remove(self, cache, key):
+    size = self._entries.pop((cache, key), None)
+    if size is not None:
+      self._bytes -= size
+
+# -----------------------------------------------------------------------------
+# Contour surface cache budget shared by all maps of a session.
+#
+def contour_cache_budget(session):
+  b = getattr(session, '_contour_cache_budget', None)
+  if b is None:
+    session._contour_cache_budget = b = ContourCacheBudget()
+  return b
+
+# -----------------------------------------------------------------------------
+# Remember contour surfaces of a map at several threshold levels so that
+# switching between levels, dragging a level back and forth, or sweeping
+# levels in a movie reuses surfaces instead of recontouring.  Surfaces are
+# kept for a (region, level, cap_faces) key in map index coordinates and the
+# least recently used surfaces of all maps sharing a ContourCacheBudget are
+# discarded when they use more than its max_bytes.  Methods may be called
+# from multiple threads.
+#
+class ContourLevelCache:
+
+  def __init__(self, budget = None):
+    self._budget = ContourCacheBudget() if budget is None else budget
+    self._surfaces = {}		# Map key to (vertices, triangles, normals).
+    self._generation = 0		# Incremented when cache is cleared.
+    self._lock = self._budget.lock
+    self._precompute_thread = None
+
+  # ---------------------------------------------------------------------------
+  #
+  @property
+  def nbytes(self):
+    with self._lock:
+      return sum(sum(a.nbytes for a in s) for s in self._surfaces.values())
+
+  # ---------------------------------------------------------------------------
+  # Pass to add_surface() for surfaces computed outside the main thread.
+  #
+  @property
+  def generation(self):
+    return self._generation
+
+  # ---------------------------------------------------------------------------
+  # Discard all surfaces, for instance after map values change.  Surfaces being
+  # precomputed from the old values will not be added.
+  #
+  def clear(self):
+    with self._lock:
+      for key in self._surfaces.keys():
+        self._budget._remove(self, key)
+      self._surfaces.clear()
+      self._generation += 1
+
+  # ---------------------------------------------------------------------------
+  # Called by the budget with its lock held.
+  #
+  def _discard(self, key):
+    self._surfaces.pop(key, None)
+
+  # ---------------------------------------------------------------------------
+  #
+  def has_surface(self, region, level, cap_faces):
+    return (region, level, cap_faces) in self._surfaces
+
+  # ---------------------------------------------------------------------------
+  # Return copies of cached vertices, triangles and normals or None.
+  #
+  def surface(self, region, level, cap_faces):
+    key = (region, level, cap_faces)
+    with self._lock:
+      s = self._surfaces.get(key)
+      if s is None:
+        return None
+      self._budget._used(self, key)
+    return tuple(a.copy() for a in s)
+
+  # ---------------------------------------------------------------------------
+  # Return (level, (vertices, triangles, normals)) for the cached surface with
+  # level closest to the requested level within tolerance, or None.
+  #
+  def nearest_surface(self, region, level, cap_faces, tolerance):
+    with self._lock:
+      levels = [k[1] for k in self._surfaces.keys()
+                if k[0] == region and k[2] == cap_faces and abs(k[1] - level) <= tolerance]
+    if len(levels) == 0:
+      return None
+    nlevel = min(levels, key = lambda l: abs(l - level))
+    s = self.surface(region, nlevel, cap_faces)
+    return None if s is None else (nlevel, s)
+
+  # ---------------------------------------------------------------------------
+  # Cache a surface.  The arrays are not copied so the caller must not modify
+  # them afterwards.  If generation is given and the cache has been cleared
+  # since then the surface is not added.
+  #
+  def add_surface(self, region, level, cap_faces, surface, generation = None):
+    s = tuple(surface)
+    size = sum(a.nbytes for a in s)
+    if size > self._budget.max_bytes:
+      return
+    key = (region, level, cap_faces)
+    with self._lock:
+      if generation is not None and generation != self._generation:
+        return
+      self._surfaces[key] = s
+      self._budget._add(self, key, size)
+
+  # ---------------------------------------------------------------------------
+  # Compute and cache surfaces for more levels in a background thread.  Only
+  # the most recent request is kept if the thread is still busy.
+  #
+  def precompute(self, matrix, region, levels, cap_faces):
+    levels = [l for l in levels if not self.has_surface(region, l, cap_faces)]
+    if len(levels) == 0:
+      return
+
+    pt = self._precompute_thread
+    new_thread = (pt is None or not pt.is_alive())
+    if new_thread:
+      from chimerax.core.threadq import WorkThread
+      self._precompute_thread = pt = WorkThread(self._precompute_surfaces,
+                                                in_queue = (pt.in_queue if pt else None))
+      pt.daemon = True
+
+    import queue
+    try:
+      while pt.in_queue.get_nowait():
+        pt.in_queue.task_done()
+    except queue.Empty:
+      pass
+    try:
+      while True:
+        pt.out_queue.get_nowait()	# Results are only in the cache.
+    except queue.Empty:
+      pass
+
+    pt.in_queue.put((matrix, region, levels, cap_faces, self._generation))
+
+    if new_thread:
+      pt.start()
+
+  # ---------------------------------------------------------------------------
+  #
+  def _precompute_surfaces(self, matrix, region, levels, cap_faces, generation):
+    from ._map import contour_surface as map_contour_surface
+    for level in levels:
+      if generation != self._generation:
+        break
+      if not self.has_surface(region, level, cap_faces):
+        s = map_contour_surface(matrix, level, cap_faces = cap_faces,
+                                calculate_normals = True)
+        self.add_surface(region, level, cap_faces, s, generation)
+
+# -----------------------------------------------------------------------------
+#
+def _fixed_slab_ranges(zsize, slab_planes):
+  '''Inclusive z plane ranges with slab_planes cell layers per slab.'''
+  if zsize <= 1:
+    return [(0, max(zsize-1, 0))]
+  bounds = list(range(0, zsize-1, slab_planes)) + [zsize-1]
+  if len(bounds) > 2 and bounds[-1] - bounds[-2] < slab_planes // 2:
+    del bounds[-2]	# Merge thin last slab with previous one.
+  return [(bounds[k], bounds[k+1]) for k in range(len(bounds)-1)]
+
+# -----------------------------------------------------------------------------
+#
+def _slab_ranges(zsize, voxels, nthread, min_slab_planes):
+  '''Inclusive z plane ranges for slabs, adjacent slabs share one plane.'''
+  if nthread is None:
+    from os import cpu_count
+    nthread = cpu_count() or 1
+  if voxels < min_parallel_contour_voxels or nthread <= 1:
+    return [(0, zsize-1)]
+  nslab = min(nthread, (zsize-1) // min_slab_planes)
+  if nslab <= 1:
+    return [(0, zsize-1)]
+  bounds = [(k * (zsize-1)) // nslab for k in range(nslab+1)]
+  return [(bounds[k], bounds[k+1]) for k in range(nslab)]
+
+# -----------------------------------------------------------------------------
+#
+def _weld_slab_surfaces(slab_surfaces, interior_planes, cap_faces):
+  from numpy import concatenate, zeros, arange, int32, unique, add, sqrt, cumsum, isin
+
+  # Combine slab geometry.
+  vlist, tlist, nlist = [], [], []
+  voffset = 0
+  for va, ta, na in slab_surfaces:
+    vlist.append(va)
+    tlist.append(ta + voffset)
+    nlist.append(na)
+    voffset += len(va)
+  va, ta, na = concatenate(vlist), concatenate(tlist), concatenate(nlist)
+  if len(va) == 0:
+    return va, ta, na
+
+  z = va[:,2]
+  on_plane = isin(z, interior_planes)
+
+  # Slab box faces between slabs were capped from both sides, remove them.
+  if cap_faces:
+    tz = z[ta]
+    cap = (tz[:,0] == tz[:,1]) & (tz[:,1] == tz[:,2]) & on_plane[ta[:,0]]
+    ta = ta[~cap]
+
+  # Merge vertices computed by both slabs on a shared plane.
+  bi = on_plane.nonzero()[0]
+  if len(bi) > 0:
+    uv, first, inverse = unique(va[bi], axis = 0, return_index = True, return_inverse = True)
+    inverse = inverse.reshape(-1)
+    keep = bi[first]
+    vmap = arange(len(va), dtype = int32)
+    vmap[bi] = keep[inverse]
+    ta = vmap[ta]
+
+    # Each slab computes boundary normals with one-sided differences, average them.
+    nsum = zeros((len(uv),3), na.dtype)
+    add.at(nsum, inverse, na[bi])
+    nlen = sqrt((nsum*nsum).sum(axis = 1))
+    nlen[nlen == 0] = 1
+    nsum /= nlen[:,None]
+    na[keep] = nsum
+
+  # Remove vertices no longer used by any triangle.
+  used = zeros((len(va),), bool)
+  used[ta.ravel()] = True
+  if not used.all():
+    new_index = cumsum(used, dtype = int32) - 1
+    ta = new_index[ta]
+    va, na = va[used], na[used]
+
+  return va, ta.astype(int32), na
@@ -233,7 +233,7 @@ def bounding_grid(xyz, step, pad, transforms = None, cube = False):
 # -----------------------------------------------------------------------------
 #
 def add_gaussians(grid, xyz, weights, sdev, cutoff_range, transforms = None,
-                  normalize = True):
+                  normalize = True, nthread = None):
 
     from numpy import zeros, float32, empty
     sdevs = zeros((len(xyz),3), float32)
@@ -246,10 +246,12 @@ def add_gaussians(grid, xyz, weights, sdev, cutoff_range, transforms = None,
     from ._map import sum_of_gaussians
     ijk = empty(xyz.shape, float32)
     matrix = grid.matrix()
+    zrange = cutoff_range * sdevs[0,2] if len(xyz) > 0 else 0
     for tf in transforms:
         ijk[:] = xyz
         (grid.xyz_to_ijk_transform * tf).transform_points(ijk, in_place = True)
-        sum_of_gaussians(ijk, weights, sdevs, cutoff_range, matrix)
+        _add_in_slabs(sum_of_gaussians, ijk, (weights, sdevs), (cutoff_range,),
+                      zrange, matrix, nthread)
 
     if normalize:
         from math import pow, pi
@@ -258,7 +260,8 @@ def add_gaussians(grid, xyz, weights, sdev, cutoff_range, transforms = None,
 
 # -----------------------------------------------------------------------------
 #
-def add_balls(grid, xyz, radii, sdev, cutoff_range, transforms = None):
+def add_balls(grid, xyz, radii, sdev, cutoff_range, transforms = None,
+              nthread = None):
 
     if transforms is None or len(transforms) == 0:
         from chimerax.geometry import Places
@@ -268,10 +271,60 @@ def add_balls(grid, xyz, radii, sdev, cutoff_range, transforms = None):
     r = (radii - sdev) / grid.step[0]
     matrix = grid.matrix()
     from ._map import sum_of_balls
+    zrange = r + cutoff_range * sdev
     for tf in transforms:
         ijk[:] = xyz
         (grid.xyz_to_ijk_transform * tf).transform_points(ijk, in_place = True)
-        sum_of_balls(ijk, r, sdev, cutoff_range, matrix)
+        _add_in_slabs(sum_of_balls, ijk, (r,), (sdev, cutoff_range),
+                      zrange, matrix, nthread)
+
+# -----------------------------------------------------------------------------
+# Atoms are splatted in parallel when there are at least this many.
+#
+min_parallel_molmap_atoms = 10000
+
+# -----------------------------------------------------------------------------
+# Add atom contributions to a map in parallel threads.  The matrix is divided
+# into z slabs and each atom is binned into every slab that its cutoff range
+# overlaps.  Each thread adds the atoms of one slab to that slab's matrix view
+# so no grid point is written by two threads.  Atoms keep their original order
+# within a slab so the sums are the same as adding all atoms in one pass.
+#
+# The splat function is called as splat(ijk, *atom_values, *args, matrix) and
+# must clip atom contributions to the matrix bounds.  The zrange is the z
+# extent in grid units of an atom's contribution, a scalar or per-atom array.
+#
+def _add_in_slabs(splat, ijk, atom_values, args, zrange, matrix, nthread = None):
+
+    if nthread is None:
+        from os import cpu_count
+        nthread = cpu_count() or 1
+    ksize = matrix.shape[0]
+    nslab = min(4*nthread, ksize//2)
+    n = len(ijk)
+    if nthread <= 1 or nslab <= 1 or n < min_parallel_molmap_atoms:
+        splat(ijk, *atom_values, *args, matrix)
+        return
+
+    from numpy import ceil, floor
+    z = ijk[:,2]
+    zmin, zmax = ceil(z - zrange), floor(z + zrange)
+    bounds = [(s*ksize)//nslab for s in range(nslab+1)]
+    slabs = []
+    for k0, k1 in zip(bounds[:-1], bounds[1:]):
+        mask = (zmax >= k0) & (zmin < k1)
+        if mask.any():
+            slabs.append((k0, k1, mask))
+
+    def add_slab(k0, k1, mask):
+        sijk = ijk[mask]
+        sijk[:,2] -= k0
+        values = tuple(v[mask] for v in atom_values)
+        splat(sijk, *values, *args, matrix[k0:k1])
+
+    # The C++ splat routines release the Python global interpreter lock.
+    from chimerax.core.threadq import apply_to_list
+    apply_to_list(add_slab, slabs, nthread = nthread)
 
 # -----------------------------------------------------------------------------
 #
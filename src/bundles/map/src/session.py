@@ -339,6 +339,9 @@ def state_from_grid_data(data, session_path = None, include_maps = False):
     else:
       s['array_compression'] = 'none'
       s['array'] = bytes
+    from chimerax.map_data import SparseGridData
+    if isinstance(dt, SparseGridData):
+      s['sparse'] = True
     save_position = True
   else:
     save_position = False
@@ -394,8 +397,12 @@ def grid_data_from_state(s, gdcache, session, file_paths):
     if not a.flags.writeable:
       a = a.copy()
     array = a.reshape(s['size'][::-1])
-    from chimerax.map_data import ArrayGridData
-    dlist = [ArrayGridData(array)]
+    if s.get('sparse'):
+      from chimerax.map_data import SparseGridData
+      dlist = [SparseGridData.from_array(array)]
+    else:
+      from chimerax.map_data import ArrayGridData
+      dlist = [ArrayGridData(array)]
   else:
     dbfetch = s.get('database_fetch')
     ask = (dbfetch is None)
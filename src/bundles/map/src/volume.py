@@ -74,6 +74,8 @@ class Volume(Model):
 
     self.matrix_stats = None
     self._matrix_id = 1          # Incremented when shape or values change.
+    from .contour import ContourLevelCache, contour_cache_budget
+    self._contour_levels = ContourLevelCache(contour_cache_budget(session))	# Surfaces for recently used levels.
 
     rlist = Region_List()
     ijk_min, ijk_max = self.region[:2]
@@ -561,6 +563,7 @@ class Volume(Model):
 
     self.matrix_stats = None
     self._matrix_id += 1
+    self._contour_levels.clear()	# Cached surfaces are keyed by matrix id.
     self._drawings_need_update()
 
   # ---------------------------------------------------------------------------
@@ -1400,7 +1403,11 @@ class Volume(Model):
 
     if type == 'values changed':
       self.data.clear_cache()
+      old_matrix_id = self._matrix_id
       self.matrix_changed()
+      region = getattr(self.data, 'changed_region', None)
+      for s in self.surfaces:
+        s._matrix_values_changed(region, old_matrix_id, self._matrix_id)
       if self._image:
         self._image.map_values_changed()
       self._drawings_need_update()
@@ -1547,6 +1554,7 @@ class Volume(Model):
       minimum(m, values, m)
     elif operation == 'multiply':
       m[:,:,:] *= values
+    d.set_matrix((0,0,0), m)
     d.values_changed()
 
   # ---------------------------------------------------------------------------
@@ -1842,6 +1850,7 @@ class Volume(Model):
       d.remove_change_callback(self.data_changed_cb)
     self.data = None
     self._keep_displayed_data = None
+    self._contour_levels.clear()
     self.outline_box = None
     self.close_models()
     Model.delete(self)
@@ -2019,9 +2028,12 @@ class VolumeSurface(Surface):
     self._min_status_message_voxels = 2**24	# Show status messages only on big surface calculations
     self._use_thread = False			# Whether to compute next surface in thread
     self._surf_calc_thread = None
+    from .contour import SlabContourCache, contour_cache_budget
+    self._slab_contours = SlabContourCache(budget = contour_cache_budget(volume.session))	# Recontour only slabs with changed values
     self.clip_cap = True			# Cap surface when clipped
 
   def delete(self):
+    self._slab_contours.clear()
     try:
       self.volume._surfaces.remove(self)
     except ValueError:
@@ -2110,23 +2122,34 @@ class VolumeSurface(Surface):
       return
 
     v = self.volume
-    matrix = v.matrix()
     level = self.level
-
-    show_status = (matrix.size >= self._min_status_message_voxels)
-    if show_status:
-      v.message('Computing %s surface, level %.3g' % (v.data.name, level))
+    region = self._region_key()
 
     if self._use_thread:
       self._use_thread = False
-      self._calc_surface_in_thread(matrix, level, rendering_options)
+      if self._show_cached_surface(region, level, rendering_options):
+        self._surf_calc_thread = None
+        self._precompute_nearby_levels(v.matrix(), region, level, rendering_options.cap_faces)
+        return
+      # Show the closest cached level while the exact surface is computed.
+      self._show_cached_surface(region, level, rendering_options, nearest = True)
+      matrix = v.matrix()
+      self._calc_surface_in_thread(matrix, level, rendering_options, region)
       return
     else:
       # Don't use thread calculation started earlier since new non-threaded calculation has begun.
       self._surf_calc_thread = None
 
+    matrix = v.matrix()
+
+    show_status = (matrix.size >= self._min_status_message_voxels)
+    if show_status:
+      v.message('Computing %s surface, level %.3g' % (v.data.name, level))
+
     try:
-      va, na, ta, hidden_edges = self._calculate_contour_surface(matrix, level, rendering_options)
+      va, na, ta, hidden_edges = self._calculate_contour_surface(matrix, level, rendering_options,
+                                                                 matrix_id = v._matrix_id,
+                                                                 region = region)
     except MemoryError:
       ses = v.session
       ses.warning('Ran out of memory contouring at level %.3g.\n' % level +
@@ -2142,7 +2165,7 @@ class VolumeSurface(Surface):
 
   # ---------------------------------------------------------------------------
   #
-  def _calc_surface_in_thread(self, matrix, level, rendering_options):
+  def _calc_surface_in_thread(self, matrix, level, rendering_options, region):
     sct = self._surf_calc_thread
     new_thread = (sct is None or not sct.is_alive())
     if new_thread:
@@ -2160,7 +2183,8 @@ class VolumeSurface(Surface):
     except queue.Empty:
       pass
 
-    sct.in_queue.put((matrix, level, rendering_options))
+    generation = self.volume._contour_levels.generation
+    sct.in_queue.put((matrix, level, rendering_options, region, generation))
 
     if new_thread:
       sct.start()	# Start surface calculation in separate thread
@@ -2184,9 +2208,12 @@ class VolumeSurface(Surface):
         self._surf_calc_thread = None
       return
 
-    va, na, ta, hidden_edges, matrix, level, rendering_options = result
+    va, na, ta, hidden_edges, matrix, level, rendering_options, region = result
     self._set_surface(va, na, ta, hidden_edges)
     self._set_appearance(rendering_options)
+    # Threaded calculation is used for interactive level changes, so contour
+    # the levels the user is likely to drag to next.
+    self._precompute_nearby_levels(matrix, region, level, rendering_options.cap_faces)
 
     show_status = (matrix.size >= self._min_status_message_voxels)
     if show_status:
@@ -2196,13 +2223,38 @@ class VolumeSurface(Surface):
 
   # ---------------------------------------------------------------------------
   #
-  def _calculate_contour_surface_threaded(self, matrix, level, rendering_options):
-    va, na, ta, hidden_edges = self._calculate_contour_surface(matrix,level, rendering_options)
-    return va, na, ta, hidden_edges, matrix, level, rendering_options
+  def _calculate_contour_surface_threaded(self, matrix, level, rendering_options, region,
+                                          generation):
+    va, na, ta, hidden_edges = self._calculate_contour_surface(matrix,level, rendering_options,
+                                                               region = region,
+                                                               generation = generation)
+    return va, na, ta, hidden_edges, matrix, level, rendering_options, region
+
+  # ---------------------------------------------------------------------------
+  #
+  def _calculate_contour_surface(self, matrix, level, rendering_options, matrix_id = None,
+                                 region = None, generation = None):
+
+    cap_faces = rendering_options.cap_faces
+    cache = self.volume._contour_levels
+    surf = None if region is None else cache.surface(region, level, cap_faces)
+    if surf is None:
+      surf = self._contour(matrix, level, cap_faces, matrix_id)
+      if region is not None:
+        # Cache keeps these arrays, adjusting the geometry modifies copies.
+        cache.add_surface(region, level, cap_faces, surf, generation)
+        surf = tuple(a.copy() for a in surf)
+    varray, tarray, narray = surf
+
+    va, na, ta, hidden_edges = self._adjust_surface_geometry(varray, narray, tarray,
+                                                             rendering_options, level)
+
+    return va, na, ta, hidden_edges
 
   # ---------------------------------------------------------------------------
+  # Contour surface vertices, triangles and normals in matrix index coordinates.
   #
-  def _calculate_contour_surface(self, matrix, level, rendering_options):
+  def _contour(self, matrix, level, cap_faces, matrix_id = None):
 
     # _map contour code does not handle single data planes.
     # Handle these by stacking two planes on top of each other.
@@ -2211,19 +2263,99 @@ class VolumeSurface(Surface):
       for a in plane_axis:
         matrix = matrix.repeat(2, axis = a)
 
-    from ._map import contour_surface
-    varray, tarray, narray = contour_surface(matrix, level,
-                                             cap_faces = rendering_options.cap_faces,
-                                             calculate_normals = True)
+    if matrix_id is None or plane_axis:
+      # Threaded calculation does not use slab cache which is not thread safe.
+      from .contour import contour_surface
+      varray, tarray, narray = contour_surface(matrix, level, cap_faces = cap_faces,
+                                               calculate_normals = True)
+    else:
+      varray, tarray, narray = self._slab_contours.contour(matrix, level, cap_faces = cap_faces,
+                                                           key = matrix_id)
 
     if plane_axis:
       for a in plane_axis:
         varray[:,2-a] = 0
 
+    return varray, tarray, narray
+
+  # ---------------------------------------------------------------------------
+  # Key identifying the map matrix for cached contour surfaces.
+  #
+  def _region_key(self):
+    v = self.volume
+    ijk_min, ijk_max, ijk_step = v.region
+    return (v._matrix_id, tuple(ijk_min), tuple(ijk_max), tuple(ijk_step))
+
+  # ---------------------------------------------------------------------------
+  # Show a cached surface for this level, or with nearest = True the cached
+  # level closest to this level.  Returns whether a surface was shown.
+  #
+  def _show_cached_surface(self, region, level, rendering_options, nearest = False):
+
+    cache = self.volume._contour_levels
+    cap_faces = rendering_options.cap_faces
+    if nearest:
+      level_step = self._level_step()
+      if level_step is None:
+        return False
+      found = cache.nearest_surface(region, level, cap_faces, 0.5*level_step)
+      if found is None:
+        return False
+      level, surf = found
+    else:
+      surf = cache.surface(region, level, cap_faces)
+      if surf is None:
+        return False
+    varray, tarray, narray = surf
     va, na, ta, hidden_edges = self._adjust_surface_geometry(varray, narray, tarray,
                                                              rendering_options, level)
+    self._set_surface(va, na, ta, hidden_edges)
+    self._set_appearance(rendering_options)
+    return True
 
-    return va, na, ta, hidden_edges
+  # ---------------------------------------------------------------------------
+  # Spacing of levels contoured in advance, a fraction of the map value range.
+  #
+  def _level_step(self):
+
+    ms = self.volume.matrix_stats	# Don't compute statistics just for this.
+    if ms is None or ms.maximum <= ms.minimum:
+      return None
+    from .contour import speculative_contour_level_steps
+    return (ms.maximum - ms.minimum) / speculative_contour_level_steps
+
+  # ---------------------------------------------------------------------------
+  # Contour levels adjacent to the current level in a background thread so
+  # that moving the level marker can show them without waiting.
+  #
+  def _precompute_nearby_levels(self, matrix, region, level, cap_faces):
+
+    from .contour import min_speculative_contour_voxels
+    if matrix.size < min_speculative_contour_voxels or 1 in matrix.shape:
+      return
+    level_step = self._level_step()
+    if level_step is None:
+      return
+    ms = self.volume.matrix_stats
+    levels = [level + k*level_step for k in (1, -1, 2, -2)]
+    levels = [l for l in levels if ms.minimum <= l <= ms.maximum]
+    self.volume._contour_levels.precompute(matrix, region, levels, cap_faces)
+
+  # ---------------------------------------------------------------------------
+  # Map values changed in full grid index box region = (ijk_min, ijk_max),
+  # or everywhere if region is None.
+  #
+  def _matrix_values_changed(self, region, old_matrix_id, new_matrix_id):
+
+    zrange = None
+    if region is not None:
+      rmin, rmax, rstep = self.volume.region
+      zmin, zmax = region[0][2], region[1][2]
+      zo, zs = rmin[2], rstep[2]
+      z0 = max(0, (zmin - zo) // zs)
+      z1 = min((rmax[2] - zo) // zs, -((zo - zmax) // zs))
+      zrange = (z0, z1)
+    self._slab_contours.values_changed(zrange, old_matrix_id, new_matrix_id)
 
   # ---------------------------------------------------------------------------
   #
@@ -2825,7 +2825,9 @@ class Histogram_Pane:
         else:
             s = m.volume_surface
             if level != s.level:
-                s.level = level
+                # While dragging a marker compute surfaces in a thread, showing
+                # cached surfaces of nearby levels immediately.
+                s.set_level(level, use_thread = getattr(self.canvas, 'mouse_down', False))
                 surf_levels_changed = True
             if tuple(s.rgba) != tuple(color):
                 s.rgba = color
@@ -0,0 +1,38 @@
+import pytest
+
+
+def _atoms(n=3000):
+    from numpy import random, float32
+
+    rng = random.default_rng(5)
+    xyz = (rng.random((n, 3)) * 40).astype(float32)
+    values = (rng.random(n) + 0.5).astype(float32)
+    return xyz, values
+
+
+def _grid():
+    from numpy import zeros, float32
+    from chimerax.map_data import ArrayGridData
+
+    return ArrayGridData(zeros((48, 45, 44), float32), origin=(-2, -2, -2), step=(1, 1, 1))
+
+
+@pytest.mark.parametrize("splat", ["gaussians", "balls"])
+def test_slab_parallel_splat_matches_single_thread(monkeypatch, splat):
+    from chimerax.map import molmap
+    from chimerax.map.molmap import add_gaussians, add_balls
+
+    monkeypatch.setattr(molmap, "min_parallel_molmap_atoms", 100)
+    xyz, values = _atoms()
+    results = []
+    for nthread in (1, 4):
+        grid = _grid()
+        if splat == "gaussians":
+            add_gaussians(grid, xyz, values, 1.5, 5, nthread=nthread)
+        else:
+            add_balls(grid, xyz, values + 1, 0.8, 3, nthread=nthread)
+        results.append(grid.matrix())
+    single, parallel = results
+    assert single.any()
+    # Atoms are added in the same order at each grid point so sums are identical.
+    assert (parallel == single).all()
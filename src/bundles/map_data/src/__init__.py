@@ -28,6 +28,7 @@
 
 from .griddata import GridData, GridSubregion
 from .arraygrid import ArrayGridData
+from .sparsegrid import SparseGridData, SparseArray
 from .subsample import SubsampledGrid
 from .fileformats import file_formats, MapFileFormat, electrostatics_types, FileFormatError
 from .fileformats import open_file, FileFormatError, UnknownFileType, save_grid_data
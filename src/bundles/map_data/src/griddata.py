@@ -146,6 +146,7 @@ class GridData:
 
     self.writable = False
     self.change_callbacks = []
+    self.changed_region = None		# Set during values changed callbacks
 
     self.update_transform()
 
@@ -393,6 +394,21 @@ class GridData:
       
     return a
   
+  # ---------------------------------------------------------------------------
+  # Store values for the box of grid points with the given index origin.
+  # Code that modifies an array from matrix() in place should call this so
+  # grids whose matrix() returns a copy (e.g. SparseGridData) are updated.
+  # For grids returning views of their data nothing is copied when values
+  # is that view.
+  #
+  def set_matrix(self, ijk_origin, values):
+
+    ks, js, is_ = values.shape
+    m = self.matrix(ijk_origin, (is_, js, ks))
+    if (m.__array_interface__['data'][0] != values.__array_interface__['data'][0]
+        or m.strides != values.strides):
+      m[...] = values
+
   # ---------------------------------------------------------------------------
   # Convenience routine.
   #
@@ -522,10 +538,18 @@ class GridData:
 
   # ---------------------------------------------------------------------------
   # Code has modified matrix elements, or the value type has changed.
+  # If only a box of grid points changed it can be given as region =
+  # (ijk_min, ijk_max), inclusive full grid indices, so surfaces can be
+  # recomputed just in that box.  The region is available to callbacks
+  # as attribute changed_region.
   #
-  def values_changed(self):
+  def values_changed(self, region = None):
 
-    self.call_callbacks('values changed')
+    self.changed_region = region
+    try:
+      self.call_callbacks('values changed')
+    finally:
+      self.changed_region = None
 
   # ---------------------------------------------------------------------------
   # Mapping of array indices to xyz coordinates has changed.
@@ -613,6 +637,16 @@ class GridSubregion(GridData):
     origin, step, size = self.full_region(ijk_origin, ijk_size, ijk_step)
     m = self.full_data.cached_data(origin, size, step)
     return m
+
+  # ---------------------------------------------------------------------------
+  #
+  def set_matrix(self, ijk_origin, values):
+
+    if tuple(self.ijk_step) != (1,1,1):
+      GridData.set_matrix(self, ijk_origin, values)
+      return
+    origin = [i+o for i,o in zip(ijk_origin, self.ijk_offset)]
+    self.full_data.set_matrix(origin, values)
         
   # ---------------------------------------------------------------------------
   #
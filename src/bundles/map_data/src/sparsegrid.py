@@ -0,0 +1,352 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+
+# === UCSF ChimeraX Copyright ===
+# Copyright 2022 Regents of the University of California. All rights reserved.
+# The ChimeraX application is provided pursuant to the ChimeraX license
+# agreement, which covers academic and commercial uses. For more details, see
+# <https://www.rbvi.ucsf.edu/chimerax/docs/licensing.html>
+#
+# This particular file is part of the ChimeraX library. You can also
+# redistribute and/or modify it under the terms of the GNU Lesser General
+# Public License version 2.1 as published by the Free Software Foundation.
+# For more details, see
+# <https://www.gnu.org/licenses/old-licenses/lgpl-2.1.html>
+#
+# THIS SOFTWARE IS PROVIDED "AS IS" WITHOUT WARRANTY OF ANY KIND, EITHER
+# EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE. ADDITIONAL LIABILITY
+# LIMITATIONS ARE DESCRIBED IN THE GNU LESSER GENERAL PUBLIC LICENSE
+# VERSION 2.1
+#
+# This notice must be embedded in or attached to all copies, including partial
+# copies, of the software or any revisions or derivations thereof.
+# === UCSF ChimeraX Copyright ===
+
+# -----------------------------------------------------------------------------
+# Sparse grid data for label maps (e.g. segmentations) that are mostly zero.
+# Only cubic bricks containing non-zero values are stored, so memory use is
+# proportional to the labeled volume rather than the full grid size.
+#
+from .arraygrid import ArrayGridData
+
+# -----------------------------------------------------------------------------
+# Indexing a SparseArray with integers and slices like a numpy array returns
+# a dense numpy array copy.  Assigning to a slice stores the values, dropping
+# bricks that become all zero.
+#
+class SparseArray:
+
+  def __init__(self, shape, dtype, brick_size = 32):
+
+    from numpy import dtype as numpy_dtype
+    self.shape = tuple(shape)
+    self.dtype = numpy_dtype(dtype)
+    self.brick_size = brick_size
+    self._bricks = {}          # Map (bk,bj,bi) to 3d numpy array
+    self._brick_keys = None    # Array of brick indices, None if bricks changed.
+
+  # ---------------------------------------------------------------------------
+  #
+  @classmethod
+  def from_array(cls, array, brick_size = 32):
+
+    s = cls(array.shape, array.dtype, brick_size)
+    s[...] = array
+    return s
+
+  # ---------------------------------------------------------------------------
+  #
+  ndim = property(lambda self: len(self.shape))
+
+  @property
+  def size(self):
+    from numpy import prod
+    return int(prod(self.shape))
+
+  @property
+  def nbytes(self):
+    '''Bytes used by stored bricks.'''
+    return sum(b.nbytes for b in self._bricks.values())
+
+  @property
+  def brick_count(self):
+    return len(self._bricks)
+
+  # ---------------------------------------------------------------------------
+  #
+  def __len__(self):
+    return self.shape[0]
+
+  # ---------------------------------------------------------------------------
+  #
+  def __array__(self, dtype = None, copy = None):
+    a = self[...]
+    return a if dtype is None else a.astype(dtype)
+
+  # ---------------------------------------------------------------------------
+  #
+  def __getitem__(self, key):
+
+    ranges, int_axes = self._index_ranges(key)
+    a = self._read_ranges(ranges)
+    if int_axes:
+      a = a[tuple((0 if axis in int_axes else slice(None)) for axis in range(self.ndim))]
+    return a
+
+  # ---------------------------------------------------------------------------
+  #
+  def __setitem__(self, key, values):
+
+    box, local_key = self._region_key(key)
+    region = self._read_box(box)
+    if region.size == 0:
+      return
+    region[local_key] = values
+    self._write_box(box, region)
+
+  # ---------------------------------------------------------------------------
+  #
+  def copy(self):
+
+    s = SparseArray(self.shape, self.dtype, self.brick_size)
+    s._bricks = {bijk:b.copy() for bijk, b in self._bricks.items()}
+    s._brick_keys = self._brick_keys
+    return s
+
+  # ---------------------------------------------------------------------------
+  #
+  def count_nonzero(self):
+    from numpy import count_nonzero
+    return sum(count_nonzero(b) for b in self._bricks.values())
+
+  # ---------------------------------------------------------------------------
+  # Return the sorted non-zero values present.
+  #
+  def labels(self):
+
+    from numpy import unique, concatenate, array
+    if len(self._bricks) == 0:
+      return array((), self.dtype)
+    u = unique(concatenate([unique(b) for b in self._bricks.values()]))
+    return u[u != 0]
+
+  # ---------------------------------------------------------------------------
+  # Convert an index key into a range of indices for each axis and the set of
+  # axes indexed by an integer.
+  #
+  def _index_ranges(self, key):
+
+    if not isinstance(key, tuple):
+      key = (key,)
+    if Ellipsis in key:
+      e = key.index(Ellipsis)
+      fill = (slice(None),) * (self.ndim - len(key) + 1)
+      key = key[:e] + fill + key[e+1:]
+    if len(key) > self.ndim:
+      raise IndexError('too many indices for sparse array: array is %d-dimensional, but %d were indexed'
+                       % (self.ndim, len(key)))
+    key = key + (slice(None),) * (self.ndim - len(key))
+
+    ranges, int_axes = [], set()
+    from numbers import Integral
+    for axis, (k, n) in enumerate(zip(key, self.shape)):
+      if isinstance(k, Integral):
+        i = int(k) + n if k < 0 else int(k)
+        if i < 0 or i >= n:
+          raise IndexError('index %d is out of bounds for axis with size %d' % (k, n))
+        ranges.append(range(i, i+1))
+        int_axes.add(axis)
+      elif isinstance(k, slice):
+        ranges.append(range(*k.indices(n)))
+      else:
+        raise TypeError('Sparse arrays only support integer and slice indexing, got %s'
+                        % type(k).__name__)
+    return ranges, int_axes
+
+  # ---------------------------------------------------------------------------
+  # Convert an index key into a bounding box ((k1,j1,i1), (k2,j2,i2)) with
+  # exclusive upper bounds, and a key that indexes the dense box array.
+  #
+  def _region_key(self, key):
+
+    ranges, int_axes = self._index_ranges(key)
+    lo, hi, local_key = [], [], []
+    for axis, r in enumerate(ranges):
+      if len(r) == 0:
+        lo.append(0)
+        hi.append(0)
+        local_key.append(slice(0,0))
+        continue
+      a, b = min(r[0], r[-1]), max(r[0], r[-1]) + 1
+      lo.append(a)
+      hi.append(b)
+      if axis in int_axes:
+        local_key.append(0)
+        continue
+      start, end = r[0] - a, r[-1] - a
+      if r.step > 0:
+        local_key.append(slice(start, end + 1, r.step))
+      else:
+        local_key.append(slice(start, (end - 1 if end > 0 else None), r.step))
+
+    return (tuple(lo), tuple(hi)), tuple(local_key)
+
+  # ---------------------------------------------------------------------------
+  #
+  def _stored_brick_keys(self):
+
+    if self._brick_keys is None:
+      from numpy import array, int64
+      self._brick_keys = array(tuple(self._bricks.keys()), int64).reshape((len(self._bricks), 3))
+    return self._brick_keys
+
+  # ---------------------------------------------------------------------------
+  #
+  def _brick_ranges(self, box):
+
+    lo, hi = box
+    bs = self.brick_size
+    return [range(a // bs, (b - 1) // bs + 1) if b > a else range(0)
+            for a, b in zip(lo, hi)]
+
+  # ---------------------------------------------------------------------------
+  #
+  def _brick_box(self, bijk):
+
+    bs = self.brick_size
+    lo = tuple(b*bs for b in bijk)
+    hi = tuple(min(l+bs, n) for l, n in zip(lo, self.shape))
+    return lo, hi
+
+  # ---------------------------------------------------------------------------
+  #
+  def _overlap(self, box, bijk):
+
+    (lo, hi), (blo, bhi) = box, self._brick_box(bijk)
+    olo = tuple(max(a, b) for a, b in zip(lo, blo))
+    ohi = tuple(min(a, b) for a, b in zip(hi, bhi))
+    region = tuple(slice(a-l, b-l) for a, b, l in zip(olo, ohi, lo))
+    brick = tuple(slice(a-l, b-l) for a, b, l in zip(olo, ohi, blo))
+    return region, brick
+
+  # ---------------------------------------------------------------------------
+  #
+  def _read_box(self, box):
+
+    lo, hi = box
+    return self._read_ranges([range(a, b) for a, b in zip(lo, hi)])
+
+  # ---------------------------------------------------------------------------
+  # Return a dense array of the values at the index ranges along each axis.
+  # Only stored bricks overlapping the ranges are visited and strided ranges
+  # copy just the sampled values of each brick.
+  #
+  def _read_ranges(self, ranges):
+
+    # Increasing ranges, the result is flipped for negative steps at the end.
+    franges = [r if r.step > 0 else r[::-1] for r in ranges]
+    from numpy import zeros
+    a = zeros(tuple(len(r) for r in franges), self.dtype)
+    if a.size == 0 or len(self._bricks) == 0:
+      return a
+
+    bs = self.brick_size
+    keys = self._stored_brick_keys()
+    bmin = [r[0] // bs for r in franges]
+    bmax = [r[-1] // bs for r in franges]
+    overlap = ((keys >= bmin) & (keys <= bmax)).all(axis = 1)
+    bricks = self._bricks
+    for bijk in keys[overlap].tolist():
+      aslice, bslice = [], []
+      for r, b in zip(franges, bijk):
+        b0, step = b*bs, r.step
+        # Positions p with b0 <= r[p] < b0 + bs.
+        p0 = max(0, -((r.start - b0) // step))
+        p1 = min(len(r), -((r.start - b0 - bs) // step))
+        if p1 <= p0:
+          break
+        aslice.append(slice(p0, p1))
+        i0 = r.start + p0*step - b0
+        bslice.append(slice(i0, i0 + (p1-p0-1)*step + 1, step))
+      else:
+        a[tuple(aslice)] = bricks[tuple(bijk)][tuple(bslice)]
+
+    if any(r.step < 0 for r in ranges):
+      a = a[tuple((slice(None,None,-1) if r.step < 0 else slice(None)) for r in ranges)]
+    return a
+
+  # ---------------------------------------------------------------------------
+  #
+  def _write_box(self, box, region):
+
+    from numpy import zeros
+    bricks = self._bricks
+    rk, rj, ri = self._brick_ranges(box)
+    for bk in rk:
+      for bj in rj:
+        for bi in ri:
+          bijk = (bk,bj,bi)
+          rslice, bslice = self._overlap(box, bijk)
+          values = region[rslice]
+          b = bricks.get(bijk)
+          if b is None:
+            if not values.any():
+              continue
+            blo, bhi = self._brick_box(bijk)
+            b = bricks[bijk] = zeros(tuple(h-l for l, h in zip(blo, bhi)), self.dtype)
+            self._brick_keys = None
+          b[bslice] = values
+          if not b.any():
+            del bricks[bijk]
+            self._brick_keys = None
+
+# -----------------------------------------------------------------------------
+# Grid data backed by a SparseArray.  Reading a region returns a dense copy
+# assembled from the bricks, which is not kept in the data cache, so
+# modifying the result of matrix() does not change the data.  Modify values
+# with set_matrix(), as code editing any grid in place should, then call
+# values_changed().
+#
+class SparseGridData(ArrayGridData):
+  '''
+  Create a GridData for label data that is mostly zero.  Only bricks of the
+  grid containing non-zero values use memory.
+
+  Attributes
+  ----------
+  array : :class:`.SparseArray`
+      Sparse data array with indices in z, y, x order.
+  '''
+
+  def __init__(self, size, value_type, origin = (0,0,0), step = (1,1,1),
+               cell_angles = (90,90,90), rotation = ((1,0,0),(0,1,0),(0,0,1)),
+               symmetries = (), name = '', brick_size = 32):
+
+    array = SparseArray(tuple(size)[::-1], value_type, brick_size)
+    ArrayGridData.__init__(self, array, origin = origin, step = step,
+                           cell_angles = cell_angles, rotation = rotation,
+                           symmetries = symmetries, name = name)
+
+  # ---------------------------------------------------------------------------
+  #
+  @classmethod
+  def from_array(cls, array, brick_size = 32, **kw):
+    g = cls(array.shape[::-1], array.dtype, brick_size = brick_size, **kw)
+    g.array[...] = array
+    return g
+
+  # ---------------------------------------------------------------------------
+  # Store new values for a box subregion.
+  #
+  def set_matrix(self, ijk_origin, values):
+
+    i1, j1, k1 = ijk_origin
+    ks, js, is_ = values.shape
+    self.array[k1:k1+ks, j1:j1+js, i1:i1+is_] = values
+
+  # ---------------------------------------------------------------------------
+  # Regions are read from the bricks each time rather than caching dense
+  # copies, which would use the memory the sparse array saves.
+  #
+  def cache_data(self, m, origin, size, step):
+    pass
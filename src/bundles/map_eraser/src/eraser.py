@@ -54,8 +54,9 @@ def _set_data_in_sphere(grid_data, center, radius, value = 0):
 
     from numpy import putmask
     putmask(dmatrix, mask, value)
+    subgrid.set_matrix((0,0,0), dmatrix)
 
-    grid_data.values_changed()
+    grid_data.values_changed(region = (ijk_min, ijk_max))
 
 # -----------------------------------------------------------------------------
 #
@@ -68,6 +69,7 @@ def _set_data_outside_sphere(grid_data, center, radius, value = 0):
 
     from numpy import putmask
     putmask(dmatrix, mask, value)
+    grid_data.set_matrix((0,0,0), dmatrix)
 
     grid_data.values_changed()
 
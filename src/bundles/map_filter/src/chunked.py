@@ -0,0 +1,184 @@
+# === UCSF ChimeraX Copyright ===
+# Copyright 2016 Regents of the University of California.
+# All rights reserved.  This software provided pursuant to a
+# license agreement containing restrictions on its disclosure,
+# duplication and use.  For details see:
+# https://www.rbvi.ucsf.edu/chimerax/docs/licensing.html
+# This notice must be embedded in or attached to all copies,
+# including partial copies, of the software or any revisions
+# or derivations thereof.
+# === UCSF ChimeraX Copyright ===
+
+# -----------------------------------------------------------------------------
+# Apply a local filter to a large map brick by brick.  Each brick is filtered
+# together with a surrounding halo of grid points wide enough that the filter
+# values inside the brick are the same as filtering the whole map.  Bricks are
+# computed in threads only when a region of the filtered map is read, so the
+# filtered map can be displayed or saved to a file plane by plane without
+# holding the full input or output map in memory.
+#
+
+# Map regions with at least this many grid points are filtered brick by brick.
+chunked_filter_voxels = 2**28
+
+# Grid points (x,y,z) in a brick, not counting the halo.
+chunked_filter_brick_size = (256,256,32)
+
+# -----------------------------------------------------------------------------
+#
+def use_chunked_filter(region):
+  '''Return whether a map region (ijk_min, ijk_max, ijk_step) is large enough to filter in bricks.'''
+  ijk_min, ijk_max, ijk_step = region
+  size = [max(0,(b-a+s)//s) for a,b,s in zip(ijk_min, ijk_max, ijk_step)]
+  return size[0]*size[1]*size[2] >= chunked_filter_voxels
+
+# -----------------------------------------------------------------------------
+#
+def chunked_filter_grid(v, region, filter, halo, value_type, name):
+  '''
+  Create a ChunkedFilterGrid for a region (ijk_min, ijk_max, ijk_step) of map v.
+  The filter is a function taking a 3d array and returning a filtered array of
+  the same shape.  Halo is the number of grid points (x,y,z) beyond a brick
+  that the filter uses.
+  '''
+  from chimerax.map_data import GridSubregion
+  g = GridSubregion(v.data, *region)
+  return ChunkedFilterGrid(g, filter, halo, value_type, name,
+                           brick_size = chunked_filter_brick_size)
+
+# -----------------------------------------------------------------------------
+#
+from chimerax.map_data import GridData
+class ChunkedFilterGrid(GridData):
+
+  def __init__(self, grid_data, filter, halo, value_type = None, name = None,
+               brick_size = (256,256,32), max_cached_bytes = 2**31, nthread = None):
+
+    self.grid_data = g = grid_data
+    self.filter = filter
+    self.halo = tuple(halo)
+    # Bricks must be at least twice the halo so filters that adapt to the
+    # array size, like the Gaussian kernel width, do not change.
+    self.brick_size = tuple(max(b, 2*h) for b,h in zip(brick_size, halo))
+    self.max_cached_bytes = max_cached_bytes
+    self.nthread = nthread
+    vt = (value_type or g.value_type)
+    settings = g.settings(value_type = vt, name = (name or g.name + ' filtered'))
+    GridData.__init__(self, **settings)
+    from collections import OrderedDict
+    self._bricks = OrderedDict()	# Map brick index (bi,bj,bk) to filtered array.
+    self._cached_bytes = 0
+
+  # ---------------------------------------------------------------------------
+  #
+  def read_matrix(self, ijk_origin, ijk_size, ijk_step, progress):
+
+    from numpy import empty
+    msize = [(s+st-1)//st for s,st in zip(ijk_size, ijk_step)]
+    m = empty(msize[::-1], self.value_type)
+
+    bricks = self._region_bricks(ijk_origin, ijk_size)
+    needed = [b for b in bricks if b not in self._bricks]
+    cached = [b for b in bricks if b in self._bricks]
+    for b in cached:
+      self._bricks.move_to_end(b)
+      self._copy_brick(b, self._bricks[b], m, ijk_origin, ijk_size, ijk_step)
+
+    # Compute a batch of bricks at a time in parallel to limit memory use.
+    # Map data is read in this thread since grid data reading and caching is
+    # not thread safe, only the filtering is done in the worker threads.
+    nthread = self._thread_count()
+    from chimerax.core.threadq import apply_to_list
+    for i in range(0, len(needed), nthread):
+      batch = needed[i:i+nthread]
+      args = [(b,) + self._brick_data(b) for b in batch]
+      results = apply_to_list(self._filter_brick, args, nthread = len(batch))
+      del args
+      for b, fb in results:
+        self._copy_brick(b, fb, m, ijk_origin, ijk_size, ijk_step)
+        self._cache_brick(b, fb)
+      if progress:
+        progress.fraction(min(1.0, (i + len(batch)) / len(needed)))
+
+    return m
+
+  # ---------------------------------------------------------------------------
+  #
+  def clear_cache(self):
+
+    GridData.clear_cache(self)
+    self._bricks.clear()
+    self._cached_bytes = 0
+
+  # ---------------------------------------------------------------------------
+  #
+  def _thread_count(self):
+    if self.nthread is not None:
+      return max(1, self.nthread)
+    from os import cpu_count
+    return cpu_count() or 1
+
+  # ---------------------------------------------------------------------------
+  #
+  def _region_bricks(self, ijk_origin, ijk_size):
+
+    ranges = [range(o//bs, (o+s-1)//bs + 1) if s > 0 else range(0)
+              for o,s,bs in zip(ijk_origin, ijk_size, self.brick_size)]
+    return [(bi,bj,bk) for bk in ranges[2] for bj in ranges[1] for bi in ranges[0]]
+
+  # ---------------------------------------------------------------------------
+  # Return brick (ijk_min, ijk_max) with exclusive maximum.
+  #
+  def _brick_box(self, b):
+
+    bmin = [bi*bs for bi,bs in zip(b, self.brick_size)]
+    bmax = [min(m+bs, s) for m,bs,s in zip(bmin, self.brick_size, self.size)]
+    return bmin, bmax
+
+  # ---------------------------------------------------------------------------
+  # Return the index origin and map values of a brick padded by the halo.
+  #
+  def _brick_data(self, b):
+
+    bmin, bmax = self._brick_box(b)
+    hmin = [max(0, m-h) for m,h in zip(bmin, self.halo)]
+    hmax = [min(s, m+h) for m,h,s in zip(bmax, self.halo, self.size)]
+    d = self.grid_data.matrix(hmin, [b-a for a,b in zip(hmin, hmax)])
+    return hmin, d
+
+  # ---------------------------------------------------------------------------
+  #
+  def _filter_brick(self, b, hmin, d):
+
+    bmin, bmax = self._brick_box(b)
+    fd = self.filter(d)
+    (i0,j0,k0), (i1,j1,k1) = [a-h for a,h in zip(bmin, hmin)], [b-h for b,h in zip(bmax, hmin)]
+    fb = fd[k0:k1,j0:j1,i0:i1].astype(self.value_type)	# Copy so halo is freed.
+    return b, fb
+
+  # ---------------------------------------------------------------------------
+  # Copy the grid points of a filtered brick that are in a subsampled region.
+  #
+  def _copy_brick(self, b, fb, m, ijk_origin, ijk_size, ijk_step):
+
+    bmin, bmax = self._brick_box(b)
+    mslice, bslice = [], []
+    for o,s,st,b0,b1 in zip(ijk_origin, ijk_size, ijk_step, bmin, bmax):
+      n0 = max(0, -((o - b0)//st))			# First region point in brick.
+      n1 = -((o - min(b1, o+s))//st)			# After last region point in brick.
+      if n1 <= n0:
+        return
+      p0 = o + n0*st - b0
+      mslice.append(slice(n0, n1))
+      bslice.append(slice(p0, p0 + (n1-n0-1)*st + 1, st))
+    m[tuple(mslice[::-1])] = fb[tuple(bslice[::-1])]
+
+  # ---------------------------------------------------------------------------
+  #
+  def _cache_brick(self, b, fb):
+
+    self._bricks[b] = fb
+    self._cached_bytes += fb.nbytes
+    while self._cached_bytes > self.max_cached_bytes and len(self._bricks) > 1:
+      ob, ofb = self._bricks.popitem(last = False)
+      self._cached_bytes -= ofb.nbytes
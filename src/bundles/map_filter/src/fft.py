@@ -0,0 +1,131 @@
+# === UCSF ChimeraX Copyright ===
+# Copyright 2016 Regents of the University of California.
+# All rights reserved.  This software provided pursuant to a
+# license agreement containing restrictions on its disclosure,
+# duplication and use.  For details see:
+# https://www.rbvi.ucsf.edu/chimerax/docs/licensing.html
+# This notice must be embedded in or attached to all copies,
+# including partial copies, of the software or any revisions
+# or derivations thereof.
+# === UCSF ChimeraX Copyright ===
+
+# -----------------------------------------------------------------------------
+# Shared FFT routines for map filters.  Uses scipy.fft which keeps single
+# precision results for single precision maps, computes many 1-d transforms
+# with multiple threads, and reuses FFT plans for repeated transform sizes.
+# Falls back to numpy.fft if scipy is not available.
+#
+
+_fft_threads = None     # None means use all cores.
+
+# Maximum bytes of real values transformed in one batch by axis_convolve().
+fft_batch_bytes = 2**26
+
+# -----------------------------------------------------------------------------
+#
+def set_fft_threads(nthread):
+  '''Set number of threads used for FFTs, None to use all cores.'''
+  global _fft_threads
+  _fft_threads = nthread
+
+# -----------------------------------------------------------------------------
+#
+def fft_threads():
+  if _fft_threads is not None:
+    return max(1, _fft_threads)
+  from os import cpu_count
+  return cpu_count() or 1
+
+# -----------------------------------------------------------------------------
+#
+def _fft_module():
+  try:
+    import scipy.fft
+  except ImportError:
+    return None
+  return scipy.fft
+
+# -----------------------------------------------------------------------------
+#
+def rfft(a, n = None, axis = -1):
+  sfft = _fft_module()
+  if sfft is None:
+    from numpy.fft import rfft as np_rfft
+    return np_rfft(a, n = n, axis = axis)
+  return sfft.rfft(a, n = n, axis = axis, workers = fft_threads())
+
+# -----------------------------------------------------------------------------
+#
+def irfft(a, n = None, axis = -1):
+  sfft = _fft_module()
+  if sfft is None:
+    from numpy.fft import irfft as np_irfft
+    return np_irfft(a, n = n, axis = axis)
+  return sfft.irfft(a, n = n, axis = axis, workers = fft_threads(), overwrite_x = True)
+
+# -----------------------------------------------------------------------------
+#
+def rfftn(a):
+  sfft = _fft_module()
+  if sfft is None:
+    from numpy.fft import rfftn as np_rfftn
+    return np_rfftn(a)
+  return sfft.rfftn(a, workers = fft_threads())
+
+# -----------------------------------------------------------------------------
+# Convolve array along one axis in place with a kernel given in Fourier space
+# (or divide by it if invert is true).  Many 1-d transforms are computed in
+# each call to use multiple threads, limited in size to bound memory use.
+# The work buffer holding zero padded input is reused between batches, the
+# padding beyond the data stays zero.
+#
+def axis_convolve(c, axis, fkernel, n, invert = False, progress = None):
+
+  from numpy import swapaxes, multiply, divide, zeros, float64
+  cs = swapaxes(c, axis, 2)     # Make axis 2 the FT axis.
+  s0, s1, size = cs.shape
+  # Dividing by small kernel values when sharpening needs double precision.
+  vt = float64 if invert else c.dtype
+  rows = max(1, fft_batch_bytes // (n * c.itemsize))
+  planes = max(1, min(s0, rows // s1))
+  buf = zeros((planes, s1, n), vt)
+  for p in range(0, s0, planes):
+    pn = min(planes, s0-p)
+    b = buf[:pn]
+    b[:,:,:size] = cs[p:p+pn]
+    try:
+      ft = rfft(b)
+    except ValueError as e:
+      raise MemoryError(e)      # Array dimensions too large.
+    if invert:
+      divide(ft, fkernel, ft)
+    else:
+      multiply(ft, fkernel, ft)
+    cs[p:p+pn] = irfft(ft, n = n)[:,:,:size]
+    if progress:
+      progress(float(p+pn)/s0)
+
+# -----------------------------------------------------------------------------
+# Fourier transform magnitude or phase of a real 3-d array with the same
+# shape as the full complex transform.  Uses a real-to-complex transform
+# and Hermitian symmetry F(-k) = conj(F(k)) to fill in the other half.
+#
+def real_fft_amplitudes(m, phase = False):
+
+  from numpy import absolute, angle, float32, empty, arange, ix_
+  rft = rfftn(m)
+  h = angle(rft).astype(float32) if phase else absolute(rft).astype(float32)
+  rft = None            # Release memory
+
+  ks, js, iz = m.shape
+  nh = h.shape[2]
+  full = empty(m.shape, float32)
+  full[:,:,:nh] = h
+  if iz > nh:
+    kk = (-arange(ks)) % ks
+    jj = (-arange(js)) % js
+    ii = iz - arange(nh, iz)
+    full[:,:,nh:] = h[ix_(kk, jj, ii)]
+    if phase:
+      full[:,:,nh:] *= -1
+  return full
@@ -17,17 +17,13 @@ def fourier_transform(v, step = None, subregion = None, model_id = None,
                       phase = False):
 
   m = v.matrix(step = step, subregion = subregion)
-  from numpy.fft import fftn
-  cftm = fftn(m)      # Complex128 result, same array size as input
-
-  from numpy import absolute, angle, float32
-  if phase:
-    aftm = angle(cftm).astype(float32)          # Radians
-  else:
-    aftm = absolute(cftm).astype(float32)
+  # Real-to-complex transform computes half the complex values, the rest
+  # follow by symmetry.
+  from .fft import real_fft_amplitudes
+  aftm = real_fft_amplitudes(m, phase)	# Float32, radians for phase
+  if not phase:
     aftm *= 1.0/aftm.size       # Normalization
     aftm[0,0,0] = 0     # Constant term often huge making histogram hard to use
-  cftm = None           # Release memory
   ftm = fftshift(aftm)
   aftm = None           # Release memory
 
@@ -43,33 +43,47 @@ def gaussian_grid(volume, sdev, step = 1, subregion = None, region = None,
   sdev3 = (sdev,sdev,sdev) if isinstance(sdev,(float,int)) else sdev
   ijk_sdev = [float(sd)/s for sd,s in zip(sdev3,step)]
 
+  d = v.data
+  suffix = 'sharpen' if invert else 'gaussian'
+  if v.name.endswith(suffix): name = v.name
+  else:                       name = '%s %s' % (v.name, suffix)
+
+  from .chunked import use_chunked_filter, chunked_filter_grid
+  if not invert and use_chunked_filter(region):
+    # Sharpening is not local so only smoothing is done in bricks.
+    def filter(m, ijk_sdev = ijk_sdev, value_type = value_type):
+      return gaussian_convolution(m, ijk_sdev, value_type = value_type)
+    size = v.matrix_size(region = region)
+    halo = [min(s//2, int(gaussian_cutoff*sd+1)) for s,sd in zip(size, ijk_sdev)]
+    vt = d.value_type if value_type is None else value_type
+    return chunked_filter_grid(v, region, filter, halo, vt, name)
+
   m = v.region_matrix(region)
   gm = gaussian_convolution(m, ijk_sdev, value_type = value_type,
                             invert = invert, task = task)
 
   from chimerax.map_data import ArrayGridData
-  d = v.data
-  suffix = 'sharpen' if invert else 'gaussian'
-  if v.name.endswith(suffix): name = v.name
-  else:                       name = '%s %s' % (v.name, suffix)
   gg = ArrayGridData(gm, origin, step, d.cell_angles, d.rotation,
                      name = name)
   return gg
 
+# Gaussian is truncated at this many standard deviations.
+gaussian_cutoff = 5
+
 # -----------------------------------------------------------------------------
 # Compute with zero padding in real-space to avoid cyclic-convolution.
 #
 def gaussian_convolution(data, ijk_sdev, value_type = None,
-                         cyclic = False, cutoff = 5, invert = False, task = None):
+                         cyclic = False, cutoff = gaussian_cutoff, invert = False, task = None):
 
   if value_type is None:
     value_type = data.dtype
 
-  from numpy import array, float32, float64, multiply, divide, swapaxes
+  from numpy import array, float32, float64
   vt = value_type if value_type == float32 or value_type == float64 else float32
   c = array(data, vt)
 
-  from numpy.fft import rfft, irfft
+  from .fft import axis_convolve
   for axis in range(3):           # Transform one axis at a time.
     size = c.shape[axis]
     if size == 1:
@@ -81,31 +95,39 @@ def gaussian_convolution(data, ijk_sdev, value_type = None,
       # FFT performance is much better (up to 10x faster in numpy 1.2.1)
       # than other sizes.
       nzeros = efficient_fft_size(size + nzeros) - size
-    g = gaussian(sdev, size + nzeros, vt)
-    g[hw:-hw] = 0
-    fg = rfft(g)                  # Fourier transform of 1-d gaussian.
-    cs = swapaxes(c, axis, 2)     # Make axis 2 the FT axis.
-    s0 = cs.shape[0]
-    for p in range(s0):  # Transform one plane at a time.
-      cp = cs[p,...]
-      try:
-        ft = rfft(cp, n=len(g))   # Complex128 result, size n/2+1
-      except ValueError as e:
-        raise MemoryError(e)      # Array dimensions too large.
-      if invert:
-        divide(ft, fg, ft)
-      else:
-        multiply(ft, fg, ft)
-      cp[:,:] = irfft(ft)[:,:size] # Float64 result
-      if task:
-        pct = 100.0 * (axis + float(p)/s0) / 3.0
-        task.updateStatus('%.0f%%' % pct)
+    n = size + nzeros
+    fg = gaussian_transform(sdev, n, hw, vt, double = invert)
+    if task:
+      def progress(f, axis = axis):
+        task.updateStatus('%.0f%%' % (100.0 * (axis + f) / 3.0))
+    else:
+      progress = None
+    axis_convolve(c, axis, fg, n, invert = invert, progress = progress)
 
   if value_type != vt:
     return c.astype(value_type)
 
   return c
 
+# -----------------------------------------------------------------------------
+# Fourier transform of 1-d gaussian truncated at half-width hw.  Cached
+# since the same widths are often used repeatedly, for example from a slider.
+# Double precision transform is used for dividing when sharpening.
+#
+from functools import lru_cache
+@lru_cache(maxsize = 32)
+def gaussian_transform(sdev, size, hw, value_type, double = False):
+
+  g = gaussian(sdev, size, value_type)
+  g[hw:-hw] = 0
+  if double:
+    from numpy import float64
+    g = g.astype(float64)
+  from .fft import rfft
+  fg = rfft(g)
+  fg.flags.writeable = False
+  return fg
+
 # -----------------------------------------------------------------------------
 #
 def gaussian(sdev, size, value_type):
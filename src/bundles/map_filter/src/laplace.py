@@ -20,7 +20,32 @@
 #
 def laplacian(v, step = None, subregion = None, model_id = None):
 
-  m = v.matrix(step = step, subregion = subregion)
+  region = v.subregion(step, subregion)
+  from .chunked import use_chunked_filter, chunked_filter_grid
+  if use_chunked_filter(region):
+    from numpy import float32
+    ld = chunked_filter_grid(v, region, laplacian_array, (1,1,1), float32,
+                             v.name + ' Laplacian')
+  else:
+    lm = laplacian_array(v.matrix(step = step, subregion = subregion))
+    origin, step = v.data_origin_and_step(subregion = subregion, step = step)
+    d = v.data
+    from chimerax.map_data import ArrayGridData
+    ld = ArrayGridData(lm, origin, step, d.cell_angles, d.rotation,
+                       name = v.name + ' Laplacian')
+  ld.polar_values = True
+  from chimerax.map import volume_from_grid_data
+  lv = volume_from_grid_data(ld, v.session, model_id = model_id)
+  lv.copy_settings_from(v, copy_thresholds = False, copy_colors = False)
+  lv.set_parameters(cap_faces = False)
+  
+  v.display = False          # Hide original map
+
+  return lv
+
+# -----------------------------------------------------------------------------
+#
+def laplacian_array(m):
 
   from numpy import float32, multiply, add
   lm = m.astype(float32)        # Copy array
@@ -39,17 +64,4 @@ def laplacian(v, step = None, subregion = None, model_id = None):
   lm[:,:,0] = 0
   lm[:,:,-1] = 0
 
-  origin, step = v.data_origin_and_step(subregion = subregion, step = step)
-  d = v.data
-  from chimerax.map_data import ArrayGridData
-  ld = ArrayGridData(lm, origin, step, d.cell_angles, d.rotation,
-                       name = v.name + ' Laplacian')
-  ld.polar_values = True
-  from chimerax.map import volume_from_grid_data
-  lv = volume_from_grid_data(ld, v.session, model_id = model_id)
-  lv.copy_settings_from(v, copy_thresholds = False, copy_colors = False)
-  lv.set_parameters(cap_faces = False)
-  
-  v.display = False          # Hide original map
-
-  return lv
+  return lm
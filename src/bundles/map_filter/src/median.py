@@ -35,15 +35,24 @@ def median_grid(volume, bin_size = 3, iterations = 1,
 
   origin, step = v.region_origin_and_step(region)
 
-  vm = v.region_matrix(region)
-  m = vm
-  for i in range(iterations):
-    m = median_array(m, bin_size)
-
-  from chimerax.map_data import ArrayGridData
   d = v.data
   if v.name.endswith('median'): name = v.name
   else:                         name = '%s median' % v.name
+
+  def filter(m, bin_size = bin_size, iterations = iterations):
+    for i in range(iterations):
+      m = median_array(m, bin_size)
+    return m
+
+  from .chunked import use_chunked_filter, chunked_filter_grid
+  if use_chunked_filter(region):
+    bsize = (bin_size,)*3 if isinstance(bin_size, int) else bin_size
+    halo = [iterations*((b-1)//2) for b in bsize]
+    return chunked_filter_grid(v, region, filter, halo, d.value_type, name)
+
+  m = filter(v.region_matrix(region))
+
+  from chimerax.map_data import ArrayGridData
   mg = ArrayGridData(m, origin, step, d.cell_angles, d.rotation,
                      name = name)
   return mg
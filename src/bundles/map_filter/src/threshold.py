@@ -38,7 +38,30 @@ def threshold_grid(volume, minimum = None, set_minimum = None,
 
   origin, step = v.region_origin_and_step(region)
 
-  m = v.region_matrix(region).copy()
+  d = v.data
+  if v.name.endswith('thresholded'): name = v.name
+  else:                         name = '%s thresholded' % v.name
+
+  def filter(m):
+    return threshold_array(m, minimum, set_minimum, maximum, set_maximum)
+
+  from .chunked import use_chunked_filter, chunked_filter_grid
+  if use_chunked_filter(region):
+    return chunked_filter_grid(v, region, filter, (0,0,0), d.value_type, name)
+
+  m = filter(v.region_matrix(region))
+
+  from chimerax.map_data import ArrayGridData
+  tg = ArrayGridData(m, origin, step, d.cell_angles, d.rotation,
+                     name = name)
+  return tg
+
+# -----------------------------------------------------------------------------
+#
+def threshold_array(m, minimum = None, set_minimum = None,
+                    maximum = None, set_maximum = None):
+
+  m = m.copy()
 
   import numpy
   from numpy import array, putmask
@@ -55,10 +78,4 @@ def threshold_grid(volume, minimum = None, set_minimum = None,
     else:
       putmask(m, m > t, array(set_maximum, m.dtype))
 
-  from chimerax.map_data import ArrayGridData
-  d = v.data
-  if v.name.endswith('thresholded'): name = v.name
-  else:                         name = '%s thresholded' % v.name
-  tg = ArrayGridData(m, origin, step, d.cell_angles, d.rotation,
-                     name = name)
-  return tg
+  return m
@@ -856,6 +856,7 @@ def set_box_value(data, value, ijk_min, ijk_max, outside = False):
 
     m = data.matrix(ijk_origin, ijk_size)
     m[:,:,:] = value
+    data.set_matrix(ijk_origin, m)
 
 # -----------------------------------------------------------------------------
 #
@@ -1090,6 +1091,7 @@ def flip_operation(v, axes, subregion, step, in_place, model_id):
             raise CommandError("Can't flip a subregion of a volume in-place: %s" % v.name)
         m = v.data.full_matrix()
         flip.flip_in_place(m, axes)
+        v.data.set_matrix((0,0,0), m)
         v.data.values_changed()
         return v
     else:
@@ -0,0 +1,92 @@
+import pytest
+
+from chimerax.core.commands import run
+
+filter_commands = [
+    "volume gaussian #1 sdev 1.5",
+    "volume median #1 binSize 3 iterations 2",
+    "volume threshold #1 minimum 0.3 set 0 maximum 0.8 setMaximum 1",
+    "volume laplacian #1",
+]
+
+
+def _open_test_map(session):
+    from numpy import random, float32
+    from chimerax.map_data import ArrayGridData
+    from chimerax.map import volume_from_grid_data
+
+    values = random.default_rng(7).random((30, 37, 41)).astype(float32)
+    return volume_from_grid_data(ArrayGridData(values), session)
+
+
+@pytest.mark.parametrize("command", filter_commands)
+def test_chunked_filter_matches_unchunked(test_production_session, monkeypatch, command):
+    from chimerax.map_filter import chunked
+    from chimerax.map_filter.chunked import ChunkedFilterGrid
+
+    session = test_production_session
+    _open_test_map(session)
+    full = run(session, command)
+    assert not isinstance(full.data, ChunkedFilterGrid)
+
+    monkeypatch.setattr(chunked, "chunked_filter_voxels", 1000)
+    monkeypatch.setattr(chunked, "chunked_filter_brick_size", (16, 16, 8))
+    bricked = run(session, command)
+    assert isinstance(bricked.data, ChunkedFilterGrid)
+    assert len(bricked.data._region_bricks((0, 0, 0), bricked.data.size)) > 1
+
+    fm, bm = full.full_matrix(), bricked.full_matrix()
+    assert bm.shape == fm.shape
+    assert bm.dtype == fm.dtype
+    assert abs(bm - fm).max() <= 1e-5 * max(1.0, abs(fm).max())
+
+
+def _previous_gaussian_convolution(data, ijk_sdev, invert=False):
+    # Plane by plane numpy transforms used before the shared fft module.
+    from numpy import array, float32, swapaxes, multiply, divide
+    from numpy.fft import rfft, irfft
+    from chimerax.map_filter.gaussian import gaussian, efficient_fft_size, gaussian_cutoff
+
+    c = array(data, float32)
+    for axis in range(3):
+        size = c.shape[axis]
+        sdev = ijk_sdev[2 - axis]
+        hw = min(size // 2, int(gaussian_cutoff * sdev + 1))
+        nzeros = efficient_fft_size(size + hw) - size
+        g = gaussian(sdev, size + nzeros, float32)
+        g[hw:-hw] = 0
+        fg = rfft(g)
+        cs = swapaxes(c, axis, 2)
+        for p in range(cs.shape[0]):
+            cp = cs[p, ...]
+            ft = rfft(cp, n=len(g))
+            if invert:
+                divide(ft, fg, ft)
+            else:
+                multiply(ft, fg, ft)
+            cp[:, :] = irfft(ft)[:, :size]
+    return c
+
+
+@pytest.mark.parametrize("invert, sdev", [(False, (1.5, 2.0, 1.0)), (True, (0.6, 0.5, 0.7))])
+def test_gaussian_matches_previous_result(monkeypatch, invert, sdev):
+    from numpy import random, float32
+    from chimerax.map_filter import fft
+    from chimerax.map_filter.gaussian import gaussian_convolution, gaussian_transform
+
+    # Small batches so several batches reuse the work buffer.
+    monkeypatch.setattr(fft, "fft_batch_bytes", 2**12)
+    data = random.default_rng(3).random((20, 27, 33)).astype(float32)
+    gaussian_transform.cache_clear()
+    expected = _previous_gaussian_convolution(data, sdev, invert=invert)
+    for repeat in range(2):
+        result = gaussian_convolution(data, sdev, invert=invert)
+        assert result.dtype == float32
+        assert abs(result - expected).max() <= 1e-5 * abs(expected).max()
+    # Second pass reuses the three cached kernel transforms.
+    assert gaussian_transform.cache_info().hits >= 3
+    fg = gaussian_transform(sdev[0], 64, 5, float32, double=invert)
+    assert fg is gaussian_transform(sdev[0], 64, 5, float32, double=invert)
+    assert not fg.flags.writeable
+    if invert:
+        assert fg.dtype == "complex128"
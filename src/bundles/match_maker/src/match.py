@@ -33,6 +33,7 @@ from .settings import defaults
 default_ss_matrix = defaults['ss_scores']
 
 from chimerax.core.errors import UserError, LimitationError
+from chimerax.core.state import StateManager
 
 # called recursively, so any changes to calling signature need to happen
 # in recursive call too...
@@ -73,16 +74,27 @@ def align(session, ref, match, matrix_name, algorithm, gap_open, gap_extend, dss
                 if not keep_computed_ss and keep_computed_ss is not None:
                     s.ss_change_notify = False
                 dssp.compute_ss(s)
+    ss_items = None if not ss_matrix else tuple(sorted(ss_matrix.items()))
+    cache_key = _alignment_cache_key(ref, match, matrix_name, algorithm, (gap_open, gap_extend,
+        ss_items, ss_fraction, gap_open_helix, gap_open_strand, gap_open_other))
+    alignments = _seq_alignment_cache(session).alignments
     if algorithm == "nw":
         from chimerax.alignment_algs import NeedlemanWunsch
-        score, seqs = NeedlemanWunsch.nw(ref, match,
-            score_gap=-gap_extend, score_gap_open=0-gap_open,
-            similarity_matrix=similarity_matrix, return_seqs=True,
-            ss_matrix=ss_matrix, ss_fraction=ss_fraction,
-            gap_open_helix=-gap_open_helix,
-            gap_open_strand=-gap_open_strand,
-            gap_open_other=-gap_open_other)
-        gapped_ref, gapped_match = seqs
+        cached = alignments.get(cache_key)
+        if cached is None:
+            score, match_list = NeedlemanWunsch.nw(ref, match,
+                score_gap=-gap_extend, score_gap_open=0-gap_open,
+                similarity_matrix=similarity_matrix, return_seqs=False,
+                ss_matrix=ss_matrix, ss_fraction=ss_fraction,
+                gap_open_helix=-gap_open_helix,
+                gap_open_strand=-gap_open_strand,
+                gap_open_other=-gap_open_other)
+            alignments[cache_key] = (score, list(match_list))
+        else:
+            score, match_list = cached
+        # matches_to_gapped_seqs() reorders the list it is given, so pass a copy
+        gapped_ref, gapped_match = NeedlemanWunsch.matches_to_gapped_seqs(list(match_list),
+            ref, match)
     elif algorithm == "sw":
         def ss_let(r):
             if not r:
@@ -101,15 +113,20 @@ def align(session, ref, match, matrix_name, algorithm, gap_open, gap_extend, dss
             for let in "HSO ":
                 ssm[(let, ' ')] = 0.0
                 ssm[(' ', let)] = 0.0
-        from chimerax.alignment_algs import SmithWaterman
-        score, alignment = SmithWaterman.align(ref.characters, match.characters,
-            similarity_matrix, float(gap_open), float(gap_extend),
-            gap_char=".", ss_matrix=ssm, ss_fraction=ssf,
-            gap_open_helix=float(gap_open_helix),
-            gap_open_strand=float(gap_open_strand),
-            gap_open_other=float(gap_open_other),
-            ss1="".join([ss_let(r) for r in ref.residues]),
-            ss2="".join([ss_let(r) for r in match.residues]))
+        cached = alignments.get(cache_key)
+        if cached is None:
+            from chimerax.alignment_algs import SmithWaterman
+            score, alignment = SmithWaterman.align(ref.characters, match.characters,
+                similarity_matrix, float(gap_open), float(gap_extend),
+                gap_char=".", ss_matrix=ssm, ss_fraction=ssf,
+                gap_open_helix=float(gap_open_helix),
+                gap_open_strand=float(gap_open_strand),
+                gap_open_other=float(gap_open_other),
+                ss1="".join([ss_let(r) for r in ref.residues]),
+                ss2="".join([ss_let(r) for r in match.residues]))
+            alignments[cache_key] = (score, alignment)
+        else:
+            score, alignment = cached
         from chimerax.atomic import StructureSeq, Sequence
         gapped_ref = StructureSeq(structure=ref.structure, chain_id=ref.chain_id)
         gapped_ref.name = ref.structure.name
@@ -192,6 +209,57 @@ def align(session, ref, match, matrix_name, algorithm, gap_open, gap_extend, dss
             _dm_cleanup.append(aligned)
     return score, gapped_ref, gapped_match
 
+# Sequence alignments computed by matchmaker, keyed by the sequences, their
+# secondary structure and the alignment parameters, so that chains identical to
+# ones already aligned (e.g. many predicted models of one sequence) reuse the
+# alignment.
+class _SeqAlignmentCache(StateManager):
+    def __init__(self, session):
+        self.alignments = {}
+        self.init_state_manager(session, 'matchmaker alignment cache')
+        from chimerax.atomic import get_triggers
+        self._handler = get_triggers().add_handler('changes', self._atomic_changes)
+
+    def _atomic_changes(self, trig_name, changes):
+        # Drop alignments when sequences change so the cache does not grow
+        # with alignments of sequences that no longer exist.
+        if self.alignments and (changes.num_deleted_residues() > 0
+                or changes.created_residues(include_new_structures=False)
+                or 'name changed' in changes.residue_reasons()):
+            self.alignments.clear()
+
+    def destroy(self):
+        from chimerax.atomic import get_triggers
+        get_triggers().remove_handler(self._handler)
+        self.alignments.clear()
+        super().destroy()
+
+    def reset_state(self, session):
+        self.alignments.clear()
+
+    def include_state(self):
+        return False
+
+    def take_snapshot(self, session, flags):
+        return {}
+
+    @classmethod
+    def restore_snapshot(cls, session, data):
+        return _seq_alignment_cache(session)
+
+def _seq_alignment_cache(session):
+    cache = getattr(session, '_matchmaker_alignment_cache', None)
+    if cache is None:
+        session._matchmaker_alignment_cache = cache = _SeqAlignmentCache(session)
+    return cache
+
+def _alignment_cache_key(ref, match, matrix_name, algorithm, params):
+    def ss_string(seq):
+        return "".join([(' ' if not r else ('H' if r.is_helix else ('S' if r.is_strand else 'O')))
+            for r in seq.residues])
+    return (algorithm, matrix_name, params, ref.characters, ss_string(ref),
+        match.characters, ss_string(match))
+
 def match(session, chain_pairing, match_items, matrix, alg, gap_open, gap_extend, *, cutoff_distance=None,
         show_alignment=defaults['show_alignment'], align=align, domain_residues=(None, None), bring=None,
         verbose=defaults['verbose_logging'], always_raise_errors=False, report_matrix=False,
@@ -770,8 +838,30 @@ def cmd_match(session, match_atoms, to=None, pairing=defaults["chain_pairing"],
         domain_residues=(ref_atoms.residues.unique(), match_atoms.residues.unique()),
         gap_open_helix=hgap, gap_open_strand=sgap, gap_open_other=ogap, report_matrix=report_matrix,
         compute_ss=compute_s_s, keep_computed_ss=keep_computed_s_s, verbose=verbose)
+    if len(ret_vals) > 5 and verbose is not None:
+        report_rmsd_table(session.logger, ret_vals)
     return ret_vals
 
+def report_rmsd_table(logger, ret_vals):
+    """log a table of RMSDs for each match/reference chain pairing"""
+    from chimerax.core.logger import html_table_params
+    rows = []
+    for rv in ret_vals:
+        ref_seq, match_seq = rv["aligned ref seq"], rv["aligned match seq"]
+        rows.append("<tr><td>%s</td><td>%s</td><td align=\"right\">%d</td><td align=\"right\">%.3f</td>"
+            "<td align=\"right\">%d</td><td align=\"right\">%.3f</td></tr>" % (
+            match_seq.full_name, ref_seq.full_name, len(rv["final match atoms"]), rv["final RMSD"],
+            len(rv["full match atoms"]), rv["full RMSD"]))
+    logger.info("""
+        <table %s>
+            <tr>
+                <th>Match</th> <th>Reference</th> <th>Pruned pairs</th> <th>RMSD</th>
+                <th>All pairs</th> <th>RMSD</th>
+            </tr>
+            %s
+        </table>
+    """ % (html_table_params, "\n".join(rows)), is_html=True)
+
 _dm_cleanup = []
 def check_domain_matching(chains, sel_residues):
     if not sel_residues:
@@ -3,3 +3,25 @@ def test_match_maker(test_production_session):
     session = test_production_session
     run(session, "open 1mtx")
     run(session, "mm #1.2-23 to #1.1")
+
+def test_match_maker_alignment_cache(test_production_session):
+    from chimerax.core.commands import run
+    from chimerax.atomic import check_for_changes
+    from chimerax.match_maker.match import _seq_alignment_cache
+    session = test_production_session
+    run(session, "open 1mtx")
+    first = run(session, "mm #1.2 to #1.1")
+    alignments = _seq_alignment_cache(session).alignments
+    num_cached = len(alignments)
+    assert num_cached > 0
+    second = run(session, "mm #1.2 to #1.1")
+    assert len(alignments) == num_cached
+    assert second[0]["full RMSD"] == first[0]["full RMSD"]
+    assert len(second[0]["final match atoms"]) == len(first[0]["final match atoms"])
+
+    run(session, "delete #1.2:1-3")
+    check_for_changes(session)
+    assert len(alignments) == 0
+    third = run(session, "mm #1.2 to #1.1")
+    assert len(alignments) > 0
+    assert len(third[0]["full match atoms"]) < len(first[0]["full match atoms"])
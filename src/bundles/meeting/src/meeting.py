@@ -727,7 +727,7 @@ def _meeting_participant(session, create = False, start_hub = False, meeting_nam
 #
 class MeetingParticipant:
     def __init__(self, session, start_hub = False, meeting_name = None):
-        self._version = 1		# Message protocol version
+        self._version = 2		# Message protocol version
         self._closed = False
         self._meeting_name = meeting_name  # Used for authentication
         self._session = session
@@ -741,6 +741,9 @@ class MeetingParticipant:
         self._vr_tracker = None
         self._copy_scene = False
         self._received_scene = start_hub
+        self._scene_offers = {}		# Map participant id to {chunk hash: compressed chunk}
+        self._pending_scene = None	# Scene chunks being received
+        self._atom_change_sync = None	# AtomChangeSync sends atom changes not made by commands
 
         self._non_synced_commands = ['meeting', 'vr', 'quit']
         self._command_handlers = []	# Trigger handlers to capture executed commands
@@ -855,21 +858,33 @@ class MeetingParticipant:
         # and cleaning up meeting models raises errors.
         self.close()
 
-    def send_scene(self):
+    def send_scene(self, to = None):
+        '''
+        Send the scene to all other participants, or only to the participant
+        with id "to".  The hashes of the session chunks are sent and each
+        participant requests the chunks not already in its chunk cache.
+        '''
         if self._session.models.empty():
             return
-        session_bytes = self._encode_session()
-        # Send size of session to allow progress status messages.
-        self._send_message({'session size': len(session_bytes)})
-        self._send_message({'session': session_bytes})
+        chunks = _scene_chunks(self._encode_session(compress = False))
+        self._scene_offers[to] = offer = dict(chunks)
+        # Participants request chunks as soon as they get the chunk hashes,
+        # so drop the offer after a while to free the scene memory.
+        _set_timer(_scene_offer_timeout, lambda: self._expire_scene_offer(to, offer))
+        msg = {'scene chunks': [h for h, cbytes in chunks]}
+        if to is not None:
+            msg['to'] = to
+        self._send_message(msg)
             
-    def _encode_session(self):
+    def _encode_session(self, compress = True):
         from io import BytesIO
         stream = BytesIO()
         from chimerax.vive import xr
         xr.save_camera_in_session(self._session, False)
         self._session.save(stream, version=3, include_maps=True)
         xr.save_camera_in_session(self._session, True)
+        if not compress:
+            return stream.getbuffer()
         from lz4.frame import compress
         sbytes = compress(stream.getbuffer())
         return sbytes
@@ -882,12 +897,79 @@ class MeetingParticipant:
         from lz4.frame import decompress
         sbytes = decompress(session_bytes)
         from io import BytesIO
-        stream = BytesIO(sbytes)
+        self._restore_session_stream(BytesIO(sbytes))
+
+    def _restore_session_stream(self, stream):
+        ses = self._session
         restore_camera = (ses.main_view.camera.name != 'vr')
         ses.restore(stream, resize_window = False,
                     restore_camera = restore_camera,
                     clear_log = False)
         self._received_scene = True
+        if self._atom_change_sync:
+            self._atom_change_sync.reset()
+
+    def _scene_chunks_offered(self, msg):
+        hashes = msg['scene chunks']
+        cache = _scene_chunk_cache()
+        chunks = {}
+        for h in set(hashes):
+            cbytes = cache.chunk(h)
+            if cbytes is not None:
+                chunks[h] = cbytes
+        need = [h for h in dict.fromkeys(hashes) if h not in chunks]
+        self._pending_scene = (hashes, chunks, set(need))
+        if need:
+            self._session.logger.status('Requesting %d of %d scene chunks from meeting participant'
+                                        % (len(need), len(chunks) + len(need)))
+            self._send_message({'need chunks': need, 'to': msg['id']})
+        else:
+            self._restore_pending_scene()
+
+    def _expire_scene_offer(self, to, offer):
+        if self._scene_offers.get(to) is offer:
+            del self._scene_offers[to]
+
+    def _send_scene_chunks(self, msg):
+        to = msg['id']
+        offer = self._scene_offers.pop(to, None) or self._scene_offers.get(None, {})
+        for h in msg['need chunks']:
+            cbytes = offer.get(h)
+            if cbytes is not None:
+                self._send_message({'scene chunk': cbytes, 'to': to})
+
+    def _scene_chunk_received(self, msg):
+        if self._pending_scene is None:
+            return
+        hashes, chunks, need = self._pending_scene
+        cbytes = msg['scene chunk']
+        h = _scene_chunk_hash(cbytes)
+        if h not in need:
+            return
+        need.remove(h)
+        chunks[h] = cbytes
+        _scene_chunk_cache().add_chunk(h, cbytes)
+        self._session.logger.status('Received %d of %d scene chunks'
+                                    % (len(chunks), len(chunks) + len(need)))
+        if not need:
+            self._restore_pending_scene()
+
+    def _restore_pending_scene(self):
+        hashes, chunks, need = self._pending_scene
+        self._pending_scene = None
+        from io import BytesIO
+        stream = BytesIO()
+        from lz4.frame import decompress
+        for h in hashes:
+            stream.write(decompress(chunks[h]))
+        chunks.clear()
+        stream.seek(0)
+        self._session.logger.status('Received scene data (%.1f Mbytes)'
+                                    % (stream.getbuffer().nbytes / 2**20))
+        self._restore_session_stream(stream)
+        _scene_chunk_cache().prune()
+        if self._hub:
+            self._hub._scene_restored()
 
     def send_and_receive_commands(self, enable=True): 
         h = self._command_handlers
@@ -899,11 +981,14 @@ class MeetingParticipant:
             h = [triggers.add_handler('command finished', self._ran_command),
                  triggers.add_handler('motion command', self._motion_command)]
             self._command_handlers = h
+            self._atom_change_sync = AtomChangeSync(ses, self)
         elif not enable and h:
             enable_motion_commands(ses, False)
             for handler in h:
                 triggers.remove_handler(handler)
             self._command_handlers.clear()
+            self._atom_change_sync.delete()
+            self._atom_change_sync = None
 
     def _ran_command(self, trigger_name, command, motion = False):
         if self._running_received_command:
@@ -964,6 +1049,14 @@ class MeetingParticipant:
             msg_stream.status_message_size = msg['session size']
         if 'command' in msg:
             self._run_command(msg)
+        if 'scene chunks' in msg:
+            self._scene_chunks_offered(msg)
+        if 'need chunks' in msg:
+            self._send_scene_chunks(msg)
+        if 'scene chunk' in msg:
+            self._scene_chunk_received(msg)
+        if 'atom changes' in msg and self._atom_change_sync:
+            self._atom_change_sync.apply_changes(msg)
         for t in self._trackers:
             t.update_model(msg)
         if 'disconnected' in msg:
@@ -977,8 +1070,17 @@ class MeetingParticipant:
         ms.send_message_bytes(msg_bytes)
         return True
 
+    def _write_backlogged(self):
+        ms = self._message_stream
+        return ms is None or ms.write_backlogged()
+
+    @property
+    def _syncing_changes(self):
+        return self._message_stream is not None and self._received_scene
+
     def _participant_left(self, msg):
         participant_id = msg['id']
+        self._scene_offers.pop(participant_id, None)
         for t in self._trackers:
             t.remove_model(participant_id)
 
@@ -1010,6 +1112,7 @@ class MeetingHub:
         self._next_participant_id = 1
         self._host = host_participant	# MeetingParticipant that provides session for new participants.
         self._copy_scene = True		# Whether new participants get copy of scene
+        self._v1_scene_streams = []	# Version 1 participants waiting for a scene sent by another participant
         self._ssh_tunnel = None		# SSHRemoteTunnel instance for ssh tunnel to proxy.
         self._registered_meeting_name = None	# RegisterMeetingName
         self._debug = True		# Write error messages for refused connections.
@@ -1153,6 +1256,7 @@ class MeetingHub:
         self._pending_connections.remove(msg_stream)
         
         if 'join' in msg:
+            msg_stream.protocol_version = msg.get('version', 1)
             rmn = self._registered_meeting_name
             if rmn is None or msg['join'].casefold() == rmn.name.casefold():
                 self._add_connection(msg_stream)
@@ -1192,11 +1296,39 @@ class MeetingHub:
     def _copy_scene_to_participant(self, message_stream):
         if self._session.models.empty():
             return
+        if getattr(message_stream, 'protocol_version', 1) >= 2:
+            # Participant requests scene chunks it does not have cached.
+            self._host.send_scene(to = message_stream.participant_id)
+            return
+        self._send_session([message_stream])
+
+    def _send_session(self, message_streams):
         session_bytes = self._host._encode_session()
         self._send_message({'session size': len(session_bytes)},
-                           message_streams=[message_stream])
+                           message_streams=message_streams)
         self._send_message({'session': session_bytes},
-                           message_streams=[message_stream])
+                           message_streams=message_streams)
+
+    def _v2_scene_streams(self, msg, message_streams):
+        '''
+        Participants using message protocol version 1 cannot request scene chunks
+        so they are sent the full session instead.  A scene sent by another
+        participant is sent to them after the host has received it.
+        Returns the message streams that can receive the chunk hashes.
+        '''
+        v1 = [ms for ms in message_streams if getattr(ms, 'protocol_version', 1) < 2]
+        if v1:
+            if msg['id'] == 0:
+                self._send_session(v1)
+            else:
+                self._v1_scene_streams = v1
+        return [ms for ms in message_streams if ms not in v1]
+
+    def _scene_restored(self):
+        v1 = [ms for ms in self._v1_scene_streams if ms in self._connections]
+        self._v1_scene_streams = []
+        if v1:
+            self._send_session(v1)
 
     def _send_room_coords(self, message_stream):
         rts = self._host.vr_tracker.last_room_to_scene
@@ -1220,9 +1352,17 @@ class MeetingHub:
 
         if message_streams is None:
             message_streams = self._connections
-            exclude_id = msg['id']
-            message_streams = [ms for ms in message_streams
-                           if ms.participant_id != exclude_id]
+            to_id = msg.get('to')
+            if to_id is not None:
+                # Message for a single participant.
+                message_streams = [ms for ms in message_streams
+                                   if ms.participant_id == to_id]
+            else:
+                exclude_id = msg['id']
+                message_streams = [ms for ms in message_streams
+                                   if ms.participant_id != exclude_id]
+                if 'scene chunks' in msg:
+                    message_streams = self._v2_scene_streams(msg, message_streams)
 
         if message_streams:
             msg_bytes = MessageStream.message_as_bytes(msg)
@@ -1457,6 +1597,7 @@ class MessageStreamLocal:
     def __init__(self, send_message_cb):
         self._send_message_cb = send_message_cb
         self.participant_id = 0
+        self.protocol_version = 2	# Host participant
     def send_message_bytes(self, msg_bytes):
         from msgpack import unpackb
         msg = unpackb(msg_bytes)
@@ -1466,6 +1607,323 @@ class MessageStreamLocal:
     def close(self):
         pass
 
+# -----------------------------------------------------------------------------
+# The scene is sent to participants as content-addressed chunks.  The session
+# is split where a rolling hash of the preceding bytes has all mask bits zero,
+# so models and maps that are unchanged give the same chunks in different
+# sessions.  Participants save received chunks in a disk cache and request only
+# the chunks they do not already have.
+#
+_scene_chunk_min_bytes = 2**18
+_scene_chunk_max_bytes = 2**23
+_scene_chunk_mask = 2**20 - 1		# Average chunk size about 1 Mbyte.
+_scene_chunk_window = 64		# Bytes in rolling hash.
+_scene_cache_max_bytes = 2**32		# Disk space used by cached chunks.
+_scene_offer_timeout = 60		# Seconds chunks of a sent scene can be requested.
+
+def _scene_chunks(data):
+    '''Return list of (sha256 hash, lz4 compressed bytes) for chunks of session data.'''
+    ends = _chunk_boundaries(data)
+    starts = [0] + ends[:-1]
+    def hash_and_compress(start, end, data = data):
+        chunk = data[start:end]
+        from hashlib import sha256
+        from lz4.frame import compress
+        return start, sha256(chunk).digest(), compress(chunk)
+    from chimerax.core.threadq import apply_to_list
+    results = apply_to_list(hash_and_compress, list(zip(starts, ends)))
+    results.sort(key = lambda r: r[0])
+    return [(h, cbytes) for start, h, cbytes in results]
+
+def _chunk_boundaries(data, block_size = 2**22):
+    '''
+    Return end offsets of content-defined chunks.  Candidate boundaries are where
+    the sum of random values for each byte of a window has all mask bits zero.
+    '''
+    from numpy import frombuffer, uint8, uint32, cumsum, zeros, concatenate, searchsorted
+    a = frombuffer(data, uint8)
+    n, w = len(a), _scene_chunk_window
+    table = _chunk_hash_table()
+    candidates = []
+    for start in range(0, n, block_size):
+        s0 = max(0, start - w)
+        c = zeros((min(n, start + block_size) - s0 + 1,), uint32)
+        cumsum(table[a[s0:start + block_size]], dtype = uint32, out = c[1:])
+        first = max(start - s0, w)		# Need a full window.
+        h = c[first+1:] - c[first+1-w:-w]	# Window sums wrap modulo 2**32.
+        candidates.append(((h & _scene_chunk_mask) == 0).nonzero()[0] + (s0 + first + 1))
+    candidates = concatenate(candidates) if candidates else zeros((0,), uint32)
+
+    ends = []
+    end = 0
+    while end < n:
+        i = searchsorted(candidates, end + _scene_chunk_min_bytes)
+        cend = candidates[i] if i < len(candidates) else n
+        end = int(min(cend, end + _scene_chunk_max_bytes, n))
+        ends.append(end)
+    return ends
+
+_hash_table = None
+def _chunk_hash_table():
+    global _hash_table
+    if _hash_table is None:
+        from numpy.random import RandomState
+        from numpy import uint32
+        _hash_table = RandomState(1).randint(0, 2**32, 256, dtype = uint32)
+    return _hash_table
+
+def _scene_chunk_hash(cbytes):
+    from lz4.frame import decompress
+    from hashlib import sha256
+    return sha256(decompress(cbytes)).digest()
+
+def _scene_chunk_cache():
+    global _chunk_cache
+    if _chunk_cache is None:
+        from os.path import join
+        from chimerax import app_dirs
+        directory = join(app_dirs.user_cache_dir, 'meeting_scene_chunks')
+        _chunk_cache = SceneChunkCache(directory, _scene_cache_max_bytes)
+    return _chunk_cache
+_chunk_cache = None
+
+class SceneChunkCache:
+    '''
+    Compressed scene chunks saved in files named by the chunk hash.
+    Least recently used chunks are removed when the size limit is exceeded.
+    '''
+    def __init__(self, directory, max_bytes):
+        self._directory = directory
+        self._max_bytes = max_bytes
+
+    def chunk(self, h):
+        '''Return the compressed chunk with sha256 hash h, or None if not cached or corrupt.'''
+        path = self._path(h)
+        from os.path import exists
+        if not exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                cbytes = f.read()
+            if _scene_chunk_hash(cbytes) != h:
+                return None
+            from os import utime
+            utime(path)		# Record use for least recently used pruning.
+        except Exception:
+            return None
+        return cbytes
+
+    def add_chunk(self, h, cbytes):
+        from os import makedirs, replace
+        try:
+            makedirs(self._directory, exist_ok = True)
+            path = self._path(h)
+            with open(path + '.tmp', 'wb') as f:
+                f.write(cbytes)
+            replace(path + '.tmp', path)
+        except OSError:
+            pass	# Chunk will be requested again next time.
+
+    def prune(self):
+        from os import scandir, remove
+        try:
+            entries = [(e.stat().st_mtime, e.stat().st_size, e.path)
+                       for e in scandir(self._directory) if e.is_file()]
+        except OSError:
+            return
+        size = sum(s for t,s,p in entries)
+        for t,s,path in sorted(entries):
+            if size <= self._max_bytes:
+                break
+            try:
+                remove(path)
+            except OSError:
+                continue
+            size -= s
+
+    def _path(self, h):
+        from os.path import join
+        return join(self._directory, h.hex())
+
+# -----------------------------------------------------------------------------
+#
+class AtomChangeSync:
+    '''
+    Send atom coordinate, color and display changes not made by commands,
+    for example by mouse modes and tools, to other participants as compressed
+    arrays of changed atom indices and values.  Changes made by commands are not
+    sent since other participants replay the commands.  Values are compared with
+    the last synchronized values so changes held back while the network is
+    backlogged are combined and only the latest values are sent.
+    '''
+    _attributes = (('coords', 'coord changed'),
+                   ('colors', 'color changed'),
+                   ('displays', 'display changed'))
+
+    def __init__(self, session, participant):
+        self._session = session
+        self._participant = participant
+        self._synced = {}		# Map Structure to last synchronized (coords, colors, displays)
+        self._command_depth = 0		# Nesting of executing commands
+        self._applying = False		# Whether applying changes from another participant
+        self._unsent = False		# Whether changes are waiting for write backlog to clear
+        self._reset_pending = False	# Whether to record values as synchronized when commands end
+        self._changed_structures = set()	# Structures with atom changes since values were synchronized
+        from chimerax.atomic import get_triggers
+        at = get_triggers()
+        t = session.triggers
+        self._handlers = [(at, at.add_handler('changes', self._atoms_changed)),
+                          (t, t.add_handler('command started', self._command_started)),
+                          (t, t.add_handler('command finished', self._command_ended)),
+                          (t, t.add_handler('command failed', self._command_ended)),
+                          (t, t.add_handler('new frame', self._new_frame))]
+        self.reset()
+
+    def delete(self):
+        for triggers, handler in self._handlers:
+            triggers.remove_handler(handler)
+        self._handlers = []
+        self._synced = {}
+
+    def reset(self):
+        '''Record current atom values as synchronized.'''
+        from chimerax.atomic import all_structures
+        self._synced = {s:self._atom_values(s) for s in all_structures(self._session)}
+        self._changed_structures = set()
+        self._unsent = False
+        self._reset_pending = False
+
+    def _reset_changed(self):
+        '''Record current values of changed structures as synchronized.'''
+        self._update_synced()
+        self._unsent = False
+        self._reset_pending = False
+
+    def _update_synced(self):
+        '''
+        Record current values of changed structures as synchronized and return
+        a list of (structure, values, previous values) for those structures.
+        '''
+        synced = self._synced
+        for s in [s for s in synced.keys() if s.deleted]:
+            del synced[s]
+        updates = []
+        for s in self._changed_structures:
+            if not s.deleted:
+                values = self._atom_values(s)
+                updates.append((s, values, synced.get(s)))
+                synced[s] = values
+        self._changed_structures = set()
+        return updates
+
+    def _add_new_structures(self):
+        synced = self._synced
+        from chimerax.atomic import all_structures
+        for s in all_structures(self._session):
+            if s not in synced:
+                synced[s] = self._atom_values(s)
+
+    def apply_changes(self, msg):
+        '''Set atom values sent by another participant.'''
+        self._send_changes(force = True)
+        self._applying = True
+        try:
+            from numpy import float64
+            for sc in msg['atom changes']:
+                s = self._structure(sc['model'])
+                if s is None or s.num_atoms != sc['natoms']:
+                    continue
+                atoms = s.atoms
+                for attr, reason in self._attributes:
+                    if attr in sc:
+                        ai = _decode_indices(sc[attr]['atoms'])
+                        values = _decode_numpy_array(sc[attr]['values'])
+                        if attr == 'coords':
+                            values = values.astype(float64)
+                        setattr(atoms.filter(ai), attr, values)
+            self._check_for_changes()
+        finally:
+            self._applying = False
+
+    def _atom_values(self, s):
+        atoms = s.atoms
+        from numpy import float32
+        return (atoms.coords.astype(float32), atoms.colors, atoms.displays)
+
+    def _structure(self, model_id):
+        from chimerax.atomic import Structure
+        mlist = self._session.models.list(model_id = tuple(model_id), type = Structure)
+        return mlist[0] if mlist else None
+
+    def _check_for_changes(self):
+        from chimerax.atomic import check_for_changes
+        check_for_changes(self._session)
+
+    def _command_started(self, trigger_name, command):
+        # Send earlier changes since changes made by the command will be
+        # recorded as synchronized.
+        self._send_changes(force = True)
+        self._command_depth += 1
+
+    def _command_ended(self, trigger_name, command):
+        self._check_for_changes()
+        self._command_depth = max(0, self._command_depth - 1)
+        if self._command_depth == 0 and self._reset_pending:
+            self._reset_changed()
+
+    def _atoms_changed(self, trigger_name, changes):
+        self._add_new_structures()
+        reasons = changes.atom_reasons()
+        if not [reason for attr, reason in self._attributes if reason in reasons]:
+            return
+        # Only structures with modified atoms are compared with synchronized values.
+        self._changed_structures.update(changes.modified_atoms().unique_structures)
+        if self._applying or not self._participant._syncing_changes:
+            self._reset_changed()
+        elif self._command_depth > 0:
+            # Values are recorded once when the command ends.
+            self._reset_pending = True
+        else:
+            self._unsent = True
+            self._send_changes()
+
+    def _new_frame(self, trigger_name, data):
+        if self._unsent:
+            self._send_changes()
+
+    def _send_changes(self, force = False):
+        if force:
+            self._check_for_changes()
+        if not self._unsent:
+            return
+        p = self._participant
+        if p._write_backlogged() and not force:
+            return
+        self._unsent = False
+        changes = self._changed_values()
+        if changes:
+            p._send_message({'atom changes': changes})
+
+    def _changed_values(self):
+        changes = []
+        for s, values, last in self._update_synced():
+            if last is None or len(last[0]) != len(values[0]):
+                continue
+            sc = {}
+            for (attr, reason), v, lv in zip(self._attributes, values, last):
+                changed = (v != lv)
+                if changed.ndim > 1:
+                    changed = changed.any(axis = 1)
+                ai = changed.nonzero()[0]
+                if len(ai) > 0:
+                    sc[attr] = {'atoms': _encode_indices(ai),
+                                'values': _encode_numpy_array(v[ai])}
+            if sc:
+                sc['model'] = s.id
+                sc['natoms'] = len(values[0])
+                changes.append(sc)
+        return changes
+
 class PointerModels:
     '''Manage mouse or VR pointer models for all connected hosts.'''
     def __init__(self, session):
@@ -2157,6 +2615,15 @@ def _encode_numpy_array(array):
     }
     return data
 
+def _encode_indices(indices):
+    '''Encode increasing indices as compressed differences, mostly small values.'''
+    from numpy import diff, uint32
+    return _encode_numpy_array(diff(indices, prepend = 0).astype(uint32))
+
+def _decode_indices(data):
+    from numpy import cumsum, int64
+    return cumsum(_decode_numpy_array(data), dtype = int64)
+
 def _decode_numpy_array(array_data):
     shape = array_data['shape']
     dtype = array_data['dtype']
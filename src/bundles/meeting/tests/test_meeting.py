@@ -0,0 +1,64 @@
+from numpy import array
+
+atom_coords = [(1.0, 2.0, 3.0), (2.5, 2.0, 3.0), (3.0, 3.2, 3.5)]
+
+def _open_structure(session, path):
+    names = [(" N  ", "N"), (" CA ", "C"), (" C  ", "C")]
+    lines = []
+    for i, ((name, element), (x, y, z)) in enumerate(zip(names, atom_coords)):
+        lines.append("ATOM  %5d %s GLY A   1    %8.3f%8.3f%8.3f  1.00  0.00          %2s"
+                     % (i+1, name, x, y, z, element))
+    lines.append("END")
+    path.write_text("\n".join(lines) + "\n")
+    from chimerax.core.commands import run
+    return run(session, "open %s" % path)[0]
+
+class _Participant:
+    '''Records atom change messages instead of sending them.'''
+    _syncing_changes = True
+    def __init__(self):
+        self.messages = []
+    def _write_backlogged(self):
+        return False
+    def _send_message(self, msg):
+        self.messages.append(msg)
+
+def test_atom_changes_only_compare_changed_structures(test_production_session, tmp_path):
+    session = test_production_session
+    s1 = _open_structure(session, tmp_path / "a.pdb")
+    s2 = _open_structure(session, tmp_path / "b.pdb")
+    from chimerax.meeting.meeting import AtomChangeSync
+    from chimerax.atomic import check_for_changes
+    check_for_changes(session)
+    p = _Participant()
+    sync = AtomChangeSync(session, p)
+    compared = []
+    atom_values = sync._atom_values
+    def _atom_values(s):
+        compared.append(s)
+        return atom_values(s)
+    sync._atom_values = _atom_values
+    try:
+        s2.atoms[1].coord = array((5.0, 6.0, 7.0))
+        s2.atoms[2].color = (255, 0, 0, 255)
+        check_for_changes(session)
+        assert compared == [s2]
+        assert len(p.messages) == 1
+        changes = p.messages[0]['atom changes']
+        assert len(changes) == 1
+        sc = changes[0]
+        assert tuple(sc['model']) == s2.id
+        assert sc['natoms'] == 3
+        assert set(sc.keys()) == {'model', 'natoms', 'coords', 'colors'}
+
+        # Values are recorded as synchronized so an unchanged structure sends nothing.
+        compared.clear()
+        s1.atoms[0].display = False
+        check_for_changes(session)
+        assert compared == [s1]
+        assert len(p.messages) == 2
+        sc = p.messages[1]['atom changes'][0]
+        assert tuple(sc['model']) == s1.id
+        assert set(sc.keys()) == {'model', 'natoms', 'displays'}
+    finally:
+        sync.delete()
@@ -114,6 +114,11 @@ def write_mmcif(session, path, *, models=None, rel_model=None, selected_only=Fal
         session.logger.info("no structures to save")
         return
 
+    if all_coordsets:
+        # Read any coordinate sets of lazily opened files.
+        for m in models:
+            m.load_coordsets()
+
     xforms = {}
     if rel_model is None:
         for m in models:
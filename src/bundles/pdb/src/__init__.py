@@ -57,6 +57,7 @@ class _PDBioAPI(BundleAPI):
                             'segid_chains': BoolArg,
                             'slider': BoolArg,
                             'missing_coordsets': EnumOf(('fill','ignore','renumber')),
+                            'lazy_coordsets': BoolArg,
                         }
             else:
                 from chimerax.open_command import FetcherInfo
@@ -31,7 +31,7 @@ Read Protein DataBank (PDB) files.
 
 def open_pdb(session, stream, file_name=None, *, auto_style=True, coordsets=False, atomic=True,
              max_models=None, log_info=True, combine_sym_atoms=True, segid_chains=False,
-             slider=True, missing_coordsets="renumber"):
+             slider=True, missing_coordsets="renumber", lazy_coordsets=False):
     """Read PDB data from a file or stream and return a list of models and status information.
 
     ``stream`` is either a string a string with a file system path to a PDB file, or an open input
@@ -68,6 +68,11 @@ def open_pdb(session, stream, file_name=None, *, auto_style=True, coordsets=Fals
     MODEL numbers are not consecutive.  The possible values are 'fill' (fill in the missing with copies
     of the preceding coord set), 'ignore' (don't fill in; use MODEL number as is for coordset ID), and
     'renumber' (don't fill in and use the next available coordset ID).
+
+    ``lazy_coordsets`` opens a multi-MODEL PDB file as a single structure with multiple coordinate
+    sets (like ``coordsets``) but only parses the first model, reading the coordinates of other
+    models from the file when they are first shown.  This makes opening large ensembles fast.
+    If models differ in their atoms the whole file is read as with ``coordsets``.
     """
 
     from chimerax.core.errors import UserError
@@ -83,7 +88,23 @@ def open_pdb(session, stream, file_name=None, *, auto_style=True, coordsets=Fals
             file_name = basename(path)
         else:
             file_name = 'structure'
-            
+
+    if lazy_coordsets:
+        coordsets = True
+        from os.path import isfile
+        if path and isfile(path) and not path.endswith('.gz') and max_models is None:
+            from .streaming import open_pdb_lazy_coordsets
+            result = open_pdb_lazy_coordsets(session, path, file_name, auto_style=auto_style,
+                atomic=atomic, log_info=log_info, combine_sym_atoms=combine_sym_atoms,
+                segid_chains=segid_chains, slider=False, missing_coordsets=missing_coordsets)
+            if result is not None:
+                stream.close()
+                models, info = result
+                if slider and session.ui.is_gui:
+                    from chimerax.std_commands.coordset import coordset_slider
+                    coordset_slider(session, models)
+                return models, info
+
     from . import _pdbio
     try:
         pointers = _pdbio.read_pdb_file(stream, session.logger, not coordsets, atomic, segid_chains,
@@ -210,6 +231,10 @@ def save_pdb(session, output, *, models=None, selected_only=False, displayed_onl
             z = ""
         s.set_metadata_entry('CRYST1',
             ["CRYST1%9s%9s%9s%7s%7s%7s %-11s%4s" % (l_a, l_b, l_c, a_a, a_b, a_g, h_m, z)])
+    if all_coordsets:
+        # Read any coordinate sets of lazily opened files.
+        for m in models:
+            m.load_coordsets()
     from . import _pdbio
     if polymeric_res_names is None:
         polymeric_res_names = _pdbio.standard_polymeric_res_names
@@ -0,0 +1,176 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+
+# === UCSF ChimeraX Copyright ===
+# Copyright 2022 Regents of the University of California. All rights reserved.
+# The ChimeraX application is provided pursuant to the ChimeraX license
+# agreement, which covers academic and commercial uses. For more details, see
+# <https://www.rbvi.ucsf.edu/chimerax/docs/licensing.html>
+#
+# This particular file is part of the ChimeraX library. You can also
+# redistribute and/or modify it under the terms of the GNU Lesser General
+# Public License version 2.1 as published by the Free Software Foundation.
+# For more details, see
+# <https://www.gnu.org/licenses/old-licenses/lgpl-2.1.html>
+#
+# THIS SOFTWARE IS PROVIDED "AS IS" WITHOUT WARRANTY OF ANY KIND, EITHER
+# EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE. ADDITIONAL LIABILITY
+# LIMITATIONS ARE DESCRIBED IN THE GNU LESSER GENERAL PUBLIC LICENSE
+# VERSION 2.1
+#
+# This notice must be embedded in or attached to all copies, including partial
+# copies, of the software or any revisions or derivations thereof.
+# === UCSF ChimeraX Copyright ===
+
+"""
+Open multi-model PDB ensembles reading the topology from the first model
+and decoding the coordinates of other models only when they are shown.
+"""
+
+class PDBModelIndex:
+    '''
+    Byte offsets, MODEL numbers and atom counts of the MODEL ... ENDMDL
+    blocks of a PDB file found with one scan of the file without parsing
+    atom records.
+    '''
+    def __init__(self, path):
+        self.path = path
+        import re, mmap
+        atom_line = re.compile(rb'^(?:ATOM  |HETATM)', re.MULTILINE)
+        with open(path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+            try:
+                models = [(m.start(), m.group(1)) for m in
+                          re.finditer(rb'^MODEL ([^\n]*)', mm, re.MULTILINE)]
+                ends = [m.end() for m in re.finditer(rb'^ENDMDL[^\n]*\n?', mm, re.MULTILINE)]
+                if len(models) == len(ends):
+                    self.atom_counts = [sum(1 for a in atom_line.finditer(mm, s, e))
+                                        for (s, num), e in zip(models, ends)]
+                self.file_size = len(mm)
+            finally:
+                mm.close()
+        if len(models) != len(ends):
+            raise ValueError('PDB file %s has %d MODEL records and %d ENDMDL records'
+                             % (path, len(models), len(ends)))
+        self.model_ranges = [(s, e) for (s, num), e in zip(models, ends)]
+        self.model_numbers = [_model_number(num, i+1) for i, (s, num) in enumerate(models)]
+
+    @property
+    def num_models(self):
+        return len(self.model_ranges)
+
+    def topology_text(self):
+        '''Header, first model and trailing records (CONECT, END) as a string.'''
+        e0, en = self.model_ranges[0][1], self.model_ranges[-1][1]
+        with open(self.path, 'rb') as f:
+            text = f.read(e0)
+            f.seek(en)
+            text += f.read()
+        return text.decode('utf-8', errors = 'replace')
+
+    def model_coords(self, i):
+        '''Atom coordinates of model i (0-based) as an N by 3 float64 array.'''
+        start, end = self.model_ranges[i]
+        with open(self.path, 'rb') as f:
+            f.seek(start)
+            block = f.read(end - start)
+        xyz = [(float(line[30:38]), float(line[38:46]), float(line[46:54]))
+               for line in block.split(b'\n')
+               if line.startswith(b'ATOM  ') or line.startswith(b'HETATM')]
+        from numpy import array, float64
+        return array(xyz, float64).reshape((len(xyz),3))
+
+    def coordset_ids(self, missing_coordsets):
+        '''
+        Coordinate set id for each model and a list of (id, model index)
+        for ids filling gaps in MODEL numbers, following the pdb reader
+        missing_coordsets option.  Returns None if MODEL numbers do not
+        increase, which only the full reader handles.
+        '''
+        nums = self.model_numbers
+        if missing_coordsets == 'renumber':
+            return list(range(nums[0], nums[0] + len(nums))), []
+        if any(n2 <= n1 for n1, n2 in zip(nums[:-1], nums[1:])):
+            return None
+        fill = []
+        if missing_coordsets == 'fill':
+            for i, (n1, n2) in enumerate(zip(nums[:-1], nums[1:])):
+                fill.extend((cs_id, i) for cs_id in range(n1+1, n2))
+        return list(nums), fill
+
+def _model_number(field, default):
+    try:
+        return int(field.split()[0])
+    except (IndexError, ValueError):
+        return default
+
+class LazyCoordsets:
+    '''
+    Coordset loader for a structure (see StructureData.set_coordset_loader())
+    reading coordinates from a PDB model index.  The structure reads a
+    coordinate set the first time it is made active or otherwise used, until
+    then unread coordinate sets are empty placeholders holding no coordinates.
+    '''
+    def __init__(self, model_index, model_for_id):
+        self._index = model_index
+        self._model_for_id = model_for_id	# Coordinate set id -> 0-based model index.
+        self.unloaded_ids = set(model_for_id.keys())
+
+    def coordset_coords(self, cs_id):
+        # Models read in the order of the first model atoms are in coordinate index order.
+        return self._index.model_coords(self._model_for_id[cs_id])
+
+def open_pdb_lazy_coordsets(session, path, file_name, missing_coordsets = 'renumber', **kw):
+    '''
+    Open a multi-model PDB file as one structure with a coordinate set per
+    model.  Only the first model is parsed, other models are read on demand.
+    Returns None if the file is not suitable, for instance when models differ
+    in atom count, so the caller can fall back to reading the whole file.
+    '''
+    try:
+        index = PDBModelIndex(path)
+    except (OSError, ValueError):
+        return None
+    n = index.num_models
+    if n < 2 or len(set(index.atom_counts)) > 1:
+        return None
+    ids = index.coordset_ids(missing_coordsets)
+    if ids is None:
+        return None
+    cs_ids, fill = ids
+
+    from io import StringIO
+    stream = StringIO(index.topology_text())
+    stream.name = path
+    from .pdb import open_pdb
+    models, info = open_pdb(session, stream, file_name, coordsets = True,
+                            missing_coordsets = missing_coordsets, **kw)
+    if len(models) != 1:
+        for m in models:
+            m.delete()
+        return None
+    s = models[0]
+    if s.coordset_size != index.atom_counts[0]:
+        # Alternate locations or combined atoms make atom order ambiguous.
+        s.delete()
+        return None
+
+    # Empty coordinate sets numbered by MODEL, filled when first used.  The
+    # first model coordinates are added last since a new coordinate set
+    # reserves the size of the last one.
+    xyz = s.active_coordset.xyzs
+    s.remove_coordsets()
+    model_for_id = {cs_id:i for i, cs_id in enumerate(cs_ids)}
+    model_for_id.update(fill)
+    from numpy import empty, float64
+    no_xyz = empty((0,3), float64)
+    for cs_id in sorted(model_for_id.keys()):
+        s.add_coordset(cs_id, no_xyz)
+    s.add_coordset(cs_ids[0], xyz)
+    s.active_coordset_id = cs_ids[0]
+    del model_for_id[cs_ids[0]]
+    s.set_coordset_loader(LazyCoordsets(index, model_for_id))
+    s.filename = path
+
+    info = '%s has %d coordinate sets, read on demand' % (file_name, s.num_coordsets)
+    return models, info
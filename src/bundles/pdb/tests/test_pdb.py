@@ -0,0 +1,37 @@
+import pytest
+
+from numpy import array, float64
+
+model_coords = [
+    [(1.0, 2.0, 3.0), (2.5, 2.0, 3.0), (3.0, 3.2, 3.5)],
+    [(1.1, 2.1, 3.1), (2.6, 2.1, 3.1), (3.1, 3.3, 3.6)],
+    [(1.2, 2.2, 3.2), (2.7, 2.2, 3.2), (3.2, 3.4, 3.7)],
+]
+
+def _write_multi_model_pdb(path):
+    names = [(" N  ", "N"), (" CA ", "C"), (" C  ", "C")]
+    lines = []
+    for m, coords in enumerate(model_coords):
+        lines.append("MODEL     %4d" % (m+1))
+        for i, ((name, element), (x, y, z)) in enumerate(zip(names, coords)):
+            lines.append("ATOM  %5d %s GLY A   1    %8.3f%8.3f%8.3f  1.00  0.00          %2s"
+                         % (i+1, name, x, y, z, element))
+        lines.append("ENDMDL")
+    lines.append("END")
+    path.write_text("\n".join(lines) + "\n")
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_multi_model_coordsets(test_production_session, tmp_path, lazy):
+    session = test_production_session
+    path = tmp_path / "ensemble.pdb"
+    _write_multi_model_pdb(path)
+    from chimerax.core.commands import run
+    models = run(session, "open %s coordsets true lazyCoordsets %s" % (path, lazy))
+    assert len(models) == 1
+    s = models[0]
+    assert s.num_coordsets == len(model_coords)
+    assert s.num_atoms == 3
+    for cs_id, coords in zip(s.coordset_ids, model_coords):
+        assert (abs(s.coordset(cs_id).xyzs - array(coords, float64)) < 1e-3).all()
+    s.active_coordset_id = s.coordset_ids[-1]
+    assert (abs(s.atoms.coords - array(model_coords[-1], float64)) < 1e-3).all()
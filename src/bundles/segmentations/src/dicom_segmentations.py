@@ -25,6 +25,13 @@ class PlanePuckSegmentation(SegmentationStrategy):
         self.max_threshold = max_threshold
 
     def execute(self, grid, reference_grid):
+        # Only one plane of the grid is modified.
+        ijk_min, ijk_max = [0, 0, 0], [s - 1 for s in grid.size]
+        axis_index = (
+            2 if self.axis == Axis.AXIAL else 1 if self.axis == Axis.CORONAL else 0
+        )
+        ijk_min[axis_index] = ijk_max[axis_index] = self.plane
+        self.changed_region = (ijk_min, ijk_max)
         for position in self.positions:
             center_x, center_y, radius = position
             self._set_data_in_puck(
@@ -211,6 +218,13 @@ class PlanePuckSegmentation(SegmentationStrategy):
         slice[bottom_offset][left_offset - scaled_radius : left_offset + scaled_radius][
             np.where(mask == 1)
         ] = value
+        # Sparse label grids return a copy of the plane, so store the painted plane.
+        if axis == Axis.AXIAL:
+            grid.set_matrix((0, 0, slice_number), slice[np.newaxis, :, :])
+        elif axis == Axis.CORONAL:
+            grid.set_matrix((0, slice_number, 0), slice[:, np.newaxis, :])
+        else:
+            grid.set_matrix((slice_number, 0, 0), slice[:, :, np.newaxis])
 
 
 class SphericalSegmentation(SegmentationStrategy):
@@ -239,6 +253,7 @@ class SphericalSegmentation(SegmentationStrategy):
     def _set_sphere_data(self, grid, reference_grid) -> None:
         # Optimization: Mask only subregion containing sphere.
         ijk_min, ijk_max = self._sphere_grid_bounds(grid)
+        self.changed_region = (ijk_min, ijk_max)
         from chimerax.map_data import GridSubregion, zone_mask
 
         subgrid = GridSubregion(grid, ijk_min, ijk_max)
@@ -261,6 +276,7 @@ class SphericalSegmentation(SegmentationStrategy):
         from numpy import putmask
 
         putmask(dmatrix, mask, self.value)
+        subgrid.set_matrix((0, 0, 0), dmatrix)
 
     def _sphere_grid_bounds(self, grid):
         ijk_center = grid.xyz_to_ijk(self.center)
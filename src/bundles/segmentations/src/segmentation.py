@@ -22,6 +22,9 @@ from chimerax.map.volume import (
 class SegmentationStrategy:
     """Implements an algorithm for segmentation"""
 
+    # Box of grid points (ijk_min, ijk_max) modified by execute(), or None if unknown
+    changed_region = None
+
     @abstractmethod
     def execute(self, grid, reference_grid):
         pass
@@ -51,7 +54,7 @@ class Segmentation(Volume):
 
     def segment(self, strategy: SegmentationStrategy):
         strategy.execute(self.data, self.reference_volume.data)
-        self.data.values_changed()
+        self.data.values_changed(region=strategy.changed_region)
 
     def save(self, path):
         self.session.save_command.save_data(path, models=[self])
@@ -81,15 +84,16 @@ class Segmentation(Volume):
         return dv
 
 
-def segment_volume(volume, number: int) -> Segmentation:
+def segment_volume(volume, number: int, num_labels: int = 255) -> Segmentation:
     """Segment the Volume and return an object of type Segmentation. The caller is responsible
-    for adding the segmentation to the session."""
-    from chimerax.map_data.arraygrid import ArrayGridData
-    from numpy import zeros
-
-    new_grid_array = zeros(volume.data.size[::-1])
-    new_grid = ArrayGridData(
-        array=new_grid_array,
+    for adding the segmentation to the session. Label values up to num_labels can be stored."""
+    from chimerax.map_data import SparseGridData
+
+    # Labels are stored in bricks that are only allocated where voxels are labeled,
+    # so large reference volumes do not need a dense copy for each segmentation.
+    new_grid = SparseGridData(
+        volume.data.size,
+        label_value_type(num_labels),
         origin=volume.data.origin,
         step=volume.data.step,
         cell_angles=volume.data.cell_angles,
@@ -105,6 +109,16 @@ def segment_volume(volume, number: int) -> Segmentation:
     return new_seg_model
 
 
+def label_value_type(num_labels: int):
+    """Return the smallest unsigned integer type holding label values 0 to num_labels."""
+    from numpy import uint8, uint16, uint32, iinfo
+
+    for value_type in (uint8, uint16, uint32):
+        if num_labels <= iinfo(value_type).max:
+            return value_type
+    raise ValueError("Too many segmentation labels: %d" % num_labels)
+
+
 # Volume.copy could accomplish this if the open_model parameter was hoisted from
 # volume_from_grid_data
 def copy_volume_for_auxiliary_display(volume):
@@ -3,3 +3,60 @@ import pytest
 
 def test_public_api_visibility(test_production_session):
     from chimerax.segmentations import bundle_api
+
+
+def _labels():
+    import numpy
+
+    labels = numpy.zeros((40, 50, 60), numpy.uint8)
+    labels[3:9, 10:45, 20:30] = 1
+    labels[30:40, 0:5, 55:60] = 2
+    labels[20, 25, 33] = 3
+    return labels
+
+
+def test_sparse_array_reads_match_dense(test_production_session):
+    from chimerax.map_data import SparseArray
+
+    labels = _labels()
+    sparse = SparseArray.from_array(labels, brick_size=16)
+    assert sparse.brick_count < 40
+    for key in [
+        (Ellipsis,),
+        (slice(2, 35, 3), slice(None), slice(50, 10, -4)),
+        (20, slice(20, 30), slice(None, None, 2)),
+        (slice(None, None, -1), 25, 33),
+        (slice(10, 10), slice(None), slice(None)),
+    ]:
+        assert (sparse[key] == labels[key]).all()
+
+
+def test_sparse_grid_subregion_not_cached(test_production_session):
+    from chimerax.map_data import SparseGridData
+    from chimerax.map.volume import data_cache
+
+    labels = _labels()
+    grid = SparseGridData.from_array(labels, brick_size=16)
+    grid.data_cache = dcache = data_cache(test_production_session)
+    m = grid.matrix((15, 5, 2), (30, 40, 30), (2, 3, 1))
+    assert (m == labels[2:32, 5:45:3, 15:45:2]).all()
+    assert len(dcache.group_keys_and_data(grid)) == 0
+    m[...] = 0
+    assert (grid.matrix() == labels).all()
+
+
+def test_segmentation_labels_sparse(test_production_session):
+    import numpy
+    from chimerax.map_data import ArrayGridData
+    from chimerax.map.volume import volume_from_grid_data
+    from chimerax.segmentations.segmentation import segment_volume
+
+    session = test_production_session
+    ref = volume_from_grid_data(
+        ArrayGridData(numpy.zeros((40, 50, 60), numpy.float32)), session
+    )
+    seg = segment_volume(ref, 1)
+    labels = _labels()
+    seg.data.set_matrix((0, 0, 0), labels)
+    assert (seg.data.matrix() == labels).all()
+    assert seg.data.array.nbytes < labels.nbytes
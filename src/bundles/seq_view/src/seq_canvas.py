@@ -280,7 +280,10 @@ class SeqCanvas:
                 '<Double-Button>': lambda e, s=seq: self.sv._editSeqName(s)
             }
         self.sv.region_manager._preAddLines(seqs)
-        self.lead_block.addSeqs(seqs)
+        if self.lead_block.large_alignment != _is_large_alignment(self.alignment):
+            self._reformat()
+        else:
+            self.lead_block.addSeqs(seqs)
         self.sv.region_manager.redraw_regions()
 
     def adjustScrolling(self):
@@ -1093,6 +1096,10 @@ class SeqCanvas:
             return
         if right is None:
             right = len(self.alignment.seqs[0])-1
+        if self.lead_block.large_alignment != _is_large_alignment(self.alignment):
+            # alignment size crossed the threshold for per-line items; rebuild all items
+            self._reformat()
+            return
         self.lead_block.refresh(seq, left, right)
         self.main_scene.update()
         """TODO
@@ -1602,6 +1609,8 @@ class SeqBlock:
             self.line_index = prev_block.line_index
             self.numbering_widths = prev_block.numbering_widths
             self._brushes = prev_block._brushes
+            self.large_alignment = prev_block.large_alignment
+            self.glyph_cache = prev_block.glyph_cache
             self.multi_assoc_brush = prev_block.multi_assoc_brush
             self.multi_assoc_pen = prev_block.multi_assoc_pen
         else:
@@ -1621,6 +1630,8 @@ class SeqBlock:
             self.multi_assoc_pen = QPen(QBrush(self.multi_assoc_color, Qt.SolidPattern),
                                         0, Qt.DashLine)
             self._brushes = {}
+            self.large_alignment = _is_large_alignment(alignment)
+            self.glyph_cache = GlyphCache() if self.large_alignment else None
             # long sequences can cause deep recursion...
             import sys
             recur_limit = sys.getrecursionlimit()
@@ -1736,12 +1747,13 @@ class SeqBlock:
                 del self.label_rects[aseq]
                 from Qt.QtCore import Qt
                 label_text.setBrush(Qt.black)
-        line_items = self.line_items[aseq]
-        for i in range(len(line_items)):
-            item = line_items[i]
-            if not item:
-                continue
-            self._assoc_res_bind(item, aseq, self.seq_offset+i)
+        if not self._large_alignment():
+            line_items = self.line_items[aseq]
+            for i in range(len(line_items)):
+                item = line_items[i]
+                if not item:
+                    continue
+                self._assoc_res_bind(item, aseq, self.seq_offset+i)
         """
         if self._large_alignment():
             line_items = self.line_items[aseq]
@@ -2213,9 +2225,9 @@ class SeqBlock:
             line.match_maps[m].struct_seq.name) for m in line.match_maps.keys()]))
 
     def _large_alignment(self):
-        # for now, return False until performance can be tested
-        return False
-        return len(self.alignment.seqs) * len(self.alignment.seqs[0]) >= 250000
+        # decided once per layout (see _is_large_alignment) so that all lines of
+        # all blocks use the same kind of items
+        return self.large_alignment
 
     def layout_ruler(self, rerule=False):
         if rerule:
@@ -2307,21 +2319,25 @@ class SeqBlock:
                 self.label_scene.tag_bind(text,
                             eventType, function)
         """
-        color_func = self._color_func(line)
-        line_items = []
-        item_aux_info = []
-        xs = self._get_xs(end - self.seq_offset)
         if self._large_alignment():
-            res_status = hasattr(line, "match_maps") and line.match_maps
+            # single item for the line; aux info is just the first and last column positions
+            item = SeqLineItem(self, line, y, end - self.seq_offset)
+            self.main_scene.addItem(item)
+            line_items = [item]
+            item_aux_info = [(item.column_x(0), y), (item.column_x(end - self.seq_offset - 1), y)]
         else:
+            color_func = self._color_func(line)
+            line_items = []
+            item_aux_info = []
+            xs = self._get_xs(end - self.seq_offset)
             res_status = line in self.alignment.seqs or adding
-        for i in range(end - self.seq_offset):
-            item = self.make_item(line, self.seq_offset + i, xs[i],
-                y, half_x, left_rect_off, right_rect_off, color_func)
-            if res_status:
-                self._assoc_res_bind(item, line, self.seq_offset + i)
-            line_items.append(item)
-            item_aux_info.append((xs[i], y))
+            for i in range(end - self.seq_offset):
+                item = self.make_item(line, self.seq_offset + i, xs[i],
+                    y, half_x, left_rect_off, right_rect_off, color_func)
+                if res_status:
+                    self._assoc_res_bind(item, line, self.seq_offset + i)
+                line_items.append(item)
+                item_aux_info.append((xs[i], y))
 
         self.line_items[line] = line_items
         self.item_aux_info[line] = item_aux_info
@@ -2667,25 +2683,25 @@ class SeqBlock:
         my_left = max(left - self.seq_offset, 0)
         my_right = min(right - self.seq_offset, self.line_width - 1)
 
-        half_x, left_rect_off, right_rect_off = self.base_layout_info()
         line_items = self.line_items[seq]
-        item_aux_info = self.item_aux_info[seq]
         if self._large_alignment():
-            res_status = hasattr(seq, "match_maps") and seq.match_maps
+            line_items[0].update_columns(my_left, my_right)
         else:
+            half_x, left_rect_off, right_rect_off = self.base_layout_info()
+            item_aux_info = self.item_aux_info[seq]
             res_status = seq in self.alignment.seqs
-        color_func = self._color_func(seq)
-        for i in range(my_left, my_right+1):
-            line_item = line_items[i]
-            if line_item is not None:
-                line_item.hide()
-                self.main_scene.removeItem(line_item)
-            x, y = item_aux_info[i]
-            line_items[i] = self.make_item(seq, self.seq_offset + i,
-                        x, y, half_x, left_rect_off,
-                        right_rect_off, color_func)
-            if res_status:
-                self._assoc_res_bind(line_items[i], seq, self.seq_offset + i)
+            color_func = self._color_func(seq)
+            for i in range(my_left, my_right+1):
+                line_item = line_items[i]
+                if line_item is not None:
+                    line_item.hide()
+                    self.main_scene.removeItem(line_item)
+                x, y = item_aux_info[i]
+                line_items[i] = self.make_item(seq, self.seq_offset + i,
+                            x, y, half_x, left_rect_off,
+                            right_rect_off, color_func)
+                if res_status:
+                    self._assoc_res_bind(line_items[i], seq, self.seq_offset + i)
         if self.show_numberings[0] and line_numbering_start(seq) is not None and my_left == 0:
             item = self.numbering_texts[seq][0]
             item.hide()
@@ -2883,6 +2899,135 @@ class SeqBlock:
             self.next_block.updateNumberings()
 """
 
+def _is_large_alignment(alignment):
+    # large alignments draw each line of a block with a single item that paints
+    # only the exposed columns, rather than one scene item per column
+    return len(alignment.seqs) * len(alignment.seqs[0]) >= 250000
+
+class GlyphCache:
+    """Least-recently-used cache of pre-rendered glyph pixmaps for the blocks of one layout"""
+
+    def __init__(self, max_size=2000):
+        from collections import OrderedDict
+        self._glyphs = OrderedDict()
+        self.max_size = max_size
+
+    def get(self, key):
+        glyph = self._glyphs.get(key)
+        if glyph is not None:
+            self._glyphs.move_to_end(key)
+        return glyph
+
+    def add(self, key, glyph):
+        self._glyphs[key] = glyph
+        if len(self._glyphs) > self.max_size:
+            self._glyphs.popitem(last=False)
+
+from Qt.QtWidgets import QGraphicsItem
+class SeqLineItem(QGraphicsItem):
+    """Draws one line (sequence or header) of a SeqBlock, painting only the exposed columns.
+       Characters are drawn from the block's cache of pre-rendered glyph pixmaps.
+    """
+
+    def __init__(self, block, line, y, num_columns):
+        super().__init__()
+        self.block = block
+        self.line = line
+        self.y = y
+        self.num_columns = num_columns
+        self._x0 = block._left_seqs_edge() + block.base_layout_info()[0]
+        self._column_step = block.font_pixels[0] + block.letter_gaps[0]
+        self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemUsesExtendedStyleOption)
+        self.setAcceptHoverEvents(True)
+
+    def boundingRect(self):
+        from Qt.QtCore import QRectF
+        block = self.block
+        half_x, left_rect_off, right_rect_off = block.base_layout_info()
+        left = self._x0 + min(left_rect_off, -self._column_step)
+        right = self.column_x(self.num_columns - 1) + max(right_rect_off, self._column_step)
+        height = block.font_pixels[1] + max(block.letter_gaps[1], 0) + 2
+        return QRectF(left, self.y - height, right - left, height + 1)
+
+    def column_x(self, column):
+        """center x of column (relative to the block's first column)"""
+        return self._x0 + column * self._column_step + (column // 10) * self.block.chunk_gap
+
+    def column_at(self, x):
+        chunk_width = 10 * self._column_step + self.block.chunk_gap
+        dx = x - self._x0 + self._column_step / 2
+        chunk, within = divmod(dx, chunk_width)
+        return int(10 * chunk + min(9, within // self._column_step))
+
+    def hoverMoveEvent(self, event):
+        line = self.line
+        if line not in self.block.alignment.seqs:
+            return
+        column = self.column_at(event.pos().x())
+        if 0 <= column < self.num_columns:
+            self.setToolTip(self.block._mouse_res_text(line, self.block.seq_offset + column))
+
+    def paint(self, painter, option, widget=None):
+        block = self.block
+        line = self.line
+        exposed = option.exposedRect
+        first = max(0, self.column_at(exposed.left()) - 1)
+        last = min(self.num_columns - 1, self.column_at(exposed.right()) + 1)
+        if last < first:
+            return
+        color_func = block._color_func(line)
+        half_x, left_rect_off, right_rect_off = block.base_layout_info()
+        dpr = widget.devicePixelRatioF() if widget is not None else 1.0
+        depict = getattr(line, 'depiction_val', None)
+        y = self.y
+        from Qt.QtCore import QRectF
+        for column in range(first, last + 1):
+            offset = block.seq_offset + column
+            info = depict(offset) if depict else line[offset]
+            x = self.column_x(column)
+            if isinstance(info, str):
+                if info == ' ':
+                    continue
+                pixmap, width, height = self._glyph(info, color_func(line, offset), dpr)
+                painter.drawPixmap(int(round(x - width/2)), int(round(y - height)), pixmap)
+            elif info is not None and info > 0.0:
+                height = info * block.font_pixels[1]
+                painter.fillRect(QRectF(x + left_rect_off, y - 1 - height,
+                    right_rect_off - left_rect_off, height), block._brush(color_func(line, offset)))
+
+    def update_columns(self, first, last):
+        """repaint columns 'first' through 'last' (relative to block start)"""
+        from Qt.QtCore import QRectF
+        rect = self.boundingRect()
+        left = self.column_x(first) - self._column_step
+        right = self.column_x(last) + self._column_step
+        self.update(QRectF(left, rect.top(), right - left, rect.height()))
+
+    def _glyph(self, text, color, dpr):
+        from Qt.QtGui import QColor
+        if not isinstance(color, QColor):
+            color = QColor(color)
+        font = self.block.font
+        key = (font.key(), text, color.rgba(), dpr)
+        glyph = self.block.glyph_cache.get(key)
+        if glyph is not None:
+            return glyph
+        from Qt.QtGui import QPixmap, QPainter, QFontMetrics
+        from Qt.QtCore import Qt
+        fm = QFontMetrics(font)
+        width, height = max(1, fm.horizontalAdvance(text)), max(1, fm.height())
+        pixmap = QPixmap(int(width * dpr + 0.999), int(height * dpr + 0.999))
+        pixmap.setDevicePixelRatio(dpr)
+        pixmap.fill(Qt.transparent)
+        p = QPainter(pixmap)
+        p.setFont(font)
+        p.setPen(color)
+        p.drawText(0, fm.ascent(), text)
+        p.end()
+        glyph = (pixmap, width, height)
+        self.block.glyph_cache.add(key, glyph)
+        return glyph
+
 def ellipsis_name(name, ellipsis_threshold):
     if len(name) > ellipsis_threshold:
         half = int(ellipsis_threshold/2)
@@ -79,11 +79,14 @@ class _AlignmentsBundleAPI(BundleAPI):
 
                 @property
                 def open_args(self, *, session=session):
-                    from chimerax.core.commands import BoolArg, StringArg, Or
+                    from chimerax.core.commands import BoolArg, StringArg, Or, ListOf, PositiveIntArg
                     return {
                         'alignment': BoolArg,
                         'auto_associate': BoolArg,
                         'ident': StringArg,
+                        'name_filter': StringArg,
+                        'sample': PositiveIntArg,
+                        'seq_names': ListOf(StringArg),
                         'viewer': Or(BoolArg, AlignmentViewerArg(session), SequenceViewerArg(session)),
                     }
         else:
@@ -110,6 +110,7 @@ class Alignment(State):
         self._reference_seq = None
         self._rmsd_chains = None
         self._rmsd_handler = None
+        self._columns = None
         self.associations = {}
         # need to be able to look up chain obj even after demotion to Sequence
         self._sseq_to_chain = {}
@@ -577,6 +578,18 @@ class Alignment(State):
         from chimerax.core.objects import Objects
         select_add(self.session, Objects(atoms=Residues(expansion).atoms))
 
+    @property
+    def columns(self):
+        """An AlignmentColumns instance holding the alignment characters as a numpy array
+           and per-column character counts, for computing column-based values (such as
+           header values) with numpy rather than looping over sequences.  It is kept up to
+           date as sequences change."""
+        cols = self._columns
+        if cols is None or cols.num_seqs != len(self._seqs) or cols.length != len(self._seqs[0]):
+            from .columns import AlignmentColumns
+            self._columns = cols = AlignmentColumns(self._seqs)
+        return cols
+
     @property
     def headers(self):
         return self._headers[:]
@@ -894,6 +907,10 @@ class Alignment(State):
             self._modified_mmaps.append(match_map)
 
     def _notify_observers(self, note_name, note_data, *, viewer_criteria=None):
+        if note_name == self.NOTE_SEQ_CONTENTS:
+            self._update_columns(note_data)
+        elif note_name in (self.NOTE_REALIGNMENT, self.NOTE_ADD_SEQS, self.NOTE_DEL_SEQS):
+            self._columns = None
         if self._observer_notification_suspended > 0:
             self._ob_note_suspended_data.append((note_name, note_data, viewer_criteria))
             return
@@ -983,6 +1000,19 @@ class Alignment(State):
         if not getattr(self, '_realigning', False):
             self._notify_observers(self.NOTE_SEQ_CONTENTS, seq)
 
+    def _update_columns(self, seq):
+        cols = self._columns
+        if cols is None:
+            return
+        try:
+            seq_index = self._seqs.index(seq)
+        except ValueError:
+            seq_index = None
+        if seq_index is None or len(seq) != cols.length:
+            self._columns = None
+        else:
+            cols.update_seq(seq_index, seq)
+
     def _set_realigned(self, realigned_seqs):
         # realigned sequences need to be in the same order as the current sequences
         self._realigning = True
@@ -1017,22 +1047,7 @@ class Alignment(State):
         if headers is None:
             headers = [hdr for hdr in self._headers if hdr.shown or hdr.eval_while_hidden]
             if len(self.seqs) > 1:
-                values = []
-                for i in range(len(self._seqs[0])):
-                    counts = {}
-                    for seq in self._seqs:
-                        c = seq[i]
-                        if not c.isalnum():
-                            continue
-                        counts[c] = counts.get(c, 0) + 1
-                    if not counts:
-                        values.append(0.0)
-                        continue
-                    max_count = None
-                    for c, count in counts.items():
-                        if max_count is None or count > max_count:
-                            max_count = count
-                    values.append(100.0 * max_count / len(self._seqs))
+                values = self.columns.residue_identities().tolist()
                 process_attr(self.COL_IDENTITY_ATTR, values)
         from chimerax.atomic import Residue
         for header in headers:
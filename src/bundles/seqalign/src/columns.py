@@ -0,0 +1,120 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+
+# === UCSF ChimeraX Copyright ===
+# Copyright 2022 Regents of the University of California. All rights reserved.
+# The ChimeraX application is provided pursuant to the ChimeraX license
+# agreement, which covers academic and commercial uses. For more details, see
+# <https://www.rbvi.ucsf.edu/chimerax/docs/licensing.html>
+#
+# This particular file is part of the ChimeraX library. You can also
+# redistribute and/or modify it under the terms of the GNU Lesser General
+# Public License version 2.1 as published by the Free Software Foundation.
+# For more details, see
+# <https://www.gnu.org/licenses/old-licenses/lgpl-2.1.html>
+#
+# THIS SOFTWARE IS PROVIDED "AS IS" WITHOUT WARRANTY OF ANY KIND, EITHER
+# EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE. ADDITIONAL LIABILITY
+# LIMITATIONS ARE DESCRIBED IN THE GNU LESSER GENERAL PUBLIC LICENSE
+# VERSION 2.1
+#
+# This notice must be embedded in or attached to all copies, including partial
+# copies, of the software or any revisions or derivations thereof.
+# === UCSF ChimeraX Copyright ===
+
+"""Column-oriented numpy tables of alignment characters, for fast header computation"""
+
+class AlignmentColumns:
+    """Alignment characters as a (num sequences x alignment length) uint8 array, plus a
+       (alignment length x alphabet size) table of how many times each character occurs
+       in each column.  'alphabet' is the array of distinct character codes in the alignment.
+    """
+
+    def __init__(self, seqs):
+        self.rebuild(seqs)
+
+    def rebuild(self, seqs):
+        from numpy import frombuffer, uint8
+        self.num_seqs = len(seqs)
+        self.length = length = max([len(seq) for seq in seqs])
+        text = ''.join([_padded_characters(seq, length) for seq in seqs])
+        self.chars = frombuffer(bytearray(text.encode('ascii', errors='replace')),
+            uint8).reshape((self.num_seqs, length))
+        self._compute_counts()
+
+    def _compute_counts(self):
+        from numpy import bincount, zeros, arange, int32, array
+        present = bincount(self.chars.ravel(), minlength=256) > 0
+        self.alphabet = alphabet = present.nonzero()[0].astype(self.chars.dtype)
+        self._code = code = zeros((256,), int32)
+        code[alphabet] = arange(len(alphabet), dtype=int32)
+        na = len(alphabet)
+        flat = (arange(self.length, dtype=int32) * na)[None,:] + code[self.chars]
+        self.counts = bincount(flat.ravel(), minlength=self.length*na).reshape((self.length, na))
+        characters = [chr(c) for c in alphabet]
+        self.is_alpha = array([c.isalpha() for c in characters], bool)
+        self.is_alnum = array([c.isalnum() for c in characters], bool)
+        # Column index of each character's upper-case form, for case-insensitive comparisons
+        upper = [c.upper() for c in characters]
+        upper_index = {}
+        self._upper_index = array([upper_index.setdefault(u, len(upper_index)) for u in upper], int32)
+        self.upper_alphabet = list(upper_index.keys())
+
+    def update_seq(self, seq_index, seq):
+        """Sequence 'seq_index' changed its characters without changing its length.
+           The counts are updated for just the changed columns and the (first, last)
+           changed column is returned (or None if nothing changed).
+        """
+        from numpy import frombuffer, uint8
+        if len(seq) != self.length:
+            raise ValueError("Sequence length changed, alignment columns must be rebuilt")
+        new_row = frombuffer(seq.characters.encode('ascii', errors='replace'), uint8)
+        old_row = self.chars[seq_index]
+        cols = (new_row != old_row).nonzero()[0]
+        if len(cols) == 0:
+            return None
+        old_chars, new_chars = old_row[cols], new_row[cols]
+        self.chars[seq_index, cols] = new_chars
+        if (self.alphabet[self._code[new_chars]] == new_chars).all():
+            self.counts[cols, self._code[old_chars]] -= 1
+            self.counts[cols, self._code[new_chars]] += 1
+        else:
+            # character not previously in the alignment
+            self._compute_counts()
+        return (int(cols[0]), int(cols[-1]))
+
+    def column_counts(self, pos1=0, pos2=None, *, mask=None):
+        """Counts for columns pos1 through pos2 (inclusive), optionally restricted
+           to alphabet characters where 'mask' is True (other counts are zeroed)."""
+        counts = self.counts[pos1:(None if pos2 is None else pos2+1)]
+        if mask is not None:
+            counts = counts * mask
+        return counts
+
+    def max_counts(self, pos1=0, pos2=None, *, mask=None):
+        """Largest number of identical characters in each column, considering only
+           alphabet characters where 'mask' is True"""
+        counts = self.column_counts(pos1, pos2, mask=mask)
+        if counts.shape[1] == 0:
+            from numpy import zeros, int32
+            return zeros((len(counts),), int32)
+        return counts.max(axis=1)
+
+    def upper_counts(self, pos1=0, pos2=None):
+        """Column counts combining upper and lower case forms of letters.  Columns of
+           the result correspond to 'upper_alphabet'."""
+        from numpy import zeros, add
+        counts = self.column_counts(pos1, pos2)
+        ucounts = zeros((len(counts), len(self.upper_alphabet)), counts.dtype)
+        add.at(ucounts.T, self._upper_index, counts.T)
+        return ucounts
+
+    def residue_identities(self):
+        """Percent of sequences with the most common alphanumeric character for each column"""
+        return 100.0 * self.max_counts(mask=self.is_alnum) / self.num_seqs
+
+def _padded_characters(seq, length):
+    characters = seq.characters
+    if len(characters) < length:
+        characters += ' ' * (length - len(characters))
+    return characters
@@ -0,0 +1,178 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+
+# === UCSF ChimeraX Copyright ===
+# Copyright 2022 Regents of the University of California. All rights reserved.
+# The ChimeraX application is provided pursuant to the ChimeraX license
+# agreement, which covers academic and commercial uses. For more details, see
+# <https://www.rbvi.ucsf.edu/chimerax/docs/licensing.html>
+#
+# This particular file is part of the ChimeraX library. You can also
+# redistribute and/or modify it under the terms of the GNU Lesser General
+# Public License version 2.1 as published by the Free Software Foundation.
+# For more details, see
+# <https://www.gnu.org/licenses/old-licenses/lgpl-2.1.html>
+#
+# THIS SOFTWARE IS PROVIDED "AS IS" WITHOUT WARRANTY OF ANY KIND, EITHER
+# EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE. ADDITIONAL LIABILITY
+# LIMITATIONS ARE DESCRIBED IN THE GNU LESSER GENERAL PUBLIC LICENSE
+# VERSION 2.1
+#
+# This notice must be embedded in or attached to all copies, including partial
+# copies, of the software or any revisions or derivations thereof.
+# === UCSF ChimeraX Copyright ===
+
+"""
+byte-offset index of the records in FASTA-style ('>' header line) sequence files,
+so that a subset of the sequences of a very large file can be read without reading
+the whole file
+"""
+
+# formats whose records start with a '>' header line
+indexable_formats = { "FASTA": "readFASTA", "A3M": "readA3M" }
+
+class SequenceFileIndex:
+    """Names and byte ranges of each record of a sequence file.
+
+       Indexes are saved in the ChimeraX cache directory and reused as long as the
+       file size and modification time are unchanged.
+    """
+
+    def __init__(self, path, names, starts, ends):
+        self.path = path
+        self.names = names
+        self.starts = starts
+        self.ends = ends
+
+    def __len__(self):
+        return len(self.names)
+
+    @classmethod
+    def for_file(cls, path, *, use_cache=True):
+        """Return the index for file 'path', computing it if there is no valid saved index"""
+        import os
+        path = os.path.abspath(path)
+        if use_cache:
+            index = cls._load(path)
+            if index is not None:
+                return index
+        index = cls._compute(path)
+        if use_cache:
+            index._save()
+        return index
+
+    @classmethod
+    def _compute(cls, path):
+        import mmap, re
+        from numpy import array, int64
+        names, starts = [], []
+        with open(path, 'rb') as f:
+            try:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # empty file
+                data = b''
+            for m in re.finditer(rb'^>([^\r\n]*)', data, re.MULTILINE):
+                starts.append(m.start())
+                names.append(m.group(1).decode('utf-8', errors='replace').strip())
+            size = len(data)
+            if isinstance(data, mmap.mmap):
+                data.close()
+        starts = array(starts, int64)
+        ends = array(starts[1:].tolist() + [size], int64)
+        return cls(path, names, starts, ends)
+
+    @staticmethod
+    def _cache_path(path):
+        import os
+        from hashlib import sha1
+        from chimerax import app_dirs
+        digest = sha1(path.encode('utf-8')).hexdigest()
+        return os.path.join(app_dirs.user_cache_dir, "sequence_index", digest + ".npz")
+
+    @staticmethod
+    def _file_stamp(path):
+        import os
+        st = os.stat(path)
+        return [st.st_size, st.st_mtime_ns]
+
+    @classmethod
+    def _load(cls, path):
+        cache_path = cls._cache_path(path)
+        import os
+        if not os.path.exists(cache_path):
+            return None
+        from numpy import load
+        try:
+            with load(cache_path, allow_pickle=False) as saved:
+                if saved['stamp'].tolist() != cls._file_stamp(path):
+                    return None
+                names = saved['names'].tobytes().decode('utf-8').split('\n')
+                starts, ends = saved['starts'], saved['ends']
+        except (OSError, KeyError, ValueError):
+            return None
+        if len(starts) == 0:
+            names = []
+        return cls(path, names, starts, ends)
+
+    def _save(self):
+        cache_path = self._cache_path(self.path)
+        import os
+        from numpy import savez, frombuffer, uint8, array, int64
+        names = frombuffer('\n'.join(self.names).encode('utf-8'), uint8)
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with open(cache_path, 'wb') as f:
+                savez(f, names=names, starts=self.starts, ends=self.ends,
+                    stamp=array(self._file_stamp(self.path), int64))
+        except OSError:
+            # cannot write cache; index will be recomputed next time
+            pass
+
+    def select(self, *, names=None, name_filter=None, sample=None, seed=None):
+        """Return indices (in file order) of records with the given names, names matching the
+           shell-style 'name_filter' pattern, and/or a random sample of 'sample' records.
+           The first record (typically the query sequence) is always included in a sample.
+        """
+        indices = range(len(self.names))
+        if names is not None:
+            # match either the full header or its first word (the sequence identifier)
+            names = set(names)
+            indices = [i for i in indices
+                if self.names[i] in names or _identifier(self.names[i]) in names]
+        if name_filter is not None:
+            from fnmatch import fnmatchcase
+            indices = [i for i in indices if fnmatchcase(self.names[i], name_filter)]
+        indices = list(indices)
+        if sample is not None and sample < len(indices):
+            import random
+            rng = random.Random(seed)
+            first, rest = indices[:1], indices[1:]
+            indices = first + sorted(rng.sample(rest, max(sample - 1, 0)))
+        return indices
+
+    def read_records(self, indices, format_name="FASTA"):
+        """Generate (header, characters) for the records with the given indices"""
+        from importlib import import_module
+        reader = import_module(".%s" % indexable_formats[format_name], __package__)
+        with open(self.path, 'rb') as f:
+            for i in indices:
+                f.seek(int(self.starts[i]))
+                data = f.read(int(self.ends[i] - self.starts[i]))
+                text = data.decode('utf-8', errors='replace')
+                for record in reader.read_records(text.splitlines(keepends=True)):
+                    yield record
+
+def _identifier(name):
+    fields = name.split(None, 1)
+    return fields[0] if fields else name
+
+def read_indexed(session, path, format_name, **select_kw):
+    """Read the sequences selected by SequenceFileIndex.select() keywords from file 'path'"""
+    from chimerax.atomic import Sequence
+    from ..parse import make_readable
+    index = SequenceFileIndex.for_file(path)
+    indices = index.select(**select_kw)
+    session.logger.status("Reading %d of %d sequences from %s" % (len(indices), len(index), path))
+    return [Sequence(name=make_readable(header), characters=characters)
+        for header, characters in index.read_records(indices, format_name)]
@@ -0,0 +1,57 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+
+# === UCSF ChimeraX Copyright ===
+# Copyright 2022 Regents of the University of California. All rights reserved.
+# The ChimeraX application is provided pursuant to the ChimeraX license
+# agreement, which covers academic and commercial uses. For more details, see
+# <https://www.rbvi.ucsf.edu/chimerax/docs/licensing.html>
+#
+# This particular file is part of the ChimeraX library. You can also
+# redistribute and/or modify it under the terms of the GNU Lesser General
+# Public License version 2.1 as published by the Free Software Foundation.
+# For more details, see
+# <https://www.gnu.org/licenses/old-licenses/lgpl-2.1.html>
+#
+# THIS SOFTWARE IS PROVIDED "AS IS" WITHOUT WARRANTY OF ANY KIND, EITHER
+# EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE. ADDITIONAL LIABILITY
+# LIMITATIONS ARE DESCRIBED IN THE GNU LESSER GENERAL PUBLIC LICENSE
+# VERSION 2.1
+#
+# This notice must be embedded in or attached to all copies, including partial
+# copies, of the software or any revisions or derivations thereof.
+# === UCSF ChimeraX Copyright ===
+
+"""
+reads an A3M file (as produced by HHblits, ColabFold, etc.)
+
+A3M is FASTA-like but lower-case letters (and '.') are insertions relative to the
+first (query) sequence.  The insertions are dropped so that all sequences are
+aligned to the query.
+"""
+
+from string import ascii_lowercase
+_insertion_chars = str.maketrans('', '', ascii_lowercase + '.')
+
+def read(session, f):
+    from chimerax.atomic import Sequence
+    from ..parse import make_readable
+    return [Sequence(name=make_readable(header), characters=characters)
+        for header, characters in read_records(f)], {}, {}
+
+def read_records(lines):
+    from .readFASTA import read_records as read_fasta_records
+    return read_fasta_records(_sequence_lines(lines), filter_characters=remove_insertions)
+
+def _sequence_lines(lines):
+    # ColabFold A3M files can start with a '#' line of query lengths/cardinalities
+    # and end with a NUL character
+    for line in lines:
+        if line.startswith('#'):
+            continue
+        line = line.replace('\0', '')
+        if line:
+            yield line
+
+def remove_insertions(characters):
+    return characters.translate(_insertion_chars)
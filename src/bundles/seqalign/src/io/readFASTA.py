@@ -28,10 +28,19 @@ reads an aligned FASTA file
 
 def read(session, f):
     from chimerax.atomic import Sequence
+    from ..parse import make_readable
+    return [Sequence(name=make_readable(header), characters=characters)
+        for header, characters in read_records(f)], {}, {}
+
+def read_records(lines, filter_characters=None):
+    """Generate (header, characters) for each sequence, reading the lines one at a time.
+       If 'filter_characters' is given, it is called on each line of sequence characters
+       and should return the characters to keep."""
     from ..parse import FormatSyntaxError, make_readable
     in_sequence = False
-    sequences = []
-    for line in f.readlines():
+    header = None
+    chunks = []
+    for line in lines:
         if in_sequence:
             if not line or line.isspace():
                 in_sequence = False
@@ -40,12 +49,19 @@ def read(session, f):
                 in_sequence = False
                 # fall through
             else:
-                sequences[-1].extend(line.strip())
+                chunk = line.strip()
+                if filter_characters is not None:
+                    chunk = filter_characters(chunk)
+                chunks.append(chunk)
         if not in_sequence:
             if line[0] == '>':
-                if sequences and len(sequences[-1]) == 0:
-                    raise FormatSyntaxError("No sequence found for %s"
-                        % sequences[-1].name)
+                if header is not None:
+                    characters = ''.join(chunks)
+                    if not characters:
+                        raise FormatSyntaxError("No sequence found for %s" % make_readable(header))
+                    yield header, characters
                 in_sequence = True
-                sequences.append(Sequence(name=make_readable(line[1:])))
-    return sequences, {}, {}
+                header = line[1:]
+                chunks = []
+    if header is not None:
+        yield header, ''.join(chunks)
@@ -48,9 +48,9 @@ def read(session, f):
     file_markups = {}
     seq_attrs = {}
     seq_markups = {}
-    sequences = {}
+    seq_blocks = {}
     seq_sequence = []
-    for line in f.readlines():
+    for line in f:
         line = line.rstrip() # drop trailing newline/whitespace
         line_num += 1
         if line_num == 1:
@@ -115,11 +115,16 @@ def read(session, f):
         except ValueError:
             raise FormatSyntaxError(
                 "Sequence info not in name/contents format on line %d" % line_num)
-        if seq_name not in sequences:
-            sequences[seq_name] = Sequence(name=make_readable(seq_name))
+        if seq_name not in seq_blocks:
+            seq_blocks[seq_name] = []
             seq_sequence.append(seq_name)
-        sequences[seq_name].extend(block)
+        seq_blocks[seq_name].append(block)
     f.close()
+    # accumulate blocks and create each sequence once, rather than extending them block by block
+    sequences = {}
+    for seq_name in seq_sequence:
+        sequences[seq_name] = Sequence(name=make_readable(seq_name),
+            characters=''.join(seq_blocks.pop(seq_name)))
     for seq_name, seq in sequences.items():
         if seq_name in seq_attrs:
             seq.attrs = seq_attrs[seq_name]
@@ -0,0 +1,46 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+
+# === UCSF ChimeraX Copyright ===
+# Copyright 2022 Regents of the University of California. All rights reserved.
+# The ChimeraX application is provided pursuant to the ChimeraX license
+# agreement, which covers academic and commercial uses. For more details, see
+# <https://www.rbvi.ucsf.edu/chimerax/docs/licensing.html>
+#
+# This particular file is part of the ChimeraX library. You can also
+# redistribute and/or modify it under the terms of the GNU Lesser General
+# Public License version 2.1 as published by the Free Software Foundation.
+# For more details, see
+# <https://www.gnu.org/licenses/old-licenses/lgpl-2.1.html>
+#
+# THIS SOFTWARE IS PROVIDED "AS IS" WITHOUT WARRANTY OF ANY KIND, EITHER
+# EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE. ADDITIONAL LIABILITY
+# LIMITATIONS ARE DESCRIBED IN THE GNU LESSER GENERAL PUBLIC LICENSE
+# VERSION 2.1
+#
+# This notice must be embedded in or attached to all copies, including partial
+# copies, of the software or any revisions or derivations thereof.
+# === UCSF ChimeraX Copyright ===
+
+"""
+writes an A3M file
+
+Columns where the first (query) sequence has a gap are written as insertions:
+lower-case residues in the other sequences, omitted where they have gaps.
+"""
+
+def save(session, alignment, stream):
+    from chimerax.atomic import Sequence
+    seqs = alignment.seqs
+    insertion = [Sequence.is_gap_character(c) for c in seqs[0].characters]
+    for seq in seqs:
+        chars = []
+        for c, ins in zip(seq.characters, insertion):
+            gap = Sequence.is_gap_character(c)
+            if ins:
+                if not gap:
+                    chars.append(c.lower())
+            else:
+                chars.append('-' if gap else c.upper())
+        print(">%s" % seq.name, file=stream)
+        print(''.join(chars), file=stream)
@@ -28,7 +28,8 @@ class NoSequencesError(ValueError):
     pass
 
 def open_file(session, stream, fname, format_name="FASTA", return_vals=None,
-        alignment=True, ident=None, auto_associate=True, **kw):
+        alignment=True, ident=None, auto_associate=True, seq_names=None, name_filter=None,
+        sample=None, **kw):
     ns = {}
     try:
         exec("from .io.read%s import read" % format_name.replace(' ', '_'), globals(), ns)
@@ -38,10 +39,24 @@ def open_file(session, stream, fname, format_name="FASTA", return_vals=None,
         import os.path
         path = fname
         fname = os.path.basename(path)
-        from chimerax import io
-        stream = io.open_input(path, 'utf-8')
+    else:
+        path = getattr(stream, 'name', None)
+    subset = seq_names is not None or name_filter is not None or sample is not None
+    select_kw = { 'names': seq_names, 'name_filter': name_filter, 'sample': sample }
     try:
-        seqs, file_attrs, file_markups = ns['read'](session, stream)
+        from .io.index import indexable_formats, read_indexed
+        if subset and format_name in indexable_formats and _plain_file(path):
+            # use byte-offset index to read only the requested sequences
+            if stream is not None:
+                stream.close()
+            seqs, file_attrs, file_markups = read_indexed(session, path, format_name, **select_kw), {}, {}
+        else:
+            if stream is None:
+                from chimerax import io
+                stream = io.open_input(path, 'utf-8')
+            seqs, file_attrs, file_markups = ns['read'](session, stream)
+            if subset:
+                seqs = _select_seqs(seqs, **select_kw)
     except FormatSyntaxError as err:
         raise IOError("Syntax error in %s file '%s': %s" % (format_name, fname, err))
     if not seqs:
@@ -93,6 +108,16 @@ def open_file(session, stream, fname, format_name="FASTA", return_vals=None,
     from chimerax.core.commands import plural_form
     return [], "Opened %d %s from %s" % (len(seqs), plural_form(seqs, "sequence"), fname)
 
+def _plain_file(path):
+    import os.path
+    from chimerax.io import remove_compression_suffix
+    return isinstance(path, str) and os.path.isfile(path) and remove_compression_suffix(path) == path
+
+def _select_seqs(seqs, **select_kw):
+    from .io.index import SequenceFileIndex
+    index = SequenceFileIndex(None, [seq.name for seq in seqs], None, None)
+    return [seqs[i] for i in index.select(**select_kw)]
+
 def make_readable(seq_name):
     """Make sequence name more human-readable"""
     return seq_name.strip()
@@ -20,3 +20,84 @@ def test_imports(test_production_session, file):
     from chimerax.core.commands import run
 
     run(test_production_session, "open %s" % os.path.join(test_data_dir, file))
+
+
+def test_read_a3m_removes_insertions():
+    from chimerax.seqalign.io.readA3M import read_records
+
+    with open(os.path.join(test_data_dir, "query.a3m"), encoding="utf-8") as f:
+        records = list(read_records(f))
+    assert [header.split()[0] for header, characters in records] == ["query", "hit1", "hit2"]
+    assert [characters for header, characters in records] == ["MKVDLAG", "MKVDLAG", "-KV-LAG"]
+
+
+# Columns with tied counts, gap/letter ties, mixed case and an all-gap column
+header_test_rows = ["MKV-LAGW-", "MRV-LSG.-", "AKIDLAGW-", "AR.DlSG.-"]
+
+
+def _new_alignment(session, rows):
+    from chimerax.atomic import Sequence
+
+    seqs = [Sequence(name="seq%d" % i, characters=chars) for i, chars in enumerate(rows)]
+    return session.alignments.new_alignment(seqs, None, viewer=False, auto_associate=False)
+
+
+def _header(alignment, ident):
+    return [hdr for hdr in alignment.headers if hdr.ident == ident][0]
+
+
+def test_alignment_columns_residue_identities(test_production_session):
+    alignment = _new_alignment(test_production_session, header_test_rows)
+    # per-column computation that AlignmentColumns replaced
+    expected = []
+    for i in range(len(alignment.seqs[0])):
+        counts = {}
+        for seq in alignment.seqs:
+            if seq[i].isalnum():
+                counts[seq[i]] = counts.get(seq[i], 0) + 1
+        expected.append(100.0 * max(counts.values()) / len(alignment.seqs) if counts else 0.0)
+    assert alignment.columns.residue_identities().tolist() == pytest.approx(expected)
+
+
+def test_alignment_columns_update_seq(test_production_session):
+    from chimerax.atomic import Sequence
+    from chimerax.seqalign.columns import AlignmentColumns
+
+    seqs = [Sequence(name="seq%d" % i, characters=chars) for i, chars in enumerate(header_test_rows)]
+    columns = AlignmentColumns(seqs)
+    seqs[2].characters = "AKIDLYGW-"
+    assert columns.update_seq(2, seqs[2]) == (5, 5)
+    assert columns.update_seq(2, seqs[2]) is None
+    rebuilt = AlignmentColumns(seqs)
+    assert (columns.alphabet == rebuilt.alphabet).all()
+    assert (columns.counts == rebuilt.counts).all()
+
+
+@pytest.mark.parametrize("ignore_gaps", [False, True])
+def test_consensus_columns_match_evaluate(test_production_session, monkeypatch, ignore_gaps):
+    alignment = _new_alignment(test_production_session, header_test_rows)
+    consensus = _header(alignment, "consensus")
+    monkeypatch.setattr(consensus.settings, "ignore_gaps", ignore_gaps)
+    num_cols = len(alignment.seqs[0])
+    expected = [consensus.evaluate(pos) for pos in range(num_cols)]
+    expected_conserved = consensus.conserved[:]
+    consensus.conserved = [False] * num_cols
+    consensus._evaluate_columns(0, num_cols - 1)
+    assert consensus[:] == expected
+    assert consensus.conserved == expected_conserved
+
+
+@pytest.mark.parametrize("style", ["identity histogram", "Clustal characters"])
+def test_conservation_columns_match_evaluate(test_production_session, monkeypatch, style):
+    alignment = _new_alignment(test_production_session, header_test_rows)
+    conservation = _header(alignment, "conservation")
+    monkeypatch.setattr(conservation.settings, "style", style)
+    num_cols = len(alignment.seqs[0])
+    expected = [conservation.evaluate(pos) for pos in range(num_cols)]
+    conservation._evaluate_columns(0, num_cols - 1)
+    if style == "identity histogram":
+        assert conservation[:] == pytest.approx(expected)
+    else:
+        assert conservation[:] == expected
+    histogram = [conservation.percent_identity(pos, for_histogram=True) for pos in range(num_cols)]
+    assert conservation.percent_identities(for_histogram=True).tolist() == pytest.approx(histogram)
@@ -1085,6 +1085,16 @@ def _none_possible_colors(item_colors, attr_vals, non_none_colors, no_value_colo
     import numpy
     return numpy.array(colors, dtype=numpy.uint8)
 
+def _item_attr_values(items, class_obj, attr_name):
+    # Values of custom attributes stored in the structures' attribute columns are read as arrays
+    from chimerax.atomic.custom_attrs import is_column_attr
+    if is_column_attr(class_obj, attr_name):
+        vals, has = items.custom_attr_values(attr_name)
+        if has.all() and vals.dtype != object:
+            return vals
+        return [v if h else None for v, h in zip(vals.tolist(), has)]
+    return [getattr(item, attr_name, None) for item in items]
+
 def color_by_attr(session, attr_name, atoms=None, what=None, target=None, average=None,
                   palette=None, range=None, no_value_color=None,
                   transparency=None, undo_name="color byattribute", key=False,
@@ -1179,7 +1189,7 @@ def color_by_attr(session, attr_name, atoms=None, what=None, target=None, averag
                 rib_colors = ring_colors = _value_colors(palette, range, res_attr_vals)
     if needs_none_processing:
         if attr_vals is None:
-            attr_vals = [getattr(o, attr_name, None) for o in attr_objs]
+            attr_vals = _item_attr_values(attr_objs, class_obj, attr_name)
         has_none = None in attr_vals
         if has_none:
             if average == 'residues' and class_obj == Atom:
@@ -1217,7 +1227,7 @@ def color_by_attr(session, attr_name, atoms=None, what=None, target=None, averag
                 else:
                     residues = atoms.unique_residues
                     if class_obj == Residue:
-                        res_attr_vals = [getattr(r, attr_name, None) for r in residues]
+                        res_attr_vals = _item_attr_values(residues, Residue, attr_name)
                     else:
                         res_attr_vals = [getattr(r.structure, attr_name, None) for r in residues]
                 non_none_res_attr_vals = [v for v in res_attr_vals if v is not None]
@@ -1248,7 +1258,7 @@ def color_by_attr(session, attr_name, atoms=None, what=None, target=None, averag
                 else:
                     residues = atoms.unique_residues
                     if class_obj == Residue:
-                        res_attr_vals = [getattr(r, attr_name, None) for r in residues]
+                        res_attr_vals = _item_attr_values(residues, Residue, attr_name)
                     else:
                         res_attr_vals = [getattr(r.structure, attr_name) for r in residues]
                 rib_colors = ring_colors = _value_colors(palette, range, res_attr_vals)
@@ -89,7 +89,6 @@ def defattr(session, data, *, log=False, restriction=None, file_name=None, summa
             raise SyntaxError("No data lines for attribute '%s' in %s" % (attr_info['attribute'], fn))
         ai.append((attr_info, data_info))
     from chimerax.core.commands import AtomSpecArg, AttrNameArg, AnnotationError, NoneArg, ColorArg, commas
-    from chimerax.core.commands import IntArg, FloatArg
     from chimerax.io import open_input
     with open_input(data, encoding="utf-8") as f:
         data = []
@@ -146,7 +145,6 @@ def defattr(session, data, *, log=False, restriction=None, file_name=None, summa
             append_all_info(attrs, data, lnum+1)
 
     for attr_info, data_info in all_info:
-        num_assignments = 0
         attr_name = attr_info['attribute']
         color_attr = attr_name.lower().endswith('color') or attr_name.lower().endswith('colour')
 
@@ -154,7 +152,6 @@ def defattr(session, data, *, log=False, restriction=None, file_name=None, summa
 
         none_handling = attr_info.get('none handling', control_defaults['none handling'])
         none_okay = none_handling != 'string'
-        none_seen = False
         eval_vals = ["true", "false"]
         if none_okay:
             eval_vals.append("none")
@@ -175,32 +172,7 @@ def defattr(session, data, *, log=False, restriction=None, file_name=None, summa
                 raise ValueError("%s is a constant in the %s class and cannot be redefined"
                     % (attr_name, recip_class.__name__))
 
-        for line_num, spec, value_string in data_info:
-            try:
-                atom_spec, *args = AtomSpecArg.parse(spec, session)
-            except AnnotationError as e:
-                raise SyntaxError("Bad atom specifier (%s) on line %d of %s" % (spec, line_num, file_name))
-
-            try:
-                objects = atom_spec.evaluate(session, models=restriction)
-            except Exception as e:
-                raise SyntaxError("Error evaluating atom specifier (%s) on line %d of %s: %s"
-                    % (spec, line_num, file_name, str(e)))
-
-            matches = instance_fetch(objects)
-
-            if not matches and match_mode != "any":
-                raise SyntaxError("Selector (%s) on line %d of %s matched nothing"
-                    % (spec, line_num, file_name))
-            if len(matches) > 1 and match_mode == "1-to-1":
-                raise SyntaxError("Selector (%s) on line %d of %s matched multiple %s"
-                    % (spec, line_num, file_name, recipient))
-            num_assignments += len(matches)
-
-            if log:
-                session.logger.info("Selector %s matched %s"
-                    % (spec, commas([str(x) for x in matches], conjunction="and")))
-
+        def parse_value(line_num, value_string):
             if not value_string:
                 raise SyntaxError("No data value on line %d of %s" % (line_num, file_name))
 
@@ -240,30 +212,15 @@ def defattr(session, data, *, log=False, restriction=None, file_name=None, summa
                     else:
                         seen_types.add(bool)
                 else:
-                    try:
-                        value, text, rest = IntArg.parse(value_string, session)
-                        if rest:
-                            raise AnnotationError("trailing text")
-                        seen_types.add(int)
-                    except AnnotationError:
-                        try:
-                            value, text, rest = FloatArg.parse(value_string, session)
-                            if rest:
-                                raise AnnotationError("trailing text")
-                            seen_types.add(float)
-                        except AnnotationError:
-                            value = value_string
-                            seen_types.add(str)
-
-            for match in matches:
-                if value is not None or none_handling == "None":
-                    setattr(match, attr_name, value)
-                elif hasattr(match, attr_name):
-                    if is_builtin_attr:
-                        raise RuntimeError("Cannot remove builtin attribute %s from class %s"
-                            % (attr_name, recip_class.__name__))
-                    else:
-                        delattr(match, attr_name)
+                    value = _parse_number(value_string)
+                    if value is None:
+                        value = value_string
+                    seen_types.add(type(value))
+            return value
+
+        # Parse all the values first, so that the attribute is registered before any values are
+        # assigned and values can be assigned to whole collections at once
+        values = [parse_value(line_num, value_string) for line_num, spec, value_string in data_info]
 
         can_return_none = None in seen_types
         seen_types.discard(None)
@@ -281,10 +238,285 @@ def defattr(session, data, *, log=False, restriction=None, file_name=None, summa
         except RegistrationConflict as e:
             raise UserError(e)
 
+        def evaluate_spec(spec, line_num):
+            try:
+                atom_spec, *args = AtomSpecArg.parse(spec, session)
+            except AnnotationError as e:
+                raise SyntaxError("Bad atom specifier (%s) on line %d of %s" % (spec, line_num, file_name))
+
+            try:
+                objects = atom_spec.evaluate(session, models=restriction)
+            except Exception as e:
+                raise SyntaxError("Error evaluating atom specifier (%s) on line %d of %s: %s"
+                    % (spec, line_num, file_name, str(e)))
+
+            return instance_fetch(objects)
+
+        def check_matches(num_matches, spec, line_num):
+            if not num_matches and match_mode != "any":
+                raise SyntaxError("Selector (%s) on line %d of %s matched nothing"
+                    % (spec, line_num, file_name))
+            if num_matches > 1 and match_mode == "1-to-1":
+                raise SyntaxError("Selector (%s) on line %d of %s matched multiple %s"
+                    % (spec, line_num, file_name, recipient))
+
+        if recipient in ("atoms", "residues") and not log:
+            num_assignments = _assign_in_bulk(restriction, recipient, recip_class, attr_name,
+                is_builtin_attr, data_info, values, none_handling, evaluate_spec, check_matches)
+        else:
+            num_assignments = 0
+            for (line_num, spec, value_string), value in zip(data_info, values):
+                matches = evaluate_spec(spec, line_num)
+                check_matches(len(matches), spec, line_num)
+                num_assignments += len(matches)
+
+                if log:
+                    session.logger.info("Selector %s matched %s"
+                        % (spec, commas([str(x) for x in matches], conjunction="and")))
+
+                for match in matches:
+                    _assign_value(match, recip_class, attr_name, value, none_handling, is_builtin_attr)
+
         if summary:
             session.logger.info("Assigned attribute '%s' to %d %s using match mode: %s" % (attr_name,
                 num_assignments, (recipient if num_assignments != 1 else recipient[:-1]), match_mode))
 
+def _parse_number(value_string):
+    from chimerax.core.commands import IntArg, FloatArg, AnnotationError
+    for arg in (IntArg, FloatArg):
+        try:
+            value, text, rest = arg.parse(value_string, None)
+        except AnnotationError:
+            continue
+        if not rest:
+            return value
+    return None
+
+def _assign_value(item, recip_class, attr_name, value, none_handling, is_builtin_attr):
+    if value is not None or none_handling == "None":
+        setattr(item, attr_name, value)
+    elif hasattr(item, attr_name):
+        if is_builtin_attr:
+            raise RuntimeError("Cannot remove builtin attribute %s from class %s"
+                % (attr_name, recip_class.__name__))
+        else:
+            delattr(item, attr_name)
+
+def _assign_in_bulk(structures, recipient, recip_class, attr_name, is_builtin_attr, data_info, values,
+        none_handling, evaluate_spec, check_matches):
+    """Assign values to atoms or residues.  Simple specifiers such as #1/A:12@CA are looked up in
+       tables of each structure's residues and atoms instead of being evaluated one at a time, and
+       the values are assigned with the collection-level setters.  Returns the number of assignments.
+    """
+    from numpy import concatenate, array, argsort, unique, intp, bincount, empty
+    lookup = _SpecLookup(structures, recipient)
+    slow_lines, slow_pointers = [], []
+    for i, (line_num, spec, value_string) in enumerate(data_info):
+        if not lookup.add_spec(i, spec):
+            slow_lines.append(i)
+            slow_pointers.append(evaluate_spec(spec, line_num).pointers)
+    lines, pointers = lookup.matches()
+    if slow_lines:
+        lines = concatenate([lines] + [array([i]*len(p), intp) for i, p in zip(slow_lines, slow_pointers)])
+        pointers = concatenate([pointers] + slow_pointers)
+    counts = bincount(lines, minlength=len(data_info))
+    for (line_num, spec, value_string), count in zip(data_info, counts):
+        check_matches(count, spec, line_num)
+
+    # When an item is assigned more than once, the last value in the file is used
+    order = argsort(lines, kind='stable')[::-1]
+    pointers, first = unique(pointers[order], return_index=True)
+    lines = lines[order][first]
+
+    line_values = empty((len(values),), object)
+    for i, value in enumerate(values):
+        line_values[i] = value
+    item_values = line_values[lines]
+    is_none = array([v is None for v in item_values], bool)
+    if none_handling == "delete" and is_none.any():
+        delete_pointers, pointers, item_values = pointers[is_none], pointers[~is_none], item_values[~is_none]
+    else:
+        delete_pointers = None
+
+    from chimerax.atomic import Atoms, Residues
+    collection_class = Atoms if recipient == "atoms" else Residues
+    items = collection_class(pointers)
+    from chimerax.atomic.custom_attrs import is_column_attr
+    if is_column_attr(recip_class, attr_name):
+        items.set_custom_attr_values(attr_name, _uniform_array(item_values))
+        if delete_pointers is not None:
+            collection_class(delete_pointers).delete_custom_attr(attr_name)
+    else:
+        from chimerax.core.commands import plural_of
+        plural_attr = plural_of(attr_name)
+        # plural attributes such as coord_indices may be read-only even though the
+        # per-item attribute can be set
+        plural_prop = getattr(collection_class, plural_attr, None)
+        if is_builtin_attr and isinstance(plural_prop, property) and plural_prop.fset is not None \
+                and not any(v is None for v in item_values):
+            setattr(items, plural_attr, _uniform_array(item_values))
+        else:
+            for item, value in zip(items, item_values):
+                _assign_value(item, recip_class, attr_name, value, none_handling, is_builtin_attr)
+        if delete_pointers is not None:
+            for item in collection_class(delete_pointers):
+                _assign_value(item, recip_class, attr_name, None, none_handling, is_builtin_attr)
+    return int(counts.sum())
+
+def _uniform_array(values):
+    # Object array of values as a numeric array when all the values are numbers or colors
+    from numpy import array
+    types = set(type(v) for v in values)
+    if types and types.issubset(set([int, float])) or types == set([bool]):
+        return array(values.tolist())
+    if len(values) > 0 and all(getattr(v, 'shape', None) == (4,) for v in values):
+        return array(values.tolist())
+    return values
+
+# Atom specifier with optional model and chain parts, a single residue number and an optional atom name
+_simple_spec = None
+def _simple_spec_pattern():
+    global _simple_spec
+    if _simple_spec is None:
+        import re
+        _simple_spec = re.compile(r'(?:#(\d+(?:\.\d+)*))?(?:/([A-Za-z0-9]+))?:(\d+)([A-Za-z]?)'
+            r'(?:@([^\s@:/#,;&|~()"=<>!^*?\[\]-]+))?$')
+    return _simple_spec
+
+class _SpecLookup:
+    """Finds the atoms or residues matched by simple atom specifiers using tables of residue
+       numbers and atom names.  Specifiers that need the general atom-specifier machinery
+       (ranges, wildcards, attribute tests, ...) are left for the caller to evaluate.
+    """
+    def __init__(self, structures, recipient):
+        self.structures = [s for s in structures if not s.deleted]
+        self.recipient = recipient
+        self._tables = {}
+        self._lines, self._pointers = [], []
+        # atom lookups are resolved together per structure: line, residue index, atom name
+        self._atom_lookups = {}
+
+    def add_spec(self, line_index, spec):
+        """Record the items matched by 'spec'; returns False if it is not a simple specifier"""
+        m = _simple_spec_pattern().match(spec.strip())
+        if m is None:
+            return False
+        model_id, chain_id, res_num, ic, atom_name = m.groups()
+        if atom_name is not None and self.recipient != "atoms":
+            return False
+        if model_id is None:
+            structures = self.structures
+        else:
+            mid = tuple(int(i) for i in model_id.split('.'))
+            structures = [s for s in self.structures if s.id[:len(mid)] == mid]
+        found = []
+        for s in structures:
+            table = self._table(s)
+            rindices = table.residue_indices(chain_id, int(res_num), ic, res_num + ic)
+            if rindices is None:
+                return False
+            if rindices:
+                found.append((table, rindices))
+        for table, rindices in found:
+            if self.recipient == "residues":
+                self._lines.append([line_index] * len(rindices))
+                self._pointers.append(table.residue_pointers[rindices])
+            else:
+                lookups = self._atom_lookups.setdefault(table, ([], [], []))
+                lookups[0].extend([line_index] * len(rindices))
+                lookups[1].extend(rindices)
+                lookups[2].extend([atom_name] * len(rindices))
+        return True
+
+    def matches(self):
+        """Return arrays of the line index and item pointer of each match"""
+        from numpy import concatenate, array, intp, uintp
+        lines = [array(l, intp) for l in self._lines]
+        pointers = list(self._pointers)
+        for table, (alines, rindices, names) in self._atom_lookups.items():
+            l, p = table.atom_matches(array(alines, intp), array(rindices, intp), names)
+            lines.append(l)
+            pointers.append(p)
+        if not lines:
+            return array((), intp), array((), uintp)
+        return concatenate(lines), concatenate(pointers)
+
+    def _table(self, s):
+        table = self._tables.get(s)
+        if table is None:
+            table = self._tables[s] = _StructureSpecTable(s)
+        return table
+
+class _StructureSpecTable:
+    """Residue and atom lookup tables of one structure that follow the atom-specifier matching
+       rules: chain IDs are case-insensitive unless the structure has lower-case chain IDs, atom
+       names are case-insensitive, and a residue number that matches no residue may instead
+       match a residue name.
+    """
+    def __init__(self, s):
+        self.structure = s
+        residues = s.residues
+        self.residue_pointers = residues.pointers
+        self.case_sensitive_chains = s.lower_case_chains
+        chain_ids = residues.chain_ids
+        if not self.case_sensitive_chains:
+            chain_ids = [cid.lower() for cid in chain_ids]
+        self._residues = {}
+        self._chainless_residues = {}
+        for i, key in enumerate(zip(chain_ids, residues.numbers.tolist(), residues.insertion_codes)):
+            self._residues.setdefault(key, []).append(i)
+            self._chainless_residues.setdefault(key[1:], []).append(i)
+        self._residue_names = set(name.lower() for name in residues.unique_names)
+        self._atom_keys = None
+
+    def residue_indices(self, chain_id, number, ic, res_text):
+        """Indices of residues matching a specifier, or None if the specifier could match by
+           residue name"""
+        if chain_id is None:
+            rindices = self._chainless_residues.get((number, ic))
+        else:
+            if not self.case_sensitive_chains:
+                chain_id = chain_id.lower()
+            rindices = self._residues.get((chain_id, number, ic))
+        if rindices is None:
+            return None if res_text.lower() in self._residue_names else []
+        return rindices
+
+    def atom_matches(self, lines, rindices, names):
+        """Atoms in the given residues with the given names (None for all atoms), returned as
+           arrays of the line index and atom pointer for each match"""
+        from numpy import searchsorted, repeat, arange, cumsum, int64, array
+        self._make_atom_table()
+        keys, ncodes = self._atom_keys, len(self._name_codes)
+        start_key = rindices.astype(int64) * ncodes
+        codes = array([(-1 if name is None else self._name_codes.get(name.lower(), -2))
+            for name in names], int64)
+        lo = searchsorted(keys, start_key + codes.clip(0), 'left')
+        hi = searchsorted(keys, start_key + codes.clip(0), 'right')
+        all_atoms = (codes == -1)
+        hi[all_atoms] = searchsorted(keys, start_key[all_atoms] + ncodes, 'left')
+        hi[codes == -2] = lo[codes == -2]
+        counts = hi - lo
+        total = counts.sum()
+        offsets = arange(total) - repeat(cumsum(counts) - counts, counts)
+        atom_indices = repeat(lo, counts) + offsets
+        return repeat(lines, counts), self._atom_pointers[atom_indices]
+
+    def _make_atom_table(self):
+        if self._atom_keys is not None:
+            return
+        from numpy import unique, argsort, int64, array, char
+        s = self.structure
+        atoms = s.atoms
+        rindices = s.residues.indices(atoms.residues).astype(int64)
+        names = char.lower(array(atoms.names, str))
+        unique_names, codes = unique(names, return_inverse=True)
+        self._name_codes = {name:i for i, name in enumerate(unique_names.tolist())}
+        keys = rindices * max(1, len(unique_names)) + codes
+        order = argsort(keys, kind='stable')
+        self._atom_keys = keys[order]
+        self._atom_pointers = atoms.pointers[order]
+
 def parse_attribute_name(session, attr_name, *, allowable_types=None):
     from chimerax.atomic import Atom, Residue, Structure
     from chimerax.core.attributes import MANAGER_NAME, type_attrs
@@ -374,18 +606,21 @@ def write_defattr(session, output, *, models=None, attr_name=None, match_mode="1
     type_warning_issued = False
     from chimerax import io
     num_saved = 0
+    if recipient == "structures":
+        omit_structure = None
+    elif model_ids is None:
+        omit_structure = len(session.models.list(type=Structure)) == 1
+    else:
+        omit_structure = not model_ids
     with io.open_output(output, 'utf-8') as stream:
         print("attribute: %s" % attr_name, file=stream)
         print("recipient: %s" % recipient, file=stream)
         print("match mode: %s" % match_mode, file=stream)
-        for source in sources:
-            try:
-                val = getattr(source, attr_name)
-            except AttributeError:
-                continue
+        lines = []
+        for spec, val in _items_and_values(sources, recipient, class_obj, attr_name, omit_structure):
             if val is None:
                 if none_handling != "python":
-                    print("none handling: None", file=stream)
+                    lines.append("none handling: None\n")
                     none_handling = "python"
                 val = "None"
             elif type(val) == str:
@@ -397,7 +632,7 @@ def write_defattr(session, output, *, models=None, attr_name=None, match_mode="1
                         val = '"%s"' % val
                     # string can't be misinterpreted as numeric, check for none/None
                     elif (val == "none" or val == "None") and none_handling != "string":
-                        print("none handling: string", file=stream)
+                        lines.append("none handling: string\n")
                         none_handling = "string"
                 else:
                     val = '"%s"' % val
@@ -411,17 +646,104 @@ def write_defattr(session, output, *, models=None, attr_name=None, match_mode="1
                             " boolean, string or None (e.g. %s); skipping those" % repr(val))
                         type_warning_issued = True
                     continue
-            if recipient == "structures":
-                spec = source.atomspec
-            else:
-                spec = source.string(style="command",
-                    omit_structure=(None if model_ids is None else not model_ids))
-            print("\t%s\t%s" % (spec, str(val)), file=stream)
+            lines.append("\t%s\t%s\n" % (spec, str(val)))
             num_saved += 1
+            if len(lines) >= 10000:
+                stream.write(''.join(lines))
+                lines = []
+        stream.write(''.join(lines))
 
         session.logger.info("Saved attribute '%s' of %d %s using match mode: %s to %s" % (attr_name,
             num_saved, (recipient if num_saved != 1 else recipient[:-1]), match_mode, output))
 
+def _items_and_values(sources, recipient, class_obj, attr_name, omit_structure):
+    """Generate (atom spec, value) for the items that have a value of the attribute.  For atoms
+       and residues the values and specifiers are computed for whole collections at once.
+    """
+    if recipient == "structures":
+        for source in sources:
+            try:
+                val = getattr(source, attr_name)
+            except AttributeError:
+                continue
+            yield source.atomspec, val
+        return
+    if len(sources) == 0:
+        return
+
+    from chimerax.atomic.custom_attrs import is_column_attr
+    from chimerax.core.commands import plural_of
+    plural_attr = plural_of(attr_name)
+    if is_column_attr(class_obj, attr_name):
+        values, has_values = sources.custom_attr_values(attr_name)
+        values = values.tolist()
+    elif hasattr(sources, plural_attr):
+        values, has_values = getattr(sources, plural_attr), None
+        import numpy
+        if isinstance(values, numpy.ndarray) and values.ndim == 1:
+            values = values.tolist()
+    else:
+        values, has_values = [], []
+        for source in sources:
+            try:
+                values.append(getattr(source, attr_name))
+                has_values.append(True)
+            except AttributeError:
+                values.append(None)
+                has_values.append(False)
+    specs = _item_specs(sources, recipient, omit_structure)
+    if has_values is None:
+        yield from zip(specs, values)
+    else:
+        for spec, val, has_val in zip(specs, values, has_values):
+            if has_val:
+                yield spec, val
+
+def _item_specs(items, recipient, omit_structure):
+    """Command-style atom specifiers of Atoms or Residues, the same as item.string(style="command")"""
+    from chimerax.atomic import Chain
+    from chimerax.atomic.custom_attrs import structure_masks
+    from numpy import empty, unique
+    specs = empty((len(items),), object)
+    residues = items if recipient == "residues" else items.residues
+    chain_specs = {}
+    for s, mask in structure_masks(items):
+        prefix = "" if omit_structure else s.string(style="command")
+        sres = residues.filter(mask)
+        res_specs = []
+        for cid, number, ic in zip(sres.chain_ids, sres.numbers.tolist(), sres.insertion_codes):
+            chain_spec = chain_specs.get(cid)
+            if chain_spec is None:
+                chain_spec = chain_specs[cid] = Chain.chain_id_to_atom_spec(cid)
+            res_specs.append("%s%s:%d%s" % (prefix, chain_spec, number, ic))
+        if recipient == "residues":
+            specs[mask] = res_specs
+            continue
+        # atom names that are not unique in their residue are specified by serial number
+        satoms = items.filter(mask)
+        all_atoms = s.atoms
+        all_keys = _atom_name_keys(s, all_atoms)
+        keys = _atom_name_keys(s, satoms)
+        ukeys, key_counts = unique(all_keys, return_counts=True)
+        duplicate = key_counts[ukeys.searchsorted(keys)] > 1
+        atom_specs = []
+        for res_spec, name, dup, serial in zip(res_specs, satoms.names, duplicate,
+                satoms.serial_numbers.tolist()):
+            if dup:
+                atom_str = '@@serial_number=' + str(serial)
+            elif name.endswith('-'):
+                atom_str = '@@name="' + name + '"'
+            else:
+                atom_str = '@' + name
+            atom_specs.append(res_spec + atom_str)
+        specs[mask] = atom_specs
+    return specs
+
+def _atom_name_keys(s, atoms):
+    from numpy import array, char
+    rindices = s.residues.indices(atoms.residues)
+    return char.add(char.add(array(rindices, str), ' '), array(atoms.names, str))
+
 def register_command(logger):
     from chimerax.core.commands import register, CmdDesc
     from chimerax.core.commands import EmptyArg, Or, OpenFileNameArg, BoolArg
@@ -140,8 +140,12 @@ def set_attr(session, objects, target, attr_name, attr_value, create=False, type
                     register_attr(session, items.object_class, attr_name, type(value))
                 else:
                     raise UserError("Not creating attribute '%s'; use 'create true' to override" % attr_name)
-            for item in items:
-                setattr(item, attr_name, value)
+            from chimerax.atomic.custom_attrs import is_column_attr
+            if is_column_attr(items.object_class, attr_name):
+                items.set_custom_attr_values(attr_name, [value] * len(items))
+            else:
+                for item in items:
+                    setattr(item, attr_name, value)
         if items.object_class in session.change_tracker.tracked_classes:
             session.change_tracker.add_modified(items, attr_name + " changed")
     else:
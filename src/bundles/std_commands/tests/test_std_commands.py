@@ -172,3 +172,31 @@ def test_exit_command(test_production_session):
     from chimerax.core.commands import run
     with pytest.raises(SystemExit):
         run(test_production_session, "exit")
+
+def _write_defattr(tmp_path, attr_name, lines):
+    path = tmp_path / ("%s.defattr" % attr_name)
+    path.write_text("attribute: %s\nrecipient: atoms\nmatch mode: 1-to-1\n" % attr_name
+        + "".join("\t%s\t%s\n" % line for line in lines))
+    return str(path)
+
+def test_defattr_atoms(test_production_session, tmp_path):
+    from chimerax.core.commands import run
+    session = test_production_session
+    s = run(session, "open 2tpk autostyle false")[0]
+    run(session, "defattr %s" % _write_defattr(tmp_path, "myattr", [(":12@CA", 1.5), (":13@CA", 2)]))
+    run(session, "defattr %s" % _write_defattr(tmp_path, "bfactor", [(":12@CA", 42.5)]))
+    ca12, ca13 = [s.atoms.filter((s.atoms.names == "CA") & (s.atoms.residues.numbers == n))[0]
+        for n in (12, 13)]
+    assert ca12.myattr == 1.5 and ca13.myattr == 2
+    assert ca12.bfactor == 42.5
+
+def test_defattr_read_only_plural(test_production_session, tmp_path, monkeypatch):
+    # builtin atom attributes whose collection attribute cannot be set are assigned per atom
+    from chimerax.core.commands import run
+    from chimerax.atomic import Atoms
+    session = test_production_session
+    s = run(session, "open 2tpk autostyle false")[0]
+    monkeypatch.setattr(Atoms, "occupancies", property(Atoms.occupancies.fget))
+    run(session, "defattr %s" % _write_defattr(tmp_path, "occupancy", [(":12@CA", 0.25)]))
+    ca12 = s.atoms.filter((s.atoms.names == "CA") & (s.atoms.residues.numbers == 12))[0]
+    assert ca12.occupancy == 0.25
@@ -304,10 +304,6 @@ def write_stl(session, filename, models):
             pos = d.get_scene_positions(displayed_only = True)
             if len(pos) > 0:
                 geom.append((va, ta, pos))
-    from chimerax.surface import combine_geometry_vtp
-    va, ta = combine_geometry_vtp(geom)
-    from .stl_cpp import stl_pack
-    stl_geom = stl_pack(va, ta)
     
     # Write 80 character comment.
     from chimerax import app_dirs as ad
@@ -319,12 +315,17 @@ def write_stl(session, filename, models):
     file.write(comment.encode('utf-8'))
 
     # Write number of triangles
-    tc = len(ta)
+    tc = sum(len(ta)*len(pos) for va, ta, pos in geom)
     from numpy import uint32
     file.write(binary_string(tc, uint32))
 
-    # Write triangles.
-    file.write(stl_geom)
+    # Write triangles for batches of instances to limit memory use.
+    from chimerax.surface import combine_geometry_vtp, position_batches
+    from .stl_cpp import stl_pack
+    for va, ta, pos in geom:
+        for bpos in position_batches(pos, len(va)):
+            bva, bta = combine_geometry_vtp([(va, ta, bpos)])
+            file.write(stl_pack(bva, bta))
     file.close()
 
 # -----------------------------------------------------------------------------
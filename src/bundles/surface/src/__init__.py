@@ -22,7 +22,7 @@
 # copies, of the software or any revisions or derivations thereof.
 # === UCSF ChimeraX Copyright ===
 
-from .sasa import spheres_surface_area
+from .sasa import spheres_surface_area, buried_sphere_areas, IncrementalSphereAreas
 from .split import split_surfaces
 from .shapes import sphere_geometry, sphere_geometry2, cylinder_geometry, dashed_cylinder_geometry, cone_geometry, box_geometry
 from .area import surface_area, enclosed_volume, surface_volume_and_area
@@ -51,6 +51,7 @@ from .colorvol import color_sample, color_electrostatic, color_gradient, color_s
 from .combine import combine_geometry, combine_geometry_vnt, combine_geometry_vntc
 from .combine import combine_geometry_xvnt, combine_geometry_vtp
 from .combine import combine_geometry_xvntctp, combine_geometry_vtc, combine_geometry_vte
+from .combine import position_batches
 from .surfacecmds import surface, surface_show_patches, surface_hide_patches
 from .sop import surface_zone
 
@@ -202,3 +202,19 @@ def combine_geometry(geom, vertex_position = 0, triangle_position = 1):
         toffset += tc
 
     return cgeom
+
+# -----------------------------------------------------------------------------
+# Split positions into batches so that copies of a geometry with vertex_count
+# vertices at the positions of each batch have at most max_vertices vertices.
+# Used to write instanced geometry to files with bounded memory use.
+#
+def position_batches(positions, vertex_count, max_vertices = 2**20):
+    n = len(positions)
+    bsize = max(1, max_vertices // max(1, vertex_count))
+    if n <= bsize:
+        yield positions
+        return
+    from chimerax.geometry import Places
+    pa = positions.array()
+    for i in range(0, n, bsize):
+        yield Places(place_array = pa[i:i+bsize])
@@ -513,3 +513,115 @@ def report_sphere_area_errors(areas, centers, radii, npoints = 1000, max_err = 0
             for i in ei[::-1]:
                 if aerr[i] >= max_err:
                     print (i, areas[i], eareas[i])
+
+class IncrementalSphereAreas:
+    '''
+    Exposed surface areas of a set of spheres that are updated when some
+    sphere centers or radii change.  Only spheres that intersect a changed
+    sphere (before or after the change) have their area recomputed.  Each
+    recomputation uses the same exact calculation as spheres_surface_area()
+    on the spheres in the neighborhood of the changed ones, so results are
+    identical to computing all areas from scratch.  Previously computed
+    areas can be given to avoid the initial calculation.
+    '''
+    def __init__(self, centers, radii, areas = None):
+        from numpy import array, float64
+        self._centers = array(centers, float64)
+        self._radii = array(radii, float64)
+        if areas is None:
+            areas = spheres_surface_area(self._centers, self._radii)
+        self.areas = areas
+
+    def update(self, centers = None, radii = None, changed = None):
+        '''
+        Set new sphere centers and/or radii and recompute areas that changed.
+        Changed spheres are found by comparing with the previous values unless
+        a boolean mask or index array of changed spheres is given.
+        Returns the number of spheres whose area was recomputed.
+        '''
+        from numpy import array, float64, zeros, logical_or, nonzero
+        n = len(self._radii)
+        old_centers = self._centers
+        new_centers = old_centers if centers is None else array(centers, float64)
+        new_radii = self._radii if radii is None else array(radii, float64)
+        if changed is None:
+            cmask = zeros((n,), bool)
+            if new_centers is not old_centers:
+                logical_or(cmask, (new_centers != old_centers).any(axis = 1), cmask)
+            if new_radii is not self._radii:
+                logical_or(cmask, new_radii != self._radii, cmask)
+            cindices = nonzero(cmask)[0]
+        else:
+            changed = array(changed)
+            cindices = nonzero(changed)[0] if changed.dtype == bool else changed
+        self._centers, self._radii = new_centers, new_radii
+        if len(cindices) == 0:
+            return 0
+        affected = self._neighbors(cindices, (old_centers, new_centers))
+        self.recompute(affected)
+        return len(affected)
+
+    def frame_areas(self, coordsets):
+        '''
+        Generator yielding an array of sphere areas for each frame of
+        coordinates, for example the coordinate sets of a trajectory.
+        Only spheres that moved relative to the previous frame, and their
+        neighbors, are recomputed.  The yielded arrays are copies.
+        '''
+        for xyz in coordsets:
+            self.update(centers = xyz)
+            yield self.areas.copy()
+
+    def _neighbors(self, indices, center_sets):
+        '''
+        Sphere indices that can intersect any of the given spheres using
+        any of the given sets of sphere centers.
+        '''
+        if len(indices) == 0:
+            from numpy import zeros, int32
+            return zeros((0,), int32)
+        d = 2 * self._radii.max()
+        from chimerax.geometry import find_close_points
+        from numpy import concatenate, unique
+        near = [indices]
+        for centers in center_sets:
+            i1, i2 = find_close_points(centers[indices], centers, d)
+            near.append(i2)
+        return unique(concatenate(near))
+
+    def recompute(self, indices):
+        '''Recompute areas for the specified sphere indices.'''
+        # Areas of the requested spheres only depend on spheres within
+        # intersecting distance, so compute on that neighborhood subset.
+        context = self._neighbors(indices, (self._centers,))
+        areas = spheres_surface_area(self._centers[context], self._radii[context])
+        from numpy import searchsorted
+        self.areas[indices] = areas[searchsorted(context, indices)]
+
+def buried_sphere_areas(centers1, radii1, centers2, radii2, areas1 = None, areas2 = None):
+    '''
+    Return exposed areas of two sets of spheres computed separately and
+    combined.  The combined areas are only recomputed for spheres near
+    the other set since spheres far from the interface have the same area
+    alone or combined.  Previously computed areas for each separate set can
+    be passed to avoid recomputing them, for instance when one set is
+    paired with many others.  Returns a1, a2, a12.
+    '''
+    if areas1 is None:
+        areas1 = spheres_surface_area(centers1, radii1)
+    if areas2 is None:
+        areas2 = spheres_surface_area(centers2, radii2)
+    from numpy import concatenate
+    a12 = concatenate((areas1, areas2))
+    n1, n2 = len(radii1), len(radii2)
+    if n1 == 0 or n2 == 0:
+        return areas1, areas2, a12
+    d = max(radii1.max(), radii2.max()) * 2
+    from chimerax.geometry import find_close_points
+    i1, i2 = find_close_points(centers1, centers2, d)
+    if len(i1) == 0:
+        return areas1, areas2, a12
+    xyz12, r12 = concatenate((centers1, centers2)), concatenate((radii1, radii2))
+    ia = IncrementalSphereAreas(xyz12, r12, areas = a12)
+    ia.recompute(concatenate((i1, i2 + n1)))
+    return areas1, areas2, a12
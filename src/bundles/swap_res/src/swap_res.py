@@ -120,7 +120,7 @@ def swap_aa(session, residues, res_type, *, bfactor=None, clash_hbond_allowance=
                 session.logger.status("Processing H-bonds for %s" % res)
                 for res, by_alt_loc in rotamers.items():
                     process_hbonds(session, res, by_alt_loc, False, None, None, hbond_relax,
-                    hbond_dist_slop, hbond_angle_slop, False, None, ignore_other_models, cache_da=True)
+                    hbond_dist_slop, hbond_angle_slop, False, None, ignore_other_models)
                 session.logger.status("")
                 from chimerax.hbonds import flush_cache
                 flush_cache()
@@ -786,7 +786,7 @@ def process_clashes(session, residue, by_alt_loc, overlap, hbond_allow, score_me
     return "%4.2f"
 
 def process_hbonds(session, residue, by_alt_loc, draw_hbonds, bond_color, radius, relax,
-            dist_slop, angle_slop, two_colors, relax_color, ignore_other_models, *, cache_da=False):
+            dist_slop, angle_slop, two_colors, relax_color, ignore_other_models):
     from chimerax.hbonds import find_hbonds
     CA = residue.find_atom("CA")
     alt_locs = CA.alt_locs if CA.alt_locs else [' ']
@@ -803,7 +803,7 @@ def process_hbonds(session, residue, by_alt_loc, draw_hbonds, bond_color, radius
             else:
                 color = bond_color
             hbonds = { hb: color for hb in find_hbonds(session, target_models, intra_model=False,
-                dist_slop=dist_slop, angle_slop=angle_slop, cache_da=cache_da, status=False) }
+                dist_slop=dist_slop, angle_slop=angle_slop, status=False) }
             if relax and two_colors:
                 hbonds.update({ hb: bond_color for hb in find_hbonds(session, target_models,
                             intra_model=False) })
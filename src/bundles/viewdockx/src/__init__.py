@@ -46,7 +46,8 @@ class _MyAPI(BundleAPI):
     def run_provider(session, name, mgr, **kw):
         from chimerax.open_command import OpenerInfo
         class ViewDockOpenerInfo(OpenerInfo):
-            def open(self, session, data, file_name, *, _name=name, show_tool=True, **kw):
+            def open(self, session, data, file_name, *, _name=name, show_tool=True, pose_sets=False,
+                    **kw):
                 if _name == "AutoDock PDBQT":
                     from .pdbqt import open_pdbqt
                     opener = open_pdbqt
@@ -59,10 +60,20 @@ class _MyAPI(BundleAPI):
                 else: # ZDOCK
                     from .io import open_zdock
                     opener = open_zdock
+                if pose_sets and "Mol2" in name:
+                    models, status = opener(session, data, file_name, True, True, pose_sets=True)
+                else:
+                    models, status = opener(session, data, file_name, True, True)
+                    if pose_sets:
+                        from .poseset import make_pose_sets
+                        models, combined = make_pose_sets(session, models)
+                        for m in combined:
+                            m.delete()
                 # the below code is also in the Maestro bundle
-                models, status = opener(session, data, file_name, True, True)
                 all_models = sum([m.all_models() for m in models], start=[])
-                if show_tool and session.ui.is_gui and len(all_models) > 1:
+                from .poseset import is_pose_set
+                if show_tool and session.ui.is_gui and (len(all_models) > 1
+                        or any([is_pose_set(m) for m in all_models])):
                     for m in all_models:
                         if hasattr(m, 'viewdockx_data'):
                             show_dock = True
@@ -80,7 +91,7 @@ class _MyAPI(BundleAPI):
             @property
             def open_args(self):
                 from chimerax.core.commands import BoolArg
-                return { 'show_tool': BoolArg }
+                return { 'show_tool': BoolArg, 'pose_sets': BoolArg }
 
         return ViewDockOpenerInfo()
 
@@ -1,6 +1,6 @@
 # vim: set expandtab ts=4 sw=4:
 
-from chimerax.core.commands import CmdDesc, StringArg
+from chimerax.core.commands import CmdDesc, StringArg, BoolArg, PositiveIntArg
 from chimerax.atomic import AtomicStructure, AtomicStructuresArg
 
 
@@ -39,10 +39,47 @@ def viewdock_up(session, name=None):
 viewdock_up_desc = CmdDesc(optional=[("name", StringArg)])
 
 
+def viewdock_poses(session, structures=None, receptor=None, fingerprints=True, nthread=None):
+    from .poseset import make_pose_sets, pose_fingerprints, is_pose_set
+    from chimerax.core.errors import UserError
+    if structures is None:
+        structures = session.models.list(type=AtomicStructure)
+    ligands = [s for s in structures
+               if is_pose_set(s) or getattr(s, "viewdockx_data", None)]
+    if not ligands:
+        raise UserError("No docking results specified")
+    models, combined = make_pose_sets(session, ligands)
+    pose_sets = [m for m in models if is_pose_set(m)]
+    if not pose_sets:
+        raise UserError("No docking results with the same ligand to combine into pose sets")
+    new_sets = [ps for ps in pose_sets if ps not in ligands]
+    if new_sets:
+        session.models.add(new_sets)
+        session.models.close(combined)
+    if fingerprints:
+        if receptor is None:
+            receptor = [s for s in session.models.list(type=AtomicStructure)
+                        if not is_pose_set(s) and not getattr(s, "viewdockx_data", None)]
+        if not receptor:
+            raise UserError("No receptor found for computing pose interactions")
+        for ps in pose_sets:
+            pose_fingerprints(session, ps, receptor, nthread=nthread)
+    num_poses = sum([ps.num_coordsets for ps in pose_sets])
+    from chimerax.core.commands import plural_form
+    session.logger.info("%d %s in %d pose %s" % (num_poses, plural_form(num_poses, "pose"),
+                        len(pose_sets), plural_form(pose_sets, "set")))
+    return pose_sets
+viewdock_poses_desc = CmdDesc(optional=[("structures", AtomicStructuresArg)],
+                              keyword=[("receptor", AtomicStructuresArg),
+                                       ("fingerprints", BoolArg),
+                                       ("nthread", PositiveIntArg)])
+
+
 command_map = {
     "viewdockx": (viewdock, viewdock_desc),
     "viewdockx down": (viewdock_down, viewdock_down_desc),
     "viewdockx up": (viewdock_up, viewdock_up_desc),
+    "viewdockx poses": (viewdock_poses, viewdock_poses_desc),
 }
 
 
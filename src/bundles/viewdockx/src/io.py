@@ -1,9 +1,9 @@
 # vim: set expandtab shiftwidth=4 softtabstop=4:
 
-def open_mol2(session, path, file_name, auto_style, atomic):
+def open_mol2(session, path, file_name, auto_style, atomic, pose_sets=False):
     from chimerax.io import open_input
     with open_input(path, encoding='utf-8') as stream:
-        p = Mol2Parser(session, stream, file_name, auto_style, atomic)
+        p = Mol2Parser(session, stream, file_name, auto_style, atomic, pose_sets)
     structures = p.structures
     from chimerax.core.commands import plural_form
     num_structures = len(structures)
@@ -69,14 +69,17 @@ class Mol2Parser:
 
     TriposPrefix = "@<tripos>"
 
-    def __init__(self, session, stream, name, auto_style, atomic):
+    def __init__(self, session, stream, name, auto_style, atomic, pose_sets=False):
         self.session = session
         self.stream = stream
         self.name = name
         self.auto_style = auto_style
         self.atomic = atomic
+        self.pose_sets = pose_sets
 
         self.structures = []
+        # Maps ligand topology to [structure, atoms, pose coordinates, pose data]
+        self._pose_groups = {}
         self._lineno = 0
         self._line = ""
         self._reset_structure()
@@ -84,6 +87,7 @@ class Mol2Parser:
             pass
         self._check_gold()
         self._make_structure()
+        self._make_pose_sets()
 
     def _read_section(self):
         """Read sections in mol2 file."""
@@ -154,6 +158,14 @@ class Mol2Parser:
         try:
             if self._molecule is None:
                 return
+            if self.pose_sets:
+                key = self._topology_key()
+                group = self._pose_groups.get(key)
+                if group is not None:
+                    # Same ligand as an earlier molecule, keep only the pose
+                    group[2].append([(ad.x, ad.y, ad.z) for ad in self._atoms])
+                    group[3].append(self._data)
+                    return
             if self.atomic:
                 from chimerax.atomic import AtomicStructure as SC
             else:
@@ -248,11 +260,34 @@ class Mol2Parser:
                     continue
                 s.pseudobond_group(s.PBG_MISSING_STRUCTURE).new_pseudobond(a1, a2)
 
-
+            if self.pose_sets:
+                self._pose_groups[key] = [s, [atomid2atom[ad.atom_id] for ad in self._atoms],
+                                          [[(ad.x, ad.y, ad.z) for ad in self._atoms]],
+                                          [self._data]]
             self.structures.append(s)
         finally:
             self._reset_structure()
 
+    def _topology_key(self):
+        """Return hashable description of current molecule without coordinates"""
+        atoms = tuple([(ad.atom_id, ad.atom_name, ad.atom_type, ad.subst_id, ad.subst_name)
+                       for ad in self._atoms])
+        bonds = tuple([(bd.origin_atom_id, bd.target_atom_id, bd.bond_type)
+                       for bd in self._bonds])
+        substs = tuple([(sd.subst_id, sd.subst_name, sd.chain, sd.sub_type)
+                        for sd in self._substs])
+        return atoms, bonds, substs
+
+    def _make_pose_sets(self):
+        """Add poses as coordinate sets of structures with more than one pose"""
+        from chimerax.atomic import Atoms
+        from numpy import array, float64
+        from .poseset import set_poses
+        for s, atoms, xyzs, pose_data in self._pose_groups.values():
+            if len(xyzs) > 1:
+                set_poses(s, Atoms(atoms), array(xyzs, float64), pose_data)
+        self._pose_groups = {}
+
     def _eat_section(self):
         """Consume all lines for current section"""
         # Stop on blank line/EOF, comment or @<tripos>
@@ -0,0 +1,265 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+
+# Pose sets hold many docking poses of one ligand as the coordinate sets
+# of a single structure, so virtual screening results with thousands of
+# poses need only one model per ligand topology.  The per-pose ViewDockX
+# data is kept in the structure "viewdockx_poses" attribute, a list with
+# one dictionary per coordinate set.  Pose coordinates stay in the frame
+# of the docking output, which is the receptor frame.
+
+
+class Pose:
+    """One docking pose of a pose set, shown as a row of the ViewDockX table.
+
+    Has the attributes the table uses for structures (id_string, atomspec,
+    viewdockx_data and display).  Displaying a pose makes its coordinate set
+    the active one, so only one pose of a pose set is shown at a time.
+    """
+
+    def __init__(self, pose_set, coordset_id, viewdockx_data):
+        self.pose_set = pose_set
+        self.coordset_id = coordset_id
+        self.viewdockx_data = viewdockx_data
+
+    @property
+    def id_string(self):
+        return "%s:%d" % (self.pose_set.id_string, self.coordset_id)
+
+    @property
+    def atomspec(self):
+        return "#" + self.id_string
+
+    def _get_display(self):
+        ps = self.pose_set
+        return ps.display and ps.active_coordset_id == self.coordset_id
+
+    def _set_display(self, display):
+        ps = self.pose_set
+        if display:
+            ps.active_coordset_id = self.coordset_id
+            ps.display = True
+        elif ps.active_coordset_id == self.coordset_id:
+            ps.display = False
+
+    display = property(_get_display, _set_display)
+
+
+def is_pose_set(s):
+    return bool(getattr(s, "viewdockx_poses", None))
+
+
+def poses(pose_set):
+    """Return a list of Pose instances, one per coordinate set of the pose set."""
+    return [Pose(pose_set, cs_id, data)
+            for cs_id, data in zip(pose_set.coordset_ids, pose_set.viewdockx_poses)]
+
+
+def set_poses(structure, atoms, xyzs, pose_data):
+    """Make structure a pose set.
+
+    'xyzs' is an array of shape (poses, atoms, 3) with coordinates for the
+    given atoms, and 'pose_data' is a list of ViewDockX data dictionaries,
+    one per pose.  Existing coordinate sets are replaced.  Coordinates of other
+    atoms are copied from the current coordinate set.
+    """
+    from numpy import zeros, float64
+    n = structure.coordset_size or structure.num_atoms
+    cs = zeros((len(xyzs), n, 3), float64)
+    all_atoms = structure.atoms
+    cs[:, all_atoms.coord_indices] = all_atoms.coords
+    cs[:, atoms.coord_indices] = xyzs
+    structure.add_coordsets(cs, replace=True)
+    structure.active_coordset_id = structure.coordset_ids[0]
+    structure.__class__.register_attr(structure.session, "viewdockx_data", "ViewDockX")
+    structure.__class__.register_attr(structure.session, "viewdockx_poses", "ViewDockX")
+    structure.viewdockx_poses = list(pose_data)
+    structure.viewdockx_data = structure.viewdockx_poses[0]
+
+
+def make_pose_sets(session, structures):
+    """Combine docking results with identical ligand topology into pose sets.
+
+    Structures that already are pose sets or have no docking data are left as
+    they are.  Returns the list of structures with each group of two or more
+    structures replaced by a new pose set, and the list of structures that
+    were combined and should be closed.  Pose sets are not added to the session.
+    """
+    groups = {}
+    order = []
+    for s in structures:
+        if is_pose_set(s) or not getattr(s, "viewdockx_data", None):
+            order.append([s])
+            continue
+        key = _topology_key(s)
+        group = groups.get(key)
+        if group is None:
+            groups[key] = group = [s]
+            order.append(group)
+        else:
+            group.append(s)
+    from numpy import array
+    models = []
+    combined = []
+    for group in order:
+        if len(group) == 1:
+            models.append(group[0])
+            continue
+        first = group[0]
+        ps = first.copy()
+        ps.positions = first.positions
+        # Atoms of each structure are in the same order since topology matches.
+        to_first = first.scene_position.inverse()
+        xyzs = array([to_first.transform_points(s.atoms.scene_coords) for s in group])
+        set_poses(ps, ps.atoms, xyzs, [s.viewdockx_data for s in group])
+        models.append(ps)
+        combined.extend(group)
+    return models, combined
+
+
+def _topology_key(s):
+    atoms = s.atoms
+    a1, a2 = s.bonds.atoms
+    r = atoms.residues
+    return (tuple(atoms.names), tuple(atoms.element_names), tuple(r.names),
+            tuple(r.numbers), atoms.indices(a1).tobytes(), atoms.indices(a2).tobytes())
+
+
+def pose_coords(pose_set, atoms):
+    """Return scene coordinates of atoms for every pose as an array of shape (poses, atoms, 3)."""
+    from numpy import array
+    ci = atoms.coord_indices
+    xyzs = array([pose_set.coordset(cs_id).xyzs[ci] for cs_id in pose_set.coordset_ids])
+    p = pose_set.scene_position
+    if not p.is_identity():
+        p.transform_points(xyzs.reshape((-1, 3)), in_place=True)
+    return xyzs
+
+
+def pose_fingerprints(session, pose_set, receptors, nthread=None):
+    """Count hydrogen bonds, clashes and contacts of every pose with receptor structures.
+
+    Counts are computed for all poses together and stored in the pose data
+    under the keys "HBonds", "Clashes" and "Contacts".  Clashes and contacts
+    use the criteria of the "clashes" and "contacts" commands with default
+    settings.  Overlaps are computed for batches of poses in 'nthread' threads.
+    Returns the three count arrays, with one value per pose.
+    """
+    from chimerax.atomic import concatenate, Atoms
+    from chimerax.clashes.settings import defaults
+    ligand = pose_set.atoms
+    xyzs = pose_coords(pose_set, ligand)
+    ratoms = concatenate([r.atoms for r in receptors], Atoms)
+    max_overlap_dist = 2 * _max_vdw_radius - defaults["contact_threshold"]
+    pocket = _pocket_atoms(ratoms, xyzs, max_overlap_dist)
+    clashes, contacts, hbond_pairs = _count_overlaps(ligand, pocket, xyzs, nthread)
+    hbonds = _count_hbonds(session, pose_set, ligand, pocket, hbond_pairs)
+    for data, h, cl, co in zip(pose_set.viewdockx_poses, hbonds, clashes, contacts):
+        data["HBonds"] = int(h)
+        data["Clashes"] = int(cl)
+        data["Contacts"] = int(co)
+    return hbonds, clashes, contacts
+
+# Same as the clashes command assumed maximum VDW radius.
+_max_vdw_radius = 2.1
+
+# Maximum number of ligand-receptor atom distances computed at once by a thread.
+_overlap_batch_size = 2**22
+
+# Longer than any donor-acceptor distance accepted by find_hbonds without distance
+# slop (3.83 for sulfur acceptors plus 0.35 sulfur compensation).
+_max_hbond_dist = 4.5
+
+
+def _pocket_atoms(ratoms, xyzs, max_dist):
+    # Receptor atoms in the bounding box of all poses padded by max_dist.
+    rxyz = ratoms.scene_coords
+    pts = xyzs.reshape((-1, 3))
+    if len(pts) == 0:
+        return ratoms.filter([])
+    lo, hi = pts.min(axis=0) - max_dist, pts.max(axis=0) + max_dist
+    inside = ((rxyz >= lo) & (rxyz <= hi)).all(axis=1)
+    return ratoms.filter(inside)
+
+
+def _count_overlaps(ligand, pocket, xyzs, nthread):
+    # Also returns the pose, ligand atom and pocket atom index arrays of nitrogen,
+    # oxygen and sulfur pairs close enough to be hydrogen bonded.
+    from numpy import zeros, int32, float32, array, intp, concatenate, isin
+    from chimerax.clashes.settings import defaults
+    npose = len(xyzs)
+    clashes = zeros((npose,), int32)
+    contacts = zeros((npose,), int32)
+    hbond_pairs = tuple(zeros((0,), intp) for i in range(3))
+    if npose == 0 or len(ligand) == 0 or len(pocket) == 0:
+        return clashes, contacts, hbond_pairs
+    from chimerax.clashes.clashes import _donor, _acceptor
+    ldon = array([_donor(a) for a in ligand])
+    lacc = array([_acceptor(a) for a in ligand])
+    pdon = array([_donor(a) for a in pocket])
+    pacc = array([_acceptor(a) for a in pocket])
+    hbond_pair = (ldon[:, None] & pacc[None, :]) | (lacc[:, None] & pdon[None, :])
+    # Overlap is radius sum minus distance, reduced for possibly hydrogen bonded pairs.
+    rsum = ligand.radii[:, None] + pocket.radii[None, :]
+    clash_rsum = (rsum - defaults["clash_hbond_allowance"] * hbond_pair).astype(float32)
+    contact_rsum = (rsum - defaults["contact_hbond_allowance"] * hbond_pair).astype(float32)
+    clash_threshold = defaults["clash_threshold"]
+    contact_threshold = defaults["contact_threshold"]
+    nos = [7, 8, 16]
+    hbond_candidate = isin(ligand.element_numbers, nos)[:, None] & isin(pocket.element_numbers, nos)[None, :]
+    lxyz = xyzs.astype(float32)
+    pxyz = pocket.scene_coords.astype(float32)
+
+    def count(start, end):
+        d = lxyz[start:end, :, None, :] - pxyz[None, None, :, :]
+        d *= d
+        dist = d.sum(axis=3)
+        dist **= 0.5
+        pi, li, ri = ((dist <= _max_hbond_dist) & hbond_candidate).nonzero()
+        return (start, ((clash_rsum - dist) >= clash_threshold).sum(axis=(1, 2)),
+                ((contact_rsum - dist) >= contact_threshold).sum(axis=(1, 2)),
+                (pi + start, li, ri))
+
+    step = max(1, _overlap_batch_size // (len(ligand) * len(pocket)))
+    from chimerax.core.threadq import apply_to_list
+    results = apply_to_list(count, [(i, min(i + step, npose)) for i in range(0, npose, step)],
+                            nthread=nthread)
+    pairs = []
+    for start, cl, co, hp in results:
+        clashes[start:start + len(cl)] = cl
+        contacts[start:start + len(co)] = co
+        pairs.append(hp)
+    hbond_pairs = tuple(concatenate(a) for a in zip(*pairs))
+    return clashes, contacts, hbond_pairs
+
+
+def _count_hbonds(session, pose_set, ligand, pocket, hbond_pairs):
+    # Close nitrogen, oxygen and sulfur pairs were found for all poses together, so
+    # the hydrogen bond geometry is only checked for poses with such pairs, limited
+    # to the atoms in those pairs.  Donor and acceptor typing is cached by the
+    # hbonds module.
+    from numpy import zeros, int32, unique, argsort, split
+    counts = zeros((pose_set.num_coordsets,), int32)
+    pi, li, ri = hbond_pairs
+    if len(pi) == 0:
+        return counts
+    order = argsort(pi, kind='stable')
+    pi, li, ri = pi[order], li[order], ri[order]
+    poses, starts = unique(pi, return_index=True)
+    from chimerax.atomic import concatenate
+    from chimerax.hbonds import find_hbonds
+    structures = [pose_set] + list(pocket.unique_structures)
+    cs_ids = pose_set.coordset_ids
+    cur_cs_id = pose_set.active_coordset_id
+    pose_set.active_coordset_change_notify = False
+    try:
+        for p, pli, pri in zip(poses, split(li, starts[1:]), split(ri, starts[1:])):
+            pose_set.active_coordset_id = cs_ids[p]
+            da_atoms = concatenate([ligand[unique(pli)], pocket[unique(pri)]])
+            hbonds = find_hbonds(session, structures, intra_model=False,
+                                 donors=da_atoms, acceptors=da_atoms, status=False)
+            counts[p] = sum([1 for d, a in hbonds
+                             if (d.structure is pose_set) != (a.structure is pose_set)])
+    finally:
+        pose_set.active_coordset_id = cur_cs_id
+        pose_set.active_coordset_change_notify = True
+    return counts
@@ -4,6 +4,11 @@ from chimerax.ui import HtmlToolInstance
 from chimerax.core.errors import UserError
 
 
+def _entry_structure(entry):
+    # Structure containing a table entry, which is a structure or pose
+    return getattr(entry, "pose_set", entry)
+
+
 class _BaseTool(HtmlToolInstance):
 
     SESSION_ENDURING = False
@@ -37,23 +42,33 @@ class _BaseTool(HtmlToolInstance):
         self.category_rating = "viewdockx_rating"
         self.category_list = []
         self.structures = []
+        self._poses = {}
 
         #
-        # Get list of structures that we are displaying
+        # Get list of structures that we are displaying.
+        # Pose sets are shown as one entry per pose.
         #
         session = self.session
         if structures is None:
-            # Include structures only if they have viewdock data
             from chimerax.atomic import AtomicStructure
-            structures = [s for s in session.models.list(type=AtomicStructure)
-                          if hasattr(s, "viewdockx_data") and s.viewdockx_data]
-        else:
-            structures = [s for s in structures
-                          if hasattr(s, "viewdockx_data") and s.viewdockx_data]
+            structures = session.models.list(type=AtomicStructure)
+        from .poseset import Pose, is_pose_set, poses
+        entries = []
+        for s in structures:
+            if isinstance(s, Pose):
+                entries.append(s)
+            elif is_pose_set(s):
+                entries.extend(poses(s))
+            elif hasattr(s, "viewdockx_data") and s.viewdockx_data:
+                # Include structures only if they have viewdock data
+                entries.append(s)
+        structures = entries
 
         if not structures:
             raise UserError("No suitable models found for ViewDockX")
         self.structures = structures
+        self._poses = dict([(s.id_string, s) for s in structures
+                            if isinstance(s, Pose)])
         t = session.triggers
         from chimerax.core.models import REMOVE_MODELS, MODEL_DISPLAY_CHANGED
         self._remove_handler = t.add_handler(REMOVE_MODELS, self._update_models)
@@ -104,8 +119,11 @@ class _BaseTool(HtmlToolInstance):
     def _update_models(self, trigger=None, trigger_data=None):
         """ Called to update page with current list of models"""
         if trigger_data is not None:
+            closed = set(trigger_data)
             self.structures = [s for s in self.structures
-                               if s not in trigger_data]
+                               if _entry_structure(s) not in closed]
+            self._poses = dict([(k, p) for k, p in self._poses.items()
+                                if p.pose_set not in closed])
         if not self.structures:
             self.delete()
             return
@@ -175,10 +193,11 @@ class _BaseTool(HtmlToolInstance):
     def _make_display(self, s=None):
         if s is None:
             structures = self.structures
-        elif s in self.structures:
-            structures = [s]
         else:
-            return None
+            structures = [e for e in self.structures
+                          if _entry_structure(e) is s]
+            if not structures:
+                return None
         return [(s.atomspec[1:], True if s.display else False)
                 for s in structures]
 
@@ -205,16 +224,21 @@ class _BaseTool(HtmlToolInstance):
 
     def get_structures(self, model_id):
         if model_id:
+            ids = model_id.split(',')
+            poses = [self._poses[mid] for mid in ids if mid in self._poses]
+            model_ids = [mid for mid in ids if mid not in self._poses]
+            if not model_ids:
+                return poses
             from chimerax.atomic import StructuresArg
-            atomspec = ''.join(['#' + mid for mid in model_id.split(',')])
-            return StructuresArg.parse(atomspec, self.session)[0]
+            atomspec = ''.join(['#' + mid for mid in model_ids])
+            return list(StructuresArg.parse(atomspec, self.session)[0]) + poses
         else:
             return self.structures
 
     def show_only(self, model_id):
         on = []
         off = []
-        structures = self.get_structures(model_id)
+        structures = set(self.get_structures(model_id))
         for s in self.structures:
             onoff = s in structures
             if s.display != onoff:
@@ -228,8 +252,9 @@ class _BaseTool(HtmlToolInstance):
         on = []
         off = []
         structures = self.get_structures(model_id)
+        entries = set(self.structures)
         for s in structures:
-            if s in self.structures:
+            if s in entries:
                 if s.display:
                     off.append(s)
                 else:
@@ -238,10 +263,11 @@ class _BaseTool(HtmlToolInstance):
 
     def show_set(self, model_id, onoff):
         structures = self.get_structures(model_id)
+        entries = set(self.structures)
         on = []
         off = []
         for s in structures:
-            if s.display != onoff and s in self.structures:
+            if s.display != onoff and s in entries:
                 if onoff:
                     on.append(s)
                 else:
@@ -251,7 +277,19 @@ class _BaseTool(HtmlToolInstance):
     def _show_hide(self, on, off):
         if on or off:
             from chimerax.core.commands import concise_model_spec, run
+            from .poseset import Pose
             self._block_updates = True
+            # Poses are shown by switching the active coordinate set
+            # of their pose set, hide before show since a pose set
+            # shows only one pose.
+            for p in off:
+                if isinstance(p, Pose):
+                    p.display = False
+            for p in on:
+                if isinstance(p, Pose):
+                    p.display = True
+            off = [s for s in off if not isinstance(s, Pose)]
+            on = [s for s in on if not isinstance(s, Pose)]
             cmd = []
             if off:
                 models = concise_model_spec(self.session, off)
@@ -259,7 +297,8 @@ class _BaseTool(HtmlToolInstance):
             if on:
                 models = concise_model_spec(self.session, on)
                 cmd.append("show %s models" % models)
-            run(self.session, " ; ".join(cmd))
+            if cmd:
+                run(self.session, " ; ".join(cmd))
             self._block_updates = False
             self._update_display()
 
@@ -268,10 +307,14 @@ class _BaseTool(HtmlToolInstance):
     html_state = "_html_state"
 
     def take_snapshot(self, session, flags):
+        from .poseset import Pose
         data = {
-            "version": 2,
+            "version": 3,
             "_super": super().take_snapshot(session, flags),
-            "structures": self.structures,
+            "structures": [s for s in self.structures
+                           if not isinstance(s, Pose)],
+            "poses": [(s.pose_set, s.coordset_id) for s in self.structures
+                      if isinstance(s, Pose)],
         }
         self.add_webview_state(data)
         return data
@@ -288,6 +331,15 @@ class _BaseTool(HtmlToolInstance):
             structures = list([sd[0] for sd in structures])
             for c in classes:
                 c.register_attr(session, "viewdockx_data", "ViewDockX")
+        saved_poses = data.get("poses", [])
+        if saved_poses:
+            from .poseset import poses
+            pose_map = {}
+            for ps in set([ps for ps, cs_id in saved_poses if ps is not None]):
+                for p in poses(ps):
+                    pose_map[(ps, p.coordset_id)] = p
+            structures = list(structures) + [pose_map[ps_cs] for ps_cs in saved_poses
+                                             if ps_cs in pose_map]
         inst.setup(structures, data.get(cls.html_state, None))
         return inst
 
@@ -439,20 +491,41 @@ class TableTool(_BaseTool):
         # Create hydrogen bonds between receptor(s) and ligands
         from chimerax.core.commands import concise_model_spec, run
         from chimerax.atomic import AtomicStructure
-        mine = concise_model_spec(self.session, self.structures)
+        from .poseset import Pose
+        ligands = set([_entry_structure(s) for s in self.structures])
         all = self.session.models.list(type=AtomicStructure)
-        others = concise_model_spec(self.session,
-                                    set(all) - set(self.structures))
+        receptors = [s for s in all if s not in ligands]
+        pose_sets = set([s.pose_set for s in self.structures
+                         if isinstance(s, Pose)])
+        if pose_sets:
+            self._pose_fingerprints(pose_sets, receptors, column_name)
+        structures = [s for s in self.structures if not isinstance(s, Pose)]
+        if not structures:
+            return
+        mine = concise_model_spec(self.session, structures)
+        others = concise_model_spec(self.session, receptors)
         cmd = ("%s %s restrict %s "
                "reveal true intersubmodel true" % (finder, mine, others))
         run(self.session, cmd)
-        self._count_pb(cat_name, column_name)
+        self._count_pb(cat_name, column_name, structures)
+
+    def _pose_fingerprints(self, pose_sets, receptors, key):
+        # Counts for all poses are computed together when first needed
+        from .poseset import pose_fingerprints
+        for ps in pose_sets:
+            if any([key not in d for d in ps.viewdockx_poses]):
+                pose_fingerprints(self.session, ps, receptors)
+        for column in ("HBonds", "Clashes", "Contacts"):
+            if column not in self.category_list:
+                self.category_list.append(column)
+        self.category_list.sort(key=str.lower)
+        self._update_models()
 
-    def _count_pb(self, group_name, key):
+    def _count_pb(self, group_name, key, structures):
         # Count up the hydrogen bonds for each structure
         pbg = self.session.pb_manager.get_group(group_name)
         pa1, pa2 = pbg.pseudobonds.atoms
-        for s in self.structures:
+        for s in structures:
             atoms = s.atoms
             ma1 = pa1.mask(atoms)
             ma2 = pa2.mask(atoms)
@@ -476,10 +549,23 @@ class TableTool(_BaseTool):
             return
         prefix = "##########"
         from chimerax.mol2 import write_mol2
+        from .poseset import Pose
+        active = dict([(s.pose_set, s.pose_set.active_coordset_id)
+                       for s in self.structures if isinstance(s, Pose)])
+        try:
+            self._write_mol2(path, prefix, write_mol2)
+        finally:
+            for ps, cs_id in active.items():
+                ps.active_coordset_id = cs_id
+
+    def _write_mol2(self, path, prefix, write_mol2):
+        from .poseset import Pose
         with open(path, "w") as outf:
             for s in self.structures:
+                if isinstance(s, Pose):
+                    s.pose_set.active_coordset_id = s.coordset_id
                 with OutputCache() as sf:
-                    write_mol2(self.session, sf, models=[s])
+                    write_mol2(self.session, sf, models=[_entry_structure(s)])
                 for item in s.viewdockx_data.items():
                     print(prefix, "%s: %s\n" % item, end='', file=outf)
                 print("\n", end='', file=outf)
@@ -495,7 +581,22 @@ class TableTool(_BaseTool):
         if not structures:
             print("No structures closed")
             return
-        self.session.models.close(structures)
+        # Poses are removed from the table, and pose sets
+        # are closed when none of their poses remain.
+        from .poseset import Pose
+        pruned = set([s for s in structures if isinstance(s, Pose)])
+        if pruned:
+            self.structures = [s for s in self.structures if s not in pruned]
+            self._poses = dict([(k, p) for k, p in self._poses.items()
+                                if p not in pruned])
+            kept = set([_entry_structure(s) for s in self.structures])
+            structures = [s for s in structures if not isinstance(s, Pose)]
+            structures.extend(set([p.pose_set for p in pruned
+                                   if p.pose_set not in kept]))
+        if structures:
+            self.session.models.close(structures)
+        if self.structures:
+            self._update_models()
 
     def _cb_columns_updated(self, query):
         self._update_display()
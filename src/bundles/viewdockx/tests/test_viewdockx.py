@@ -0,0 +1,61 @@
+import os
+
+test_data_folder = os.path.join(os.path.dirname(os.path.dirname(__file__)), "test-data")
+
+def _open_vina_poses(session):
+    from chimerax.core.commands import run
+    receptor = run(session, "open %s showTool false"
+                   % os.path.join(test_data_folder, "vinaoutput.receptor.pdbqt"))[0]
+    ligands = run(session, "open %s format pdbqt showTool false"
+                  % os.path.join(test_data_folder, "vinaoutput.txt"))
+    return receptor, ligands
+
+def test_pose_sets_group_by_topology(test_production_session):
+    session = test_production_session
+    from chimerax.viewdockx.poseset import make_pose_sets, is_pose_set
+    receptor, ligands = _open_vina_poses(session)
+    assert len(ligands) == 5
+    # Removing an atom gives the last result a different topology.
+    other = ligands[-1]
+    other.atoms[-1].delete()
+    models, combined = make_pose_sets(session, [receptor] + ligands)
+    assert len(models) == 3
+    assert models[0] is receptor and models[2] is other
+    ps = models[1]
+    assert is_pose_set(ps) and not is_pose_set(receptor) and not is_pose_set(other)
+    assert combined == ligands[:4]
+    assert ps.num_coordsets == 4
+    assert ps.viewdockx_poses == [s.viewdockx_data for s in ligands[:4]]
+    from numpy import allclose
+    for cs_id, s in zip(ps.coordset_ids, ligands[:4]):
+        assert allclose(ps.coordset(cs_id).xyzs[ps.atoms.coord_indices], s.atoms.coords)
+
+def test_pose_fingerprints_match_commands(test_production_session):
+    session = test_production_session
+    from chimerax.viewdockx.poseset import make_pose_sets, pose_fingerprints
+    from chimerax.clashes.clashes import find_clashes
+    from chimerax.clashes.settings import defaults
+    from chimerax.hbonds import find_hbonds
+    receptor, ligands = _open_vina_poses(session)
+    models, combined = make_pose_sets(session, ligands)
+    ps = models[0]
+    session.models.add([ps])
+    hbonds, clashes, contacts = pose_fingerprints(session, ps, [receptor], nthread=2)
+    assert len(hbonds) == len(clashes) == len(contacts) == len(ligands)
+
+    def overlap_count(s, threshold, allowance):
+        overlaps = find_clashes(session, s.atoms, restrict=receptor.atoms,
+                                clash_threshold=threshold, hbond_allowance=allowance)
+        return sum([len(overlaps[a]) for a in s.atoms if a in overlaps])
+
+    for i, s in enumerate(ligands):
+        hb = find_hbonds(session, [s, receptor], intra_model=False, status=False)
+        assert hbonds[i] == len([1 for d, a in hb if (d.structure is s) != (a.structure is s)])
+        assert clashes[i] == overlap_count(s, defaults["clash_threshold"],
+                                           defaults["clash_hbond_allowance"])
+        assert contacts[i] == overlap_count(s, defaults["contact_threshold"],
+                                            defaults["contact_hbond_allowance"])
+        data = ps.viewdockx_poses[i]
+        assert (data["HBonds"], data["Clashes"], data["Contacts"]) == (
+            hbonds[i], clashes[i], contacts[i])
+    assert contacts.sum() > 0
@@ -42,120 +42,207 @@ def write_vrml(session, filename, models = None,
     if models is None:
         models = session.models.list()
 
-    geom_list = models_geometry(models)
-
-    if center or size is not None:
-        center_and_size(models, geom_list, center, size)
+    drawings = all_visible_drawings(models)
+    scale, translation = center_and_size(models, center, size)
 
     with open(filename, 'w') as file:
-        file.write(vrml_string(geom_list, backface_culling))
+        write_vrml_scene(file, drawings, scale, translation, backface_culling)
 
 # -----------------------------------------------------------------------------
+# Shapes are written one drawing at a time.  Drawings with many instances, such
+# as atom spheres, bond cylinders and symmetry copies, define their geometry
+# once and place it with a Transform node for each instance, so the file size
+# and memory use do not grow with the triangles of every copy.
 #
-def vrml_string(geom_list, backface_culling):
+def write_vrml_scene(file, drawings, scale, translation, backface_culling):
 
-    template = \
+    header = \
 '''#VRML V2.0 utf8
 
-# Generated by ChimeraX <<version>>
+# Generated by ChimeraX {version}
 
-NavigationInfo {
+NavigationInfo {{
   type [ "EXAMINE", "ANY" ]
-}
+}}
 
-Transform {
-  scale 1 1 1
-  translation 0 0 0
+Transform {{
+  scale {scale} {scale} {scale}
+  translation {tx} {ty} {tz}
 
   children
   [
-    Shape
+'''
+    from chimerax.core import __version__ as version
+    tx, ty, tz = translation
+    file.write(header.format(version = version, scale = '%.6g' % scale,
+                             tx = '%.6g' % tx, ty = '%.6g' % ty, tz = '%.6g' % tz))
+    solid = 'TRUE' if backface_culling else 'FALSE'
+    for i, d in enumerate(drawings):
+        write_drawing_shapes(file, d, 'G%d' % (i+1), solid)
+    file.write('  ]\n}\n')
+
+# -----------------------------------------------------------------------------
+#
+def write_drawing_shapes(file, drawing, name, solid):
+    v = drawing.vertices
+    vc = drawing.vertex_colors
+    t = drawing.masked_triangles
+    if len(t) < len(drawing.triangles):
+        v, vc, t = remove_unused_vertices(v, vc, t)
+
+    positions = drawing.get_scene_positions(displayed_only = True)
+    if len(positions) == 1:
+        p = positions[0]
+        if not p.is_identity():
+            v = p * v
+        if vc is None:
+            vc = single_vertex_color(len(v), drawing.color)
+        file.write(shape_text(v, t, solid, vertex_colors = vc))
+        return
+
+    # Scene positions list parent instances times drawing instances.
+    instance_colors = drawing.get_colors(displayed_only = True)
+    from numpy import arange
+    cindex = arange(len(positions)) % len(instance_colors)
+
+    transforms = instance_transforms(positions)
+    if transforms is None:
+        # Instances cannot be written as transforms so write copies in batches.
+        from chimerax.surface import position_batches
+        offset = 0
+        for bpos in position_batches(positions, len(v)):
+            bcolors = instance_colors[cindex[offset:offset+len(bpos)]]
+            bv, bvc, bt = combine_instance_geometry(v, vc, t, bpos, bcolors)
+            file.write(shape_text(bv, bt, solid, vertex_colors = bvc))
+            offset += len(bpos)
+        return
+
+    # Define a shape for each instance color, all sharing the vertex coordinates.
+    if vc is None:
+        from numpy import unique
+        colors, color_num = unique(instance_colors, axis = 0, return_inverse = True)
+        shape_num = color_num.ravel()[cindex]
+    else:
+        colors, shape_num = None, cindex * 0
+    defined = set()
+    coord_name = name + 'coord'
+    from chimerax.geometry import Place
+    from math import radians
+    for i, (shift, rot, scale) in enumerate(zip(*transforms)):
+        sn = shape_num[i]
+        shape_name = '%s_%d' % (name, sn)
+        if sn in defined:
+            shape = 'USE %s' % shape_name
+        else:
+            coord_use = coord_name if defined else None
+            color = None if colors is None else colors[sn]
+            shape = 'DEF %s %s' % (shape_name,
+                                   shape_text(v, t, solid, vertex_colors = vc, color = color,
+                                              coord_def = coord_name, coord_use = coord_use))
+            defined.add(sn)
+        axis, angle = Place(axes = rot.T).rotation_axis_and_angle()
+        file.write('Transform {\n  translation %.6g %.6g %.6g\n' % tuple(shift) +
+                   '  rotation %.6g %.6g %.6g %.6g\n' % (tuple(axis) + (radians(angle),)) +
+                   '  scale %.6g %.6g %.6g\n' % tuple(scale) +
+                   '  children [ %s ]\n}\n' % shape)
+
+# -----------------------------------------------------------------------------
+# Return translations, rotation matrices and scale factors for each position,
+# or None if some position is not a rotation and scaling along the rotated axes
+# which a VRML Transform node can represent.
+#
+def instance_transforms(positions, tolerance = 1e-4):
+    from numpy import sqrt, einsum, identity, abs
+    from numpy.linalg import det
+    m = positions.array()
+    lin = m[:,:,:3]
+    s = sqrt((lin*lin).sum(axis = 1))	# Column lengths
+    if (s == 0).any():
+        return None
+    r = lin / s[:,None,:]
+    rtr = einsum('nji,njk->nik', r, r)
+    if abs(rtr - identity(3)).max() > tolerance or (det(r) <= 0).any():
+        return None
+    return m[:,:,3], r, s
+
+# -----------------------------------------------------------------------------
+#
+def shape_text(v, t, solid, vertex_colors = None, color = None,
+               coord_def = None, coord_use = None):
+
+    template = \
+'''Shape
+{
+  geometry IndexedFaceSet
+  {
+    creaseAngle .5
+    solid <<solid>>
+    coord <<coord>>
+<<color_node>>    coordIndex
+    [
+      <<triangles>>
+    ]
+  }
+  appearance Appearance
+  {
+    material Material
     {
-      geometry IndexedFaceSet
-      {
-        creaseAngle .5
-        solid <<solid>>
-        coord Coordinate
-        {
-          point
-          [
-            <<vertices>>
-          ]
-        }
-        color Color
-        {
-          color
-          [
-            <<colors>>
-          ]
-        }
-        coordIndex
-        [
-          <<triangles>>
-        ]
-      }
-      appearance Appearance
-      {
-        material Material
-        {
-	       ambientIntensity <<ambient_intensity>>
-	       diffuseColor <<diffuse_color>>
-	       specularColor <<specular_color>>
-	       shininess <<shininess>>
-	       transparency <<transparency>>
-        }
-      }
+      ambientIntensity <<ambient_intensity>>
+      diffuseColor <<diffuse_color>>
+      specularColor <<specular_color>>
+      shininess <<shininess>>
+      transparency <<transparency>>
     }
-  ]
+  }
 }
 '''
-
     # Escape curly brackets
     template = template.replace('{', '{{').replace('}', '}}').replace('<<', '{').replace('>>', '}')
 
-    from chimerax.core import __version__ as version
-    solid = 'TRUE' if backface_culling else 'FALSE'
-    from chimerax.surface import combine_geometry_vtc
-    v,t,c = combine_geometry_vtc(geom_list)
-    vertices = ',\n'.join(', '.join('%.6g %.6g %.6g' % (x,y,z) for x,y,z in v[i:i+4])
-                        for i in range(0, len(v), 4))
-    colors = ',\n'.join(', '.join('%.6g %.6g %.6g' % (r/255,g/255,b/255) for r,g,b in c[i:i+4,:3])
-                      for i in range(0, len(c), 4))
-    triangles = ',\n'.join(', '.join('%d,%d,%d,-1' % (v1,v2,v3) for v1,v2,v3 in t[i:i+6])
-                         for i in range(0, len(t), 6))
-    if len(c) > 0 and (c[:,3] == c[0,3]).all():
-        transparency = '%.6g' % ((255-c[0,3])/255)
+    if coord_use is not None:
+        coord = 'USE %s' % coord_use
+    else:
+        vertices = ',\n'.join(', '.join('%.6g %.6g %.6g' % (x,y,z) for x,y,z in v[i:i+4])
+                              for i in range(0, len(v), 4))
+        coord = 'Coordinate\n    {\n      point\n      [\n        %s\n      ]\n    }' % vertices
+        if coord_def is not None:
+            coord = 'DEF %s %s' % (coord_def, coord)
+
+    c = vertex_colors
+    if c is not None:
+        colors = ',\n'.join(', '.join('%.6g %.6g %.6g' % (r/255,g/255,b/255) for r,g,b in c[i:i+4,:3])
+                            for i in range(0, len(c), 4))
+        color_node = '    color Color\n    {\n      color\n      [\n        %s\n      ]\n    }\n' % colors
+        diffuse_color = '0.9 0.9 0.9'
+        if len(c) > 0 and (c[:,3] == c[0,3]).all():
+            transparency = '%.6g' % ((255-c[0,3])/255)
+        else:
+            transparency = '0'
     else:
-        transparency = '0'
-    vrml = template.format(version = version, solid = solid,
-                           vertices = vertices, colors = colors, triangles = triangles,
-                           ambient_intensity = '0.2', diffuse_color = '0.9 0.9 0.9',
-	                   specular_color = '.1 .1 .1', shininess = '.5', transparency = transparency)
-    return vrml
+        r,g,b,a = color
+        color_node = ''
+        diffuse_color = '%.6g %.6g %.6g' % (r/255, g/255, b/255)
+        transparency = '%.6g' % ((255-a)/255)
+
+    triangles = ',\n'.join(', '.join('%d,%d,%d,-1' % (v1,v2,v3) for v1,v2,v3 in t[i:i+6])
+                           for i in range(0, len(t), 6))
+    return template.format(solid = solid, coord = coord, color_node = color_node,
+                           triangles = triangles, ambient_intensity = '0.2',
+                           diffuse_color = diffuse_color, specular_color = '.1 .1 .1',
+                           shininess = '.5', transparency = transparency)
         
 # -----------------------------------------------------------------------------
+# Return scale and translation of the top level Transform node that centers and
+# scales the scene.
 #
-def center_and_size(models, geom_list, center, size):
+def center_and_size(models, center, size):
     from chimerax.geometry import union_bounds
     bounds = union_bounds(m.bounds() for m in models if m.visible)
-    if bounds is None:
-        return
-    if center:
-        c = bounds.center()
-        for (v,vc,t) in geom_list:
-            v -= c
-    if size is not None:
-        s = max(bounds.size())
-        scale = size / s
-        for (v,vc,t) in geom_list:
-            v *= scale
-
-# -----------------------------------------------------------------------------
-#
-def models_geometry(models):
-    drawings = all_visible_drawings(models)
-    geom_list = [drawing_geometry(d) for d in drawings]
-    return geom_list
+    if bounds is None or (not center and size is None):
+        return 1, (0,0,0)
+    scale = 1 if size is None else size / max(bounds.size())
+    translation = -scale * bounds.center() if center else (0,0,0)
+    return scale, translation
 
 # -----------------------------------------------------------------------------
 # Collect all drawings including descendants of specified models, excluding
@@ -170,37 +257,6 @@ def all_visible_drawings(models):
                     drawings.add(d)
     return tuple(drawings)
 
-# -----------------------------------------------------------------------------
-#
-def drawing_geometry(drawing):
-    v = drawing.vertices.copy()
-    vc = drawing.vertex_colors
-    t = drawing.masked_triangles
-
-    if len(t) < len(drawing.triangles):
-        v, vc, t = remove_unused_vertices(v, vc, t)
-    
-    # Expand instancing and create vertex colors if needed.
-    positions = drawing.get_scene_positions(displayed_only = True)
-    if len(positions) == 1:
-        p = positions[0]
-        if not p.is_identity():
-            p.transform_points(v, in_place = True)
-        if vc is None:
-            vc = single_vertex_color(len(v), drawing.color)
-    else:
-        dpositions = drawing.get_positions(displayed_only = True)
-        instance_colors = drawing.get_colors(displayed_only = True)
-        v, vc, t = combine_instance_geometry(v, vc, t, dpositions, instance_colors)
-        ppositions = drawing.parent.get_scene_positions(displayed_only = True)
-        if len(ppositions) == 1:
-            pp = ppositions[0]
-            if not pp.is_identity():
-                pp.transform_points(v, in_place = True)
-        else:
-            v, vc, t = combine_instance_geometry(v, vc, t, ppositions, None)
-    return v, t, vc
-
 # -----------------------------------------------------------------------------
 #
 def remove_unused_vertices(va, vc, ta):
@@ -344,9 +344,10 @@ def write_obj(session, filename, models, obj_to_unity = True, single_object = Fa
                 geom.append((full_name(d), va, na, tca, ta, pos))
 
     if single_object:
-        from chimerax.surface import combine_geometry_xvntctp
-        va, na, tca, ta = combine_geometry_xvntctp(geom)
-        geom = [(None, va, na, tca, ta, None)]
+        tex_coords = [tca is not None for name, va, na, tca, ta, pos in geom]
+        if any(tex_coords) and not all(tex_coords):
+            raise RuntimeError('Cannot combine some models with texture coordinates'
+                               ' and others without texture coordinates')
 
     # Write 80 character comment.
     from chimerax import app_dirs as ad
@@ -358,10 +359,15 @@ def write_obj(session, filename, models, obj_to_unity = True, single_object = Fa
     # Write comment
     file.write(created_by)
 
+    # Write batches of instances to limit memory use.  A single object
+    # is written as consecutive vertex and face lists with no object name.
+    from chimerax.surface import position_batches
     voffset = 0
     for name, va, na, tca, ta, pos in geom:
-        vcount = write_object(file, name, va, na, tca, ta, voffset, pos, obj_to_unity)
-        voffset += vcount
+        for i, bpos in enumerate(position_batches(pos, len(va))):
+            oname = name if i == 0 and not single_object else None
+            vcount = write_object(file, oname, va, na, tca, ta, voffset, bpos, obj_to_unity)
+            voffset += vcount
 
     file.close()
 